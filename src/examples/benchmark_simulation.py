@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Benchmarks voor de Go2 PyBullet simulatie
+
+Meet de doorvoer van de simulatie en RL environments (headless).
+
+Gebruik:
+    python src/examples/benchmark_simulation.py reset
+    python src/examples/benchmark_simulation.py reset --env stairs --resets 200
+    python src/examples/benchmark_simulation.py profile
+    python src/examples/benchmark_simulation.py multi --robots 16
+    python src/examples/benchmark_simulation.py vec --envs 32 --envs-per-process 4
+    python src/examples/benchmark_simulation.py transport --envs 8
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+import argparse
+from functools import partial
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.simulation.go2_simulator import Go2Simulator
+from src.simulation.go2_rl_env import Go2RLEnv
+from src.simulation.go2_stairs_env import Go2StairsEnv
+
+
+def current_rss_mb() -> float:
+    """Huidig geheugengebruik (resident set size) van dit proces in MB"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        pass
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def make_env(env_name: str, **kwargs):
+    """Maak environment op naam"""
+    if env_name == "walking":
+        return Go2RLEnv(gui=False, **kwargs)
+    elif env_name == "stairs":
+        return Go2StairsEnv(gui=False, **kwargs)
+    raise ValueError(f"Onbekende environment: {env_name}")
+
+
+def benchmark_reset(env_name: str = "walking", num_resets: int = 50, episode_steps: int = 10):
+    """
+    Meet resets per seconde met en zonder snelle reset
+    
+    Args:
+        env_name: Environment ("walking" of "stairs")
+        num_resets: Aantal resets per meting
+        episode_steps: Aantal stappen tussen resets (korte episodes)
+    """
+    print("=" * 70)
+    print(f"  Reset Benchmark - {env_name}")
+    print("=" * 70)
+    
+    results = {}
+    for fast_reset in (False, True):
+        env = make_env(env_name, fast_reset=fast_reset)
+        env.reset()  # Eerste reset (simulator laden) niet meetellen
+        action = np.zeros(env.action_space.shape, dtype=np.float32)
+        
+        reset_time = 0.0
+        for _ in range(num_resets):
+            for _ in range(episode_steps):
+                env.step(action)
+            start = time.perf_counter()
+            env.reset()
+            reset_time += time.perf_counter() - start
+        env.close()
+        
+        label = "snel (restore state)" if fast_reset else "herbouw simulator"
+        results[label] = num_resets / reset_time
+    
+    print()
+    for label, resets_per_sec in results.items():
+        print(f"  {label:<24} {resets_per_sec:>12.1f} resets/s  ({1e6 / resets_per_sec:>10.1f} µs/reset)")
+    
+    values = list(results.values())
+    print(f"\n✓ Speedup: {values[1] / values[0]:.1f}x")
+    return results
+
+
+def benchmark_profile(num_steps: int = 20000, num_sims: int = 8):
+    """
+    Vergelijk simulator profielen ("full" vs "train")
+    
+    Args:
+        num_steps: Aantal physics stappen per meting
+        num_sims: Aantal simulators voor geheugenmeting per env
+    """
+    print("=" * 70)
+    print("  Simulator Profiel Benchmark")
+    print("=" * 70)
+    
+    results = {}
+    # "train" eerst meten: vrijgegeven geheugen van "full" wordt anders hergebruikt
+    for profile in ("train", "full"):
+        # Laadtijd en geheugen per simulator
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        sims = [Go2Simulator(gui=False, profile=profile) for _ in range(num_sims)]
+        load_time = (time.perf_counter() - start) / num_sims
+        memory_per_env = (current_rss_mb() - rss_before) / num_sims
+        
+        # Physics stappen per seconde met robot in staande houding
+        sim = sims[0]
+        sim.set_joint_targets_array(np.array(sim.default_joint_positions))
+        start = time.perf_counter()
+        sim.step(num_steps)
+        steps_per_sec = num_steps / (time.perf_counter() - start)
+        
+        for sim in sims:
+            sim.close()
+        
+        results[profile] = {
+            "load_time": load_time,
+            "steps_per_sec": steps_per_sec,
+            "memory_mb": memory_per_env,
+        }
+    
+    print()
+    print(f"  {'profiel':<8} {'laadtijd':>12} {'stappen/s':>12} {'geheugen/env':>14}")
+    for profile, result in results.items():
+        print(
+            f"  {profile:<8} {result['load_time'] * 1000:>10.1f}ms "
+            f"{result['steps_per_sec']:>12.0f} {result['memory_mb']:>12.1f}MB"
+        )
+    
+    speedup = results["train"]["steps_per_sec"] / results["full"]["steps_per_sec"]
+    print(f"\n✓ Physics speedup (train vs full): {speedup:.2f}x")
+    return results
+
+
+def benchmark_multi(num_robots: int = 8, num_steps: int = 2000):
+    """
+    Vergelijk N losse simulators met N robots in één physics wereld
+    
+    Args:
+        num_robots: Aantal robots
+        num_steps: Aantal physics stappen per meting
+    """
+    print("=" * 70)
+    print(f"  Multi-robot Benchmark - {num_robots} robots")
+    print("=" * 70)
+    
+    results = {}
+    
+    # N losse simulators, elk met eigen client
+    sims = [Go2Simulator(gui=False, profile="train") for _ in range(num_robots)]
+    targets = np.array(sims[0].default_joint_positions)
+    start = time.perf_counter()
+    for _ in range(num_steps):
+        for sim in sims:
+            sim.set_joint_targets_array(targets)
+            sim.step()
+            sim.get_joint_state_arrays()
+    results["losse simulators"] = num_robots * num_steps / (time.perf_counter() - start)
+    for sim in sims:
+        sim.close()
+    
+    # N robots in één wereld: één stepSimulation per stap
+    sim = Go2Simulator(gui=False, profile="train", num_robots=num_robots)
+    batch_targets = np.tile(targets, (num_robots, 1))
+    start = time.perf_counter()
+    for _ in range(num_steps):
+        sim.set_joint_targets_batch(batch_targets)
+        sim.step()
+        sim.get_joint_state_batch()
+    results["één wereld"] = num_robots * num_steps / (time.perf_counter() - start)
+    sim.close()
+    
+    print()
+    for label, robot_steps_per_sec in results.items():
+        print(f"  {label:<20} {robot_steps_per_sec:>12.0f} robot-stappen/s")
+    
+    values = list(results.values())
+    print(f"\n✓ Speedup: {values[1] / values[0]:.2f}x")
+    return results
+
+
+def benchmark_vec(
+    env_name: str = "walking",
+    num_envs: int = 16,
+    envs_per_process: int = 4,
+    num_steps: int = 200,
+    decimation: int = 4
+):
+    """
+    Vergelijk env stappen per seconde van DummyVecEnv en Go2VecEnv
+    
+    Args:
+        env_name: Environment ("walking" of "stairs")
+        num_envs: Aantal environments
+        envs_per_process: Robots per worker proces voor de multiprocess meting
+        num_steps: Aantal vec stappen per meting
+        decimation: Physics substeps per policy stap
+    """
+    from stable_baselines3.common.vec_env import DummyVecEnv
+    from src.simulation.vec_env import Go2VecEnv
+    
+    print("=" * 70)
+    print(f"  VecEnv Benchmark - {env_name}, {num_envs} environments")
+    print("=" * 70)
+    
+    env_fn = partial(make_env, env_name, decimation=decimation)
+    setups = {
+        "DummyVecEnv": lambda: DummyVecEnv([env_fn] * num_envs),
+        "Go2VecEnv (1 client)": lambda: Go2VecEnv([env_fn] * num_envs),
+        f"Go2VecEnv ({envs_per_process}/proces)": lambda: Go2VecEnv(
+            [env_fn] * num_envs, envs_per_process=envs_per_process
+        ),
+    }
+    
+    results = {}
+    for label, make_vec_env in setups.items():
+        vec_env = make_vec_env()
+        vec_env.reset()
+        actions = np.zeros((num_envs,) + vec_env.action_space.shape, dtype=np.float32)
+        start = time.perf_counter()
+        for _ in range(num_steps):
+            vec_env.step(actions)
+        results[label] = num_envs * num_steps / (time.perf_counter() - start)
+        vec_env.close()
+    
+    print()
+    for label, env_steps_per_sec in results.items():
+        print(f"  {label:<28} {env_steps_per_sec:>12.0f} env-stappen/s")
+    
+    values = list(results.values())
+    print(f"\n✓ Speedup t.o.v. DummyVecEnv: {max(values[1:]) / values[0]:.2f}x  ({os.cpu_count()} CPU's)")
+    return results
+
+
+def benchmark_transport(
+    env_name: str = "walking",
+    num_envs: int = 4,
+    num_steps: int = 500,
+    decimation: int = 1
+):
+    """
+    Vergelijk worker transport: SubprocVecEnv vs Go2VecEnv (pipe en shm)
+    
+    Elke environment draait in een eigen worker proces, zodat alleen het
+    transport van actions, observaties en rewards verschilt.
+    
+    Args:
+        env_name: Environment ("walking" of "stairs")
+        num_envs: Aantal environments (= aantal worker processen)
+        num_steps: Aantal vec stappen per meting
+        decimation: Physics substeps per policy stap (laag = transport weegt zwaarder)
+    """
+    from stable_baselines3.common.vec_env import SubprocVecEnv
+    from src.simulation.vec_env import Go2VecEnv
+    
+    print("=" * 70)
+    print(f"  Transport Benchmark - {env_name}, {num_envs} worker processen")
+    print("=" * 70)
+    
+    env_fn = partial(make_env, env_name, decimation=decimation)
+    setups = {
+        "SubprocVecEnv": lambda: SubprocVecEnv([env_fn] * num_envs),
+        "Go2VecEnv (pipe)": lambda: Go2VecEnv([env_fn] * num_envs, envs_per_process=1, transport="pipe"),
+        "Go2VecEnv (shm)": lambda: Go2VecEnv([env_fn] * num_envs, envs_per_process=1, transport="shm"),
+    }
+    
+    results = {}
+    for label, make_vec_env in setups.items():
+        vec_env = make_vec_env()
+        vec_env.reset()
+        actions = np.zeros((num_envs,) + vec_env.action_space.shape, dtype=np.float32)
+        start = time.perf_counter()
+        for _ in range(num_steps):
+            vec_env.step(actions)
+        elapsed = time.perf_counter() - start
+        results[label] = num_envs * num_steps / elapsed
+        vec_env.close()
+    
+    print()
+    for label, env_steps_per_sec in results.items():
+        print(
+            f"  {label:<20} {env_steps_per_sec:>12.0f} env-stappen/s  "
+            f"({1e6 * num_envs / env_steps_per_sec:>8.1f} µs/vec stap)"
+        )
+    
+    print(f"\n✓ Speedup shm t.o.v. SubprocVecEnv: {results['Go2VecEnv (shm)'] / results['SubprocVecEnv']:.2f}x")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks voor de Go2 PyBullet simulatie"
+    )
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+    
+    reset_parser = subparsers.add_parser("reset", help="Resets per seconde (herbouw vs snelle reset)")
+    reset_parser.add_argument(
+        "--env",
+        type=str,
+        default="walking",
+        choices=["walking", "stairs"],
+        help="Environment (default: walking)"
+    )
+    reset_parser.add_argument(
+        "--resets",
+        type=int,
+        default=50,
+        help="Aantal resets (default: 50)"
+    )
+    reset_parser.add_argument(
+        "--episode-steps",
+        type=int,
+        default=10,
+        help="Stappen per episode tussen resets (default: 10)"
+    )
+    
+    profile_parser = subparsers.add_parser("profile", help="Simulator profielen vergelijken (full vs train)")
+    profile_parser.add_argument(
+        "--steps",
+        type=int,
+        default=20000,
+        help="Aantal physics stappen (default: 20000)"
+    )
+    profile_parser.add_argument(
+        "--sims",
+        type=int,
+        default=8,
+        help="Aantal simulators voor geheugenmeting (default: 8)"
+    )
+    
+    multi_parser = subparsers.add_parser("multi", help="N losse simulators vs N robots in één wereld")
+    multi_parser.add_argument(
+        "--robots",
+        type=int,
+        default=8,
+        help="Aantal robots (default: 8)"
+    )
+    multi_parser.add_argument(
+        "--steps",
+        type=int,
+        default=2000,
+        help="Aantal physics stappen (default: 2000)"
+    )
+    
+    vec_parser = subparsers.add_parser("vec", help="DummyVecEnv vs Go2VecEnv (env stappen/s)")
+    vec_parser.add_argument(
+        "--env",
+        type=str,
+        default="walking",
+        choices=["walking", "stairs"],
+        help="Environment (default: walking)"
+    )
+    vec_parser.add_argument(
+        "--envs",
+        type=int,
+        default=16,
+        help="Aantal environments (default: 16)"
+    )
+    vec_parser.add_argument(
+        "--envs-per-process",
+        type=int,
+        default=4,
+        help="Robots per worker proces (default: 4)"
+    )
+    vec_parser.add_argument(
+        "--steps",
+        type=int,
+        default=200,
+        help="Aantal vec stappen (default: 200)"
+    )
+    vec_parser.add_argument(
+        "--decimation",
+        type=int,
+        default=4,
+        help="Physics substeps per policy stap (default: 4)"
+    )
+    
+    transport_parser = subparsers.add_parser("transport", help="SubprocVecEnv vs Go2VecEnv pipe/shm transport")
+    transport_parser.add_argument(
+        "--env",
+        type=str,
+        default="walking",
+        choices=["walking", "stairs"],
+        help="Environment (default: walking)"
+    )
+    transport_parser.add_argument(
+        "--envs",
+        type=int,
+        default=4,
+        help="Aantal environments en worker processen (default: 4)"
+    )
+    transport_parser.add_argument(
+        "--steps",
+        type=int,
+        default=500,
+        help="Aantal vec stappen (default: 500)"
+    )
+    transport_parser.add_argument(
+        "--decimation",
+        type=int,
+        default=1,
+        help="Physics substeps per policy stap (default: 1)"
+    )
+    
+    args = parser.parse_args()
+    
+    if args.benchmark == "reset":
+        benchmark_reset(
+            env_name=args.env,
+            num_resets=args.resets,
+            episode_steps=args.episode_steps
+        )
+    elif args.benchmark == "profile":
+        benchmark_profile(num_steps=args.steps, num_sims=args.sims)
+    elif args.benchmark == "multi":
+        benchmark_multi(num_robots=args.robots, num_steps=args.steps)
+    elif args.benchmark == "vec":
+        benchmark_vec(
+            env_name=args.env,
+            num_envs=args.envs,
+            envs_per_process=args.envs_per_process,
+            num_steps=args.steps,
+            decimation=args.decimation
+        )
+    elif args.benchmark == "transport":
+        benchmark_transport(
+            env_name=args.env,
+            num_envs=args.envs,
+            num_steps=args.steps,
+            decimation=args.decimation
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Parallelle evaluatie van getrainde Go2 policies
+
+Evalueert één model of een hele checkpoint directory over meerdere seeds en
+trap configuraties in headless worker processen. Resultaten per episode
+worden naar een JSON lines bestand gestreamd; aan het einde volgt een
+samenvatting met betrouwbaarheidsintervallen.
+
+Voorbeeld:
+    python src/examples/evaluate_parallel.py models/go2_stairs/checkpoints \\
+        --episodes 10 --seeds 0 1 2 --num-steps 3 5 --step-height 10 15
+"""
+
+import sys
+import json
+import itertools
+from pathlib import Path
+import argparse
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.simulation.evaluation import (
+    ENV_TYPES, find_models, make_tasks, evaluate_parallel, summarize
+)
+from src.simulation.randomization import DEFAULT_RANDOMIZATION
+from src.simulation.sensors import SENSOR_TYPES
+
+try:
+    import stable_baselines3
+except ImportError:
+    print("ERROR: Stable-Baselines3 niet geïnstalleerd")
+    print("Installeer met: conda activate pybullet && pip install stable-baselines3")
+    sys.exit(1)
+
+
+def find_stair_config(model_path: str) -> Optional[Dict]:
+    """Zoek stair_config.json van train_stairs.py in de map van het model of erboven"""
+    path = Path(model_path).resolve()
+    for directory in [path if path.is_dir() else path.parent] + list(path.parents)[:2]:
+        config_path = directory / "stair_config.json"
+        if config_path.exists():
+            with open(config_path, "r") as f:
+                return json.load(f)
+    return None
+
+
+def stair_configs_from_args(
+    num_steps: Optional[List[int]],
+    step_heights: Optional[List[float]],
+    step_depths: Optional[List[float]],
+    base_config: Optional[Dict]
+) -> List[Optional[Dict]]:
+    """Alle combinaties van de opgegeven trap parameters (hoogte en diepte in cm)"""
+    if not (num_steps or step_heights or step_depths):
+        return [base_config]
+    configs = []
+    for steps, height, depth in itertools.product(num_steps or [None], step_heights or [None], step_depths or [None]):
+        config = dict(base_config or {})
+        if steps is not None:
+            config["num_steps"] = steps
+        if height is not None:
+            config["step_height"] = height / 100.0  # cm naar m
+        if depth is not None:
+            config["step_depth"] = depth / 100.0  # cm naar m
+        configs.append(config)
+    return configs
+
+
+def format_interval(values: List[float], scale: float = 1.0, digits: int = 2) -> str:
+    """Gemiddelde [onder, boven] als tekst"""
+    mean, low, high = (value * scale for value in values)
+    return f"{mean:.{digits}f} [{low:.{digits}f}, {high:.{digits}f}]"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Evalueer getrainde Go2 policies parallel over seeds en trap configuraties"
+    )
+    parser.add_argument(
+        "model_path",
+        type=str,
+        help="Pad naar getraind model of een directory met checkpoints"
+    )
+    parser.add_argument(
+        "--env",
+        type=str,
+        default="stairs",
+        choices=list(ENV_TYPES),
+        help="Environment: traplopen of lopen (default: stairs)"
+    )
+    parser.add_argument(
+        "--episodes",
+        type=int,
+        default=10,
+        help="Episodes per model, configuratie en seed (default: 10)"
+    )
+    parser.add_argument(
+        "--seeds",
+        type=int,
+        nargs="+",
+        default=[0, 1, 2],
+        help="Evaluatie seeds (default: 0 1 2)"
+    )
+    parser.add_argument(
+        "--num-steps",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Aantal treden (meerdere waarden = meerdere configuraties)"
+    )
+    parser.add_argument(
+        "--step-height",
+        type=float,
+        nargs="+",
+        default=None,
+        help="Hoogte per trede in centimeters (meerdere waarden mogelijk)"
+    )
+    parser.add_argument(
+        "--step-depth",
+        type=float,
+        nargs="+",
+        default=None,
+        help="Diepte per trede in centimeters (meerdere waarden mogelijk)"
+    )
+    parser.add_argument(
+        "--reward",
+        type=str,
+        default="walking",
+        choices=["walking", "standing", "custom"],
+        help="Reward type voor --env rl (default: walking)"
+    )
+    parser.add_argument(
+        "--max-episode-steps",
+        type=int,
+        default=None,
+        help="Maximum stappen per episode (default: 2000 traplopen, 1000 lopen)"
+    )
+    parser.add_argument(
+        "--control-dt",
+        type=float,
+        default=None,
+        help="Tijd per policy stap in seconden (zelfde als bij training)"
+    )
+    parser.add_argument(
+        "--sensors",
+        nargs="+",
+        default=None,
+        choices=list(SENSOR_TYPES),
+        help="Sensoren waarmee het model getraind is"
+    )
+    parser.add_argument(
+        "--randomize",
+        action="store_true",
+        help="Evalueer met domain randomization (robuustheid)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Aantal worker processen (default: aantal cores, 0 = geen processen)"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="eval_results.jsonl",
+        help="Resultaten per episode (JSON lines, default: eval_results.jsonl)"
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Betrouwbaarheid van de intervallen (default: 0.95)"
+    )
+    
+    args = parser.parse_args()
+    
+    models = find_models(args.model_path)
+    
+    env_kwargs = {
+        "max_episode_steps": args.max_episode_steps or (2000 if args.env == "stairs" else 1000),
+        "control_dt": args.control_dt,
+        "sensors": {name: None for name in args.sensors} if args.sensors else None,
+        "randomization": dict(DEFAULT_RANDOMIZATION) if args.randomize else None,
+    }
+    stair_configs = [None]
+    if args.env == "stairs":
+        stair_configs = stair_configs_from_args(
+            args.num_steps, args.step_height, args.step_depth, find_stair_config(args.model_path)
+        )
+    else:
+        env_kwargs["reward_type"] = args.reward
+    
+    tasks = make_tasks(
+        models,
+        seeds=args.seeds,
+        num_episodes=args.episodes,
+        stair_configs=stair_configs,
+        env=args.env,
+        env_kwargs=env_kwargs
+    )
+    
+    print("=" * 70)
+    print("  Parallelle RL Evaluatie")
+    print("=" * 70)
+    print(f"\nModellen: {len(models)}")
+    print(f"Configuraties: {len(stair_configs)}")
+    print(f"Seeds: {', '.join(str(seed) for seed in args.seeds)}")
+    print(f"Episodes: {len(tasks)} totaal")
+    print(f"Resultaten: {args.output}\n")
+    
+    done = [0]
+    
+    def on_result(result: Dict):
+        done[0] += 1
+        status = "✓" if result["success"] else "✗"
+        print(
+            f"[{done[0]}/{len(tasks)}] {status} {Path(result['model']).name} "
+            f"config {result['config']} seed {result['seed']} episode {result['episode']}: "
+            f"reward {result['return']:.2f}, lengte {result['length']}",
+            flush=True
+        )
+    
+    results = evaluate_parallel(tasks, results_path=args.output, num_workers=args.workers, on_result=on_result)
+    summary = summarize(results, confidence=args.confidence)
+    
+    summary_path = Path(args.output).with_suffix(".summary.json")
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=2)
+    
+    # Samenvatting per model en configuratie
+    print("\n" + "=" * 70)
+    print(f"  Evaluatie Resultaten ({args.confidence:.0%} intervallen)")
+    print("=" * 70)
+    for row in summary:
+        print(f"\n{Path(row['model']).name} - configuratie {row['config']}: {row.get('stair_config') or 'standaard'}")
+        print(f"  Episodes: {row['episodes']}")
+        print(f"  Success rate: {format_interval(row['success_rate'], 100.0, 1)} %")
+        print(f"  Val rate: {format_interval(row['fall_rate'], 100.0, 1)} %")
+        print(f"  Reward: {format_interval(row['return'])}")
+        print(f"  Lengte: {format_interval(row['length'], digits=1)}")
+        if "steps_reached" in row:
+            print(f"  Treden gehaald: {format_interval(row['steps_reached'])}")
+    
+    print(f"\n✓ Resultaten opgeslagen: {args.output}")
+    print(f"✓ Samenvatting opgeslagen: {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
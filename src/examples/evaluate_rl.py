@@ -7,10 +7,12 @@ import sys
 import os
 from pathlib import Path
 import argparse
+from typing import Optional
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.simulation.go2_rl_env import Go2RLEnv
+from src.simulation.rendering import VideoWriter
 
 try:
     from stable_baselines3 import PPO, SAC, TD3
@@ -20,7 +22,15 @@ except ImportError:
     sys.exit(1)
 
 
-def evaluate(model_path: str, num_episodes: int = 10, gui: bool = True, reward_type: str = "walking"):
+def evaluate(
+    model_path: str,
+    num_episodes: int = 10,
+    gui: bool = True,
+    reward_type: str = "walking",
+    control_dt: Optional[float] = None,
+    video_path: Optional[str] = None,
+    video_fps: float = 30.0
+):
     """Evaluateer getrainde model"""
     
     print("=" * 70)
@@ -28,6 +38,8 @@ def evaluate(model_path: str, num_episodes: int = 10, gui: bool = True, reward_t
     print("=" * 70)
     print(f"\nModel: {model_path}")
     print(f"Episodes: {num_episodes}")
+    if video_path:
+        print(f"Video: {video_path}")
     print(f"GUI: {gui}\n")
     
     # Laad model
@@ -50,7 +62,19 @@ def evaluate(model_path: str, num_episodes: int = 10, gui: bool = True, reward_t
     
     # Maak environment
     print("✓ Environment aanmaken...")
-    env = Go2RLEnv(gui=gui, reward_type=reward_type, max_episode_steps=1000)
+    env = Go2RLEnv(
+        gui=gui,
+        reward_type=reward_type,
+        max_episode_steps=1000,
+        control_dt=control_dt,
+        render_mode="rgb_array" if video_path else None
+    )
+    
+    # Video opname (offscreen, werkt ook zonder GUI)
+    video = None
+    if video_path:
+        video = VideoWriter(video_path, fps=video_fps)
+        video_every = max(1, int(round(1.0 / (video_fps * env.control_dt))))
     
     # Run episodes
     print("\n✓ Episodes uitvoeren...\n")
@@ -66,11 +90,17 @@ def evaluate(model_path: str, num_episodes: int = 10, gui: bool = True, reward_t
         
         print(f"Episode {episode + 1}/{num_episodes}...", end=" ", flush=True)
         
+        if video is not None:
+            video.append(env.render())
+        
         while not done:
             action, _ = model.predict(obs, deterministic=True)
             obs, reward, done, truncated, info = env.step(action)
             episode_reward += reward
             episode_length += 1
+            
+            if video is not None and episode_length % video_every == 0:
+                video.append(env.render())
         
         episode_rewards.append(episode_reward)
         episode_lengths.append(episode_length)
@@ -86,6 +116,10 @@ def evaluate(model_path: str, num_episodes: int = 10, gui: bool = True, reward_t
     print(f"Min reward: {np.min(episode_rewards):.2f}")
     print(f"Max reward: {np.max(episode_rewards):.2f}")
     
+    if video is not None:
+        video.close()
+        print(f"\n✓ Video opgeslagen: {video_path} ({video.frames_written} frames)")
+    
     env.close()
 
 
@@ -117,13 +151,35 @@ def main():
         help="Reward type (default: walking)"
     )
     
+    parser.add_argument(
+        "--control-dt",
+        type=float,
+        default=None,
+        help="Tijd per policy stap in seconden (zelfde als bij training), bijv. 0.05 voor 20 Hz (default: elke physics stap)"
+    )
+    parser.add_argument(
+        "--video",
+        type=str,
+        default=None,
+        help="Sla evaluatie video op (bijv. videos/eval.mp4); werkt ook met --no-gui"
+    )
+    parser.add_argument(
+        "--video-fps",
+        type=float,
+        default=30.0,
+        help="Frames per seconde van de video (default: 30)"
+    )
+    
     args = parser.parse_args()
     
     evaluate(
         model_path=args.model_path,
         num_episodes=args.episodes,
         gui=not args.no_gui,
-        reward_type=args.reward
+        reward_type=args.reward,
+        control_dt=args.control_dt,
+        video_path=args.video,
+        video_fps=args.video_fps
     )
 
 
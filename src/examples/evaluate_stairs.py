@@ -8,11 +8,14 @@ import os
 import json
 from pathlib import Path
 import argparse
+from typing import List, Optional
 import numpy as np
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.simulation.go2_stairs_env import Go2StairsEnv
+from src.simulation.sensors import SENSOR_TYPES
+from src.simulation.rendering import VideoWriter
 
 try:
     from stable_baselines3 import PPO, SAC, TD3
@@ -26,7 +29,11 @@ def evaluate(
     model_path: str,
     num_episodes: int = 10,
     gui: bool = True,
-    stair_config: dict = None
+    stair_config: dict = None,
+    control_dt: Optional[float] = None,
+    video_path: Optional[str] = None,
+    video_fps: float = 30.0,
+    sensors: Optional[List[str]] = None
 ):
     """Evaluateer getrainde model voor traplopen"""
     
@@ -35,6 +42,8 @@ def evaluate(
     print("=" * 70)
     print(f"\nModel: {model_path}")
     print(f"Episodes: {num_episodes}")
+    if video_path:
+        print(f"Video: {video_path}")
     print(f"GUI: {gui}")
     
     # Laad trap configuratie als beschikbaar
@@ -77,7 +86,20 @@ def evaluate(
     
     # Maak environment
     print("✓ Environment aanmaken...")
-    env = Go2StairsEnv(gui=gui, stair_config=stair_config, max_episode_steps=2000)
+    env = Go2StairsEnv(
+        gui=gui,
+        stair_config=stair_config,
+        max_episode_steps=2000,
+        control_dt=control_dt,
+        render_mode="rgb_array" if video_path else None,
+        sensors={name: None for name in sensors} if sensors else None
+    )
+    
+    # Video opname (offscreen, werkt ook zonder GUI)
+    video = None
+    if video_path:
+        video = VideoWriter(video_path, fps=video_fps)
+        video_every = max(1, int(round(1.0 / (video_fps * env.control_dt))))
     
     # Run episodes
     print("\n✓ Episodes uitvoeren...\n")
@@ -94,11 +116,17 @@ def evaluate(
         
         print(f"Episode {episode + 1}/{num_episodes}...", end=" ", flush=True)
         
+        if video is not None:
+            video.append(env.render())
+        
         while not done:
             action, _ = model.predict(obs, deterministic=True)
             obs, reward, done, truncated, info = env.step(action)
             episode_reward += reward
             episode_length += 1
+            
+            if video is not None and episode_length % video_every == 0:
+                video.append(env.render())
         
         episode_rewards.append(episode_reward)
         episode_lengths.append(episode_length)
@@ -120,6 +148,10 @@ def evaluate(
     print(f"Min reward: {np.min(episode_rewards):.2f}")
     print(f"Max reward: {np.max(episode_rewards):.2f}")
     
+    if video is not None:
+        video.close()
+        print(f"\n✓ Video opgeslagen: {video_path} ({video.frames_written} frames)")
+    
     env.close()
 
 
@@ -162,6 +194,32 @@ def main():
         help="Diepte per trede in centimeters (override config)"
     )
     
+    parser.add_argument(
+        "--control-dt",
+        type=float,
+        default=None,
+        help="Tijd per policy stap in seconden (zelfde als bij training), bijv. 0.05 voor 20 Hz (default: elke physics stap)"
+    )
+    parser.add_argument(
+        "--video",
+        type=str,
+        default=None,
+        help="Sla evaluatie video op (bijv. videos/eval.mp4); werkt ook met --no-gui"
+    )
+    parser.add_argument(
+        "--video-fps",
+        type=float,
+        default=30.0,
+        help="Frames per seconde van de video (default: 30)"
+    )
+    parser.add_argument(
+        "--sensors",
+        nargs="+",
+        default=None,
+        choices=list(SENSOR_TYPES),
+        help="Sensoren waarmee het model getraind is (zelfde als --sensors bij train_stairs.py)"
+    )
+    
     args = parser.parse_args()
     
     stair_config = {}
@@ -176,7 +234,11 @@ def main():
         model_path=args.model_path,
         num_episodes=args.episodes,
         gui=not args.no_gui,
-        stair_config=stair_config if stair_config else None
+        stair_config=stair_config if stair_config else None,
+        control_dt=args.control_dt,
+        video_path=args.video,
+        video_fps=args.video_fps,
+        sensors=args.sensors
     )
 
 
@@ -26,14 +26,24 @@ except ImportError as e:
     sys.exit(1)
 
 
-def basic_simulation():
+def print_pacing_stats(sim):
+    """Toon pacing statistieken (alleen geoptimaliseerde simulator)"""
+    if not hasattr(sim, "pacing_stats"):
+        return
+    stats = sim.pacing_stats()
+    print(f"\n✓ Pacing ({stats['mode']}): real-time factor {stats['real_time_factor']:.2f}x")
+    print(f"  Frames: {stats['frames']}, {stats['frames_late']} te laat")
+    print(f"  Jitter per frame: gemiddeld {stats['frame_jitter_mean_ms']:.2f}ms, max {stats['frame_jitter_max_ms']:.2f}ms")
+
+
+def basic_simulation(**sim_kwargs):
     """Basis simulatie - robot staat stil"""
     print("=" * 70)
     print("  PyBullet Simulatie - Basis")
     print("=" * 70)
     print("\nRobot wordt geladen...")
     
-    with Go2Simulator(gui=True) as sim:
+    with Go2Simulator(gui=True, **sim_kwargs) as sim:
         print("\n✓ Simulatie gestart!")
         print("  - Robot staat in standaard positie")
         print("  - Druk Ctrl+C om te stoppen\n")
@@ -43,16 +53,18 @@ def basic_simulation():
             sim.run_simulation(3.0)
         except KeyboardInterrupt:
             print("\n\n⚠️  Simulatie gestopt door gebruiker")
+        
+        print_pacing_stats(sim)
 
 
-def movement_simulation():
+def movement_simulation(**sim_kwargs):
     """Simulatie met beweging"""
     print("=" * 70)
     print("  PyBullet Simulatie - Beweging")
     print("=" * 70)
     print("\nRobot wordt geladen...")
     
-    with Go2Simulator(gui=True) as sim:
+    with Go2Simulator(gui=True, **sim_kwargs) as sim:
         print("\n✓ Simulatie gestart!")
         print("  - Robot gaat bewegen")
         print("  - Druk Ctrl+C om te stoppen\n")
@@ -101,16 +113,18 @@ def movement_simulation():
                 
         except KeyboardInterrupt:
             print("\n\n⚠️  Simulatie gestopt door gebruiker")
+        
+        print_pacing_stats(sim)
 
 
-def sensor_simulation():
+def sensor_simulation(**sim_kwargs):
     """Simulatie met sensor data lezen"""
     print("=" * 70)
     print("  PyBullet Simulatie - Sensor Data")
     print("=" * 70)
     print("\nRobot wordt geladen...")
     
-    with Go2Simulator(gui=True) as sim:
+    with Go2Simulator(gui=True, **sim_kwargs) as sim:
         print("\n✓ Simulatie gestart!")
         print("  - Lezen sensor data")
         print("  - Druk Ctrl+C om te stoppen\n")
@@ -143,16 +157,18 @@ def sensor_simulation():
                 
         except KeyboardInterrupt:
             print("\n\n⚠️  Simulatie gestopt door gebruiker")
+        
+        print_pacing_stats(sim)
 
 
-def circle_walk_simulation():
+def circle_walk_simulation(**sim_kwargs):
     """Simulatie waarbij de robot in een kring loopt"""
     print("=" * 70)
     print("  PyBullet Simulatie - Cirkel Lopen")
     print("=" * 70)
     print("\nRobot wordt geladen...")
     
-    with Go2Simulator(gui=True) as sim:
+    with Go2Simulator(gui=True, **sim_kwargs) as sim:
         print("\n✓ Simulatie gestart!")
         print("  - Robot loopt in een cirkel")
         print("  - Druk Ctrl+C om te stoppen\n")
@@ -266,7 +282,8 @@ def circle_walk_simulation():
                 p.resetBasePositionAndOrientation(
                     sim.robot_id,
                     new_pos,
-                    target_orientation
+                    target_orientation,
+                    physicsClientId=sim.client
                 )
                 
                 # Simuleer stap
@@ -283,6 +300,8 @@ def circle_walk_simulation():
             print(f"\n❌ Fout: {e}")
             import traceback
             traceback.print_exc()
+        
+        print_pacing_stats(sim)
 
 
 def main():
@@ -304,17 +323,34 @@ def main():
         action='store_true',
         help='Run zonder GUI (headless mode)'
     )
+    parser.add_argument(
+        '--pacing',
+        choices=['fast', 'realtime', 'xfactor'],
+        default='realtime',
+        help='Wall-clock pacing (default: realtime)'
+    )
+    parser.add_argument(
+        '--speed',
+        type=float,
+        default=1.0,
+        help='Snelheidsfactor bij --pacing xfactor (default: 1.0)'
+    )
     
     args = parser.parse_args()
     
+    # Pacing is alleen beschikbaar in de geoptimaliseerde simulator
+    sim_kwargs = {}
+    if hasattr(Go2Simulator, "set_pacing"):
+        sim_kwargs = {"pacing": args.pacing, "speed": args.speed}
+    
     if args.mode == 'basic':
-        basic_simulation()
+        basic_simulation(**sim_kwargs)
     elif args.mode == 'movement':
-        movement_simulation()
+        movement_simulation(**sim_kwargs)
     elif args.mode == 'sensor':
-        sensor_simulation()
+        sensor_simulation(**sim_kwargs)
     elif args.mode == 'circle':
-        circle_walk_simulation()
+        circle_walk_simulation(**sim_kwargs)
     else:
         print(f"Onbekende modus: {args.mode}")
         return 1
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Rollouts opnemen voor offline analyse en behavior cloning
+
+Speelt episodes met een getraind model (of willekeurige acties) en schrijft
+elke transitie via RolloutRecorder naar memory-mapped kolom bestanden.
+Lees een opname terug met src.simulation.recording.RolloutReader.
+
+Voorbeeld:
+    python src/examples/record_rollouts.py models/go2_stairs/best_model/best_model.zip \\
+        --env stairs --episodes 100 --reward-terms --contacts --output rollouts/stairs
+"""
+
+import sys
+import time
+from pathlib import Path
+import argparse
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.simulation.evaluation import ENV_TYPES, load_policy, make_env, run_episode
+from src.simulation.recording import RolloutRecorder, RolloutReader
+from src.simulation.randomization import DEFAULT_RANDOMIZATION
+from src.simulation.sensors import SENSOR_TYPES
+
+
+class RandomPolicy:
+    """Willekeurige acties met dezelfde interface als een SB3 model"""
+    
+    def __init__(self, action_space, seed: int):
+        """
+        Args:
+            action_space: Action space van de environment
+            seed: Seed voor de acties
+        """
+        self.action_space = action_space
+        self.action_space.seed(seed)
+    
+    def predict(self, obs, deterministic: bool = True):
+        """Willekeurige actie (obs en deterministic worden genegeerd)"""
+        return self.action_space.sample(), None
+
+
+def disk_usage(path: Path) -> int:
+    """Werkelijk gebruikte bytes (chunk bestanden zijn sparse)"""
+    return sum(f.stat().st_blocks * 512 for f in path.rglob("*") if f.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Neem Go2 rollouts op naar memory-mapped kolom bestanden"
+    )
+    parser.add_argument(
+        "model_path",
+        type=str,
+        nargs="?",
+        default=None,
+        help="Pad naar getraind model (weglaten = willekeurige acties)"
+    )
+    parser.add_argument(
+        "--env",
+        type=str,
+        default="stairs",
+        choices=list(ENV_TYPES),
+        help="Environment: traplopen of lopen (default: stairs)"
+    )
+    parser.add_argument(
+        "--episodes",
+        type=int,
+        default=10,
+        help="Aantal episodes (default: 10)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed van de eerste episode; episode i gebruikt seed + i (default: 0)"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="rollouts",
+        help="Opname map; een bestaande opname wordt aangevuld (default: rollouts)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1_000_000,
+        help="Transities per chunk bestand (default: 1000000)"
+    )
+    parser.add_argument(
+        "--reward-terms",
+        action="store_true",
+        help="Sla de gewogen reward termen per stap op"
+    )
+    parser.add_argument(
+        "--contacts",
+        action="store_true",
+        help="Sla de voet contacten per stap op"
+    )
+    parser.add_argument(
+        "--stochastic",
+        action="store_true",
+        help="Sample acties uit de policy in plaats van deterministisch"
+    )
+    parser.add_argument(
+        "--reward",
+        type=str,
+        default="walking",
+        choices=["walking", "standing", "custom"],
+        help="Reward type voor --env rl (default: walking)"
+    )
+    parser.add_argument(
+        "--num-steps",
+        type=int,
+        default=None,
+        help="Aantal treden voor --env stairs"
+    )
+    parser.add_argument(
+        "--step-height",
+        type=float,
+        default=None,
+        help="Hoogte per trede in centimeters"
+    )
+    parser.add_argument(
+        "--step-depth",
+        type=float,
+        default=None,
+        help="Diepte per trede in centimeters"
+    )
+    parser.add_argument(
+        "--max-episode-steps",
+        type=int,
+        default=None,
+        help="Maximum stappen per episode (default: 2000 traplopen, 1000 lopen)"
+    )
+    parser.add_argument(
+        "--control-dt",
+        type=float,
+        default=None,
+        help="Tijd per policy stap in seconden (zelfde als bij training)"
+    )
+    parser.add_argument(
+        "--sensors",
+        nargs="+",
+        default=None,
+        choices=list(SENSOR_TYPES),
+        help="Sensoren waarmee het model getraind is"
+    )
+    parser.add_argument(
+        "--randomize",
+        action="store_true",
+        help="Neem op met domain randomization"
+    )
+    
+    args = parser.parse_args()
+    
+    env_kwargs = {
+        "max_episode_steps": args.max_episode_steps or (2000 if args.env == "stairs" else 1000),
+        "control_dt": args.control_dt,
+        "sensors": {name: None for name in args.sensors} if args.sensors else None,
+        "randomization": dict(DEFAULT_RANDOMIZATION) if args.randomize else None,
+    }
+    if args.env == "stairs":
+        stair_config = {}
+        if args.num_steps is not None:
+            stair_config["num_steps"] = args.num_steps
+        if args.step_height is not None:
+            stair_config["step_height"] = args.step_height / 100.0  # cm naar m
+        if args.step_depth is not None:
+            stair_config["step_depth"] = args.step_depth / 100.0  # cm naar m
+        env_kwargs["stair_config"] = stair_config or None
+    else:
+        env_kwargs["reward_type"] = args.reward
+    
+    env = RolloutRecorder(
+        make_env(args.env, env_kwargs),
+        args.output,
+        chunk_size=args.chunk_size,
+        record_reward_terms=args.reward_terms,
+        record_contacts=args.contacts,
+        metadata={"model": args.model_path, "env": args.env, "env_kwargs": env_kwargs, "seed": args.seed}
+    )
+    if args.model_path:
+        policy = load_policy(args.model_path)
+    else:
+        policy = RandomPolicy(env.action_space, args.seed)
+    
+    print("=" * 70)
+    print("  Rollouts Opnemen")
+    print("=" * 70)
+    print(f"\nModel: {args.model_path or 'willekeurige acties'}")
+    print(f"Environment: {args.env}")
+    print(f"Episodes: {args.episodes}")
+    print(f"Opname: {args.output}\n")
+    
+    rows_before = env.num_rows
+    start = time.perf_counter()
+    try:
+        for i in range(args.episodes):
+            result = run_episode(env, policy, seed=args.seed + i, deterministic=not args.stochastic)
+            status = "gevallen" if result["fallen"] else "✓"
+            print(
+                f"[{i + 1}/{args.episodes}] {status} reward {result['return']:.2f}, lengte {result['length']}",
+                flush=True
+            )
+    except KeyboardInterrupt:
+        print("\n⚠️  Opname gestopt door gebruiker")
+    finally:
+        env.close()
+    elapsed = time.perf_counter() - start
+    recorded = env.num_rows - rows_before
+    
+    reader = RolloutReader(args.output)
+    episodes = reader.episodes
+    print("\n" + "=" * 70)
+    print("  Opname")
+    print("=" * 70)
+    print(f"  Transities: {len(reader)} (deze sessie {recorded}, {recorded / max(elapsed, 1e-9):.0f} per seconde)")
+    print(f"  Episodes: {len(episodes)} (gevallen: {int(episodes['fallen'].sum())})")
+    if len(episodes):
+        print(f"  Gemiddelde reward: {episodes['return'].mean():.2f}")
+    print(f"  Kolommen: {', '.join(reader.columns)}")
+    print(f"  Op schijf: {disk_usage(Path(args.output)) / 1e6:.1f} MB")
+    print(f"\n✓ Opname opgeslagen: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
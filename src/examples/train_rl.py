@@ -15,22 +15,38 @@ from typing import Optional
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.simulation.go2_rl_env import Go2RLEnv
+from src.simulation.terrain import TERRAIN_TYPES
+from src.simulation.randomization import DEFAULT_RANDOMIZATION
 
 try:
     from stable_baselines3 import PPO, SAC, TD3
-    from stable_baselines3.common.callbacks import EvalCallback, CheckpointCallback
+    from stable_baselines3.common.callbacks import EvalCallback
     from stable_baselines3.common.monitor import Monitor
     from stable_baselines3.common.vec_env import DummyVecEnv
+    from src.simulation.callbacks import (
+        ProfileReportCallback, RewardTermsCallback, AsyncEvalCallback,
+        BackgroundCheckpointCallback
+    )
+    from src.simulation.vec_env import Go2VecEnv
+    from src.simulation.checkpointing import read_training_state, resume_training
 except ImportError:
     print("ERROR: Stable-Baselines3 niet geïnstalleerd")
     print("Installeer met: conda activate pybullet && pip install stable-baselines3")
     sys.exit(1)
 
 
-def make_env(gui=False, reward_type="walking"):
+def make_env(gui=False, reward_type="walking", control_dt=None, profiling=False, terrain=None, randomization=None):
     """Maak environment"""
     def _init():
-        env = Go2RLEnv(gui=gui, reward_type=reward_type, max_episode_steps=1000)
+        env = Go2RLEnv(
+            gui=gui,
+            reward_type=reward_type,
+            max_episode_steps=1000,
+            control_dt=control_dt,
+            profiling=profiling,
+            terrain=terrain,
+            randomization=randomization
+        )
         return env
     return _init
 
@@ -41,7 +57,18 @@ def train(
     gui: bool = False,
     reward_type: str = "walking",
     save_path: str = "models/go2_rl",
-    load_model: Optional[str] = None
+    load_model: Optional[str] = None,
+    control_dt: Optional[float] = None,
+    profile_every: Optional[int] = None,
+    num_envs: int = 1,
+    envs_per_process: Optional[int] = None,
+    transport: str = "shm",
+    terrain: Optional[str] = None,
+    terrain_variations: int = 100,
+    randomize: bool = False,
+    sync_eval: bool = False,
+    keep_checkpoints: Optional[int] = 5,
+    resume: bool = False
 ):
     """Train RL agent"""
     
@@ -53,16 +80,43 @@ def train(
     print(f"  Total timesteps: {total_timesteps}")
     print(f"  GUI: {gui}")
     print(f"  Reward type: {reward_type}")
+    print(f"  Control dt: {control_dt if control_dt else 'elke physics stap'}")
+    print(f"  Terrain: {f'{terrain} ({terrain_variations} varianten)' if terrain else 'vlak'}")
+    print(f"  Domain randomization: {'aan' if randomize else 'uit'}")
+    print(f"  Environments: {num_envs}" + (f" ({envs_per_process} per proces)" if num_envs > 1 and envs_per_process else ""))
     print(f"  Save path: {save_path}\n")
     
     # Maak environment
     print("✓ Environment aanmaken...")
-    env = DummyVecEnv([make_env(gui=gui, reward_type=reward_type)])
+    terrain_config = {"type": terrain, "num_variations": terrain_variations} if terrain else None
+    env_fn = make_env(
+        gui=gui,
+        reward_type=reward_type,
+        control_dt=control_dt,
+        profiling=bool(profile_every),
+        terrain=terrain_config,
+        randomization=dict(DEFAULT_RANDOMIZATION) if randomize else None
+    )
+    if num_envs > 1:
+        # Gebatchte VecEnv: robots in lockstep, in één client of verdeeld over worker processen
+        env = Go2VecEnv([env_fn] * num_envs, envs_per_process=envs_per_process, transport=transport)
+    else:
+        env = DummyVecEnv([env_fn])
     
     # Maak model
     print(f"✓ {algorithm} model aanmaken...")
     
-    if load_model and os.path.exists(load_model):
+    checkpoint_dir = f"{save_path}/checkpoints"
+    resume_state = None
+    can_resume = resume and read_training_state(checkpoint_dir) is not None
+    if resume and not can_resume:
+        print(f"  ⚠️  Geen training state in {checkpoint_dir}, nieuwe training")
+    
+    if can_resume:
+        # Model, optimizers, replay buffer, random generators en curriculum
+        model, resume_state = resume_training(checkpoint_dir, env)
+        print(f"  Hervat vanuit {checkpoint_dir}: {resume_state['algorithm']}, {model.num_timesteps} timesteps")
+    elif load_model and os.path.exists(load_model):
         print(f"  Laden van bestaand model: {load_model}")
         if algorithm == "PPO":
             model = PPO.load(load_model, env=env)
@@ -121,43 +175,83 @@ def train(
     os.makedirs(save_path, exist_ok=True)
     
     # Callbacks
-    checkpoint_callback = CheckpointCallback(
+    # Checkpoints worden op een achtergrond thread geschreven; bij SAC/TD3
+    # gaat de replay buffer incrementeel mee
+    checkpoint_callback = BackgroundCheckpointCallback(
         save_freq=10000,
-        save_path=f"{save_path}/checkpoints",
-        name_prefix="go2_rl"
+        save_path=checkpoint_dir,
+        name_prefix="go2_rl",
+        keep_last=keep_checkpoints or None,
+        save_replay_buffer=getattr(model, "replay_buffer", None) is not None,
+        extra_state=lambda: {"best_mean_reward": float(eval_callback.best_mean_reward)}
     )
     
-    eval_env = DummyVecEnv([make_env(gui=False, reward_type=reward_type)])
-    eval_callback = EvalCallback(
-        eval_env,
-        best_model_save_path=f"{save_path}/best_model",
-        log_path=f"{save_path}/logs",
-        eval_freq=5000,
-        deterministic=True,
-        render=False
-    )
+    if sync_eval:
+        eval_env = DummyVecEnv([make_env(gui=False, reward_type=reward_type, control_dt=control_dt, terrain=terrain_config)])
+        eval_callback = EvalCallback(
+            eval_env,
+            best_model_save_path=f"{save_path}/best_model",
+            log_path=f"{save_path}/logs",
+            eval_freq=5000,
+            deterministic=True,
+            render=False
+        )
+    else:
+        # Evaluatie in een apart proces: de training wacht er niet op
+        eval_env = None
+        eval_callback = AsyncEvalCallback(
+            env="rl",
+            env_kwargs={
+                "reward_type": reward_type,
+                "max_episode_steps": 1000,
+                "control_dt": control_dt,
+                "terrain": terrain_config,
+            },
+            best_model_save_path=f"{save_path}/best_model",
+            log_path=f"{save_path}/logs",
+            eval_freq=5000,
+            deterministic=True
+        )
+    
+    if resume_state is not None:
+        eval_callback.best_mean_reward = resume_state["extra"].get("best_mean_reward", float("-inf"))
+    
+    callbacks = [checkpoint_callback, eval_callback, RewardTermsCallback()]
+    if profile_every:
+        callbacks.append(ProfileReportCallback(report_every=profile_every))
     
     # Train
     print("\n✓ Training starten...")
     print("  Druk Ctrl+C om te stoppen\n")
     
+    # Bij hervatten alleen de resterende timesteps, met doorlopende tellers
+    remaining = total_timesteps - model.num_timesteps if resume_state is not None else total_timesteps
     try:
-        model.learn(
-            total_timesteps=total_timesteps,
-            callback=[checkpoint_callback, eval_callback],
-            progress_bar=True
-        )
+        if remaining > 0:
+            model.learn(
+                total_timesteps=remaining,
+                callback=callbacks,
+                progress_bar=True,
+                reset_num_timesteps=resume_state is None
+            )
     except KeyboardInterrupt:
         print("\n\n⚠️  Training gestopt door gebruiker")
+    if remaining > 0:
+        # Laatste stand, zodat --resume precies hier verder gaat
+        checkpoint_callback.checkpoint()
     
     # Sla final model op
     final_model_path = f"{save_path}/final_model"
     print(f"\n✓ Model opslaan naar {final_model_path}")
-    model.save(final_model_path)
+    checkpoint_callback.save(final_model_path)
     
-    # Sluit environments
+    # Sluit environments (en wacht op een lopende async evaluatie en checkpoints)
     env.close()
-    eval_env.close()
+    if eval_env is not None:
+        eval_env.close()
+    else:
+        eval_callback.close()
+    checkpoint_callback.close()
     
     print("\n✓ Training voltooid!")
     print(f"  Model opgeslagen: {final_model_path}")
@@ -208,6 +302,73 @@ def main():
         help="Pad naar bestaand model om te laden (optioneel)"
     )
     
+    parser.add_argument(
+        "--control-dt",
+        type=float,
+        default=None,
+        help="Tijd per policy stap in seconden, bijv. 0.05 voor 20 Hz (default: elke physics stap)"
+    )
+    parser.add_argument(
+        "--profile-every",
+        type=int,
+        default=None,
+        help="Print elke N timesteps een profiel van de env stappen (physics, obs, reward, API calls)"
+    )
+    parser.add_argument(
+        "--num-envs",
+        type=int,
+        default=1,
+        help="Aantal parallelle environments (robots) voor training (default: 1)"
+    )
+    parser.add_argument(
+        "--envs-per-process",
+        type=int,
+        default=None,
+        help="Robots per worker proces bij --num-envs > 1 (default: alles in één proces en één physics client)"
+    )
+    parser.add_argument(
+        "--transport",
+        type=str,
+        default="shm",
+        choices=["shm", "pipe"],
+        help="Transport naar worker processen: gedeeld geheugen of pipe met pickling (default: shm)"
+    )
+    parser.add_argument(
+        "--terrain",
+        type=str,
+        default=None,
+        choices=list(TERRAIN_TYPES),
+        help="Train op procedureel terrain in plaats van vlakke vloer (default: vlak)"
+    )
+    parser.add_argument(
+        "--terrain-variations",
+        type=int,
+        default=100,
+        help="Aantal terrain varianten waaruit elke reset kiest (default: 100)"
+    )
+    parser.add_argument(
+        "--randomize",
+        action="store_true",
+        help="Trek frictie, massa's, motor sterkte, gains, latency en zwaartekracht per episode opnieuw"
+    )
+    parser.add_argument(
+        "--sync-eval",
+        action="store_true",
+        help="Evalueer in het trainingsproces (SB3 EvalCallback); default: async in een apart proces"
+    )
+    parser.add_argument(
+        "--keep-checkpoints",
+        type=int,
+        default=5,
+        help="Aantal checkpoints dat bewaard blijft, oudere worden verwijderd (default: 5, 0 = alles)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Hervat de training uit <save-path>/checkpoints (model, optimizers, replay buffer, "
+             "random generators en curriculum); --timesteps is het totaal"
+    )
+    
     args = parser.parse_args()
     
     train(
@@ -216,7 +377,18 @@ def main():
         gui=args.gui,
         reward_type=args.reward,
         save_path=args.save_path,
-        load_model=args.load_model
+        load_model=args.load_model,
+        control_dt=args.control_dt,
+        profile_every=args.profile_every,
+        num_envs=args.num_envs,
+        envs_per_process=args.envs_per_process,
+        transport=args.transport,
+        terrain=args.terrain,
+        terrain_variations=args.terrain_variations,
+        randomize=args.randomize,
+        sync_eval=args.sync_eval,
+        keep_checkpoints=args.keep_checkpoints,
+        resume=args.resume
     )
 
 
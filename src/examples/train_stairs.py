@@ -9,26 +9,40 @@ import sys
 import os
 from pathlib import Path
 import argparse
-from typing import Optional
+from typing import List, Optional
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.simulation.go2_stairs_env import Go2StairsEnv
+from src.simulation.sensors import SENSOR_TYPES
 
 try:
     from stable_baselines3 import PPO, SAC, TD3
-    from stable_baselines3.common.callbacks import EvalCallback, CheckpointCallback
+    from stable_baselines3.common.callbacks import EvalCallback
     from stable_baselines3.common.vec_env import DummyVecEnv
+    from src.simulation.callbacks import (
+        ProfileReportCallback, RewardTermsCallback, AsyncEvalCallback,
+        BackgroundCheckpointCallback
+    )
+    from src.simulation.vec_env import Go2VecEnv
+    from src.simulation.checkpointing import read_training_state, resume_training
 except ImportError:
     print("ERROR: Stable-Baselines3 niet geïnstalleerd")
     print("Installeer met: conda activate pybullet && pip install stable-baselines3")
     sys.exit(1)
 
 
-def make_env(gui=False, stair_config=None):
+def make_env(gui=False, stair_config=None, control_dt=None, profiling=False, sensors=None):
     """Maak traplopen environment"""
     def _init():
-        env = Go2StairsEnv(gui=gui, stair_config=stair_config, max_episode_steps=2000)
+        env = Go2StairsEnv(
+            gui=gui,
+            stair_config=stair_config,
+            max_episode_steps=2000,
+            control_dt=control_dt,
+            profiling=profiling,
+            sensors={name: None for name in sensors} if sensors else None
+        )
         return env
     return _init
 
@@ -43,7 +57,16 @@ def train(
     step_height: float = 0.15,
     step_depth: float = 0.25,
     step_width: float = 0.5,
-    start_distance: float = 1.0
+    start_distance: float = 1.0,
+    control_dt: Optional[float] = None,
+    profile_every: Optional[int] = None,
+    num_envs: int = 1,
+    envs_per_process: Optional[int] = None,
+    transport: str = "shm",
+    sensors: Optional[List[str]] = None,
+    sync_eval: bool = False,
+    keep_checkpoints: Optional[int] = 5,
+    resume: bool = False
 ):
     """Train RL agent voor traplopen"""
     
@@ -68,16 +91,40 @@ def train(
     print(f"  Algorithm: {algorithm}")
     print(f"  Total timesteps: {total_timesteps}")
     print(f"  GUI: {gui}")
+    print(f"  Control dt: {control_dt if control_dt else 'elke physics stap'}")
+    print(f"  Sensoren: {', '.join(sensors) if sensors else 'geen'}")
+    print(f"  Environments: {num_envs}" + (f" ({envs_per_process} per proces)" if num_envs > 1 and envs_per_process else ""))
     print(f"  Save path: {save_path}\n")
     
     # Maak environment
     print("✓ Environment aanmaken...")
-    env = DummyVecEnv([make_env(gui=gui, stair_config=stair_config)])
+    env_fn = make_env(
+        gui=gui,
+        stair_config=stair_config,
+        control_dt=control_dt,
+        profiling=bool(profile_every),
+        sensors=sensors
+    )
+    if num_envs > 1:
+        # Gebatchte VecEnv: robots in lockstep, in één client of verdeeld over worker processen
+        env = Go2VecEnv([env_fn] * num_envs, envs_per_process=envs_per_process, transport=transport)
+    else:
+        env = DummyVecEnv([env_fn])
     
     # Maak model
     print(f"✓ {algorithm} model aanmaken...")
     
-    if load_model and os.path.exists(load_model):
+    checkpoint_dir = f"{save_path}/checkpoints"
+    resume_state = None
+    can_resume = resume and read_training_state(checkpoint_dir) is not None
+    if resume and not can_resume:
+        print(f"  ⚠️  Geen training state in {checkpoint_dir}, nieuwe training")
+    
+    if can_resume:
+        # Model, optimizers, replay buffer, random generators en curriculum
+        model, resume_state = resume_training(checkpoint_dir, env)
+        print(f"  Hervat vanuit {checkpoint_dir}: {resume_state['algorithm']}, {model.num_timesteps} timesteps")
+    elif load_model and os.path.exists(load_model):
         print(f"  Laden van bestaand model: {load_model}")
         if algorithm == "PPO":
             model = PPO.load(load_model, env=env)
@@ -136,39 +183,75 @@ def train(
     os.makedirs(save_path, exist_ok=True)
     
     # Callbacks
-    checkpoint_callback = CheckpointCallback(
+    # Checkpoints worden op een achtergrond thread geschreven; bij SAC/TD3
+    # gaat de replay buffer incrementeel mee
+    checkpoint_callback = BackgroundCheckpointCallback(
         save_freq=10000,
-        save_path=f"{save_path}/checkpoints",
-        name_prefix="go2_stairs"
+        save_path=checkpoint_dir,
+        name_prefix="go2_stairs",
+        keep_last=keep_checkpoints or None,
+        save_replay_buffer=getattr(model, "replay_buffer", None) is not None,
+        extra_state=lambda: {"best_mean_reward": float(eval_callback.best_mean_reward)}
     )
     
-    eval_env = DummyVecEnv([make_env(gui=False, stair_config=stair_config)])
-    eval_callback = EvalCallback(
-        eval_env,
-        best_model_save_path=f"{save_path}/best_model",
-        log_path=f"{save_path}/logs",
-        eval_freq=5000,
-        deterministic=True,
-        render=False
-    )
+    if sync_eval:
+        eval_env = DummyVecEnv([make_env(gui=False, stair_config=stair_config, control_dt=control_dt, sensors=sensors)])
+        eval_callback = EvalCallback(
+            eval_env,
+            best_model_save_path=f"{save_path}/best_model",
+            log_path=f"{save_path}/logs",
+            eval_freq=5000,
+            deterministic=True,
+            render=False
+        )
+    else:
+        # Evaluatie in een apart proces: de training wacht er niet op
+        eval_env = None
+        eval_callback = AsyncEvalCallback(
+            env="stairs",
+            env_kwargs={
+                "stair_config": stair_config,
+                "max_episode_steps": 2000,
+                "control_dt": control_dt,
+                "sensors": {name: None for name in sensors} if sensors else None,
+            },
+            best_model_save_path=f"{save_path}/best_model",
+            log_path=f"{save_path}/logs",
+            eval_freq=5000,
+            deterministic=True
+        )
+    
+    if resume_state is not None:
+        eval_callback.best_mean_reward = resume_state["extra"].get("best_mean_reward", float("-inf"))
+    
+    callbacks = [checkpoint_callback, eval_callback, RewardTermsCallback()]
+    if profile_every:
+        callbacks.append(ProfileReportCallback(report_every=profile_every))
     
     # Train
     print("\n✓ Training starten...")
     print("  Druk Ctrl+C om te stoppen\n")
     
+    # Bij hervatten alleen de resterende timesteps, met doorlopende tellers
+    remaining = total_timesteps - model.num_timesteps if resume_state is not None else total_timesteps
     try:
-        model.learn(
-            total_timesteps=total_timesteps,
-            callback=[checkpoint_callback, eval_callback],
-            progress_bar=True
-        )
+        if remaining > 0:
+            model.learn(
+                total_timesteps=remaining,
+                callback=callbacks,
+                progress_bar=True,
+                reset_num_timesteps=resume_state is None
+            )
     except KeyboardInterrupt:
         print("\n\n⚠️  Training gestopt door gebruiker")
+    if remaining > 0:
+        # Laatste stand, zodat --resume precies hier verder gaat
+        checkpoint_callback.checkpoint()
     
     # Sla final model op
     final_model_path = f"{save_path}/final_model"
     print(f"\n✓ Model opslaan naar {final_model_path}")
-    model.save(final_model_path)
+    checkpoint_callback.save(final_model_path)
     
     # Sla trap configuratie op
     import json
@@ -177,9 +260,13 @@ def train(
         json.dump(stair_config, f, indent=2)
     print(f"✓ Trap configuratie opgeslagen: {config_path}")
     
-    # Sluit environments
+    # Sluit environments (en wacht op een lopende async evaluatie en checkpoints)
     env.close()
-    eval_env.close()
+    if eval_env is not None:
+        eval_env.close()
+    else:
+        eval_callback.close()
+    checkpoint_callback.close()
     
     print("\n✓ Training voltooid!")
     print(f"  Model opgeslagen: {final_model_path}")
@@ -253,6 +340,62 @@ def main():
         help="Afstand van robot tot trap in centimeters (default: 100.0)"
     )
     
+    parser.add_argument(
+        "--control-dt",
+        type=float,
+        default=None,
+        help="Tijd per policy stap in seconden, bijv. 0.05 voor 20 Hz (default: elke physics stap)"
+    )
+    parser.add_argument(
+        "--profile-every",
+        type=int,
+        default=None,
+        help="Print elke N timesteps een profiel van de env stappen (physics, obs, reward, API calls)"
+    )
+    parser.add_argument(
+        "--num-envs",
+        type=int,
+        default=1,
+        help="Aantal parallelle environments (robots) voor training (default: 1)"
+    )
+    parser.add_argument(
+        "--envs-per-process",
+        type=int,
+        default=None,
+        help="Robots per worker proces bij --num-envs > 1 (default: alles in één proces en één physics client)"
+    )
+    parser.add_argument(
+        "--transport",
+        type=str,
+        default="shm",
+        choices=["shm", "pipe"],
+        help="Transport naar worker processen: gedeeld geheugen of pipe met pickling (default: shm)"
+    )
+    parser.add_argument(
+        "--sensors",
+        nargs="+",
+        default=None,
+        choices=list(SENSOR_TYPES),
+        help="Gesimuleerde sensoren als extra observatie, bijv. height_scan foot_contacts (default: geen)"
+    )
+    parser.add_argument(
+        "--sync-eval",
+        action="store_true",
+        help="Evalueer in het trainingsproces (SB3 EvalCallback); default: async in een apart proces"
+    )
+    parser.add_argument(
+        "--keep-checkpoints",
+        type=int,
+        default=5,
+        help="Aantal checkpoints dat bewaard blijft, oudere worden verwijderd (default: 5, 0 = alles)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Hervat de training uit <save-path>/checkpoints (model, optimizers, replay buffer, "
+             "random generators en curriculum); --timesteps is het totaal"
+    )
+    
     args = parser.parse_args()
     
     # Converteer centimeters naar meters voor PyBullet
@@ -266,7 +409,16 @@ def main():
         step_height=args.step_height / 100.0,  # cm naar m
         step_depth=args.step_depth / 100.0,    # cm naar m
         step_width=args.step_width / 100.0,     # cm naar m
-        start_distance=args.start_distance / 100.0  # cm naar m
+        start_distance=args.start_distance / 100.0,  # cm naar m
+        control_dt=args.control_dt,
+        profile_every=args.profile_every,
+        num_envs=args.num_envs,
+        envs_per_process=args.envs_per_process,
+        transport=args.transport,
+        sensors=args.sensors,
+        sync_eval=args.sync_eval,
+        keep_checkpoints=args.keep_checkpoints,
+        resume=args.resume
     )
 
 
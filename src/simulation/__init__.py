@@ -1,6 +1,6 @@
 """PyBullet simulatie voor Unitree Go2 EDU"""
 
-from .go2_simulator import Go2Simulator
+from .go2_simulator import Go2Simulator, SimSnapshot
 
-__all__ = ["Go2Simulator"]
+__all__ = ["Go2Simulator", "SimSnapshot"]
 
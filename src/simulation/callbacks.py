@@ -0,0 +1,384 @@
+"""
+Stable-Baselines3 callbacks voor Go2 training
+"""
+
+import os
+import shutil
+import tempfile
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from stable_baselines3.common.callbacks import BaseCallback
+except ImportError:
+    raise ImportError(
+        "Stable-Baselines3 niet geïnstalleerd. Installeer met: pip install stable-baselines3"
+    )
+
+from .profiling import StepProfiler
+from .evaluation import make_pool, make_tasks, evaluate_snapshot, warm_up_worker
+from .checkpointing import (
+    TRAINING_STATE_FILE, CheckpointWriter, ReplayBufferStore, snapshot_model, write_model_zip,
+    prune_checkpoints, write_json, training_state, env_training_states
+)
+
+
+class ProfileReportCallback(BaseCallback):
+    """
+    Print periodiek het profiling rapport van de training environments
+    
+    Vereist environments met profiling=True. Rapporten van meerdere
+    environments worden samengevoegd.
+    """
+    
+    def __init__(self, report_every: int = 10000, verbose: int = 0):
+        """
+        Args:
+            report_every: Aantal timesteps tussen rapporten
+            verbose: Verbosity level
+        """
+        super().__init__(verbose)
+        self.report_every = report_every
+        self._next_report = report_every
+    
+    def _on_step(self) -> bool:
+        """Print rapport elke report_every timesteps"""
+        if self.num_timesteps >= self._next_report:
+            self._next_report += self.report_every
+            print(f"\n[{self.num_timesteps} timesteps] {self.format_report()}\n")
+        return True
+    
+    def format_report(self) -> str:
+        """Samengevoegd rapport van alle environments als tekst"""
+        merged = StepProfiler(enabled=True)
+        for report in self.training_env.env_method("profile_report"):
+            merged.merge_report(report)
+        return merged.format_report()
+
+
+class RewardTermsCallback(BaseCallback):
+    """
+    Log de reward termen per episode naar de SB3 logger
+    
+    Neemt aan het einde van elke episode de "reward/<term>" sommen uit info
+    over; in de logger verschijnt het gemiddelde per term (bijv. in
+    TensorBoard onder reward/forward_velocity).
+    """
+    
+    def _on_step(self) -> bool:
+        """Registreer term sommen van afgelopen episodes"""
+        for info, done in zip(self.locals["infos"], self.locals["dones"]):
+            if not done:
+                continue
+            for key, value in info.items():
+                if key.startswith("reward/"):
+                    self.logger.record_mean(key, value)
+        return True
+
+
+class AsyncEvalCallback(BaseCallback):
+    """
+    Evaluatie in een apart proces terwijl de training doorloopt
+    
+    Vervanger van SB3's EvalCallback die de training niet stilzet: elke
+    eval_freq calls gaan de huidige policy gewichten naar een worker proces
+    met een eigen headless simulator (zie evaluation.evaluate_snapshot).
+    Resultaten worden bij een latere stap opgehaald en onder eval/
+    geregistreerd; de learner schrijft ze bij zijn volgende dump weg, met de
+    timestep van de snapshot in eval/snapshot_timesteps. Een nieuw beste
+    model slaat de worker op als best_model_save_path/best_model.zip. Loopt
+    er nog een evaluatie, dan wordt de beurt overgeslagen (eval/skipped).
+    """
+    
+    def __init__(
+        self,
+        env: str = "rl",
+        env_kwargs: Optional[Dict[str, Any]] = None,
+        eval_freq: int = 10000,
+        n_eval_episodes: int = 5,
+        seed: int = 0,
+        best_model_save_path: Optional[str] = None,
+        log_path: Optional[str] = None,
+        deterministic: bool = True,
+        start_method: Optional[str] = None,
+        verbose: int = 1
+    ):
+        """
+        Args:
+            env: Evaluatie environment, "rl" of "stairs" (zie evaluation.make_env)
+            env_kwargs: Argumenten voor de evaluatie environment (zelfde als training)
+            eval_freq: Aantal calls (VecEnv stappen) tussen evaluaties
+            n_eval_episodes: Episodes per evaluatie
+            seed: Evaluatie seed; elke evaluatie speelt dezelfde episodes
+            best_model_save_path: Map voor best_model.zip (None = niet opslaan)
+            log_path: Map voor evaluations.npz (None = niet opslaan)
+            deterministic: Deterministische acties
+            start_method: Multiprocessing start methode van de worker
+            verbose: Verbosity level
+        """
+        super().__init__(verbose)
+        self.env = env
+        self.env_kwargs = dict(env_kwargs or {})
+        self.eval_freq = eval_freq
+        self.n_eval_episodes = n_eval_episodes
+        self.seed = seed
+        self.best_model_save_path = best_model_save_path
+        self.log_path = os.path.join(log_path, "evaluations") if log_path is not None else None
+        self.deterministic = deterministic
+        self.start_method = start_method
+        
+        self.best_mean_reward = -np.inf
+        self.last_mean_reward = -np.inf
+        self.evaluations_timesteps: List[int] = []
+        self.evaluations_results: List[List[float]] = []
+        self.evaluations_length: List[List[int]] = []
+        self.evaluations_successes: List[List[bool]] = []
+        self.skipped = 0
+        
+        self._pool = None
+        self._template_dir: Optional[str] = None
+        self._pending: Optional[Tuple[int, Any]] = None
+    
+    def _init_callback(self):
+        """Sla het model sjabloon op en start de worker"""
+        for path in (self.best_model_save_path, self.log_path and os.path.dirname(self.log_path)):
+            if path:
+                os.makedirs(path, exist_ok=True)
+        
+        # Sjabloon: de worker laadt het model één keer, daarna alleen gewichten
+        self._template_dir = tempfile.mkdtemp(prefix="go2_eval_")
+        self.model.save(os.path.join(self._template_dir, "template"))
+        self._pool = make_pool(1, self.start_method)
+        
+        # Worker opstart (imports, model, simulator) overlapt met de eerste rollouts
+        self._pool.submit(warm_up_worker, self._make_tasks()[0])
+    
+    def _on_step(self) -> bool:
+        """Haal klare resultaten op en start zo nodig een nieuwe evaluatie"""
+        self._collect(wait=False)
+        if self.eval_freq > 0 and self.n_calls % self.eval_freq == 0:
+            if self._pending is not None:
+                self.skipped += 1
+                self.logger.record("eval/skipped", self.skipped)
+            else:
+                self._submit()
+        return True
+    
+    def _submit(self):
+        """Stuur een snapshot van de policy gewichten naar de worker"""
+        state_dict = {name: value.detach().cpu().clone() for name, value in self.model.policy.state_dict().items()}
+        tasks = self._make_tasks()
+        save_path = None
+        if self.best_model_save_path is not None:
+            save_path = os.path.join(self.best_model_save_path, "best_model")
+        future = self._pool.submit(evaluate_snapshot, state_dict, tasks, save_path, self.best_mean_reward)
+        self._pending = (self.num_timesteps, future)
+    
+    def _make_tasks(self) -> list:
+        """Evaluatie episodes met het sjabloon als model"""
+        return make_tasks(
+            [os.path.join(self._template_dir, "template.zip")],
+            seeds=[self.seed],
+            num_episodes=self.n_eval_episodes,
+            env=self.env,
+            env_kwargs=self.env_kwargs,
+            deterministic=self.deterministic
+        )
+    
+    def _collect(self, wait: bool) -> bool:
+        """
+        Verwerk de lopende evaluatie als die klaar is (of wacht erop)
+        
+        De waarden worden alleen geregistreerd: een dump midden in een rollout
+        zou de records van de learner wegschrijven bij een oudere timestep.
+        
+        Args:
+            wait: Wacht op een lopende evaluatie
+        
+        Returns:
+            True als er resultaten verwerkt zijn
+        """
+        if self._pending is None:
+            return False
+        timesteps, future = self._pending
+        if not wait and not future.done():
+            return False
+        self._pending = None
+        results = future.result()
+        
+        rewards = [result["return"] for result in results]
+        lengths = [result["length"] for result in results]
+        successes = [result["success"] for result in results]
+        if self.log_path is not None:
+            self.evaluations_timesteps.append(timesteps)
+            self.evaluations_results.append(rewards)
+            self.evaluations_length.append(lengths)
+            self.evaluations_successes.append(successes)
+            np.savez(
+                self.log_path,
+                timesteps=self.evaluations_timesteps,
+                results=self.evaluations_results,
+                ep_lengths=self.evaluations_length,
+                successes=self.evaluations_successes
+            )
+        
+        mean_reward = float(np.mean(rewards))
+        self.last_mean_reward = mean_reward
+        if self.verbose >= 1:
+            print(f"Eval num_timesteps={timesteps}, episode_reward={mean_reward:.2f} +/- {np.std(rewards):.2f}")
+            print(f"Episode length: {np.mean(lengths):.2f} +/- {np.std(lengths):.2f}")
+        self.logger.record("eval/mean_reward", mean_reward)
+        self.logger.record("eval/mean_ep_length", float(np.mean(lengths)))
+        self.logger.record("eval/success_rate", float(np.mean(successes)))
+        self.logger.record("eval/snapshot_timesteps", timesteps)
+        self.logger.record("eval/delay_timesteps", self.num_timesteps - timesteps)
+        
+        if mean_reward > self.best_mean_reward:
+            if self.verbose >= 1 and self.best_model_save_path is not None:
+                print("New best mean reward!")
+            self.best_mean_reward = mean_reward
+        return True
+    
+    def _on_training_end(self):
+        """Wacht op de laatste evaluatie en stop de worker"""
+        self.close()
+    
+    def close(self):
+        """Rond de lopende evaluatie af en ruim worker en sjabloon op (idempotent)"""
+        if self._pool is None:
+            return
+        try:
+            # Na de laatste dump van de learner: zelf wegschrijven
+            if self._collect(wait=True):
+                self.logger.dump(self.num_timesteps)
+        finally:
+            self._pool.shutdown()
+            self._pool = None
+            shutil.rmtree(self._template_dir, ignore_errors=True)
+
+
+class BackgroundCheckpointCallback(BaseCallback):
+    """
+    Checkpoints zonder de training op te houden
+    
+    Vervanger van SB3's CheckpointCallback: elke save_freq calls wordt het
+    model in het geheugen gekopieerd en schrijft een achtergrond thread het
+    als gecomprimeerde zip naar save_path/<name_prefix>_<steps>_steps.zip.
+    Daarna worden oude checkpoints opgeruimd volgens keep_last/keep_every.
+    Met save_replay_buffer worden alleen de nieuwe rijen van de replay
+    buffer bijgeschreven in save_path/replay_buffer (zie ReplayBufferStore).
+    Na elk checkpoint volgt save_path/training_state.json, waarmee
+    checkpointing.resume_training() de hele training kan hervatten.
+    """
+    
+    def __init__(
+        self,
+        save_freq: int,
+        save_path: str,
+        name_prefix: str = "rl_model",
+        keep_last: Optional[int] = 5,
+        keep_every: Optional[int] = None,
+        save_replay_buffer: bool = False,
+        compresslevel: Optional[int] = 6,
+        extra_state: Optional[Callable[[], Dict[str, Any]]] = None,
+        verbose: int = 0
+    ):
+        """
+        Args:
+            save_freq: Aantal calls (VecEnv stappen) tussen checkpoints
+            save_path: Checkpoint map
+            name_prefix: Prefix van de checkpoint bestanden
+            keep_last: Bewaar de laatste N checkpoints (None = alles)
+            keep_every: Bewaar daarnaast elk checkpoint met steps een veelvoud hiervan
+            save_replay_buffer: Schrijf de replay buffer (SAC/TD3) incrementeel mee
+            compresslevel: Deflate niveau 0-9 (None = ongecomprimeerd)
+            extra_state: Geeft extra JSON state voor training_state.json,
+                bijv. de best_mean_reward van de evaluatie callback
+            verbose: Verbosity level
+        """
+        super().__init__(verbose)
+        self.save_freq = save_freq
+        self.save_path = save_path
+        self.name_prefix = name_prefix
+        self.keep_last = keep_last
+        self.keep_every = keep_every
+        self.save_replay_buffer = save_replay_buffer
+        self.compresslevel = compresslevel
+        self.extra_state = extra_state
+        self.replay_buffer_store = ReplayBufferStore(os.path.join(save_path, "replay_buffer"))
+        self._writer: Optional[CheckpointWriter] = None
+    
+    @property
+    def writer(self) -> CheckpointWriter:
+        """Achtergrond thread, gestart bij het eerste gebruik"""
+        if self._writer is None:
+            self._writer = CheckpointWriter()
+        return self._writer
+    
+    def _init_callback(self):
+        """Maak de checkpoint map; na hervatten alleen nieuwe replay buffer rijen schrijven"""
+        os.makedirs(self.save_path, exist_ok=True)
+        if self._replay_buffer is not None:
+            self.replay_buffer_store.sync(self._replay_buffer, self.model.num_timesteps)
+    
+    @property
+    def _replay_buffer(self):
+        """Replay buffer van het model als die meegeschreven wordt"""
+        if not self.save_replay_buffer:
+            return None
+        return getattr(self.model, "replay_buffer", None)
+    
+    def _on_step(self) -> bool:
+        """Plan elke save_freq calls een checkpoint in"""
+        if self.n_calls % self.save_freq == 0:
+            self.checkpoint()
+        return True
+    
+    def checkpoint(self):
+        """
+        Plan een volledig checkpoint in: model zip, replay buffer, training
+        state en daarna het opruimen van oude checkpoints
+        """
+        name = f"{self.name_prefix}_{self.num_timesteps}_steps"
+        self.save(os.path.join(self.save_path, name))
+        
+        replay_buffer = None
+        if self._replay_buffer is not None:
+            payload = self.replay_buffer_store.snapshot(self._replay_buffer, self.model.num_timesteps)
+            self.writer.submit(self.replay_buffer_store.write, payload)
+            replay_buffer = {"directory": os.path.basename(self.replay_buffer_store.directory)}
+            replay_buffer.update({key: payload["meta"][key] for key in ("pos", "full", "num_timesteps")})
+        
+        # training_state.json als laatste: verwijst dan altijd naar een compleet checkpoint
+        state = training_state(
+            self.model,
+            name + ".zip",
+            envs=env_training_states(self.training_env),
+            replay_buffer=replay_buffer,
+            extra=self.extra_state() if self.extra_state is not None else None
+        )
+        self.writer.submit(write_json, os.path.join(self.save_path, TRAINING_STATE_FILE), state)
+        self.writer.submit(prune_checkpoints, self.save_path, self.name_prefix, self.keep_last, self.keep_every)
+    
+    def save(self, path: str):
+        """
+        Sla het model op de achtergrond op
+        
+        Args:
+            path: Doelbestand (".zip" wordt toegevoegd)
+        """
+        self.writer.submit(write_model_zip, path, snapshot_model(self.model), self.compresslevel)
+        if self.verbose >= 2:
+            print(f"Saving model checkpoint to {path}.zip")
+    
+    def _on_training_end(self):
+        """Wacht tot alle checkpoints geschreven zijn"""
+        if self._writer is not None:
+            self._writer.wait()
+    
+    def close(self):
+        """Schrijf alles weg en stop de achtergrond thread (idempotent)"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
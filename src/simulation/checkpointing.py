@@ -0,0 +1,594 @@
+"""
+Checkpoints op de achtergrond voor Go2 training
+
+Het trainingsproces maakt alleen een kopie in het geheugen (parameters,
+optimizer state en de JSON van de overige attributen); serialiseren,
+comprimeren en wegschrijven gebeurt in een achtergrond thread. Bestanden
+worden eerst naast het doel geschreven en daarna atomisch hernoemd, zodat
+een afgebroken run nooit een half checkpoint achterlaat.
+
+De replay buffer (SAC/TD3) wordt niet als één blok gepickled maar per veld
+in een .npy bestand bijgehouden: bij elk checkpoint worden alleen de rijen
+geschreven die sinds het vorige checkpoint veranderd zijn. Er zijn twee sets
+bestanden; een checkpoint schrijft altijd de set die niet in gebruik is en
+zet daarna meta.json atomisch om, zodat een afgebroken checkpoint de vorige
+buffer intact laat.
+
+Naast elk checkpoint staat training_state.json met alles wat een hervatte
+training nodig heeft: welk model zip, de stap tellers, de random generators
+(python, numpy, torch) en de curriculum state van elke environment. Het
+bestand wordt als laatste geschreven, dus het verwijst altijd naar een
+compleet checkpoint; resume_training() zet alles weer terug.
+"""
+
+import copy
+import json
+import os
+import queue
+import random
+import re
+import shutil
+import threading
+import zipfile
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import torch
+    import stable_baselines3
+    from stable_baselines3.common.base_class import BaseAlgorithm
+    from stable_baselines3.common.save_util import data_to_json, recursive_getattr
+    from stable_baselines3.common.utils import get_system_info
+except ImportError:
+    raise ImportError(
+        "Stable-Baselines3 niet geïnstalleerd. Installeer met: pip install stable-baselines3"
+    )
+
+# Velden van SB3's ReplayBuffer met één rij per (positie, environment)
+REPLAY_BUFFER_FIELDS = ("observations", "next_observations", "actions", "rewards", "dones", "timeouts")
+
+# Bestand sets (submappen) van een ReplayBufferStore
+REPLAY_BUFFER_SLOTS = ("a", "b")
+
+TRAINING_STATE_FILE = "training_state.json"
+
+
+@dataclass
+class ModelSnapshot:
+    """Kopie van een SB3 model in het geheugen, klaar om weg te schrijven"""
+    data: str
+    params: Dict[str, Any]
+    pytorch_variables: Dict[str, Any]
+    num_timesteps: int
+
+
+def snapshot_model(model) -> ModelSnapshot:
+    """
+    Kopieer alles wat model.save() zou schrijven
+    
+    Zelfde selectie als BaseAlgorithm.save(); de tensors worden gekloond
+    zodat de training direct verder kan.
+    
+    Args:
+        model: Stable-Baselines3 model
+    
+    Returns:
+        ModelSnapshot
+    """
+    data = model.__dict__.copy()
+    exclude = set(model._excluded_save_params())
+    state_dicts_names, torch_variable_names = model._get_torch_save_params()
+    for torch_var in state_dicts_names + torch_variable_names:
+        exclude.add(torch_var.split(".")[0])
+    for name in exclude:
+        data.pop(name, None)
+    
+    pytorch_variables = {name: recursive_getattr(model, name) for name in torch_variable_names}
+    return ModelSnapshot(
+        data=data_to_json(data),
+        params=copy.deepcopy(model.get_parameters()),
+        pytorch_variables=copy.deepcopy(pytorch_variables),
+        num_timesteps=model.num_timesteps
+    )
+
+
+def _atomic_path(path: str) -> str:
+    """Tijdelijke naam naast het doel (zelfde bestandssysteem voor os.replace)"""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.tmp")
+
+
+def write_model_zip(path: str, snapshot: ModelSnapshot, compresslevel: Optional[int] = 6):
+    """
+    Schrijf een snapshot als SB3 zip (te laden met PPO.load, SAC.load, ...)
+    
+    Args:
+        path: Doelbestand; ".zip" wordt toegevoegd als het ontbreekt
+        snapshot: Resultaat van snapshot_model()
+        compresslevel: Deflate niveau 0-9 (None = ongecomprimeerd, zoals model.save())
+    """
+    if not path.endswith(".zip"):
+        path += ".zip"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = _atomic_path(path)
+    compression = zipfile.ZIP_STORED if compresslevel is None else zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(tmp_path, mode="w", compression=compression, compresslevel=compresslevel) as archive:
+        archive.writestr("data", snapshot.data)
+        if snapshot.pytorch_variables:
+            with archive.open("pytorch_variables.pth", mode="w", force_zip64=True) as f:
+                torch.save(snapshot.pytorch_variables, f)
+        for file_name, state_dict in snapshot.params.items():
+            with archive.open(file_name + ".pth", mode="w", force_zip64=True) as f:
+                torch.save(state_dict, f)
+        archive.writestr("_stable_baselines3_version", stable_baselines3.__version__)
+        archive.writestr("system_info.txt", get_system_info(print_info=False)[1])
+    os.replace(tmp_path, path)
+
+
+def write_json(path: str, data: Dict):
+    """Schrijf JSON atomisch (eerst naast het doel, dan hernoemen)"""
+    tmp_path = _atomic_path(path)
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def checkpoint_steps(directory: str, name_prefix: str) -> List[Tuple[int, str]]:
+    """
+    Checkpoints "<name_prefix>_<steps>_steps.zip" in een map
+    
+    Returns:
+        (steps, pad) gesorteerd op steps
+    """
+    if not os.path.isdir(directory):
+        return []
+    pattern = re.compile(rf"^{re.escape(name_prefix)}_(\d+)_steps\.zip$")
+    found = []
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match:
+            found.append((int(match.group(1)), os.path.join(directory, name)))
+    return sorted(found)
+
+
+def prune_checkpoints(
+    directory: str,
+    name_prefix: str,
+    keep_last: Optional[int] = None,
+    keep_every: Optional[int] = None
+) -> List[str]:
+    """
+    Verwijder oude checkpoints volgens een bewaarbeleid
+    
+    Args:
+        directory: Checkpoint map
+        name_prefix: Prefix van de checkpoint bestanden
+        keep_last: Bewaar de laatste N checkpoints (None = alles)
+        keep_every: Bewaar daarnaast elk checkpoint waarvan steps een
+            veelvoud is van deze waarde (None = geen)
+    
+    Returns:
+        Verwijderde paden
+    """
+    if keep_last is None:
+        return []
+    checkpoints = checkpoint_steps(directory, name_prefix)
+    removed = []
+    for steps, path in checkpoints[:max(len(checkpoints) - keep_last, 0)]:
+        if keep_every and steps % keep_every == 0:
+            continue
+        os.remove(path)
+        removed.append(path)
+    return removed
+
+
+def _buffer_fields(buffer) -> Dict[str, np.ndarray]:
+    """Arrays van een (Dict)ReplayBuffer per veld; dict observaties als "observations.<key>" """
+    fields = {}
+    for name in REPLAY_BUFFER_FIELDS:
+        value = getattr(buffer, name, None)
+        if isinstance(value, dict):
+            for key, array in value.items():
+                fields[f"{name}.{key}"] = array
+        elif isinstance(value, np.ndarray):
+            fields[name] = value
+    return fields
+
+
+class ReplayBufferStore:
+    """
+    Replay buffer als map met twee sets .npy bestanden (één per veld) plus meta.json
+    
+    snapshot() kopieert op de training thread alleen de rijen die sinds de
+    vorige snapshot zijn toegevoegd; write() schrijft die via een memmap in
+    de bestanden (mag op een andere thread). De bestanden hebben de volle
+    buffer grootte, dus load() kan ze met mmap_mode openen zonder alles
+    eerst in het geheugen te lezen.
+    
+    write() schrijft nooit in de set waar meta.json naar verwijst: de andere
+    set wordt eerst in meta.json als ongeldig gemarkeerd, dan bijgewerkt met
+    de rijen van de vorige en de huidige snapshot, en pas daarna wordt
+    meta.json in één keer omgezet. meta.json houdt per set bij welke
+    num_timesteps hij bevat; een set zonder waarde is niet compleet.
+    """
+    
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Map voor meta.json en de bestand sets
+        """
+        self.directory = directory
+        self._saved_pos: Optional[int] = None
+        self._saved_timesteps = 0
+        self._last_payload: Optional[Dict[str, Any]] = None  # Laatst geschreven snapshot
+    
+    def _dirty_rows(self, buffer, num_timesteps: int) -> List[slice]:
+        """Rijen van de ring buffer die sinds de vorige snapshot veranderd zijn"""
+        size = buffer.buffer_size
+        pos = buffer.pos
+        if self._saved_pos is None:
+            return [slice(0, size if buffer.full else pos)]
+        added = (num_timesteps - self._saved_timesteps) // max(buffer.n_envs, 1)
+        if added >= size:
+            return [slice(0, size)]
+        if pos >= self._saved_pos:
+            return [slice(self._saved_pos, pos)]
+        return [slice(self._saved_pos, size), slice(0, pos)]
+    
+    def snapshot(self, buffer, num_timesteps: int) -> Dict[str, Any]:
+        """
+        Kopieer de nieuwe rijen van de buffer
+        
+        Args:
+            buffer: SB3 ReplayBuffer of DictReplayBuffer
+            num_timesteps: Huidige model.num_timesteps
+        
+        Returns:
+            Payload voor write()
+        """
+        fields = _buffer_fields(buffer)
+        # Zonder vorige snapshot bevat de payload alle geldige rijen
+        base_timesteps = None if self._saved_pos is None else self._saved_timesteps
+        rows = self._dirty_rows(buffer, num_timesteps)
+        if getattr(buffer, "optimize_memory_usage", False):
+            # Volgende observatie staat in de rij na pos
+            rows.append(slice(buffer.pos, buffer.pos + 1))
+        rows = [rows for rows in rows if rows.stop > rows.start]
+        payload = {
+            "meta": {
+                "buffer_size": buffer.buffer_size,
+                "n_envs": buffer.n_envs,
+                "pos": buffer.pos,
+                "full": buffer.full,
+                "num_timesteps": num_timesteps,
+                "fields": {name: [list(array.shape), array.dtype.str] for name, array in fields.items()},
+            },
+            "base_timesteps": base_timesteps,
+            "rows": [(rows, {name: array[rows].copy() for name, array in fields.items()}) for rows in rows],
+        }
+        self._saved_pos = buffer.pos
+        self._saved_timesteps = num_timesteps
+        return payload
+    
+    def _read_meta(self) -> Optional[Dict]:
+        """meta.json of None als er nog niets is opgeslagen"""
+        path = os.path.join(self.directory, "meta.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+    
+    def _field_path(self, slot: str, name: str) -> str:
+        """Pad van een veld bestand in een set"""
+        return os.path.join(self.directory, slot, f"{name}.npy")
+    
+    def write(self, payload: Dict[str, Any]):
+        """Schrijf een snapshot in de vrije set en zet meta.json daarna om"""
+        os.makedirs(self.directory, exist_ok=True)
+        meta = dict(payload["meta"])
+        previous = self._read_meta()
+        committed = previous["slot"] if previous is not None else None
+        slot = REPLAY_BUFFER_SLOTS[1] if committed == REPLAY_BUFFER_SLOTS[0] else REPLAY_BUFFER_SLOTS[0]
+        same_layout = previous is not None and previous["fields"] == meta["fields"]
+        # Sets met een andere layout zijn niet meer bruikbaar
+        slots = dict(previous["slots"]) if same_layout else {}
+        
+        # Welke snapshots mist de vrije set?
+        base = payload["base_timesteps"]
+        last = self._last_payload
+        one_behind = (
+            same_layout
+            and last is not None
+            and last["meta"]["num_timesteps"] == base
+            and (last["base_timesteps"] is None or slots.get(slot) == last["base_timesteps"])
+        )
+        if base is None:
+            updates, copy_from = [payload], None
+        elif one_behind:
+            # Gewone gang van zaken: de vrije set loopt één snapshot achter
+            updates, copy_from = [last, payload], None
+        elif same_layout and previous["num_timesteps"] == base:
+            # Vrije set onbekend (eerste wissel of na hervatten): kopieer de actieve set
+            updates, copy_from = [payload], committed
+        else:
+            raise RuntimeError(
+                f"Replay buffer snapshot vanaf {base} timesteps past niet bij {self.directory}"
+            )
+        
+        # Vrije set ongeldig markeren vóór het schrijven
+        if previous is not None:
+            slots[slot] = None
+            write_json(os.path.join(self.directory, "meta.json"), dict(previous, slots=slots))
+        
+        os.makedirs(os.path.join(self.directory, slot), exist_ok=True)
+        for name, (shape, dtype) in meta["fields"].items():
+            path = self._field_path(slot, name)
+            if copy_from is not None:
+                shutil.copyfile(self._field_path(copy_from, name), path)
+            if copy_from is None and (not same_layout or not os.path.exists(path)):
+                # Nieuwe of gewijzigde layout: bestand op volle grootte (sparse) aanmaken
+                array = np.lib.format.open_memmap(path, mode="w+", dtype=np.dtype(dtype), shape=tuple(shape))
+            else:
+                array = np.load(path, mmap_mode="r+")
+            for update in updates:
+                for rows, values in update["rows"]:
+                    array[rows] = values[name]
+            array.flush()
+            del array
+        
+        # Pas nu verwijst meta.json naar de nieuwe set
+        slots[slot] = meta["num_timesteps"]
+        meta.update(slot=slot, slots=slots)
+        write_json(os.path.join(self.directory, "meta.json"), meta)
+        self._last_payload = payload
+    
+    def load(self, buffer, position: Optional[Dict[str, Any]] = None) -> Dict:
+        """
+        Vul een buffer met dezelfde layout vanuit de bestanden
+        
+        Leest alleen een complete set: zonder position de actieve set uit
+        meta.json, met position de set met dezelfde num_timesteps.
+        
+        Args:
+            buffer: Lege SB3 ReplayBuffer of DictReplayBuffer
+            position: Optioneel pos, full en num_timesteps van een
+                checkpoint, bijv. uit training_state.json. Is de buffer na
+                dat checkpoint al verder geschreven (training_state.json niet
+                meer bijgewerkt), dan wordt de vorige set gelezen.
+        
+        Returns:
+            meta.json inhoud (pos, full, num_timesteps, ...) van de gelezen set
+        """
+        meta = self._read_meta()
+        if meta is None:
+            raise FileNotFoundError(f"Geen replay buffer gevonden in {self.directory}")
+        slot = meta["slot"]
+        if position is not None:
+            matching = [name for name, steps in meta["slots"].items() if steps == position["num_timesteps"]]
+            if not matching:
+                raise ValueError(
+                    f"Replay buffer in {self.directory} heeft geen complete set voor "
+                    f"{position['num_timesteps']} timesteps"
+                )
+            slot = slot if slot in matching else matching[0]
+            meta.update({key: position[key] for key in ("pos", "full", "num_timesteps")})
+        fields = _buffer_fields(buffer)
+        for name, (shape, dtype) in meta["fields"].items():
+            if name not in fields or list(fields[name].shape) != shape:
+                raise ValueError(
+                    f"Replay buffer veld {name} past niet: opgeslagen {shape}, "
+                    f"buffer {list(fields[name].shape) if name in fields else 'ontbreekt'}"
+                )
+        
+        end = meta["buffer_size"] if meta["full"] else min(meta["pos"] + 1, meta["buffer_size"])
+        for name in meta["fields"]:
+            stored = np.load(self._field_path(slot, name), mmap_mode="r")
+            fields[name][:end] = stored[:end]
+            del stored
+        buffer.pos = meta["pos"]
+        buffer.full = meta["full"]
+        
+        # Volgende snapshot schrijft alleen nieuwe rijen
+        self._saved_pos = meta["pos"]
+        self._saved_timesteps = meta["num_timesteps"]
+        self._last_payload = None
+        return dict(meta, slot=slot)
+    
+    def sync(self, buffer, num_timesteps: int) -> bool:
+        """
+        Ga verder vanaf de opgeslagen bestanden als die bij de buffer horen
+        
+        Na load() in een andere store (bijv. via resume_training()) hoeft
+        de volgende snapshot dan alleen de nieuwe rijen te schrijven.
+        
+        Returns:
+            True als de actieve set bij de buffer hoort
+        """
+        meta = self._read_meta()
+        if meta is None or (meta["num_timesteps"], meta["pos"], meta["full"]) != (num_timesteps, buffer.pos, buffer.full):
+            return False
+        self._saved_pos = meta["pos"]
+        self._saved_timesteps = meta["num_timesteps"]
+        self._last_payload = None
+        return True
+
+
+class CheckpointWriter:
+    """
+    Achtergrond thread die schrijfopdrachten in volgorde uitvoert
+    
+    De wachtrij is begrensd: loopt de schijf achter, dan wacht submit() tot
+    er plaats is in plaats van snapshots in het geheugen op te stapelen.
+    Een fout in de thread wordt bij de volgende submit(), wait() of close()
+    opnieuw opgegooid.
+    """
+    
+    def __init__(self, max_pending: int = 2):
+        """
+        Args:
+            max_pending: Maximum aantal wachtende opdrachten
+        """
+        self._queue: "queue.Queue[Optional[Tuple[Callable, tuple]]]" = queue.Queue(maxsize=max_pending)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        """Voer opdrachten uit tot de stop markering (None)"""
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                if self._error is None:
+                    function, args = job
+                    function(*args)
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+    
+    def _raise_error(self):
+        """Gooi een fout uit de achtergrond thread op in de aanroepende thread"""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"Checkpoint schrijven mislukt: {error}") from error
+    
+    def submit(self, function: Callable, *args):
+        """Plan function(*args) in op de achtergrond thread"""
+        self._raise_error()
+        if not self._thread.is_alive():
+            raise RuntimeError("CheckpointWriter is al gesloten")
+        self._queue.put((function, args))
+    
+    def wait(self):
+        """Wacht tot alle ingeplande opdrachten geschreven zijn"""
+        self._queue.join()
+        self._raise_error()
+    
+    def close(self):
+        """Schrijf alles weg en stop de thread (idempotent)"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._raise_error()
+
+
+def rng_state() -> Dict[str, Any]:
+    """State van de python, numpy en torch (CPU) random generators als JSON"""
+    version, internal, gauss = random.getstate()
+    name, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    return {
+        "python": [version, list(internal), gauss],
+        "numpy": [name, keys.tolist(), pos, has_gauss, cached_gaussian],
+        "torch": torch.get_rng_state().tolist(),
+    }
+
+
+def set_rng_state(state: Dict[str, Any]):
+    """Herstel de random generators uit rng_state()"""
+    version, internal, gauss = state["python"]
+    random.setstate((version, tuple(internal), gauss))
+    name, keys, pos, has_gauss, cached_gaussian = state["numpy"]
+    np.random.set_state((name, np.array(keys, dtype=np.uint32), pos, has_gauss, cached_gaussian))
+    torch.set_rng_state(torch.tensor(state["torch"], dtype=torch.uint8))
+
+
+def env_training_states(env) -> Optional[List[Dict[str, Any]]]:
+    """get_training_state() van elke environment in een VecEnv (None als ze het niet hebben)"""
+    try:
+        return env.env_method("get_training_state")
+    except AttributeError:
+        return None
+
+
+def training_state(
+    model,
+    model_file: str,
+    envs: Optional[List[Dict[str, Any]]] = None,
+    replay_buffer: Optional[Dict[str, Any]] = None,
+    extra: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Verzamel de training state voor training_state.json
+    
+    Args:
+        model: Stable-Baselines3 model
+        model_file: Checkpoint zip, relatief t.o.v. de checkpoint map
+        envs: Resultaat van env_training_states()
+        replay_buffer: Map van de ReplayBufferStore (relatief) en de buffer
+            positie van dit checkpoint: {"directory", "pos", "full",
+            "num_timesteps"} (None = geen)
+        extra: Overige state, bijv. {"best_mean_reward": ...} van de evaluatie
+    
+    Returns:
+        JSON serialiseerbare dict
+    """
+    return {
+        "algorithm": type(model).__name__,
+        "model": model_file,
+        "num_timesteps": int(model.num_timesteps),
+        "episode_num": int(model._episode_num),
+        "replay_buffer": replay_buffer,
+        "envs": envs,
+        "rng": rng_state(),
+        "extra": extra or {},
+    }
+
+
+def read_training_state(directory: str) -> Optional[Dict[str, Any]]:
+    """training_state.json uit een checkpoint map (None als die er niet is)"""
+    path = os.path.join(directory, TRAINING_STATE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def resume_training(directory: str, env, device: str = "auto", **load_kwargs) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Laad model, optimizers, replay buffer, random generators en environment state
+    
+    Het algoritme volgt uit training_state.json. De replay buffer wordt via
+    mmap rechtstreeks in de buffer van het model gekopieerd. Elke environment
+    begint met een nieuwe episode; ga verder met
+    model.learn(total - model.num_timesteps, reset_num_timesteps=False).
+    
+    Args:
+        directory: Checkpoint map met training_state.json
+        env: VecEnv met hetzelfde aantal en type environments
+        device: Torch device voor het model
+        **load_kwargs: Extra argumenten voor <Algoritme>.load()
+    
+    Returns:
+        (model, training state)
+    """
+    state = read_training_state(directory)
+    if state is None:
+        raise FileNotFoundError(f"Geen {TRAINING_STATE_FILE} gevonden in {directory}")
+    
+    algorithm = getattr(stable_baselines3, state["algorithm"], None)
+    if not (isinstance(algorithm, type) and issubclass(algorithm, BaseAlgorithm)):
+        raise ValueError(f"Onbekend algoritme in {TRAINING_STATE_FILE}: {state['algorithm']}")
+    model = algorithm.load(os.path.join(directory, state["model"]), env=env, device=device, **load_kwargs)
+    
+    replay_buffer = state["replay_buffer"]
+    if replay_buffer and getattr(model, "replay_buffer", None) is not None:
+        store = ReplayBufferStore(os.path.join(directory, replay_buffer["directory"]))
+        store.load(model.replay_buffer, position=replay_buffer)
+    
+    if state["envs"]:
+        if len(state["envs"]) != env.num_envs:
+            raise ValueError(
+                f"Checkpoint heeft {len(state['envs'])} environments, de VecEnv {env.num_envs}"
+            )
+        for i, env_state in enumerate(state["envs"]):
+            env.env_method("set_training_state", env_state, indices=[i])
+    
+    # Nieuwe episodes: learn() roept env.reset() aan als er geen laatste observatie is
+    model._last_obs = None
+    model._episode_num = state["episode_num"]
+    set_rng_state(state["rng"])
+    return model, state
@@ -0,0 +1,486 @@
+"""
+Parallelle evaluatie van getrainde policies
+
+Verdeelt episodes (modellen × trap configuraties × seeds × episodes) over
+een pool van headless simulator processen. Elke episode is een losse taak
+met een eigen afgeleide seed, dus de resultaten hangen niet af van het
+aantal workers of de volgorde waarin taken klaar zijn. Een worker laadt
+model en environment één keer en hergebruikt ze voor volgende taken.
+
+Resultaten worden per episode als JSON regel naar een resultatenbestand
+gestreamd (een afgebroken evaluatie verliest niets); summarize() maakt er
+gemiddelden met betrouwbaarheidsintervallen van.
+"""
+
+import json
+import math
+import multiprocessing as mp
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import NormalDist
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ENV_TYPES = ("rl", "stairs")
+
+
+@dataclass
+class EvalTask:
+    """
+    Eén evaluatie episode
+    
+    config_index nummert de trap configuraties, zodat resultaten per
+    configuratie gegroepeerd kunnen worden.
+    """
+    model_path: str
+    seed: int
+    episode: int
+    env: str = "stairs"
+    env_kwargs: Dict[str, Any] = field(default_factory=dict)
+    stair_config: Optional[Dict[str, Any]] = None
+    config_index: int = 0
+    deterministic: bool = True
+    
+    def episode_seed(self) -> int:
+        """Reset seed van deze episode, afgeleid van (seed, episode)"""
+        return int(np.random.SeedSequence([self.seed, self.episode]).generate_state(1)[0])
+
+
+def make_tasks(
+    model_paths: Sequence[str],
+    seeds: Sequence[int],
+    num_episodes: int,
+    stair_configs: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    env: str = "stairs",
+    env_kwargs: Optional[Dict[str, Any]] = None,
+    deterministic: bool = True
+) -> List[EvalTask]:
+    """
+    Maak taken voor alle combinaties van model, trap configuratie, seed en episode
+    
+    Taken staan per model gesorteerd, zodat workers een geladen model zo
+    vaak mogelijk hergebruiken.
+    
+    Args:
+        model_paths: Paden naar opgeslagen SB3 modellen
+        seeds: Evaluatie seeds
+        num_episodes: Episodes per (model, configuratie, seed)
+        stair_configs: Trap configuraties (None = alleen de standaard trap)
+        env: "stairs" (Go2StairsEnv) of "rl" (Go2RLEnv)
+        env_kwargs: Extra argumenten voor de environment (bijv. control_dt)
+        deterministic: Deterministische acties
+    
+    Returns:
+        Lijst van EvalTask
+    """
+    if env not in ENV_TYPES:
+        raise ValueError(f"Onbekend environment type: {env} (kies uit {', '.join(ENV_TYPES)})")
+    configs = list(stair_configs) if stair_configs else [None]
+    return [
+        EvalTask(
+            model_path=str(model_path),
+            seed=seed,
+            episode=episode,
+            env=env,
+            env_kwargs=dict(env_kwargs or {}),
+            stair_config=config,
+            config_index=config_index,
+            deterministic=deterministic,
+        )
+        for model_path in model_paths
+        for config_index, config in enumerate(configs)
+        for seed in seeds
+        for episode in range(num_episodes)
+    ]
+
+
+def find_models(path: str) -> List[str]:
+    """
+    Zoek modellen in een bestand of checkpoint directory
+    
+    Args:
+        path: Pad naar een model (.zip) of een directory met modellen
+    
+    Returns:
+        Model paden, checkpoints in trainingsvolgorde
+    """
+    path = Path(path)
+    if path.is_dir():
+        # Natuurlijke volgorde: go2_5000_steps voor go2_10000_steps
+        models = sorted(
+            path.rglob("*.zip"),
+            key=lambda model: [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", str(model))]
+        )
+        if not models:
+            raise FileNotFoundError(f"Geen modellen (.zip) gevonden in {path}")
+        return [str(model) for model in models]
+    return [str(path)]
+
+
+def load_policy(model_path: str):
+    """
+    Laad een SB3 model; het algoritme wordt uit de naam of het bestand afgeleid
+    
+    Args:
+        model_path: Pad naar opgeslagen model
+    
+    Returns:
+        PPO, SAC of TD3 model
+    """
+    try:
+        from stable_baselines3 import PPO, SAC, TD3
+    except ImportError:
+        raise ImportError(
+            "Stable-Baselines3 niet geïnstalleerd. Installeer met: pip install stable-baselines3"
+        )
+    
+    algorithms = [PPO, SAC, TD3]
+    name = Path(model_path).name.lower()
+    for algorithm in algorithms:
+        if algorithm.__name__.lower() in name:
+            return algorithm.load(model_path, device="cpu")
+    
+    last_error = None
+    for algorithm in algorithms:
+        try:
+            return algorithm.load(model_path, device="cpu")
+        except Exception as e:
+            last_error = e
+    raise ValueError(f"Kon model niet laden als PPO, SAC of TD3: {model_path} ({last_error})")
+
+
+def make_env(env: str, env_kwargs: Optional[Dict[str, Any]] = None):
+    """
+    Maak een headless evaluatie environment
+    
+    Args:
+        env: "stairs" of "rl"
+        env_kwargs: Extra argumenten voor de environment
+    
+    Returns:
+        Go2StairsEnv of Go2RLEnv
+    """
+    kwargs = dict(env_kwargs or {})
+    kwargs["gui"] = False
+    if env == "stairs":
+        from .go2_stairs_env import Go2StairsEnv
+        return Go2StairsEnv(**kwargs)
+    if env == "rl":
+        from .go2_rl_env import Go2RLEnv
+        return Go2RLEnv(**kwargs)
+    raise ValueError(f"Onbekend environment type: {env} (kies uit {', '.join(ENV_TYPES)})")
+
+
+def run_episode(
+    env,
+    policy,
+    seed: Optional[int] = None,
+    options: Optional[Dict] = None,
+    deterministic: bool = True
+) -> Dict[str, Any]:
+    """
+    Speel één episode met een policy
+    
+    Args:
+        env: Go2BaseEnv (of een wrapper, bijv. RolloutRecorder)
+        policy: Object met predict(obs, deterministic) (bijv. een SB3 model)
+        seed: Reset seed
+        options: Reset opties (bijv. {"stair_config": ...})
+        deterministic: Deterministische acties
+    
+    Returns:
+        Dict met return, length, success, fallen en (traplopen) steps_reached
+    """
+    obs, info = env.reset(seed=seed, options=options)
+    episode_return = 0.0
+    length = 0
+    done = False
+    while not done:
+        action, _ = policy.predict(obs, deterministic=deterministic)
+        obs, reward, done, truncated, info = env.step(action)
+        done = done or truncated
+        episode_return += reward
+        length += 1
+    
+    fallen = bool(env.unwrapped.has_fallen())
+    result = {
+        "return": float(episode_return),
+        "length": length,
+        "fallen": fallen,
+    }
+    if "num_steps" in info:
+        result["steps_reached"] = int(info["current_step_index"])
+        result["success"] = info["current_step_index"] >= info["num_steps"]
+    else:
+        # Zonder doel: geslaagd = volgehouden tot het einde van de episode
+        result["success"] = not fallen and length >= env.unwrapped.max_episode_steps
+    return result
+
+
+# Per worker proces: laatst gebruikte model en environments
+_worker_policy: Tuple[Optional[str], Any] = (None, None)
+_worker_envs: Dict[str, Any] = {}
+
+
+def _init_worker():
+    """Eén thread per worker: de pool levert de parallelliteit"""
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+
+def _worker_load_policy(model_path: str):
+    """Model van de worker; wordt alleen opnieuw geladen bij een ander pad"""
+    global _worker_policy
+    if _worker_policy[0] != model_path:
+        _worker_policy = (model_path, load_policy(model_path))
+    return _worker_policy[1]
+
+
+def _worker_env(task: EvalTask):
+    """Environment van de worker voor deze taak (één per env configuratie)"""
+    env_key = json.dumps([task.env, task.env_kwargs], sort_keys=True, default=str)
+    env = _worker_envs.get(env_key)
+    if env is None:
+        env = make_env(task.env, task.env_kwargs)
+        _worker_envs[env_key] = env
+    return env
+
+
+def warm_up_worker(task: EvalTask):
+    """
+    Laad model en environment van een taak alvast in de worker
+    
+    Args:
+        task: Taak waarvan model_path en environment geladen worden
+    """
+    _worker_load_policy(task.model_path)
+    _worker_env(task).reset(seed=task.episode_seed())
+
+
+def make_pool(num_workers: int, start_method: Optional[str] = None) -> ProcessPoolExecutor:
+    """
+    Maak een pool van evaluatie workers
+    
+    Args:
+        num_workers: Aantal worker processen
+        start_method: Multiprocessing start methode (None = "forkserver"
+            indien beschikbaar, anders "spawn")
+    
+    Returns:
+        ProcessPoolExecutor met één torch thread per worker
+    """
+    if start_method is None:
+        start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(
+        max_workers=num_workers,
+        mp_context=mp.get_context(start_method),
+        initializer=_init_worker
+    )
+
+
+def _run_task(task: EvalTask) -> Dict[str, Any]:
+    """Voer één taak uit in een worker (model en environment blijven geladen)"""
+    policy = _worker_load_policy(task.model_path)
+    env = _worker_env(task)
+    
+    options = None
+    if task.env == "stairs":
+        # Altijd meegeven: de worker kan net een andere trap gebruikt hebben
+        options = {"stair_config": task.stair_config or task.env_kwargs.get("stair_config") or {}}
+    
+    result = {
+        "model": task.model_path,
+        "config": task.config_index,
+        "stair_config": task.stair_config,
+        "seed": task.seed,
+        "episode": task.episode,
+    }
+    result.update(run_episode(env, policy, seed=task.episode_seed(), options=options, deterministic=task.deterministic))
+    return result
+
+
+def evaluate_parallel(
+    tasks: Sequence[EvalTask],
+    results_path: Optional[str] = None,
+    num_workers: Optional[int] = None,
+    start_method: Optional[str] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Voer evaluatie taken parallel uit en stream de resultaten
+    
+    Args:
+        tasks: Taken van make_tasks()
+        results_path: JSON lines bestand voor de resultaten (None = niet opslaan);
+            elk resultaat wordt direct weggeschreven
+        num_workers: Aantal worker processen (None = aantal cores, 0 = alles
+            in het hoofdproces)
+        start_method: Multiprocessing start methode (None = "forkserver"
+            indien beschikbaar, anders "spawn")
+        on_result: Wordt aangeroepen met elk resultaat zodra het binnen is
+    
+    Returns:
+        Resultaten per episode, in de volgorde van tasks
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+    output = None
+    if results_path is not None:
+        Path(results_path).parent.mkdir(parents=True, exist_ok=True)
+        output = open(results_path, "w")
+    
+    def _collect(index: int, result: Dict[str, Any]):
+        results[index] = result
+        if output is not None:
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+        if on_result is not None:
+            on_result(result)
+    
+    try:
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        if num_workers == 0:
+            for i, task in enumerate(tasks):
+                _collect(i, _run_task(task))
+        else:
+            with make_pool(min(num_workers, max(1, len(tasks))), start_method) as pool:
+                futures = {pool.submit(_run_task, task): i for i, task in enumerate(tasks)}
+                for future in as_completed(futures):
+                    _collect(futures[future], future.result())
+    finally:
+        if output is not None:
+            output.close()
+    
+    return results
+
+
+def evaluate_snapshot(
+    state_dict: Dict[str, Any],
+    tasks: Sequence[EvalTask],
+    save_path: Optional[str] = None,
+    best_mean_reward: float = -np.inf
+) -> List[Dict[str, Any]]:
+    """
+    Evalueer policy gewichten met een eerder opgeslagen model als sjabloon
+    
+    Bedoeld voor een worker tijdens training (zie AsyncEvalCallback): het
+    sjabloon (tasks[i].model_path) wordt één keer geladen, daarna komen
+    alleen de gewichten mee.
+    
+    Args:
+        state_dict: policy.state_dict() van het lerende model (CPU tensors)
+        tasks: Taken met hetzelfde model_path (het sjabloon)
+        save_path: Sla het model hier op als de gemiddelde reward
+            best_mean_reward overtreft (None = niet opslaan)
+        best_mean_reward: Beste gemiddelde reward tot nu toe
+    
+    Returns:
+        Resultaten per episode
+    """
+    policy = _worker_load_policy(tasks[0].model_path)
+    policy.policy.load_state_dict(state_dict)
+    results = [_run_task(task) for task in tasks]
+    if save_path is not None and np.mean([result["return"] for result in results]) > best_mean_reward:
+        policy.save(save_path)
+    return results
+
+
+def read_results(results_path: str) -> List[Dict[str, Any]]:
+    """
+    Lees een resultatenbestand van evaluate_parallel()
+    
+    Args:
+        results_path: JSON lines bestand
+    
+    Returns:
+        Resultaten per episode
+    """
+    with open(results_path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def mean_confidence_interval(values: Iterable[float], confidence: float = 0.95) -> Tuple[float, float, float]:
+    """
+    Gemiddelde met betrouwbaarheidsinterval (normale benadering)
+    
+    Args:
+        values: Metingen
+        confidence: Betrouwbaarheid (bijv. 0.95)
+    
+    Returns:
+        (gemiddelde, ondergrens, bovengrens)
+    """
+    values = np.asarray(list(values), dtype=np.float64)
+    mean = float(values.mean()) if len(values) else float("nan")
+    if len(values) < 2:
+        return mean, mean, mean
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half_width = z * float(values.std(ddof=1)) / math.sqrt(len(values))
+    return mean, mean - half_width, mean + half_width
+
+
+def proportion_confidence_interval(successes: int, total: int, confidence: float = 0.95) -> Tuple[float, float, float]:
+    """
+    Fractie met Wilson betrouwbaarheidsinterval (ook goed bij 0% of 100%)
+    
+    Args:
+        successes: Aantal geslaagde episodes
+        total: Totaal aantal episodes
+        confidence: Betrouwbaarheid (bijv. 0.95)
+    
+    Returns:
+        (fractie, ondergrens, bovengrens)
+    """
+    if total == 0:
+        return float("nan"), float("nan"), float("nan")
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    rate = successes / total
+    denominator = 1 + z * z / total
+    center = (rate + z * z / (2 * total)) / denominator
+    half_width = z * math.sqrt(rate * (1 - rate) / total + z * z / (4 * total * total)) / denominator
+    return rate, max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+def summarize(
+    results: Sequence[Dict[str, Any]],
+    group_by: Sequence[str] = ("model", "config"),
+    confidence: float = 0.95
+) -> List[Dict[str, Any]]:
+    """
+    Vat resultaten per groep samen
+    
+    Args:
+        results: Resultaten van evaluate_parallel() of read_results()
+        group_by: Velden waarop gegroepeerd wordt
+        confidence: Betrouwbaarheid van de intervallen
+    
+    Returns:
+        Eén dict per groep met episodes, en per metric [gemiddelde, onder, boven]
+        (return, length, steps_reached) of fractie met interval (success_rate, fall_rate)
+    """
+    groups: Dict[Tuple, List[Dict[str, Any]]] = {}
+    for result in results:
+        key = tuple(json.dumps(result.get(name), sort_keys=True) for name in group_by)
+        groups.setdefault(key, []).append(result)
+    
+    summary = []
+    for group in groups.values():
+        row = {name: group[0].get(name) for name in group_by}
+        if "stair_config" in group[0] and "stair_config" not in row:
+            row["stair_config"] = group[0]["stair_config"]
+        row["episodes"] = len(group)
+        for metric in ("return", "length", "steps_reached"):
+            if all(metric in result for result in group):
+                row[metric] = list(mean_confidence_interval((r[metric] for r in group), confidence))
+        n = len(group)
+        row["success_rate"] = list(proportion_confidence_interval(sum(r["success"] for r in group), n, confidence))
+        row["fall_rate"] = list(proportion_confidence_interval(sum(r["fallen"] for r in group), n, confidence))
+        summary.append(row)
+    return summary
@@ -0,0 +1,941 @@
+"""
+Gedeelde basis voor Go2 RL environments
+
+Bevat alles wat de taak environments gemeen hebben: simulator beheer,
+snelle reset, decimation, snapshots, profiling, rendering, de observatie
+layout, action scaling, de reward termen, procedurele terrains,
+gesimuleerde sensoren en domain randomization. Een nieuwe taak declareert
+alleen zijn extra observatie velden en reward gewichten en implementeert
+zijn done checks.
+"""
+
+import numpy as np
+import pybullet as p
+import gymnasium as gym
+from gymnasium import spaces
+from collections import deque
+from typing import Dict, List, Tuple, Optional, Any
+
+from .go2_simulator import Go2Simulator, SimSnapshot
+from .rendering import OffscreenRenderer
+from .profiling import StepProfiler
+from .rewards import RewardFunction
+from .terrain import TERRAIN_TYPES, TerrainManager, get_heightfield
+from .sensors import NUM_FEET, SensorSuite, sensor_fields, find_foot_links, read_foot_contacts
+from .randomization import DomainRandomizer, randomization_ranges
+
+
+class Go2BaseEnv(gym.Env):
+    """
+    Basis environment voor Go2 taken
+    
+    De observatie is één voorgealloceerde float32 vector met benoemde
+    slices (obs_slices). De robot velden uit BASE_OBS_FIELDS komen altijd
+    eerst; subclasses voegen velden toe via EXTRA_OBS_FIELDS en vullen die
+    in _fill_obs(). Actions in [-1, 1] worden met één affine operatie
+    (action * scale + offset) naar joint targets geschaald.
+    
+    De reward is een gewogen som van geregistreerde termen (zie rewards.py):
+    REWARD_WEIGHTS geeft de standaard gewichten, reward_weights overschrijft
+    ze per environment. De som per term over de episode staat in
+    info["reward/<term>"].
+    
+    Met terrain={"type": ...} staat de robot op een procedureel heightfield
+    in plaats van de vlakke vloer (zie terrain.py); bij elke reset wordt een
+    van de num_variations varianten gekozen.
+    
+    Met sensors={"height_scan": {...}, ...} komen ray-cast sensoren en voet
+    contacten (zie sensors.py) als extra velden achteraan de observatie.
+    
+    Met randomization={"friction": None, ...} worden frictie, massa's,
+    motor sterkte, gains, latency en zwaartekracht per episode opnieuw
+    getrokken (zie randomization.py); de waarden staan in
+    info["randomization/<naam>"].
+    
+    Subclasses implementeren:
+    - _is_done(): taak specifieke eindcondities (roep super() aan)
+    En optioneel _fill_obs(), _reward_state(), _build_world(), _reset_task(),
+    _sync_world(), _post_physics_step(), _get_info() en
+    _snapshot_extra()/_restore_extra().
+    
+    Met attach() draait de environment als één robot in een gedeelde
+    multi-robot simulator (zie Go2VecEnv); robot_index bepaalt dan welke
+    robot uit het state frame gelezen en aangestuurd wordt.
+    """
+    
+    metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 60}
+    
+    # (naam, grootte) van de robot observatie velden, in volgorde
+    BASE_OBS_FIELDS: Tuple[Tuple[str, int], ...] = (
+        ("joint_positions", 12),
+        ("joint_velocities", 12),
+        ("base_position", 3),
+        ("base_orientation", 4),
+        ("base_linear_velocity", 3),
+        ("base_angular_velocity", 3),
+    )
+    
+    # Extra taak velden (naam, grootte), na de robot velden
+    EXTRA_OBS_FIELDS: Tuple[Tuple[str, int], ...] = ()
+    
+    # Joint limits voor scaling van actions [low, high]
+    # Hip: ±0.5 rad, Thigh: 0.0-1.0 rad, Calf: -1.5-0.0 rad
+    JOINT_LIMITS = np.array([
+        [-0.5, 0.5],   # Hip joints (4x)
+        [-0.5, 0.5],
+        [-0.5, 0.5],
+        [-0.5, 0.5],
+        [0.0, 1.0],    # Thigh joints (4x)
+        [0.0, 1.0],
+        [0.0, 1.0],
+        [0.0, 1.0],
+        [-1.5, 0.0],   # Calf joints (4x)
+        [-1.5, 0.0],
+        [-1.5, 0.0],
+        [-1.5, 0.0],
+    ])
+    
+    # Startpositie van de robot t.o.v. zijn oorsprong
+    START_POSITION = (0.0, 0.0, 0.5)
+    
+    # Standaard reward gewichten (term naam -> gewicht)
+    REWARD_WEIGHTS: Dict[str, float] = {"survival": 0.1}
+    
+    # Doelhoogte van de base voor de hoogte termen
+    TARGET_HEIGHT = 0.5
+    
+    # Base lager dan dit boven de grond = gevallen
+    FALL_HEIGHT = 0.2
+    
+    def __init__(
+        self,
+        render_mode: Optional[str] = None,
+        gui: bool = True,
+        max_episode_steps: int = 1000,
+        fast_reset: bool = True,
+        sim_profile: Optional[str] = None,
+        control_dt: Optional[float] = None,
+        decimation: int = 1,
+        render_width: int = 320,
+        render_height: int = 240,
+        render_frame_skip: int = 1,
+        profiling: bool = False,
+        reward_weights: Optional[Dict[str, float]] = None,
+        terrain: Optional[Dict[str, Any]] = None,
+        sensors: Optional[Dict[str, Optional[Dict[str, Any]]]] = None,
+        randomization: Optional[Dict[str, Optional[Tuple[float, float]]]] = None
+    ):
+        """
+        Initialiseer basis environment
+        
+        Args:
+            render_mode: Rendering mode ("human" of "rgb_array")
+            gui: Toon PyBullet GUI
+            max_episode_steps: Maximum aantal stappen per episode
+            fast_reset: Hergebruik simulator tussen episodes en herstel een
+                opgeslagen begin-state (False = nieuwe simulator per reset)
+            sim_profile: Simulator profiel ("full" of "train");
+                None = "train" zonder GUI, anders "full"
+            control_dt: Tijd per policy stap in seconden (bijv. 0.05 voor 20 Hz
+                zoals Go2RLController); overschrijft decimation
+            decimation: Aantal physics substeps (1/240 s) per policy stap.
+                Reward en done worden één keer per policy stap berekend
+                (rate termen geschaald met control_dt); max_episode_steps
+                telt policy stappen
+            render_width: Beeldbreedte voor render_mode="rgb_array"
+            render_height: Beeldhoogte voor render_mode="rgb_array"
+            render_frame_skip: Render alleen elke N-de render() aanroep
+                (tussenliggende aanroepen geven het vorige beeld terug)
+            profiling: Meet fase timings en PyBullet API calls per stap
+                (in info["profile"] en profile_report())
+            reward_weights: Reward gewichten die de standaard gewichten
+                overschrijven (term naam -> gewicht, 0 = term uit)
+            terrain: Terrain configuratie (None = vlakke vloer), zie set_terrain()
+            sensors: Sensor naam -> instellingen (None = geen sensoren), bijv.
+                {"height_scan": {"resolution": 0.1}, "foot_contacts": None};
+                zie sensors.DEFAULT_SENSOR_CONFIG
+            randomization: Domain randomization (None = nominale dynamica),
+                zie set_randomization()
+        """
+        super().__init__()
+        
+        self.render_mode = render_mode
+        self.gui = gui or (render_mode == "human")
+        self.max_episode_steps = max_episode_steps
+        self.fast_reset = fast_reset
+        if sim_profile is None:
+            sim_profile = "full" if self.gui else "train"
+        self.sim_profile = sim_profile
+        
+        # Control rate: N physics substeps per policy stap
+        self.sim_dt = 1.0 / 240.0
+        if control_dt is not None:
+            decimation = max(1, int(round(control_dt / self.sim_dt)))
+        if decimation < 1:
+            raise ValueError(f"decimation moet >= 1 zijn, niet {decimation}")
+        self.decimation = decimation
+        self.control_dt = decimation * self.sim_dt
+        
+        # Offscreen rendering (wordt aangemaakt bij de eerste render())
+        self.render_width = render_width
+        self.render_height = render_height
+        self.render_frame_skip = render_frame_skip
+        self._renderer = None
+        
+        # Profiling (blijft behouden als de simulator herbouwd wordt)
+        self.profiler = StepProfiler(enabled=profiling)
+        
+        # Simulator
+        self.sim = None
+        self.robot_index = 0
+        self._shared_sim = False  # True na attach(): simulator is niet van deze env
+        self._initial_state_id = None  # Opgeslagen state na stabilisatie
+        self._initial_snapshot = None  # Begin-state in een gedeelde simulator
+        
+        # Episode tracking
+        self.step_count = 0
+        self.episode_reward = 0.0
+        
+        # Sensoren (worden bij de eerste observatie aangemaakt)
+        self.sensor_config = dict(sensors) if sensors else None
+        self.sensors: Optional[SensorSuite] = None
+        self._foot_links: Optional[List[int]] = None
+        self._foot_contacts = np.zeros(NUM_FEET, dtype=np.float32)
+        
+        # Observatie layout: benoemde slices in één float32 vector
+        self.obs_slices: Dict[str, slice] = {}
+        offset = 0
+        for name, size in self.BASE_OBS_FIELDS + self.EXTRA_OBS_FIELDS + sensor_fields(self.sensor_config):
+            if name in self.obs_slices:
+                raise ValueError(f"Observatie veld {name} is dubbel gedefinieerd")
+            self.obs_slices[name] = slice(offset, offset + size)
+            offset += size
+        self._obs_buffer = np.zeros(offset, dtype=np.float32)
+        self.observation_space = spaces.Box(
+            low=-np.inf,
+            high=np.inf,
+            shape=(offset,),
+            dtype=np.float32
+        )
+        
+        # Define action space (12 joints, normalized to [-1, 1])
+        self.action_space = spaces.Box(
+            low=-1.0,
+            high=1.0,
+            shape=(12,),
+            dtype=np.float32
+        )
+        
+        # Action scaling als affine map: target = action * scale + offset
+        self.joint_limits = self.JOINT_LIMITS.copy()
+        low, high = self.joint_limits[:, 0], self.joint_limits[:, 1]
+        self._action_scale = (high - low) / 2.0
+        self._action_offset = (high + low) / 2.0
+        self._target_buffer = np.zeros(len(self.joint_limits))
+        
+        # Reward termen en hun som over de episode
+        weights = dict(self._default_reward_weights())
+        weights.update(reward_weights or {})
+        self.reward_fn = RewardFunction(weights, time_scale=self.control_dt / self.sim_dt)
+        self._reward_term_sums = np.zeros(len(self.reward_fn.names))
+        
+        # Procedureel terrain (body wordt bij de eerste reset gemaakt)
+        self.terrain_config: Optional[Dict[str, Any]] = None
+        self.terrain: Optional[TerrainManager] = None
+        self.terrain_seed: Optional[int] = None
+        self.set_terrain(terrain)
+        
+        # Domain randomization (wordt bij de eerste reset aangemaakt)
+        self.randomization_config: Optional[Dict[str, Optional[Tuple[float, float]]]] = None
+        self.randomizer: Optional[DomainRandomizer] = None
+        self._physics_steps = 0
+        self._delayed_targets: deque = deque()
+        self.set_randomization(randomization)
+    
+    def attach(self, sim: Go2Simulator, robot_index: int):
+        """
+        Koppel de environment aan één robot in een gedeelde simulator
+        
+        De simulator blijft eigendom van de aanroeper: reset() herstelt alleen
+        deze robot en close() sluit de simulator niet. Roep daarna
+        set_initial_snapshot() aan voor de eerste reset().
+        
+        Args:
+            sim: Multi-robot Go2Simulator
+            robot_index: Index van de robot voor deze environment
+        """
+        if self.sim is not None and not self._shared_sim:
+            self.sim.close()
+        self.sim = sim
+        self.robot_index = robot_index
+        self._shared_sim = True
+        self._initial_state_id = None
+        self._renderer = None
+        self.terrain = None
+        self.sensors = None
+        self._foot_links = None
+        self.randomizer = None
+        self._build_world()
+    
+    def set_initial_snapshot(self, snapshot: SimSnapshot):
+        """
+        Stel de begin-state in waar reset() in een gedeelde simulator naar terugkeert
+        
+        Args:
+            snapshot: SimSnapshot van de gestabiliseerde simulator
+        """
+        self._initial_snapshot = snapshot
+    
+    def set_terrain(self, config: Optional[Dict[str, Any]]):
+        """
+        Stel het terrain in; geldt vanaf de volgende reset()
+        
+        Werkt ook via Go2VecEnv.env_method("set_terrain", ...), bijvoorbeeld
+        voor een curriculum met steeds moeilijker terrain.
+        
+        Args:
+            config: None voor de vlakke vloer, of dict met:
+                - type: Een van terrain.TERRAIN_TYPES
+                - num_variations: Aantal varianten waaruit elke reset kiest
+                  (seeds seed .. seed + num_variations - 1, default: 1)
+                - seed: Eerste terrain seed (default: 0)
+                - size, resolution, spawn_radius: Zie generate_heightfield()
+                  (size moet kleiner zijn dan de spacing van Go2VecEnv)
+                - Overige sleutels gaan naar de generator (bijv. amplitude)
+        """
+        if config is not None:
+            if config.get("type") not in TERRAIN_TYPES:
+                raise ValueError(
+                    f"Onbekend terrain type: {config.get('type')} (kies uit {', '.join(TERRAIN_TYPES)})"
+                )
+            if config.get("num_variations", 1) < 1:
+                raise ValueError(f"num_variations moet >= 1 zijn, niet {config['num_variations']}")
+        
+        # Andere afmetingen passen niet in de bestaande shape
+        old = self.terrain_config or {}
+        new = config or {}
+        if self.terrain is not None and (
+            config is None
+            or old.get("size") != new.get("size")
+            or old.get("resolution") != new.get("resolution")
+        ):
+            self._remove_terrain()
+        self.terrain_config = dict(config) if config is not None else None
+    
+    def _reset_terrain(self):
+        """Kies en laad het terrain voor een nieuwe episode"""
+        if self.terrain_config is None:
+            return
+        
+        config = dict(self.terrain_config)
+        terrain_type = config.pop("type")
+        num_variations = config.pop("num_variations", 1)
+        first_seed = config.pop("seed", 0)
+        size = config.get("size", 4.0)
+        resolution = config.get("resolution", 0.05)
+        
+        if self.terrain is None:
+            # Terrain vervangt de vloer: geen botsingen tussen robot en plane
+            robot_id = self.sim.robot_ids[self.robot_index]
+            for link in range(-1, p.getNumJoints(robot_id, physicsClientId=self.sim.client)):
+                p.setCollisionFilterPair(
+                    self.sim.plane_id, robot_id, -1, link, 0,
+                    physicsClientId=self.sim.client
+                )
+            self.terrain = TerrainManager(
+                self.sim.client,
+                self.sim.robot_origins[self.robot_index],
+                size=size,
+                resolution=resolution
+            )
+            # Nieuwe body: opgeslagen begin-state past niet meer
+            self._discard_initial_state()
+        
+        self.terrain_seed = first_seed + int(self.np_random.integers(num_variations))
+        with self.profiler.phase("terrain"):
+            heights, key = get_heightfield(terrain_type, seed=self.terrain_seed, **config)
+            self.terrain.load(heights, key)
+    
+    def _remove_terrain(self):
+        """Verwijder het terrain en zet de botsingen met de vloer terug"""
+        if self.terrain is None:
+            return
+        if self.sim is not None:
+            self.terrain.remove()
+            robot_id = self.sim.robot_ids[self.robot_index]
+            for link in range(-1, p.getNumJoints(robot_id, physicsClientId=self.sim.client)):
+                p.setCollisionFilterPair(
+                    self.sim.plane_id, robot_id, -1, link, 1,
+                    physicsClientId=self.sim.client
+                )
+            self._discard_initial_state()
+        self.terrain = None
+        self.terrain_seed = None
+    
+    def set_randomization(self, config: Optional[Dict[str, Optional[Tuple[float, float]]]]):
+        """
+        Stel domain randomization in; geldt vanaf de volgende reset()
+        
+        Werkt ook via Go2VecEnv.env_method("set_randomization", ...), bijvoorbeeld
+        om de bereiken tijdens training te verbreden. gravity_tilt werkt niet
+        in een gedeelde simulator (de zwaartekracht geldt voor alle robots).
+        
+        Args:
+            config: None voor nominale dynamica, of parameter naam -> (laag, hoog)
+                of None voor het standaard bereik, bijv.
+                {"friction": (0.4, 1.2), "motor_strength": None};
+                zie randomization.DEFAULT_RANDOMIZATION
+        """
+        if config is not None:
+            randomization_ranges(config)
+        if self.randomizer is not None:
+            # Terug naar nominaal; de volgende reset trekt met de nieuwe bereiken
+            self.randomizer.restore()
+            self.randomizer = None
+        self.randomization_config = dict(config) if config is not None else None
+    
+    def _reset_randomization(self):
+        """Trek nieuwe dynamica parameters voor een episode"""
+        self._physics_steps = 0
+        self._delayed_targets.clear()
+        if self.randomization_config is None:
+            return
+        if self.randomizer is None:
+            self.randomizer = DomainRandomizer(
+                self.sim,
+                self.robot_index,
+                self.randomization_config,
+                timestep=self.sim_dt,
+                apply_gravity=not self._shared_sim
+            )
+        with self.profiler.phase("randomization"):
+            self.randomizer.sample(self.np_random)
+    
+    def _hold_joint_targets(self):
+        """Houd de huidige joint posities vast tot de eerste vertraagde targets"""
+        if self.randomizer is not None and self.randomizer.latency_steps > 0:
+            positions = self.sim.get_state_frame().joint_positions[self.robot_index]
+            self.sim.set_joint_targets_array(positions.copy(), robot_index=self.robot_index)
+    
+    def _discard_initial_state(self):
+        """Vergeet de opgeslagen begin-state (na het toevoegen of verwijderen van bodies)"""
+        if self._initial_state_id is not None:
+            self.sim.remove_state(self._initial_state_id)
+            self._initial_state_id = None
+    
+    def ground_height(self) -> float:
+        """
+        Hoogte van de grond onder de robot t.o.v. zijn oorsprong
+        
+        Returns:
+            Terrain hoogte in meters (0 op de vlakke vloer)
+        """
+        if self.terrain is None:
+            return 0.0
+        base_pos = self.sim.get_state_frame().base_position[self.robot_index]
+        return self.terrain.height_at(base_pos[0], base_pos[1])
+    
+    def obs_field(self, obs: np.ndarray, name: str) -> np.ndarray:
+        """
+        Haal een benoemd veld uit een observatie
+        
+        Args:
+            obs: Observatie van reset() of step() (laatste as = features)
+            name: Veldnaam uit BASE_OBS_FIELDS of EXTRA_OBS_FIELDS
+        
+        Returns:
+            View op het veld
+        """
+        return obs[..., self.obs_slices[name]]
+    
+    def scale_action(self, action: np.ndarray) -> np.ndarray:
+        """
+        Schaal actions van [-1, 1] naar joint targets
+        
+        Args:
+            action: 12 genormaliseerde actions
+        
+        Returns:
+            Joint targets in radians (hergebruikte buffer)
+        """
+        np.multiply(action, self._action_scale, out=self._target_buffer)
+        np.add(self._target_buffer, self._action_offset, out=self._target_buffer)
+        return self._target_buffer
+    
+    def _get_obs(self) -> np.ndarray:
+        """Haal observation op"""
+        obs = self._obs_buffer
+        if self.sim is None:
+            obs[:] = 0.0
+            return obs.copy()
+        
+        # Robot state (één keer per policy stap gelezen)
+        frame = self.sim.get_state_frame()
+        slices = self.obs_slices
+        r = self.robot_index
+        obs[slices["joint_positions"]] = frame.joint_positions[r]
+        obs[slices["joint_velocities"]] = frame.joint_velocities[r]
+        obs[slices["base_position"]] = frame.base_position[r]
+        obs[slices["base_orientation"]] = frame.base_orientation[r]
+        obs[slices["base_linear_velocity"]] = frame.base_linear_velocity[r]
+        obs[slices["base_angular_velocity"]] = frame.base_angular_velocity[r]
+        
+        # Taak velden
+        self._fill_obs(obs)
+        
+        # Sensor metingen
+        if self.sensor_config is not None:
+            if self.sensors is None:
+                self.sensors = SensorSuite(self.sim, self.robot_index, self.sensor_config)
+            with self.profiler.phase("sensors"):
+                for name, values in self.sensors.update().items():
+                    obs[slices[name]] = values
+        
+        # Kopie: de buffer wordt bij de volgende stap overschreven
+        return obs.copy()
+    
+    def _fill_obs(self, obs: np.ndarray):
+        """
+        Vul de taak specifieke observatie velden (EXTRA_OBS_FIELDS)
+        
+        Args:
+            obs: Observatie buffer; schrijf in obs[self.obs_slices[naam]]
+        """
+        pass
+    
+    def _get_info(self) -> Dict[str, Any]:
+        """Haal extra info op"""
+        info = {
+            "step_count": self.step_count,
+            "episode_reward": self.episode_reward,
+        }
+        if self.terrain_seed is not None:
+            info["terrain_seed"] = self.terrain_seed
+        if self.randomizer is not None:
+            for name, value in self.randomizer.params.items():
+                info[f"randomization/{name}"] = value
+        for name, value in zip(self.reward_fn.names, self._reward_term_sums):
+            info[f"reward/{name}"] = float(value)
+        return info
+    
+    def _default_reward_weights(self) -> Dict[str, float]:
+        """Standaard reward gewichten van deze taak"""
+        return self.REWARD_WEIGHTS
+    
+    def _reward_state(self) -> Dict[str, np.ndarray]:
+        """
+        State arrays voor de reward termen (batch van één robot)
+        
+        Returns:
+            Dict met (1, ...) arrays, zie rewards.py
+        """
+        frame = self.sim.get_state_frame()
+        robot = slice(self.robot_index, self.robot_index + 1)
+        ground = np.full(1, self.ground_height())
+        return {
+            "base_position": frame.base_position[robot],
+            "base_linear_velocity": frame.base_linear_velocity[robot],
+            "base_angular_velocity": frame.base_angular_velocity[robot],
+            "joint_positions": frame.joint_positions[robot],
+            "joint_velocities": frame.joint_velocities[robot],
+            "joint_limits": self.joint_limits,
+            "ground_height": ground,
+            "target_height": ground + self.TARGET_HEIGHT,
+        }
+    
+    @property
+    def reward_term_sums(self) -> np.ndarray:
+        """Gewogen som per reward term over de huidige episode (volgorde van reward_fn.names)"""
+        return self._reward_term_sums
+    
+    def _calculate_reward(self) -> float:
+        """Bereken reward na de physics substeps van een policy stap"""
+        if self.sim is None:
+            return 0.0
+        
+        rewards, terms = self.reward_fn.compute(self._reward_state())
+        self._reward_term_sums += terms[0]
+        return float(rewards[0])
+    
+    def _is_done(self) -> bool:
+        """Check of episode klaar is"""
+        if self.sim is None:
+            return True
+        
+        # Episode eindigt na max steps
+        if self.step_count >= self.max_episode_steps:
+            return True
+        
+        # Episode eindigt als robot valt
+        if self.has_fallen():
+            return True
+        
+        return False
+    
+    def foot_contacts(self) -> np.ndarray:
+        """
+        Contact vlag per voet in de huidige simulator state
+        
+        Werkt ook zonder de foot_contacts sensor (één getContactPoints call).
+        
+        Returns:
+            (4,) float32 array, 1.0 = contact (volgorde van de URDF voeten)
+        """
+        robot_id = self.sim.robot_ids[self.robot_index]
+        if self._foot_links is None:
+            self._foot_links = find_foot_links(self.sim.client, robot_id)
+        read_foot_contacts(self.sim.client, robot_id, self._foot_links, self._foot_contacts)
+        self.sim.profiler.count("getContactPoints")
+        return self._foot_contacts
+    
+    def has_fallen(self) -> bool:
+        """
+        Is de robot gevallen?
+        
+        Returns:
+            True als de base lager dan FALL_HEIGHT boven de grond is
+        """
+        base_pos = self.sim.get_state_frame().base_position[self.robot_index]
+        return base_pos[2] - self.ground_height() < self.FALL_HEIGHT
+    
+    def _build_world(self):
+        """Bouw taak objecten in een nieuwe simulator (bijv. een trap)"""
+        pass
+    
+    def _reset_task(self):
+        """Reset taak specifieke episode state"""
+        pass
+    
+    def _sync_world(self):
+        """
+        Zet taak objecten goed na het herstellen van simulator state
+        
+        restoreState zet ook statische bodies terug; wie objecten tussen
+        episodes verplaatst, doet dat hier.
+        """
+        pass
+    
+    def _post_physics_step(self):
+        """Taak update na de physics substeps van een policy stap (vóór reward en done)"""
+        pass
+    
+    def _snapshot_extra(self) -> Dict[str, Any]:
+        """Taak specifieke episode state voor snapshot()"""
+        return {}
+    
+    def _restore_extra(self, extra: Dict[str, Any]):
+        """
+        Herstel taak specifieke episode state
+        
+        Args:
+            extra: snapshot.extra van snapshot()
+        """
+        pass
+    
+    def _training_state_extra(self) -> Dict[str, Any]:
+        """Taak specifieke curriculum state voor get_training_state()"""
+        return {}
+    
+    def _restore_training_state_extra(self, extra: Dict[str, Any]):
+        """
+        Herstel taak specifieke curriculum state
+        
+        Args:
+            extra: Zelfde dict als get_training_state()
+        """
+        pass
+    
+    def reset(
+        self,
+        seed: Optional[int] = None,
+        options: Optional[Dict] = None
+    ) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Reset environment
+        
+        Args:
+            seed: Random seed
+            options: Optioneel {"snapshot": SimSnapshot} om vanuit een
+                opgeslagen state te starten (bijv. curriculum start states)
+        """
+        super().reset(seed=seed)
+        
+        if self._shared_sim:
+            return self._reset_shared(options)
+        
+        if self.sim is None or not self.fast_reset:
+            # Sluit oude simulator
+            if self.sim is not None:
+                self.sim.close()
+            
+            # Start nieuwe simulator
+            self.sim = Go2Simulator(
+                gui=self.gui,
+                timestep=self.sim_dt,
+                profile=self.sim_profile,
+                profiler=self.profiler
+            )
+            self._initial_state_id = None
+            self._renderer = None
+            self.terrain = None
+            self.sensors = None
+            self._foot_links = None
+            self.randomizer = None
+            self._build_world()
+        
+        # Reset tracking
+        self.step_count = 0
+        self.episode_reward = 0.0
+        self._reward_term_sums[:] = 0.0
+        self._reset_task()
+        self._reset_terrain()
+        self._reset_randomization()
+        if self.sensors is not None:
+            self.sensors.reset()
+        
+        if self._initial_state_id is None:
+            # Reset robot naar start positie
+            self.sim.reset(position=list(self.START_POSITION))
+            
+            # Wacht even voor stabilisatie
+            for _ in range(10):
+                self.sim.step()
+            
+            # Bewaar gestabiliseerde begin-state voor volgende resets
+            self._initial_state_id = self.sim.save_state()
+        else:
+            # Snelle reset: herstel begin-state zonder simulator te herladen
+            self.sim.restore_state(self._initial_state_id)
+        self._sync_world()
+        
+        # Start vanuit snapshot: nieuwe episode vanaf opgeslagen state
+        if options and options.get("snapshot") is not None:
+            self.restore(options["snapshot"])
+            self.step_count = 0
+            self.episode_reward = 0.0
+        self._hold_joint_targets()
+        
+        obs = self._get_obs()
+        info = self._get_info()
+        
+        return obs, info
+    
+    def _reset_shared(self, options: Optional[Dict]) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """Reset alleen deze robot in een gedeelde simulator"""
+        if self._initial_snapshot is None:
+            raise RuntimeError("Geen begin-state voor gedeelde simulator. Roep set_initial_snapshot() aan eerst.")
+        
+        self.step_count = 0
+        self.episode_reward = 0.0
+        self._reward_term_sums[:] = 0.0
+        self._reset_task()
+        self._reset_terrain()
+        self._reset_randomization()
+        if self.sensors is not None:
+            self.sensors.reset()
+        
+        snapshot = self._initial_snapshot
+        if options and options.get("snapshot") is not None:
+            snapshot = options["snapshot"]
+        self.sim.restore(snapshot, robot_indices=[self.robot_index])
+        self._sync_world()
+        self._hold_joint_targets()
+        
+        return self._get_obs(), self._get_info()
+    
+    def snapshot(self) -> SimSnapshot:
+        """
+        Maak een momentopname van simulatie en episode state
+        
+        Hiermee kunnen vanuit één interessante state meerdere korte rollouts
+        gestart worden (restore() of reset(options={"snapshot": ...})).
+        
+        Returns:
+            SimSnapshot (serialiseerbaar met to_bytes())
+        """
+        if self.sim is None:
+            raise RuntimeError("Environment niet geïnitialiseerd. Roep reset() aan eerst.")
+        extra = {
+            "step_count": self.step_count,
+            "episode_reward": self.episode_reward,
+        }
+        extra.update(self._snapshot_extra())
+        return self.sim.snapshot(extra=extra)
+    
+    def restore(self, snapshot: SimSnapshot) -> np.ndarray:
+        """
+        Herstel simulatie en episode state uit een snapshot
+        
+        Args:
+            snapshot: SimSnapshot van snapshot()
+        
+        Returns:
+            Observatie na herstellen
+        """
+        if self.sim is None:
+            raise RuntimeError("Environment niet geïnitialiseerd. Roep reset() aan eerst.")
+        self.sim.restore(snapshot)
+        self._sync_world()
+        self.step_count = snapshot.extra.get("step_count", 0)
+        self.episode_reward = snapshot.extra.get("episode_reward", 0.0)
+        self._restore_extra(snapshot.extra)
+        return self._get_obs()
+    
+    def get_training_state(self) -> Dict[str, Any]:
+        """
+        State die een hervatte training nodig heeft (JSON serialiseerbaar)
+        
+        Bevat de random generator en de curriculum instellingen (terrain,
+        randomization en taak specifiek), niet de lopende episode: na
+        hervatten begint elke environment met een nieuwe reset(). Werkt ook
+        via Go2VecEnv.env_method("get_training_state").
+        
+        Returns:
+            Dict voor set_training_state()
+        """
+        state = {
+            "np_random": self.np_random.bit_generator.state,
+            "terrain": self.terrain_config,
+            "randomization": self.randomization_config,
+        }
+        state.update(self._training_state_extra())
+        return state
+    
+    def set_training_state(self, state: Dict[str, Any]):
+        """
+        Herstel de state van get_training_state(); geldt vanaf de volgende reset()
+        
+        Args:
+            state: Dict van get_training_state()
+        """
+        bit_generator = getattr(np.random, state["np_random"]["bit_generator"])()
+        bit_generator.state = state["np_random"]
+        self.np_random = np.random.Generator(bit_generator)
+        self.set_terrain(state.get("terrain"))
+        self.set_randomization(state.get("randomization"))
+        self._restore_training_state_extra(state)
+    
+    def step(self, action: np.ndarray) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
+        """Voer actie uit"""
+        if self.sim is None:
+            raise RuntimeError("Environment niet geïnitialiseerd. Roep reset() aan eerst.")
+        
+        with self.profiler.phase("step"):
+            obs, reward, done, truncated, info = self._step(action)
+        
+        self.profiler.end_step()
+        if self.profiler.enabled:
+            info["profile"] = self.profiler.last_step
+        
+        return obs, reward, done, truncated, info
+    
+    def _step(self, action: np.ndarray) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
+        """Voer actie uit (zonder profiling administratie)"""
+        self._apply_action(action)
+        
+        # Alleen physics in de substeps; reward en done één keer per policy stap
+        for _ in range(self.decimation):
+            self._pre_physics_step()
+            self.sim.step()
+        
+        return self._finish_step()
+    
+    def _apply_action(self, action: np.ndarray):
+        """
+        Stel joint targets in (gelden voor alle substeps)
+        
+        Met gerandomizede latency gaan de targets pas na latency_steps
+        physics stappen naar de motoren (zie _pre_physics_step()).
+        
+        Args:
+            action: 12 genormaliseerde actions
+        """
+        with self.profiler.phase("action"):
+            targets = self.scale_action(action)
+            if self.randomizer is not None and self.randomizer.latency_steps > 0:
+                due = self._physics_steps + self.randomizer.latency_steps
+                self._delayed_targets.append((due, targets.copy()))
+            else:
+                self.sim.set_joint_targets_array(targets, robot_index=self.robot_index)
+    
+    def _pre_physics_step(self):
+        """Stuur vertraagde joint targets die aan de beurt zijn, vlak voor een physics stap"""
+        pending = self._delayed_targets
+        if pending and pending[0][0] <= self._physics_steps:
+            targets = None
+            while pending and pending[0][0] <= self._physics_steps:
+                targets = pending.popleft()[1]
+            self.sim.set_joint_targets_array(targets, robot_index=self.robot_index)
+        self._physics_steps += 1
+    
+    def _finish_step(self) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
+        """
+        Sluit een policy stap af na de substeps: taak update, reward, done en observatie
+        
+        Returns:
+            (obs, reward, done, truncated, info)
+        """
+        profiler = self.profiler
+        self._post_physics_step()
+        with profiler.phase("reward"):
+            reward = self._calculate_reward()
+        
+        # Update tracking
+        self.step_count += 1
+        self.episode_reward += reward
+        
+        # Check done (max_episode_steps telt policy stappen)
+        with profiler.phase("done"):
+            done = self._is_done()
+        truncated = False  # Gymnasium gebruikt truncated voor time limits
+        
+        with profiler.phase("obs"):
+            obs = self._get_obs()
+        info = self._get_info()
+        
+        return obs, reward, done, truncated, info
+    
+    def profile_report(self) -> Dict[str, Any]:
+        """
+        Haal profiling resultaten op (vereist profiling=True)
+        
+        Returns:
+            Dict met steps, phases ({naam: {total_s, mean_us}}) en
+            api_calls_per_step
+        """
+        return self.profiler.report()
+    
+    def render(self):
+        """Render environment"""
+        if self.render_mode == "human":
+            # PyBullet GUI wordt automatisch getoond als gui=True
+            pass
+        elif self.render_mode == "rgb_array":
+            # Offscreen TinyRenderer; camera volgt de robot
+            if self._renderer is None:
+                self._renderer = OffscreenRenderer(
+                    self.sim.client,
+                    width=self.render_width,
+                    height=self.render_height,
+                    frame_skip=self.render_frame_skip
+                )
+            r = self.robot_index
+            position = self.sim.robot_origins[r] + self.sim.get_state_frame().base_position[r]
+            return self._renderer.render(target=(position[0], position[1], 0.3))
+    
+    def close(self):
+        """Sluit environment"""
+        if self.sim is not None:
+            if self._shared_sim:
+                self._remove_terrain()
+                if self.randomizer is not None:
+                    self.randomizer.restore()
+            else:
+                self.sim.close()
+            self.sim = None
+            self.terrain = None
+            self.sensors = None
+            self._foot_links = None
+            self.randomizer = None
+            self._initial_state_id = None
+            self._renderer = None
@@ -4,16 +4,12 @@ Reinforcement Learning Environment voor Unitree Go2
 Gymnasium-compatible environment voor RL training van de Go2 robot.
 """
 
-import numpy as np
-import gymnasium as gym
-from gymnasium import spaces
-from typing import Dict, Tuple, Optional, Any
-import pybullet as p
+from typing import Any, Dict, Optional, Tuple
 
-from .go2_simulator import Go2Simulator
+from .go2_base_env import Go2BaseEnv
 
 
-class Go2RLEnv(gym.Env):
+class Go2RLEnv(Go2BaseEnv):
     """
     Reinforcement Learning Environment voor Go2 robot
     
@@ -29,16 +25,50 @@ class Go2RLEnv(gym.Env):
     Action Space:
     - Joint target positions (12 joints)
     Range: [-1, 1] wordt geschaald naar joint limits
+    
+    Reward: gewogen reward termen per reward_type (REWARD_PRESETS)
     """
     
-    metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 60}
+    # Reward gewichten per reward_type
+    REWARD_PRESETS: Dict[str, Dict[str, float]] = {
+        "walking": {
+            "forward_velocity": 10.0,
+            "lateral_velocity": -5.0,
+            "angular_velocity": -2.0,
+            "height_error": -10.0,
+            "joint_velocity_stability": 1.0,
+            "joint_limit_violation": -5.0,
+            "survival": 0.1,
+        },
+        "standing": {
+            "height_tracking": 10.0,
+            "linear_velocity": -5.0,
+            "angular_velocity": -2.0,
+            "survival": 0.1,
+        },
+        "custom": {
+            "survival": 0.1,
+        },
+    }
     
     def __init__(
         self,
         render_mode: Optional[str] = None,
         gui: bool = True,
         max_episode_steps: int = 1000,
-        reward_type: str = "walking"
+        reward_type: str = "walking",
+        fast_reset: bool = True,
+        sim_profile: Optional[str] = None,
+        control_dt: Optional[float] = None,
+        decimation: int = 1,
+        render_width: int = 320,
+        render_height: int = 240,
+        render_frame_skip: int = 1,
+        profiling: bool = False,
+        reward_weights: Optional[Dict[str, float]] = None,
+        terrain: Optional[Dict[str, Any]] = None,
+        sensors: Optional[Dict[str, Optional[Dict[str, Any]]]] = None,
+        randomization: Optional[Dict[str, Optional[Tuple[float, float]]]] = None
     ):
         """
         Initialiseer RL environment
@@ -47,249 +77,57 @@ class Go2RLEnv(gym.Env):
             render_mode: Rendering mode ("human" of "rgb_array")
             gui: Toon PyBullet GUI
             max_episode_steps: Maximum aantal stappen per episode
-            reward_type: Type reward functie ("walking", "standing", "custom")
+            reward_type: Type reward functie ("walking", "standing", "custom");
+                "custom" begint met alleen de survival bonus
+            fast_reset: Hergebruik simulator tussen episodes en herstel een
+                opgeslagen begin-state (False = nieuwe simulator per reset)
+            sim_profile: Simulator profiel ("full" of "train");
+                None = "train" zonder GUI, anders "full"
+            control_dt: Tijd per policy stap in seconden (bijv. 0.05 voor 20 Hz
+                zoals Go2RLController); overschrijft decimation
+            decimation: Aantal physics substeps (1/240 s) per policy stap.
+                Reward en done worden één keer per policy stap berekend
+                (rate termen geschaald met control_dt); max_episode_steps
+                telt policy stappen
+            render_width: Beeldbreedte voor render_mode="rgb_array"
+            render_height: Beeldhoogte voor render_mode="rgb_array"
+            render_frame_skip: Render alleen elke N-de render() aanroep
+                (tussenliggende aanroepen geven het vorige beeld terug)
+            profiling: Meet fase timings en PyBullet API calls per stap
+                (in info["profile"] en profile_report())
+            reward_weights: Reward gewichten bovenop het reward_type preset
+                (term naam -> gewicht, 0 = term uit), zie rewards.py
+            terrain: Procedureel terrain in plaats van de vlakke vloer
+                (None = vlak), zie Go2BaseEnv.set_terrain()
+            sensors: Ray-cast sensoren en voet contacten als extra observatie
+                velden (None = geen), zie sensors.py
+            randomization: Domain randomization per episode (None = nominale
+                dynamica), zie Go2BaseEnv.set_randomization()
         """
-        super().__init__()
-        
-        self.render_mode = render_mode
-        self.gui = gui or (render_mode == "human")
-        self.max_episode_steps = max_episode_steps
+        if reward_type not in self.REWARD_PRESETS:
+            raise ValueError(
+                f"Onbekend reward type: {reward_type} (kies uit {', '.join(self.REWARD_PRESETS)})"
+            )
         self.reward_type = reward_type
         
-        # Simulator
-        self.sim = None
-        
-        # Episode tracking
-        self.step_count = 0
-        self.episode_reward = 0.0
-        
-        # Define observation space
-        # 12 joint positions + 12 joint velocities + 3 base pos + 4 base ori + 3 base lin vel + 3 base ang vel
-        obs_dim = 12 + 12 + 3 + 4 + 3 + 3
-        self.observation_space = spaces.Box(
-            low=-np.inf,
-            high=np.inf,
-            shape=(obs_dim,),
-            dtype=np.float32
-        )
-        
-        # Define action space (12 joints, normalized to [-1, 1])
-        self.action_space = spaces.Box(
-            low=-1.0,
-            high=1.0,
-            shape=(12,),
-            dtype=np.float32
+        super().__init__(
+            render_mode=render_mode,
+            gui=gui,
+            max_episode_steps=max_episode_steps,
+            fast_reset=fast_reset,
+            sim_profile=sim_profile,
+            control_dt=control_dt,
+            decimation=decimation,
+            render_width=render_width,
+            render_height=render_height,
+            render_frame_skip=render_frame_skip,
+            profiling=profiling,
+            reward_weights=reward_weights,
+            terrain=terrain,
+            sensors=sensors,
+            randomization=randomization
         )
-        
-        # Joint limits voor scaling van actions
-        # Hip: ±0.5 rad, Thigh: 0.0-1.0 rad, Calf: -1.5-0.0 rad
-        self.joint_limits = np.array([
-            [-0.5, 0.5],   # Hip joints (4x)
-            [-0.5, 0.5],
-            [-0.5, 0.5],
-            [-0.5, 0.5],
-            [0.0, 1.0],    # Thigh joints (4x)
-            [0.0, 1.0],
-            [0.0, 1.0],
-            [0.0, 1.0],
-            [-1.5, 0.0],   # Calf joints (4x)
-            [-1.5, 0.0],
-            [-1.5, 0.0],
-            [-1.5, 0.0],
-        ])
-        
-    def _get_obs(self) -> np.ndarray:
-        """Haal observation op"""
-        if self.sim is None:
-            return np.zeros(self.observation_space.shape, dtype=np.float32)
-        
-        # Joint states
-        joint_states = self.sim.get_joint_states()
-        joint_positions = []
-        joint_velocities = []
-        
-        for joint_name in self.sim.joint_names:
-            state = joint_states[joint_name]
-            joint_positions.append(state['position'])
-            joint_velocities.append(state['velocity'])
-        
-        joint_positions = np.array(joint_positions, dtype=np.float32)
-        joint_velocities = np.array(joint_velocities, dtype=np.float32)
-        
-        # Base pose
-        base_pos, base_ori = self.sim.get_base_pose()
-        base_lin_vel, base_ang_vel = self.sim.get_base_velocity()
-        
-        # Combineer alle observaties
-        obs = np.concatenate([
-            joint_positions,
-            joint_velocities,
-            np.array(base_pos, dtype=np.float32),
-            np.array(base_ori, dtype=np.float32),
-            np.array(base_lin_vel, dtype=np.float32),
-            np.array(base_ang_vel, dtype=np.float32),
-        ])
-        
-        return obs
-    
-    def _get_info(self) -> Dict[str, Any]:
-        """Haal extra info op"""
-        return {
-            "step_count": self.step_count,
-            "episode_reward": self.episode_reward,
-        }
-    
-    def _calculate_reward(self) -> float:
-        """Bereken reward"""
-        if self.sim is None:
-            return 0.0
-        
-        base_pos, base_ori = self.sim.get_base_pose()
-        base_lin_vel, base_ang_vel = self.sim.get_base_velocity()
-        joint_states = self.sim.get_joint_states()
-        
-        reward = 0.0
-        
-        if self.reward_type == "walking":
-            # Reward voor voorwaartse beweging
-            forward_velocity = base_lin_vel[0]  # x-richting
-            reward += 10.0 * forward_velocity
-            
-            # Penalty voor zijwaartse beweging (stabiliteit)
-            lateral_velocity = abs(base_lin_vel[1])
-            reward -= 5.0 * lateral_velocity
-            
-            # Penalty voor rotatie (stabiliteit)
-            angular_velocity_magnitude = np.linalg.norm(base_ang_vel)
-            reward -= 2.0 * angular_velocity_magnitude
-            
-            # Penalty voor te veel hoogte variatie
-            height_error = abs(base_pos[2] - 0.5)  # Target hoogte ~0.5m
-            reward -= 10.0 * height_error
-            
-            # Reward voor stabiliteit (lage joint velocities)
-            joint_velocities = [joint_states[name]['velocity'] for name in self.sim.joint_names]
-            avg_joint_velocity = np.mean(np.abs(joint_velocities))
-            reward += 1.0 * (1.0 - min(avg_joint_velocity, 1.0))
-            
-            # Penalty voor extreme joint posities
-            joint_positions = [joint_states[name]['position'] for name in self.sim.joint_names]
-            for i, pos in enumerate(joint_positions):
-                if pos < self.joint_limits[i][0] or pos > self.joint_limits[i][1]:
-                    reward -= 5.0
-        
-        elif self.reward_type == "standing":
-            # Reward voor stabiel staan
-            height_error = abs(base_pos[2] - 0.5)
-            reward += 10.0 * (1.0 - min(height_error * 2, 1.0))
-            
-            # Penalty voor beweging
-            velocity_magnitude = np.linalg.norm(base_lin_vel)
-            reward -= 5.0 * velocity_magnitude
-            
-            # Penalty voor rotatie
-            angular_velocity_magnitude = np.linalg.norm(base_ang_vel)
-            reward -= 2.0 * angular_velocity_magnitude
-        
-        # Survival bonus
-        reward += 0.1
-        
-        return reward
-    
-    def _is_done(self) -> bool:
-        """Check of episode klaar is"""
-        if self.sim is None:
-            return True
-        
-        # Episode eindigt na max steps
-        if self.step_count >= self.max_episode_steps:
-            return True
-        
-        # Episode eindigt als robot valt
-        base_pos, _ = self.sim.get_base_pose()
-        if base_pos[2] < 0.2:  # Te laag = gevallen
-            return True
-        
-        return False
-    
-    def reset(
-        self,
-        seed: Optional[int] = None,
-        options: Optional[Dict] = None
-    ) -> Tuple[np.ndarray, Dict[str, Any]]:
-        """Reset environment"""
-        super().reset(seed=seed)
-        
-        # Sluit oude simulator
-        if self.sim is not None:
-            self.sim.close()
-        
-        # Start nieuwe simulator
-        self.sim = Go2Simulator(gui=self.gui)
-        
-        # Reset tracking
-        self.step_count = 0
-        self.episode_reward = 0.0
-        
-        # Reset robot naar start positie
-        self.sim.reset()
-        
-        # Wacht even voor stabilisatie
-        for _ in range(10):
-            self.sim.step()
-        
-        obs = self._get_obs()
-        info = self._get_info()
-        
-        return obs, info
     
-    def step(self, action: np.ndarray) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
-        """Voer actie uit"""
-        if self.sim is None:
-            raise RuntimeError("Environment niet geïnitialiseerd. Roep reset() aan eerst.")
-        
-        # Scale actions van [-1, 1] naar joint limits
-        scaled_actions = np.zeros_like(action)
-        for i in range(len(action)):
-            low, high = self.joint_limits[i]
-            scaled_actions[i] = low + (action[i] + 1.0) / 2.0 * (high - low)
-        
-        # Stel joint targets in
-        targets = {}
-        for i, joint_name in enumerate(self.sim.joint_names):
-            targets[joint_name] = scaled_actions[i]
-        
-        self.sim.set_joint_targets(targets)
-        
-        # Simuleer stap
-        self.sim.step()
-        
-        # Update tracking
-        self.step_count += 1
-        reward = self._calculate_reward()
-        self.episode_reward += reward
-        
-        # Check done
-        done = self._is_done()
-        truncated = False  # Gymnasium gebruikt truncated voor time limits
-        
-        obs = self._get_obs()
-        info = self._get_info()
-        
-        return obs, reward, done, truncated, info
-    
-    def render(self):
-        """Render environment"""
-        if self.render_mode == "human":
-            # PyBullet GUI wordt automatisch getoond als gui=True
-            pass
-        elif self.render_mode == "rgb_array":
-            # TODO: Implementeer RGB array rendering
-            raise NotImplementedError("RGB array rendering nog niet geïmplementeerd")
-    
-    def close(self):
-        """Sluit environment"""
-        if self.sim is not None:
-            self.sim.close()
-            self.sim = None
-
+    def _default_reward_weights(self) -> Dict[str, float]:
+        """Reward gewichten van het gekozen reward_type"""
+        return self.REWARD_PRESETS[self.reward_type]
@@ -4,10 +4,14 @@ PyBullet Simulator voor Unitree Go2 EDU
 Simuleert de Go2 robot in PyBullet voor testing en ontwikkeling.
 """
 
+import io
 import os
+import json
+import itertools
 import numpy as np
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, Callable
 
 try:
     import pybullet as p
@@ -17,16 +21,129 @@ except ImportError:
         "PyBullet niet geïnstalleerd. Installeer met: pip install pybullet"
     )
 
+from .urdf_cache import URDF_PROFILES, resolve_urdf, load_joint_table, save_joint_table
+from .profiling import StepProfiler
+
+# Uniek ID per simulator in dit proces (client IDs worden hergebruikt na disconnect)
+_instance_ids = itertools.count()
+
+# PyBullet gains voor POSITION_CONTROL als er geen gains meegegeven worden
+DEFAULT_POSITION_GAIN = 0.1
+DEFAULT_VELOCITY_GAIN = 1.0
+
+
+@dataclass
+class SimSnapshot:
+    """
+    Momentopname van de simulatie state
+    
+    state_id verwijst naar een in-memory PyBullet state van de simulator die
+    de snapshot maakte (snelste restore, inclusief contactinformatie). De
+    arrays bevatten de robot state zodat een snapshot ook na serialisatie
+    (to_bytes/from_bytes) in een ander proces hersteld kan worden.
+    """
+    base_positions: np.ndarray  # (N, 3) wereld coördinaten
+    base_orientations: np.ndarray  # (N, 4) quaternions [x, y, z, w]
+    base_linear_velocities: np.ndarray  # (N, 3)
+    base_angular_velocities: np.ndarray  # (N, 3)
+    joint_positions: np.ndarray  # (N, num_joints)
+    joint_velocities: np.ndarray  # (N, num_joints)
+    extra: Dict[str, Any] = field(default_factory=dict)  # Environment state (JSON)
+    state_id: Optional[int] = None  # Alleen geldig in de eigen simulator
+    owner: Optional[int] = None  # instance_id van de simulator met state_id
+    
+    _ARRAYS = (
+        "base_positions", "base_orientations", "base_linear_velocities",
+        "base_angular_velocities", "joint_positions", "joint_velocities",
+    )
+    
+    def to_bytes(self) -> bytes:
+        """
+        Serialiseer snapshot (zonder in-memory state_id)
+        
+        Returns:
+            Bytes voor from_bytes()
+        """
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            extra=np.array(json.dumps(self.extra)),
+            **{name: getattr(self, name) for name in self._ARRAYS}
+        )
+        return buffer.getvalue()
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SimSnapshot":
+        """
+        Laad snapshot uit bytes
+        
+        Args:
+            data: Bytes van to_bytes()
+        
+        Returns:
+            SimSnapshot zonder state_id (restore via de robot arrays)
+        """
+        with np.load(io.BytesIO(data)) as arrays:
+            return cls(
+                extra=json.loads(str(arrays["extra"])),
+                **{name: arrays[name] for name in cls._ARRAYS}
+            )
+
+
+class StateFrame:
+    """
+    Robot state van alle robots na één physics stap
+    
+    Voorgealloceerde float32 arrays met een robot dimensie voorop. Base
+    posities zijn relatief t.o.v. de oorsprong van elke robot. Het frame
+    wordt door Go2Simulator.get_state_frame() één keer per physics stap
+    gevuld en is geldig tot de volgende state wijziging.
+    """
+    
+    def __init__(self, num_robots: int, num_joints: int):
+        """
+        Args:
+            num_robots: Aantal robots
+            num_joints: Aantal actuated joints per robot
+        """
+        self.base_position = np.zeros((num_robots, 3), dtype=np.float32)
+        self.base_orientation = np.zeros((num_robots, 4), dtype=np.float32)
+        self.base_linear_velocity = np.zeros((num_robots, 3), dtype=np.float32)
+        self.base_angular_velocity = np.zeros((num_robots, 3), dtype=np.float32)
+        self.joint_positions = np.zeros((num_robots, num_joints), dtype=np.float32)
+        self.joint_velocities = np.zeros((num_robots, num_joints), dtype=np.float32)
+        self.joint_efforts = np.zeros((num_robots, num_joints), dtype=np.float32)
+        self.version = -1  # State versie waarmee het frame gevuld is
+
 
 class Go2Simulator:
-    """PyBullet simulator voor Unitree Go2 robot"""
+    """
+    PyBullet simulator voor Unitree Go2 robot
+    
+    Elke instantie heeft een eigen physics client; alle PyBullet calls
+    gebruiken physicsClientId zodat meerdere simulators naast elkaar
+    in één proces kunnen draaien.
+    
+    Met num_robots > 1 worden meerdere robots in een raster op dezelfde
+    vloer geladen. Eén step() call simuleert dan alle robots tegelijk; de
+    *_batch methoden lezen en sturen alle robots als (N, 12) arrays aan.
+    robot_id verwijst altijd naar de eerste robot.
+    
+    get_state_frame() leest de state van alle robots één keer per physics
+    stap; step(), reset() en restore calls maken het frame ongeldig. Wie de
+    state direct via PyBullet wijzigt, roept daarna invalidate_state() aan.
+    """
     
     def __init__(
         self,
         urdf_path: Optional[str] = None,
         gui: bool = True,
         gravity: float = -9.81,
-        timestep: float = 1.0 / 240.0
+        timestep: float = 1.0 / 240.0,
+        profile: str = "full",
+        num_robots: int = 1,
+        spacing: float = 2.0,
+        profiler: Optional[StepProfiler] = None
     ):
         """
         Initialiseer PyBullet simulator
@@ -36,6 +153,14 @@ class Go2Simulator:
             gui: Toon GUI (True) of headless (False)
             gravity: Zwaartekracht waarde
             timestep: Simulatie tijdstap in seconden
+            profile: Robot model profiel:
+                - "full": volledig model met visuele meshes (default)
+                - "train": licht model voor headless training, zonder visuele
+                  meshes en met primitieve collision geometrie
+            num_robots: Aantal robots in dezelfde physics wereld
+            spacing: Afstand tussen robots in meters (raster op de vloer)
+            profiler: StepProfiler voor fase timings en API call tellingen
+                (None = eigen, uitgeschakelde profiler)
         """
         # Bepaal URDF pad
         if urdf_path is None:
@@ -46,32 +171,50 @@ class Go2Simulator:
         if not self.urdf_path.exists():
             raise FileNotFoundError(f"URDF bestand niet gevonden: {self.urdf_path}")
         
+        if profile not in URDF_PROFILES:
+            raise ValueError(f"Onbekend simulator profiel: {profile} (kies uit {', '.join(URDF_PROFILES)})")
+        self.profile = profile
+        self.instance_id = next(_instance_ids)
+        self.profiler = profiler if profiler is not None else StepProfiler()
+        
+        if num_robots < 1:
+            raise ValueError(f"num_robots moet >= 1 zijn, niet {num_robots}")
+        self.num_robots = num_robots
+        
+        # Robots in een vierkant raster; robot 0 staat in de oorsprong
+        columns = int(np.ceil(np.sqrt(num_robots)))
+        self.robot_origins = np.array(
+            [[(i % columns) * spacing, (i // columns) * spacing, 0.0] for i in range(num_robots)]
+        )
+        
         # Start PyBullet
         if gui:
             self.client = p.connect(p.GUI)
             
             # Apple Silicon M3 Max optimalisaties voor rendering
-            p.configureDebugVisualizer(p.COV_ENABLE_GUI, 0)  # Disable GUI controls
-            p.configureDebugVisualizer(p.COV_ENABLE_SHADOWS, 0)  # Disable shadows (snelste)
-            p.configureDebugVisualizer(p.COV_ENABLE_TINY_RENDERER, 0)  # Use main renderer
-            p.configureDebugVisualizer(p.COV_ENABLE_RGB_BUFFER_PREVIEW, 0)
-            p.configureDebugVisualizer(p.COV_ENABLE_DEPTH_BUFFER_PREVIEW, 0)
-            p.configureDebugVisualizer(p.COV_ENABLE_SEGMENTATION_MARK_PREVIEW, 0)
+            p.configureDebugVisualizer(p.COV_ENABLE_GUI, 0, physicsClientId=self.client)  # Disable GUI controls
+            p.configureDebugVisualizer(p.COV_ENABLE_SHADOWS, 0, physicsClientId=self.client)  # Disable shadows (snelste)
+            p.configureDebugVisualizer(p.COV_ENABLE_TINY_RENDERER, 0, physicsClientId=self.client)  # Use main renderer
+            p.configureDebugVisualizer(p.COV_ENABLE_RGB_BUFFER_PREVIEW, 0, physicsClientId=self.client)
+            p.configureDebugVisualizer(p.COV_ENABLE_DEPTH_BUFFER_PREVIEW, 0, physicsClientId=self.client)
+            p.configureDebugVisualizer(p.COV_ENABLE_SEGMENTATION_MARK_PREVIEW, 0, physicsClientId=self.client)
             
             # Set camera voor betere view
             p.resetDebugVisualizerCamera(
                 cameraDistance=2.0,
                 cameraYaw=45,
                 cameraPitch=-20,
-                cameraTargetPosition=[0, 0, 0.5]
+                cameraTargetPosition=[0, 0, 0.5],
+                physicsClientId=self.client
             )
         else:
             self.client = p.connect(p.DIRECT)
         
         # Configureer simulator
-        p.setGravity(0, 0, gravity)
-        p.setTimeStep(timestep)
-        p.setAdditionalSearchPath(pybullet_data.getDataPath())
+        self.gravity = gravity
+        p.setGravity(0, 0, gravity, physicsClientId=self.client)
+        p.setTimeStep(timestep, physicsClientId=self.client)
+        p.setAdditionalSearchPath(pybullet_data.getDataPath(), physicsClientId=self.client)
         
         # Optimaliseer physics engine voor Apple Silicon
         p.setPhysicsEngineParameter(
@@ -80,80 +223,123 @@ class Go2Simulator:
             splitImpulsePenetrationThreshold=-0.02,
             enableConeFriction=0,  # Disable voor betere performance
             deterministicOverlappingPairs=0,  # Sneller
-            numSubSteps=0  # Geen substeps voor betere performance
+            numSubSteps=0,  # Geen substeps voor betere performance
+            physicsClientId=self.client
         )
         
         # Laad vloer
-        self.plane_id = p.loadURDF("plane.urdf")
+        self.plane_id = p.loadURDF("plane.urdf", physicsClientId=self.client)
         
-        # Laad robot
+        # Laad robots
         start_pos = [0, 0, 0.5]  # Start positie (zodat robot op vloer staat)
         start_orientation = p.getQuaternionFromEuler([0, 0, 0])
         
-        # Fix mesh paths in URDF voor PyBullet
-        urdf_dir = self.urdf_path.parent.parent
-        
-        # Repareer URDF paths: vervang package://go2_description/ met absolute paths
-        import re
-        urdf_content = self.urdf_path.read_text(encoding='utf-8')
-        
-        # Vervang package://go2_description/dae/ met absolute pad naar dae/
-        urdf_content = re.sub(
-            r'package://go2_description/dae/([^"]+)',
-            lambda m: str((urdf_dir / "dae" / m.group(1)).absolute()),
-            urdf_content
-        )
+        # Opgeloste URDF (absolute mesh paden) uit de cache: geen regex werk
+        # en geen tijdelijke bestanden bij elke simulator
+        resolved_urdf, self.urdf_cache_key = resolve_urdf(self.urdf_path, profile=profile)
         
-        # Vervang package://go2_description/meshes/ met absolute pad naar meshes/
-        urdf_content = re.sub(
-            r'package://go2_description/meshes/([^"]+)',
-            lambda m: str((urdf_dir / "meshes" / m.group(1)).absolute()),
-            urdf_content
-        )
+        # Trainingsprofiel heeft geen visuele meshes, dus ook geen materialen
+        flags = p.URDF_USE_INERTIA_FROM_FILE
+        if profile == "full":
+            flags |= p.URDF_USE_MATERIAL_COLORS_FROM_MTL
         
-        # Schrijf tijdelijke URDF met gefixte paths
-        import tempfile
-        temp_urdf = tempfile.NamedTemporaryFile(mode='w', suffix='.urdf', delete=False, encoding='utf-8')
-        temp_urdf.write(urdf_content)
-        temp_urdf.close()
-        
-        try:
-            # Laad URDF met gefixte paths
-            self.robot_id = p.loadURDF(
-                temp_urdf.name,
-                start_pos,
+        self.robot_ids = [
+            p.loadURDF(
+                str(resolved_urdf),
+                origin + start_pos,
                 start_orientation,
-                flags=p.URDF_USE_INERTIA_FROM_FILE | p.URDF_USE_MATERIAL_COLORS_FROM_MTL
+                flags=flags,
+                physicsClientId=self.client
             )
-        finally:
-            # Verwijder tijdelijke URDF
-            import os
-            if os.path.exists(temp_urdf.name):
-                os.unlink(temp_urdf.name)
+            for origin in self.robot_origins
+        ]
+        self.robot_id = self.robot_ids[0]
+        
+        # Haal joint informatie op (uit cache als de URDF al eerder geladen is)
+        num_joints = p.getNumJoints(self.robot_id, physicsClientId=self.client)
+        joint_table = load_joint_table(resolved_urdf)
+        if joint_table is None or joint_table["num_joints"] != num_joints:
+            joint_table = self._read_joint_table(num_joints)
+            save_joint_table(resolved_urdf, joint_table)
+        
+        self.joint_indices = list(joint_table["joint_indices"])
+        self.joint_names = list(joint_table["joint_names"])
+        self.joint_lower_limits = list(joint_table["lower_limits"])
+        self.joint_upper_limits = list(joint_table["upper_limits"])
+        
+        # Standaard joint posities (staande positie)
+        self.default_joint_positions = list(joint_table["default_positions"])
+        
+        # Voorgealloceerde buffers voor array-gebaseerde joint I/O
+        num_actuated = len(self.joint_indices)
+        self._joint_name_to_index = {name: i for i, name in enumerate(self.joint_names)}
+        self._joint_positions = np.zeros(num_actuated)
+        self._joint_velocities = np.zeros(num_actuated)
+        self._joint_efforts = np.zeros(num_actuated)
+        self.default_joint_forces = np.full(num_actuated, 100.0)
+        
+        # Motor parameters per robot (domain randomization past deze aan);
+        # gains zijn de PyBullet defaults voor POSITION_CONTROL
+        self.joint_forces = np.tile(self.default_joint_forces, (num_robots, 1))
+        self.position_gains = np.full((num_robots, num_actuated), DEFAULT_POSITION_GAIN)
+        self.velocity_gains = np.full((num_robots, num_actuated), DEFAULT_VELOCITY_GAIN)
+        self._batch_positions = np.zeros((num_robots, num_actuated))
+        self._batch_velocities = np.zeros((num_robots, num_actuated))
+        self._batch_efforts = np.zeros((num_robots, num_actuated))
+        self._base_positions = np.zeros((num_robots, 3))
+        self._base_orientations = np.zeros((num_robots, 4))
+        self._base_linear_velocities = np.zeros((num_robots, 3))
+        self._base_angular_velocities = np.zeros((num_robots, 3))
+        
+        # Per-stap state cache
+        self._state_version = 0
+        self.state_frame = StateFrame(num_robots, num_actuated)
+        
+        # Collision shapes van taak objecten, gedeeld door alle environments
+        # in deze simulator (sleutel -> shape id), zie acquire_shape()
+        self.shape_cache: Dict[Any, int] = {}
+        self._shape_users: Dict[Any, int] = {}
+        
+        # Reset naar standaard positie
+        self.reset()
+        
+        if num_robots > 1:
+            print(f"✓ {num_robots} robots geladen: {len(self.joint_indices)} actuated joints per robot")
+        else:
+            print(f"✓ Robot geladen: {len(self.joint_indices)} actuated joints")
+        print(f"  Joints: {', '.join(self.joint_names[:6])}...")
+    
+    def _read_joint_table(self, num_joints: int) -> Dict[str, Any]:
+        """
+        Lees joint informatie uit PyBullet (alleen als niet gecached)
+        
+        Args:
+            num_joints: Aantal joints van de robot
         
-        # Haal joint informatie op
+        Returns:
+            Joint tabel voor save_joint_table()
+        """
         self.joint_indices = []
         self.joint_names = []
         self.joint_lower_limits = []
         self.joint_upper_limits = []
         
-        num_joints = p.getNumJoints(self.robot_id)
         for i in range(num_joints):
-            joint_info = p.getJointInfo(self.robot_id, i)
+            joint_info = p.getJointInfo(self.robot_id, i, physicsClientId=self.client)
             if joint_info[2] == p.JOINT_REVOLUTE or joint_info[2] == p.JOINT_PRISMATIC:
                 self.joint_indices.append(i)
                 self.joint_names.append(joint_info[1].decode('utf-8'))
                 self.joint_lower_limits.append(joint_info[8])
                 self.joint_upper_limits.append(joint_info[9])
         
-        # Standaard joint posities (staande positie)
-        self.default_joint_positions = self._get_default_joint_positions()
-        
-        # Reset naar standaard positie
-        self.reset()
-        
-        print(f"✓ Robot geladen: {len(self.joint_indices)} actuated joints")
-        print(f"  Joints: {', '.join(self.joint_names[:6])}...")
+        return {
+            "num_joints": num_joints,
+            "joint_indices": self.joint_indices,
+            "joint_names": self.joint_names,
+            "lower_limits": self.joint_lower_limits,
+            "upper_limits": self.joint_upper_limits,
+            "default_positions": self._get_default_joint_positions(),
+        }
     
     def _get_default_joint_positions(self) -> List[float]:
         """Retourneer standaard joint posities voor staande houding"""
@@ -180,34 +366,49 @@ class Go2Simulator:
         
         return default_positions
     
-    def reset(self, position: Optional[List[float]] = None, orientation: Optional[List[float]] = None):
+    def reset(
+        self,
+        position: Optional[List[float]] = None,
+        orientation: Optional[List[float]] = None,
+        robot_indices: Optional[List[int]] = None
+    ):
         """
-        Reset robot naar beginpositie
+        Reset robot(s) naar beginpositie
         
         Args:
-            position: [x, y, z] positie (None = default)
+            position: [x, y, z] positie t.o.v. de oorsprong van elke robot (None = default)
             orientation: [x, y, z, w] quaternion (None = default)
+            robot_indices: Te resetten robots (None = alle robots)
         """
         if position is None:
             position = [0, 0, 0.5]
         if orientation is None:
             orientation = p.getQuaternionFromEuler([0, 0, 0])
+        if robot_indices is None:
+            robot_indices = range(self.num_robots)
         
-        # Reset base positie
-        p.resetBasePositionAndOrientation(self.robot_id, position, orientation)
-        
-        # Reset joint posities
-        for i, joint_idx in enumerate(self.joint_indices):
-            p.resetJointState(
-                self.robot_id,
-                joint_idx,
-                self.default_joint_positions[i] if i < len(self.default_joint_positions) else 0.0
+        self._state_version += 1
+        for r in robot_indices:
+            robot_id = self.robot_ids[r]
+            
+            # Reset base positie
+            p.resetBasePositionAndOrientation(
+                robot_id, self.robot_origins[r] + position, orientation, physicsClientId=self.client
             )
-        
-        # Reset velocities
-        p.resetBaseVelocity(self.robot_id, [0, 0, 0], [0, 0, 0])
-        for joint_idx in self.joint_indices:
-            p.resetJointState(self.robot_id, joint_idx, targetValue=0, targetVelocity=0)
+            
+            # Reset joint posities
+            for i, joint_idx in enumerate(self.joint_indices):
+                p.resetJointState(
+                    robot_id,
+                    joint_idx,
+                    self.default_joint_positions[i] if i < len(self.default_joint_positions) else 0.0,
+                    physicsClientId=self.client
+                )
+            
+            # Reset velocities
+            p.resetBaseVelocity(robot_id, [0, 0, 0], [0, 0, 0], physicsClientId=self.client)
+            for joint_idx in self.joint_indices:
+                p.resetJointState(robot_id, joint_idx, targetValue=0, targetVelocity=0, physicsClientId=self.client)
     
     def set_joint_positions(self, positions: Dict[str, float]):
         """
@@ -216,11 +417,12 @@ class Go2Simulator:
         Args:
             positions: Dictionary met joint naam -> positie (radians)
         """
+        self._state_version += 1
         for joint_name, position in positions.items():
             if joint_name in self.joint_names:
                 idx = self.joint_names.index(joint_name)
                 joint_idx = self.joint_indices[idx]
-                p.resetJointState(self.robot_id, joint_idx, position)
+                p.resetJointState(self.robot_id, joint_idx, position, physicsClientId=self.client)
     
     def set_joint_targets(self, targets: Dict[str, float], forces: Optional[Dict[str, float]] = None):
         """
@@ -228,20 +430,184 @@ class Go2Simulator:
         
         Args:
             targets: Dictionary met joint naam -> target positie (radians)
-            forces: Dictionary met joint naam -> max kracht (None = default)
+            forces: Dictionary met joint naam -> max kracht (None = joint_forces)
         """
+        joint_indices = []
+        target_positions = []
+        max_forces = []
+        position_gains = []
+        velocity_gains = []
         for joint_name, target in targets.items():
-            if joint_name in self.joint_names:
-                idx = self.joint_names.index(joint_name)
-                joint_idx = self.joint_indices[idx]
-                max_force = forces[joint_name] if forces and joint_name in forces else 100.0
-                p.setJointMotorControl2(
-                    self.robot_id,
-                    joint_idx,
-                    p.POSITION_CONTROL,
-                    targetPosition=target,
-                    force=max_force
-                )
+            idx = self._joint_name_to_index.get(joint_name)
+            if idx is not None:
+                joint_indices.append(self.joint_indices[idx])
+                target_positions.append(target)
+                max_forces.append(forces[joint_name] if forces and joint_name in forces else self.joint_forces[0, idx])
+                position_gains.append(self.position_gains[0, idx])
+                velocity_gains.append(self.velocity_gains[0, idx])
+        
+        if joint_indices:
+            self.profiler.count("setJointMotorControlArray")
+            p.setJointMotorControlArray(
+                self.robot_id,
+                joint_indices,
+                p.POSITION_CONTROL,
+                targetPositions=target_positions,
+                forces=max_forces,
+                positionGains=position_gains,
+                velocityGains=velocity_gains,
+                physicsClientId=self.client
+            )
+    
+    def set_joint_targets_array(
+        self,
+        targets: np.ndarray,
+        forces: Optional[np.ndarray] = None,
+        robot_index: int = 0
+    ):
+        """
+        Stel joint targets in voor alle actuated joints in één call
+        
+        Args:
+            targets: Array met target posities (radians), volgorde van joint_names
+            forces: Array met max krachten (None = joint_forces van de robot)
+            robot_index: Index van de aan te sturen robot
+        """
+        self.profiler.count("setJointMotorControlArray")
+        p.setJointMotorControlArray(
+            self.robot_ids[robot_index],
+            self.joint_indices,
+            p.POSITION_CONTROL,
+            targetPositions=targets,
+            forces=self.joint_forces[robot_index] if forces is None else forces,
+            positionGains=self.position_gains[robot_index],
+            velocityGains=self.velocity_gains[robot_index],
+            physicsClientId=self.client
+        )
+    
+    def get_joint_state_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Haal joint states op als arrays in één call
+        
+        De arrays zijn voorgealloceerd en worden bij de volgende aanroep
+        overschreven; kopieer ze als ze bewaard moeten blijven.
+        
+        Returns:
+            (positions, velocities, efforts), volgorde van joint_names
+        """
+        self.profiler.count("getJointStates")
+        joint_states = p.getJointStates(self.robot_id, self.joint_indices, physicsClientId=self.client)
+        self._joint_positions[:] = [state[0] for state in joint_states]
+        self._joint_velocities[:] = [state[1] for state in joint_states]
+        self._joint_efforts[:] = [state[3] for state in joint_states]
+        return self._joint_positions, self._joint_velocities, self._joint_efforts
+    
+    def set_joint_targets_batch(self, targets: np.ndarray, forces: Optional[np.ndarray] = None):
+        """
+        Stel joint targets in voor alle robots
+        
+        Args:
+            targets: (num_robots, num_joints) array met target posities (radians)
+            forces: (num_robots, num_joints) of (num_joints,) array met max
+                krachten (None = joint_forces)
+        """
+        if forces is None:
+            forces = self.joint_forces
+        forces = np.broadcast_to(forces, targets.shape)
+        self.profiler.count("setJointMotorControlArray", self.num_robots)
+        for r, robot_id in enumerate(self.robot_ids):
+            p.setJointMotorControlArray(
+                robot_id,
+                self.joint_indices,
+                p.POSITION_CONTROL,
+                targetPositions=targets[r],
+                forces=forces[r],
+                positionGains=self.position_gains[r],
+                velocityGains=self.velocity_gains[r],
+                physicsClientId=self.client
+            )
+    
+    def get_joint_state_batch(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Haal joint states van alle robots op
+        
+        De arrays zijn voorgealloceerd en worden bij de volgende aanroep
+        overschreven; kopieer ze als ze bewaard moeten blijven.
+        
+        Returns:
+            (positions, velocities, efforts) als (num_robots, num_joints) arrays
+        """
+        self.profiler.count("getJointStates", self.num_robots)
+        for r, robot_id in enumerate(self.robot_ids):
+            joint_states = p.getJointStates(robot_id, self.joint_indices, physicsClientId=self.client)
+            self._batch_positions[r] = [state[0] for state in joint_states]
+            self._batch_velocities[r] = [state[1] for state in joint_states]
+            self._batch_efforts[r] = [state[3] for state in joint_states]
+        return self._batch_positions, self._batch_velocities, self._batch_efforts
+    
+    def get_base_state_batch(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Haal base pose en snelheid van alle robots op
+        
+        Posities zijn in wereld coördinaten; trek robot_origins af voor de
+        positie t.o.v. de eigen startplek. De arrays zijn voorgealloceerd.
+        
+        Returns:
+            (positions (N, 3), orientations (N, 4), linear velocities (N, 3),
+            angular velocities (N, 3))
+        """
+        self.profiler.count("getBasePositionAndOrientation", self.num_robots)
+        self.profiler.count("getBaseVelocity", self.num_robots)
+        for r, robot_id in enumerate(self.robot_ids):
+            self._base_positions[r], self._base_orientations[r] = p.getBasePositionAndOrientation(
+                robot_id, physicsClientId=self.client
+            )
+            self._base_linear_velocities[r], self._base_angular_velocities[r] = p.getBaseVelocity(
+                robot_id, physicsClientId=self.client
+            )
+        return (
+            self._base_positions,
+            self._base_orientations,
+            self._base_linear_velocities,
+            self._base_angular_velocities,
+        )
+    
+    def get_state_frame(self) -> StateFrame:
+        """
+        Haal de state van alle robots op, maximaal één keer per physics stap
+        
+        Zolang de simulatie niet verandert geeft elke aanroep hetzelfde,
+        al gevulde frame terug zonder PyBullet calls.
+        
+        Returns:
+            StateFrame (voorgealloceerd; wordt bij de volgende stap overschreven)
+        """
+        frame = self.state_frame
+        if frame.version == self._state_version:
+            return frame
+        
+        self.profiler.count("getJointStates", self.num_robots)
+        self.profiler.count("getBasePositionAndOrientation", self.num_robots)
+        self.profiler.count("getBaseVelocity", self.num_robots)
+        for r, robot_id in enumerate(self.robot_ids):
+            joint_states = p.getJointStates(robot_id, self.joint_indices, physicsClientId=self.client)
+            frame.joint_positions[r] = [state[0] for state in joint_states]
+            frame.joint_velocities[r] = [state[1] for state in joint_states]
+            frame.joint_efforts[r] = [state[3] for state in joint_states]
+            
+            position, frame.base_orientation[r] = p.getBasePositionAndOrientation(
+                robot_id, physicsClientId=self.client
+            )
+            frame.base_position[r] = np.subtract(position, self.robot_origins[r])
+            frame.base_linear_velocity[r], frame.base_angular_velocity[r] = p.getBaseVelocity(
+                robot_id, physicsClientId=self.client
+            )
+        frame.version = self._state_version
+        return frame
+    
+    def invalidate_state(self):
+        """Markeer het state frame als verouderd (na directe PyBullet wijzigingen)"""
+        self._state_version += 1
     
     def get_joint_states(self) -> Dict[str, Dict[str, float]]:
         """
@@ -250,16 +616,15 @@ class Go2Simulator:
         Returns:
             Dictionary met joint naam -> {position, velocity, effort}
         """
-        states = {}
-        for i, joint_name in enumerate(self.joint_names):
-            joint_idx = self.joint_indices[i]
-            joint_state = p.getJointState(self.robot_id, joint_idx)
-            states[joint_name] = {
-                'position': joint_state[0],
-                'velocity': joint_state[1],
-                'effort': joint_state[3]
+        positions, velocities, efforts = self.get_joint_state_arrays()
+        return {
+            joint_name: {
+                'position': float(positions[i]),
+                'velocity': float(velocities[i]),
+                'effort': float(efforts[i])
             }
-        return states
+            for i, joint_name in enumerate(self.joint_names)
+        }
     
     def get_base_pose(self) -> Tuple[List[float], List[float]]:
         """
@@ -268,7 +633,8 @@ class Go2Simulator:
         Returns:
             (position [x,y,z], orientation quaternion [x,y,z,w])
         """
-        pose = p.getBasePositionAndOrientation(self.robot_id)
+        self.profiler.count("getBasePositionAndOrientation")
+        pose = p.getBasePositionAndOrientation(self.robot_id, physicsClientId=self.client)
         return pose[0], pose[1]
     
     def get_base_velocity(self) -> Tuple[List[float], List[float]]:
@@ -278,7 +644,8 @@ class Go2Simulator:
         Returns:
             (linear velocity [x,y,z], angular velocity [x,y,z])
         """
-        velocity = p.getBaseVelocity(self.robot_id)
+        self.profiler.count("getBaseVelocity")
+        velocity = p.getBaseVelocity(self.robot_id, physicsClientId=self.client)
         return velocity[0], velocity[1]
     
     def step(self, steps: int = 1):
@@ -288,8 +655,11 @@ class Go2Simulator:
         Args:
             steps: Aantal stappen
         """
-        for _ in range(steps):
-            p.stepSimulation()
+        self.profiler.count("stepSimulation", steps)
+        self._state_version += 1
+        with self.profiler.phase("physics"):
+            for _ in range(steps):
+                p.stepSimulation(physicsClientId=self.client)
     
     def run_simulation(self, duration: float, callback: Optional[callable] = None):
         """
@@ -299,7 +669,7 @@ class Go2Simulator:
             duration: Duur in seconden
             callback: Functie die elke stap wordt aangeroepen (optioneel)
         """
-        timestep = p.getPhysicsEngineParameters()['fixedTimeStep']
+        timestep = p.getPhysicsEngineParameters(physicsClientId=self.client)['fixedTimeStep']
         steps = int(duration / timestep)
         
         # Optimalisatie: batch steps voor betere performance
@@ -320,11 +690,173 @@ class Go2Simulator:
             color: Kleur [r, g, b]
             line_width: Lijn breedte
         """
-        p.addUserDebugLine(start, end, color, lineWidth=line_width)
+        p.addUserDebugLine(start, end, color, lineWidth=line_width, physicsClientId=self.client)
+    
+    def save_state(self) -> int:
+        """
+        Sla de huidige simulatie state in het geheugen op
+        
+        De physics client, vloer, robot en andere bodies blijven geladen;
+        alleen posities, snelheden en contactinformatie worden bewaard.
+        
+        Returns:
+            State ID voor restore_state()
+        """
+        self.profiler.count("saveState")
+        return p.saveState(physicsClientId=self.client)
+    
+    def restore_state(self, state_id: int):
+        """
+        Herstel een eerder opgeslagen simulatie state
+        
+        Args:
+            state_id: State ID van save_state()
+        """
+        self.profiler.count("restoreState")
+        self._state_version += 1
+        p.restoreState(stateId=state_id, physicsClientId=self.client)
+    
+    def remove_state(self, state_id: int):
+        """
+        Geef een opgeslagen simulatie state vrij
+        
+        Args:
+            state_id: State ID van save_state()
+        """
+        p.removeState(state_id, physicsClientId=self.client)
+    
+    def snapshot(self, extra: Optional[Dict[str, Any]] = None) -> SimSnapshot:
+        """
+        Maak een momentopname van de huidige simulatie state
+        
+        Bewaart een in-memory PyBullet state plus de robot state als arrays.
+        Geef de in-memory state vrij met release() als de snapshot niet meer
+        nodig is.
+        
+        Args:
+            extra: Extra (JSON-serialiseerbare) state, bijv. van een environment
+        
+        Returns:
+            SimSnapshot voor restore()
+        """
+        joint_positions, joint_velocities, _ = self.get_joint_state_batch()
+        base_positions, base_orientations, linear_velocities, angular_velocities = self.get_base_state_batch()
+        return SimSnapshot(
+            base_positions=base_positions.copy(),
+            base_orientations=base_orientations.copy(),
+            base_linear_velocities=linear_velocities.copy(),
+            base_angular_velocities=angular_velocities.copy(),
+            joint_positions=joint_positions.copy(),
+            joint_velocities=joint_velocities.copy(),
+            extra=dict(extra or {}),
+            state_id=self.save_state(),
+            owner=self.instance_id
+        )
+    
+    def restore(self, snapshot: SimSnapshot, robot_indices: Optional[List[int]] = None):
+        """
+        Herstel een snapshot
+        
+        Snapshots van deze simulator worden via restoreState hersteld. Voor
+        gedeserialiseerde snapshots (of snapshots van een andere simulator)
+        en bij het herstellen van een deel van de robots worden base pose,
+        snelheden en joint states opnieuw gezet; contact informatie en joint
+        targets worden dan niet hersteld.
+        
+        Args:
+            snapshot: SimSnapshot van snapshot() of SimSnapshot.from_bytes()
+            robot_indices: Te herstellen robots (None = hele wereld); andere
+                robots lopen ongestoord door
+        """
+        if robot_indices is None and snapshot.state_id is not None and snapshot.owner == self.instance_id:
+            self.restore_state(snapshot.state_id)
+            return
+        
+        if snapshot.joint_positions.shape != (self.num_robots, len(self.joint_indices)):
+            raise ValueError(
+                f"Snapshot past niet bij simulator: {snapshot.joint_positions.shape} "
+                f"vs ({self.num_robots}, {len(self.joint_indices)})"
+            )
+        
+        if robot_indices is None:
+            robot_indices = range(self.num_robots)
+        
+        self._state_version += 1
+        for r in robot_indices:
+            robot_id = self.robot_ids[r]
+            p.resetBasePositionAndOrientation(
+                robot_id, snapshot.base_positions[r], snapshot.base_orientations[r], physicsClientId=self.client
+            )
+            p.resetBaseVelocity(
+                robot_id,
+                snapshot.base_linear_velocities[r],
+                snapshot.base_angular_velocities[r],
+                physicsClientId=self.client
+            )
+            for i, joint_idx in enumerate(self.joint_indices):
+                p.resetJointState(
+                    robot_id,
+                    joint_idx,
+                    targetValue=snapshot.joint_positions[r, i],
+                    targetVelocity=snapshot.joint_velocities[r, i],
+                    physicsClientId=self.client
+                )
+    
+    def release(self, snapshot: SimSnapshot):
+        """
+        Geef de in-memory state van een snapshot vrij
+        
+        De snapshot blijft bruikbaar via de robot arrays.
+        
+        Args:
+            snapshot: SimSnapshot van snapshot()
+        """
+        if snapshot.state_id is not None and snapshot.owner == self.instance_id:
+            self.remove_state(snapshot.state_id)
+        snapshot.state_id = None
+        snapshot.owner = None
+    
+    def profile_report(self) -> Dict[str, Any]:
+        """
+        Haal profiling resultaten op (zie StepProfiler.report())
+        
+        Returns:
+            Dict met steps, phases en api_calls_per_step
+        """
+        return self.profiler.report()
+    
+    def acquire_shape(self, key: Any, create: Callable[[], int]) -> int:
+        """
+        Haal een gedeelde collision shape op en tel de gebruiker
+        
+        Args:
+            key: Sleutel van de shape, bijv. ("stair_step", hoogte, diepte, breedte)
+            create: Maakt de shape als die nog niet in de cache staat
+        
+        Returns:
+            Shape id; geef vrij met release_shape() als de body verwijderd is
+        """
+        if key not in self.shape_cache:
+            self.shape_cache[key] = create()
+            self._shape_users[key] = 0
+        self._shape_users[key] += 1
+        return self.shape_cache[key]
+    
+    def release_shape(self, key: Any):
+        """
+        Geef een shape van acquire_shape() vrij; de laatste gebruiker verwijdert hem
+        
+        Args:
+            key: Sleutel van acquire_shape()
+        """
+        self._shape_users[key] -= 1
+        if self._shape_users[key] == 0:
+            del self._shape_users[key]
+            p.removeCollisionShape(self.shape_cache.pop(key), physicsClientId=self.client)
     
     def close(self):
         """Sluit simulator"""
-        p.disconnect(self.client)
+        p.disconnect(physicsClientId=self.client)
     
     def __enter__(self):
         """Context manager entry"""
@@ -18,6 +18,9 @@ except ImportError:
         "PyBullet niet geïnstalleerd. Installeer met: conda install -c conda-forge pybullet"
     )
 
+from .urdf_cache import resolve_urdf, load_joint_table, save_joint_table
+from .pacing import PacingScheduler
+
 
 class Go2SimulatorOptimized:
     """Geoptimaliseerde PyBullet simulator voor Apple Silicon"""
@@ -28,7 +31,9 @@ class Go2SimulatorOptimized:
         gui: bool = True,
         gravity: float = -9.81,
         timestep: float = 1.0 / 240.0,
-        render_fps: int = 30  # Lagere rendering FPS voor betere performance
+        render_fps: int = 30,  # Lagere rendering FPS voor betere performance
+        pacing: str = "fast",
+        speed: float = 1.0
     ):
         """
         Initialiseer geoptimaliseerde PyBullet simulator
@@ -38,7 +43,10 @@ class Go2SimulatorOptimized:
             gui: Toon GUI (True) of headless (False)
             gravity: Zwaartekracht waarde
             timestep: Simulatie tijdstap in seconden (physics blijft op 240Hz)
-            render_fps: Rendering frames per seconde (30 voor betere performance)
+            render_fps: Frames per wall-clock seconde bij realtime/xfactor, per
+                gesimuleerde seconde bij fast (30 voor betere performance)
+            pacing: "fast" (zo snel mogelijk), "realtime" of "xfactor"
+            speed: Snelheidsfactor bij pacing="xfactor" (2.0 = twee keer real-time)
         """
         # Bepaal URDF pad
         if urdf_path is None:
@@ -49,9 +57,11 @@ class Go2SimulatorOptimized:
         if not self.urdf_path.exists():
             raise FileNotFoundError(f"URDF bestand niet gevonden: {self.urdf_path}")
         
+        self.gui = gui
+        self.timestep = timestep
         self.render_fps = render_fps
-        self.render_interval = 1.0 / render_fps
-        self.last_render_time = 0.0
+        self.pacer = PacingScheduler(timestep, mode=pacing, speed=speed, render_fps=render_fps)
+        self._rendering_enabled = True
         
         # Start PyBullet met optimalisaties voor Apple Silicon
         if gui:
@@ -64,69 +74,44 @@ class Go2SimulatorOptimized:
             self.client = p.connect(p.DIRECT)
         
         # Configureer simulator
-        p.setGravity(0, 0, gravity)
-        p.setTimeStep(timestep)
-        p.setAdditionalSearchPath(pybullet_data.getDataPath())
+        p.setGravity(0, 0, gravity, physicsClientId=self.client)
+        p.setTimeStep(timestep, physicsClientId=self.client)
+        p.setAdditionalSearchPath(pybullet_data.getDataPath(), physicsClientId=self.client)
         
         # Optimaliseer physics engine
         self._configure_physics_engine()
         
         # Laad vloer
-        self.plane_id = p.loadURDF("plane.urdf")
+        self.plane_id = p.loadURDF("plane.urdf", physicsClientId=self.client)
         
         # Laad robot
         start_pos = [0, 0, 0.5]
         start_orientation = p.getQuaternionFromEuler([0, 0, 0])
         
-        # Fix URDF paths
-        urdf_dir = self.urdf_path.parent.parent
-        import re
-        import tempfile
+        # Opgeloste URDF en joint tabel uit de cache
+        resolved_urdf, self.urdf_cache_key = resolve_urdf(self.urdf_path)
         
-        urdf_content = self.urdf_path.read_text(encoding='utf-8')
-        urdf_content = re.sub(
-            r'package://go2_description/dae/([^"]+)',
-            lambda m: str((urdf_dir / "dae" / m.group(1)).absolute()),
-            urdf_content
-        )
-        urdf_content = re.sub(
-            r'package://go2_description/meshes/([^"]+)',
-            lambda m: str((urdf_dir / "meshes" / m.group(1)).absolute()),
-            urdf_content
+        self.robot_id = p.loadURDF(
+            str(resolved_urdf),
+            start_pos,
+            start_orientation,
+            flags=p.URDF_USE_INERTIA_FROM_FILE | p.URDF_USE_MATERIAL_COLORS_FROM_MTL,
+            physicsClientId=self.client
         )
         
-        temp_urdf = tempfile.NamedTemporaryFile(mode='w', suffix='.urdf', delete=False, encoding='utf-8')
-        temp_urdf.write(urdf_content)
-        temp_urdf.close()
-        
-        try:
-            self.robot_id = p.loadURDF(
-                temp_urdf.name,
-                start_pos,
-                start_orientation,
-                flags=p.URDF_USE_INERTIA_FROM_FILE | p.URDF_USE_MATERIAL_COLORS_FROM_MTL
-            )
-        finally:
-            import os
-            if os.path.exists(temp_urdf.name):
-                os.unlink(temp_urdf.name)
-        
         # Haal joint informatie op
-        self.joint_indices = []
-        self.joint_names = []
-        self.joint_lower_limits = []
-        self.joint_upper_limits = []
+        num_joints = p.getNumJoints(self.robot_id, physicsClientId=self.client)
+        joint_table = load_joint_table(resolved_urdf)
+        if joint_table is None or joint_table["num_joints"] != num_joints:
+            joint_table = self._read_joint_table(num_joints)
+            save_joint_table(resolved_urdf, joint_table)
         
-        num_joints = p.getNumJoints(self.robot_id)
-        for i in range(num_joints):
-            joint_info = p.getJointInfo(self.robot_id, i)
-            if joint_info[2] == p.JOINT_REVOLUTE or joint_info[2] == p.JOINT_PRISMATIC:
-                self.joint_indices.append(i)
-                self.joint_names.append(joint_info[1].decode('utf-8'))
-                self.joint_lower_limits.append(joint_info[8])
-                self.joint_upper_limits.append(joint_info[9])
+        self.joint_indices = list(joint_table["joint_indices"])
+        self.joint_names = list(joint_table["joint_names"])
+        self.joint_lower_limits = list(joint_table["lower_limits"])
+        self.joint_upper_limits = list(joint_table["upper_limits"])
+        self.default_joint_positions = list(joint_table["default_positions"])
         
-        self.default_joint_positions = self._get_default_joint_positions()
         self.reset()
         
         print(f"✓ Robot geladen: {len(self.joint_indices)} actuated joints (Apple Silicon geoptimaliseerd)")
@@ -134,19 +119,20 @@ class Go2SimulatorOptimized:
     def _configure_apple_silicon_rendering(self):
         """Configureer rendering voor Apple Silicon optimalisatie"""
         # Disable onnodige visualisaties
-        p.configureDebugVisualizer(p.COV_ENABLE_GUI, 0)  # Geen GUI controls
-        p.configureDebugVisualizer(p.COV_ENABLE_SHADOWS, 0)  # Geen shadows (snelste)
-        p.configureDebugVisualizer(p.COV_ENABLE_TINY_RENDERER, 0)  # Gebruik main renderer
-        p.configureDebugVisualizer(p.COV_ENABLE_RGB_BUFFER_PREVIEW, 0)
-        p.configureDebugVisualizer(p.COV_ENABLE_DEPTH_BUFFER_PREVIEW, 0)
-        p.configureDebugVisualizer(p.COV_ENABLE_SEGMENTATION_MARK_PREVIEW, 0)
+        p.configureDebugVisualizer(p.COV_ENABLE_GUI, 0, physicsClientId=self.client)  # Geen GUI controls
+        p.configureDebugVisualizer(p.COV_ENABLE_SHADOWS, 0, physicsClientId=self.client)  # Geen shadows (snelste)
+        p.configureDebugVisualizer(p.COV_ENABLE_TINY_RENDERER, 0, physicsClientId=self.client)  # Gebruik main renderer
+        p.configureDebugVisualizer(p.COV_ENABLE_RGB_BUFFER_PREVIEW, 0, physicsClientId=self.client)
+        p.configureDebugVisualizer(p.COV_ENABLE_DEPTH_BUFFER_PREVIEW, 0, physicsClientId=self.client)
+        p.configureDebugVisualizer(p.COV_ENABLE_SEGMENTATION_MARK_PREVIEW, 0, physicsClientId=self.client)
         
         # Set camera positie voor betere view
         p.resetDebugVisualizerCamera(
             cameraDistance=2.0,
             cameraYaw=45,
             cameraPitch=-20,
-            cameraTargetPosition=[0, 0, 0.5]
+            cameraTargetPosition=[0, 0, 0.5],
+            physicsClientId=self.client
         )
     
     def _configure_physics_engine(self):
@@ -157,27 +143,95 @@ class Go2SimulatorOptimized:
             splitImpulsePenetrationThreshold=-0.02,
             enableConeFriction=0,  # Disable voor betere performance
             deterministicOverlappingPairs=0,  # Sneller
-            numSubSteps=0  # Geen substeps voor betere performance
+            numSubSteps=0,  # Geen substeps voor betere performance
+            physicsClientId=self.client
         )
     
     def step(self, steps: int = 1, render: bool = True):
         """
         Voer simulatie stappen uit met geoptimaliseerde rendering
         
+        De frame stappen volgen uit de stap teller (zie PacingScheduler); bij
+        "realtime" en "xfactor" wacht deze methode op elke frame grens op de
+        wall-clock, zodat de GUI één frame per render_fps interval tekent.
+        De renderer wordt niet per frame aan/uit gezet: elke omschakeling
+        dwingt een volledige sync af en laat de GUI haperen.
+        
         Args:
             steps: Aantal stappen
-            render: Of rendering moet worden uitgevoerd (True = alleen op render_fps)
+            render: Of de GUI moet renderen (alleen omgeschakeld als deze
+                waarde verandert)
         """
-        import time
-        current_time = time.time()
+        if self.gui and render != self._rendering_enabled:
+            p.configureDebugVisualizer(p.COV_ENABLE_RENDERING, int(render), physicsClientId=self.client)
+            self._rendering_enabled = render
         
         for _ in range(steps):
-            p.stepSimulation()
-            
-            # Render alleen op ingestelde FPS voor betere performance
-            if render and (current_time - self.last_render_time) >= self.render_interval:
-                # Rendering gebeurt automatisch door PyBullet
-                self.last_render_time = current_time
+            self.pacer.before_step()
+            p.stepSimulation(physicsClientId=self.client)
+            self.pacer.after_step()
+    
+    def run_simulation(self, duration: float, callback: Optional[callable] = None):
+        """
+        Voer simulatie uit voor bepaalde duur
+        
+        Args:
+            duration: Duur in gesimuleerde seconden
+            callback: Functie die elke stap wordt aangeroepen (optioneel)
+        """
+        steps = int(duration / self.timestep)
+        
+        # Optimalisatie: batch steps voor betere performance
+        batch_size = max(1, steps // 100)  # Max 100 callback calls
+        
+        for step in range(steps):
+            if callback and step % batch_size == 0:
+                callback(step, self)
+            self.step()
+    
+    def set_pacing(self, mode: str, speed: float = 1.0):
+        """
+        Wissel van pacing modus
+        
+        Args:
+            mode: "fast", "realtime" of "xfactor"
+            speed: Snelheidsfactor bij "xfactor"
+        """
+        self.pacer.set_mode(mode, speed)
+    
+    def pacing_stats(self) -> Dict[str, Any]:
+        """
+        Haal pacing statistieken op
+        
+        Returns:
+            Dict met o.a. real_time_factor, frames, frames_late,
+            frame_jitter_mean_ms en frame_jitter_max_ms
+        """
+        return self.pacer.stats()
+    
+    def _read_joint_table(self, num_joints: int) -> Dict[str, Any]:
+        """Lees joint informatie uit PyBullet (alleen als niet gecached)"""
+        self.joint_indices = []
+        self.joint_names = []
+        self.joint_lower_limits = []
+        self.joint_upper_limits = []
+        
+        for i in range(num_joints):
+            joint_info = p.getJointInfo(self.robot_id, i, physicsClientId=self.client)
+            if joint_info[2] == p.JOINT_REVOLUTE or joint_info[2] == p.JOINT_PRISMATIC:
+                self.joint_indices.append(i)
+                self.joint_names.append(joint_info[1].decode('utf-8'))
+                self.joint_lower_limits.append(joint_info[8])
+                self.joint_upper_limits.append(joint_info[9])
+        
+        return {
+            "num_joints": num_joints,
+            "joint_indices": self.joint_indices,
+            "joint_names": self.joint_names,
+            "lower_limits": self.joint_lower_limits,
+            "upper_limits": self.joint_upper_limits,
+            "default_positions": self._get_default_joint_positions(),
+        }
     
     def _get_default_joint_positions(self) -> List[float]:
         """Retourneer standaard joint posities"""
@@ -200,18 +254,19 @@ class Go2SimulatorOptimized:
         if orientation is None:
             orientation = p.getQuaternionFromEuler([0, 0, 0])
         
-        p.resetBasePositionAndOrientation(self.robot_id, position, orientation)
+        p.resetBasePositionAndOrientation(self.robot_id, position, orientation, physicsClientId=self.client)
         
         for i, joint_idx in enumerate(self.joint_indices):
             p.resetJointState(
                 self.robot_id,
                 joint_idx,
-                self.default_joint_positions[i] if i < len(self.default_joint_positions) else 0.0
+                self.default_joint_positions[i] if i < len(self.default_joint_positions) else 0.0,
+                physicsClientId=self.client
             )
         
-        p.resetBaseVelocity(self.robot_id, [0, 0, 0], [0, 0, 0])
+        p.resetBaseVelocity(self.robot_id, [0, 0, 0], [0, 0, 0], physicsClientId=self.client)
         for joint_idx in self.joint_indices:
-            p.resetJointState(self.robot_id, joint_idx, targetValue=0, targetVelocity=0)
+            p.resetJointState(self.robot_id, joint_idx, targetValue=0, targetVelocity=0, physicsClientId=self.client)
     
     def set_joint_targets(self, targets: Dict[str, float], forces: Optional[Dict[str, float]] = None):
         """Stel joint targets in"""
@@ -225,7 +280,8 @@ class Go2SimulatorOptimized:
                     joint_idx,
                     p.POSITION_CONTROL,
                     targetPosition=target,
-                    force=max_force
+                    force=max_force,
+                    physicsClientId=self.client
                 )
     
     def get_joint_states(self) -> Dict[str, Dict[str, float]]:
@@ -233,7 +289,7 @@ class Go2SimulatorOptimized:
         states = {}
         for i, joint_name in enumerate(self.joint_names):
             joint_idx = self.joint_indices[i]
-            joint_state = p.getJointState(self.robot_id, joint_idx)
+            joint_state = p.getJointState(self.robot_id, joint_idx, physicsClientId=self.client)
             states[joint_name] = {
                 'position': joint_state[0],
                 'velocity': joint_state[1],
@@ -243,17 +299,17 @@ class Go2SimulatorOptimized:
     
     def get_base_pose(self) -> Tuple[List[float], List[float]]:
         """Haal base positie en orientatie op"""
-        pose = p.getBasePositionAndOrientation(self.robot_id)
+        pose = p.getBasePositionAndOrientation(self.robot_id, physicsClientId=self.client)
         return pose[0], pose[1]
     
     def get_base_velocity(self) -> Tuple[List[float], List[float]]:
         """Haal base snelheid op"""
-        velocity = p.getBaseVelocity(self.robot_id)
+        velocity = p.getBaseVelocity(self.robot_id, physicsClientId=self.client)
         return velocity[0], velocity[1]
     
     def close(self):
         """Sluit simulator"""
-        p.disconnect(self.client)
+        p.disconnect(physicsClientId=self.client)
     
     def __enter__(self):
         return self
@@ -5,15 +5,14 @@ Gymnasium-compatible environment voor RL training van traplopen.
 """
 
 import numpy as np
-import gymnasium as gym
-from gymnasium import spaces
-from typing import Dict, Tuple, Optional, Any, List
+from collections import OrderedDict
+from typing import Dict, Tuple, Optional, Any
 import pybullet as p
 
-from .go2_simulator import Go2Simulator
+from .go2_base_env import Go2BaseEnv
 
 
-class Go2StairsEnv(gym.Env):
+class Go2StairsEnv(Go2BaseEnv):
     """
     Reinforcement Learning Environment voor traplopen met Go2 robot
     
@@ -31,16 +30,63 @@ class Go2StairsEnv(gym.Env):
     Action Space:
     - Joint target positions (12 joints)
     Range: [-1, 1] wordt geschaald naar joint limits
+    
+    Reward: gewogen reward termen (REWARD_WEIGHTS)
+    
+    De trap is één statische multi-link body met MAX_STAIR_STEPS treden en
+    een platform; de box shape van een trede wordt per (hoogte, diepte,
+    breedte) gecachet. Een ander aantal treden of een andere start_distance
+    bij reset verplaatst alleen links (ongebruikte treden gaan onder de
+    vloer). Alleen nieuwe trede afmetingen kosten een nieuwe body; de
+    opgeslagen begin-state wordt dan opnieuw bewaard zonder te stabiliseren.
     """
     
-    metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 60}
+    EXTRA_OBS_FIELDS = (
+        ("next_step_position", 3),
+        ("distance_to_step", 1),
+    )
+    
+    REWARD_WEIGHTS = {
+        "forward_velocity": 5.0,
+        "step_proximity": 10.0,        # Beloning voor dichterbij komen
+        "step_reached": 50.0,          # Grote beloning voor het bereiken van een trede
+        "top_reached": 100.0,
+        "backward_motion": -10.0,
+        "lateral_velocity": -5.0,
+        "angular_velocity": -2.0,
+        "height_error": -10.0,
+        "fallen": -100.0,
+        "joint_velocity_stability": 1.0,
+        "survival": 0.1,
+    }
+    
+    # Maximaal aantal treden (links per trap body)
+    MAX_STAIR_STEPS = 12
+    
+    # Maximaal aantal bewaarde trap bodies (trede afmetingen) per environment
+    MAX_STAIR_BODIES = 16
+    
+    # Ongebruikte trap bodies en treden wachten onder de vloer
+    PARKING_OFFSET = (0.0, 0.0, -20.0)
     
     def __init__(
         self,
         render_mode: Optional[str] = None,
         gui: bool = True,
         max_episode_steps: int = 2000,
-        stair_config: Optional[Dict] = None
+        stair_config: Optional[Dict] = None,
+        fast_reset: bool = True,
+        sim_profile: Optional[str] = None,
+        control_dt: Optional[float] = None,
+        decimation: int = 1,
+        render_width: int = 320,
+        render_height: int = 240,
+        render_frame_skip: int = 1,
+        profiling: bool = False,
+        reward_weights: Optional[Dict[str, float]] = None,
+        terrain: Optional[Dict[str, Any]] = None,
+        sensors: Optional[Dict[str, Optional[Dict[str, Any]]]] = None,
+        randomization: Optional[Dict[str, Optional[Tuple[float, float]]]] = None
     ):
         """
         Initialiseer traplopen RL environment
@@ -49,20 +95,94 @@ class Go2StairsEnv(gym.Env):
             render_mode: Rendering mode ("human" of "rgb_array")
             gui: Toon PyBullet GUI
             max_episode_steps: Maximum aantal stappen per episode
-            stair_config: Configuratie voor trap:
+            stair_config: Configuratie voor trap (zie set_stair_config()):
                 - num_steps: Aantal treden (default: 5)
                 - step_height: Hoogte per trede in meters (default: 0.15)
                 - step_depth: Diepte per trede in meters (default: 0.25)
                 - step_width: Breedte van trap in meters (default: 0.5)
                 - start_distance: Afstand van robot tot trap in meters (default: 1.0)
+            fast_reset: Hergebruik simulator en trap tussen episodes en herstel
+                een opgeslagen begin-state (False = nieuwe simulator per reset)
+            sim_profile: Simulator profiel ("full" of "train");
+                None = "train" zonder GUI, anders "full"
+            control_dt: Tijd per policy stap in seconden (bijv. 0.05 voor 20 Hz
+                zoals Go2RLController); overschrijft decimation
+            decimation: Aantal physics substeps (1/240 s) per policy stap.
+                Reward en done worden één keer per policy stap berekend
+                (rate termen geschaald met control_dt); max_episode_steps
+                telt policy stappen
+            render_width: Beeldbreedte voor render_mode="rgb_array"
+            render_height: Beeldhoogte voor render_mode="rgb_array"
+            render_frame_skip: Render alleen elke N-de render() aanroep
+                (tussenliggende aanroepen geven het vorige beeld terug)
+            profiling: Meet fase timings en PyBullet API calls per stap
+                (in info["profile"] en profile_report())
+            reward_weights: Reward gewichten die REWARD_WEIGHTS overschrijven
+                (term naam -> gewicht, 0 = term uit), zie rewards.py
+            terrain: Procedureel terrain in plaats van de vlakke vloer
+                (None = vlak), zie Go2BaseEnv.set_terrain()
+            sensors: Ray-cast sensoren en voet contacten als extra observatie
+                velden (None = geen), zie sensors.py
+            randomization: Domain randomization per episode (None = nominale
+                dynamica), zie Go2BaseEnv.set_randomization()
         """
-        super().__init__()
+        super().__init__(
+            render_mode=render_mode,
+            gui=gui,
+            max_episode_steps=max_episode_steps,
+            fast_reset=fast_reset,
+            sim_profile=sim_profile,
+            control_dt=control_dt,
+            decimation=decimation,
+            render_width=render_width,
+            render_height=render_height,
+            render_frame_skip=render_frame_skip,
+            profiling=profiling,
+            reward_weights=reward_weights,
+            terrain=terrain,
+            sensors=sensors,
+            randomization=randomization
+        )
         
-        self.render_mode = render_mode
-        self.gui = gui or (render_mode == "human")
-        self.max_episode_steps = max_episode_steps
+        # Trap bodies per trede afmetingen (hoogte, diepte, breedte)
+        self._stair_bodies: "OrderedDict[Tuple, int]" = OrderedDict()
+        self.stair_id: Optional[int] = None  # Actieve trap body
+        self._pending_stair_config = None
+        
+        # Episode tracking
+        self.current_step_index = 0  # Huidige trede waar robot naartoe gaat
+        self.step_positions = []  # Posities van alle treden
         
         # Trap configuratie
+        self._apply_stair_config(stair_config)
+    
+    def set_stair_config(self, stair_config: Optional[Dict]):
+        """
+        Stel een nieuwe trap configuratie in; geldt vanaf de volgende reset()
+        
+        Werkt ook via reset(options={"stair_config": ...}) of
+        Go2VecEnv.env_method("set_stair_config", ...). Een ander aantal
+        treden of een andere start_distance verplaatst alleen links; nieuwe
+        trede afmetingen kosten één box shape (gecachet per simulator) en
+        één body.
+        
+        Args:
+            stair_config: Dict met num_steps (maximaal MAX_STAIR_STEPS),
+                step_height, step_depth, step_width en start_distance
+                (ontbrekende sleutels = default)
+        """
+        self._check_stair_config(stair_config)
+        self._pending_stair_config = dict(stair_config or {})
+    
+    def _check_stair_config(self, stair_config: Optional[Dict]):
+        """Controleer of het aantal treden in een trap body past"""
+        num_steps = (stair_config or {}).get("num_steps", 5)
+        if not 0 <= num_steps <= self.MAX_STAIR_STEPS:
+            raise ValueError(f"num_steps moet tussen 0 en {self.MAX_STAIR_STEPS} liggen, niet {num_steps}")
+    
+    def _apply_stair_config(self, stair_config: Optional[Dict]):
+        """Zet trap parameters en trede posities uit een configuratie"""
+        self._check_stair_config(stair_config)
         self.stair_config = stair_config or {}
         self.num_steps = self.stair_config.get("num_steps", 5)
         self.step_height = self.stair_config.get("step_height", 0.15)
@@ -70,100 +190,122 @@ class Go2StairsEnv(gym.Env):
         self.step_width = self.stair_config.get("step_width", 0.5)
         self.start_distance = self.stair_config.get("start_distance", 1.0)
         
-        # Simulator
-        self.sim = None
-        self.stair_ids = []  # IDs van trap objecten
-        
-        # Episode tracking
-        self.step_count = 0
-        self.episode_reward = 0.0
-        self.current_step_index = 0  # Huidige trede waar robot naartoe gaat
-        self.step_positions = []  # Posities van alle treden
-        
-        # Define observation space
-        # 12 joint pos + 12 joint vel + 3 base pos + 4 base ori + 3 base lin vel + 3 base ang vel + 3 next step pos + 1 distance
-        obs_dim = 12 + 12 + 3 + 4 + 3 + 3 + 3 + 1
-        self.observation_space = spaces.Box(
-            low=-np.inf,
-            high=np.inf,
-            shape=(obs_dim,),
-            dtype=np.float32
+        # Trede posities t.o.v. de oorsprong van de eigen robot, net als de
+        # base posities in het state frame
+        self.step_positions = [
+            [self.start_distance + i * self.step_depth, 0.0, (i + 1) * self.step_height]
+            for i in range(self.num_steps)
+        ]
+    
+    def _stair_geometry(self) -> Tuple[float, float, float]:
+        """Sleutel voor de trede afmetingen (hoogte, diepte, breedte)"""
+        return (
+            round(self.step_height, 6),
+            round(self.step_depth, 6),
+            round(self.step_width, 6),
         )
+    
+    def _create_stair_body(self, geometry: Tuple[float, float, float]) -> int:
+        """
+        Maak een trap body met MAX_STAIR_STEPS treden en een platform als links
         
-        # Define action space (12 joints, normalized to [-1, 1])
-        self.action_space = spaces.Box(
-            low=-1.0,
-            high=1.0,
-            shape=(12,),
-            dtype=np.float32
+        Elke trede hangt aan een prismatic joint langs z (0 = op zijn plek);
+        het platform schuift over een joint langs de helling van de trap naar
+        de bovenste trede. Links hebben massa 0 en bewegen alleen via
+        resetJointState().
+        """
+        height, depth, width = geometry
+        client = self.sim.client
+        step_shape = self.sim.acquire_shape(
+            ("stair_step",) + geometry,
+            lambda: p.createCollisionShape(
+                p.GEOM_BOX, halfExtents=[width / 2, depth / 2, height / 2], physicsClientId=client
+            )
+        )
+        platform_shape = self.sim.acquire_shape(
+            ("stair_platform", width),
+            lambda: p.createCollisionShape(p.GEOM_BOX, halfExtents=[width / 2, 1.0, 0.1], physicsClientId=client)
         )
         
-        # Joint limits voor scaling van actions
-        self.joint_limits = np.array([
-            [-0.5, 0.5],   # Hip joints (4x)
-            [-0.5, 0.5],
-            [-0.5, 0.5],
-            [-0.5, 0.5],
-            [0.0, 1.0],    # Thigh joints (4x)
-            [0.0, 1.0],
-            [0.0, 1.0],
-            [0.0, 1.0],
-            [-1.5, 0.0],   # Calf joints (4x)
-            [-1.5, 0.0],
-            [-1.5, 0.0],
-            [-1.5, 0.0],
-        ])
-        
+        # Treden en platform t.o.v. de voet van de trap
+        num_links = self.MAX_STAIR_STEPS + 1
+        slope = [depth, 0.0, height] / np.hypot(depth, height)
+        stair_id = p.createMultiBody(
+            baseMass=0,  # Statisch
+            basePosition=self._stair_base_position(parked=True),
+            linkMasses=[0] * num_links,
+            linkCollisionShapeIndices=[step_shape] * self.MAX_STAIR_STEPS + [platform_shape],
+            linkVisualShapeIndices=[-1] * num_links,
+            linkPositions=[[i * depth, 0.0, (i + 1) * height] for i in range(self.MAX_STAIR_STEPS)] + [[0.0, 0.0, 0.1]],
+            linkOrientations=[[0, 0, 0, 1]] * num_links,
+            linkInertialFramePositions=[[0, 0, 0]] * num_links,
+            linkInertialFrameOrientations=[[0, 0, 0, 1]] * num_links,
+            linkParentIndices=[0] * num_links,
+            linkJointTypes=[p.JOINT_PRISMATIC] * num_links,
+            linkJointAxis=[[0, 0, 1]] * self.MAX_STAIR_STEPS + [slope.tolist()],
+            physicsClientId=client
+        )
+        for link in range(num_links):
+            p.changeVisualShape(stair_id, link, rgbaColor=[0.5, 0.5, 0.5, 1.0], physicsClientId=client)
+        return stair_id
+    
+    def _remove_stair_body(self, geometry: Tuple[float, float, float], stair_id: int):
+        """Verwijder een trap body en geef zijn shapes vrij"""
+        p.removeBody(stair_id, physicsClientId=self.sim.client)
+        self.sim.release_shape(("stair_step",) + geometry)
+        self.sim.release_shape(("stair_platform", geometry[2]))
+    
     def _create_stairs(self):
-        """Maak trap in PyBullet"""
+        """Zorg dat er een trap body is voor de huidige trede afmetingen"""
         if self.sim is None:
             return
         
-        # Verwijder oude trap
-        for stair_id in self.stair_ids:
-            p.removeBody(stair_id)
-        self.stair_ids = []
-        self.step_positions = []
-        
-        # Maak trap
-        for i in range(self.num_steps):
-            step_x = self.start_distance + i * self.step_depth
-            step_y = 0.0
-            step_z = (i + 1) * self.step_height
-            
-            # Maak trede
-            step_shape = p.createCollisionShape(
-                p.GEOM_BOX,
-                halfExtents=[self.step_width/2, self.step_depth/2, self.step_height/2]
-            )
-            
-            step_id = p.createMultiBody(
-                baseMass=0,  # Statisch
-                baseCollisionShapeIndex=step_shape,
-                basePosition=[step_x, step_y, step_z]
-            )
+        geometry = self._stair_geometry()
+        if geometry in self._stair_bodies:
+            self._stair_bodies.move_to_end(geometry)
+        else:
+            # Een opgeslagen state past alleen bij dezelfde bodies: zet de
+            # begin-state terug, wijzig de bodies en bewaar hem opnieuw
+            # (zonder opnieuw te stabiliseren)
+            resave = self._initial_state_id is not None
+            if resave:
+                self.sim.restore_state(self._initial_state_id)
+            self._stair_bodies[geometry] = self._create_stair_body(geometry)
             
-            # Set kleur (grijs)
-            p.changeVisualShape(step_id, -1, rgbaColor=[0.5, 0.5, 0.5, 1.0])
+            # Te veel afmetingen: verwijder de langst niet gebruikte body
+            if len(self._stair_bodies) > self.MAX_STAIR_BODIES:
+                self._remove_stair_body(*self._stair_bodies.popitem(last=False))
             
-            self.stair_ids.append(step_id)
-            self.step_positions.append([step_x, step_y, step_z])
-        
-        # Maak platform bovenaan trap
-        platform_x = self.start_distance + self.num_steps * self.step_depth
-        platform_z = self.num_steps * self.step_height + 0.1
-        platform_shape = p.createCollisionShape(
-            p.GEOM_BOX,
-            halfExtents=[self.step_width/2, 1.0, 0.1]
-        )
-        platform_id = p.createMultiBody(
-            baseMass=0,
-            baseCollisionShapeIndex=platform_shape,
-            basePosition=[platform_x, step_y, platform_z]
-        )
-        p.changeVisualShape(platform_id, -1, rgbaColor=[0.3, 0.3, 0.3, 1.0])
-        self.stair_ids.append(platform_id)
+            if resave:
+                self.sim.remove_state(self._initial_state_id)
+                self._initial_state_id = self.sim.save_state()
+        self.stair_id = self._stair_bodies[geometry]
+    
+    def _stair_base_position(self, parked: bool = False) -> np.ndarray:
+        """Wereldpositie van de voet van de trap (of de parkeerplek)"""
+        origin = self.sim.robot_origins[self.robot_index]
+        if parked:
+            return origin + self.PARKING_OFFSET
+        return origin + [self.start_distance, 0.0, 0.0]
+    
+    def _place_stairs(self):
+        """Zet de actieve trap en zijn treden op hun plek, de rest op de parkeerplek"""
+        if self.sim is None:
+            return
         
+        client = self.sim.client
+        parked = self._stair_base_position(parked=True)
+        for stair_id in self._stair_bodies.values():
+            position = self._stair_base_position() if stair_id == self.stair_id else parked
+            p.resetBasePositionAndOrientation(stair_id, position, [0, 0, 0, 1], physicsClientId=client)
+        
+        # Treden na num_steps onder de vloer, platform achter de bovenste trede
+        for link in range(self.MAX_STAIR_STEPS):
+            offset = 0.0 if link < self.num_steps else self.PARKING_OFFSET[2]
+            p.resetJointState(self.stair_id, link, offset, physicsClientId=client)
+        platform_offset = self.num_steps * np.hypot(self.step_depth, self.step_height)
+        p.resetJointState(self.stair_id, self.MAX_STAIR_STEPS, platform_offset, physicsClientId=client)
+    
     def _get_next_step_position(self) -> Tuple[float, float, float]:
         """Haal positie van volgende trede op"""
         if self.current_step_index < len(self.step_positions):
@@ -176,65 +318,29 @@ class Go2StairsEnv(gym.Env):
                 self.num_steps * self.step_height + 0.1
             ]
     
-    def _get_obs(self) -> np.ndarray:
-        """Haal observation op"""
-        if self.sim is None:
-            return np.zeros(self.observation_space.shape, dtype=np.float32)
-        
-        # Joint states
-        joint_states = self.sim.get_joint_states()
-        joint_positions = []
-        joint_velocities = []
-        
-        for joint_name in self.sim.joint_names:
-            state = joint_states[joint_name]
-            joint_positions.append(state['position'])
-            joint_velocities.append(state['velocity'])
-        
-        joint_positions = np.array(joint_positions, dtype=np.float32)
-        joint_velocities = np.array(joint_velocities, dtype=np.float32)
-        
-        # Base pose
-        base_pos, base_ori = self.sim.get_base_pose()
-        base_lin_vel, base_ang_vel = self.sim.get_base_velocity()
-        
-        # Next step position
+    def _fill_obs(self, obs: np.ndarray):
+        """Vul next step positie en afstand tot volgende trede"""
+        base_pos = self.sim.get_state_frame().base_position[self.robot_index]
         next_step_pos = self._get_next_step_position()
         
-        # Distance to next step
-        distance_to_step = np.linalg.norm(
+        obs[self.obs_slices["next_step_position"]] = next_step_pos
+        obs[self.obs_slices["distance_to_step"]] = np.linalg.norm(
             np.array(base_pos[:2]) - np.array(next_step_pos[:2])
         )
-        
-        # Combineer alle observaties
-        obs = np.concatenate([
-            joint_positions,
-            joint_velocities,
-            np.array(base_pos, dtype=np.float32),
-            np.array(base_ori, dtype=np.float32),
-            np.array(base_lin_vel, dtype=np.float32),
-            np.array(base_ang_vel, dtype=np.float32),
-            np.array(next_step_pos, dtype=np.float32),
-            np.array([distance_to_step], dtype=np.float32),
-        ])
-        
-        return obs
     
     def _get_info(self) -> Dict[str, Any]:
         """Haal extra info op"""
-        return {
-            "step_count": self.step_count,
-            "episode_reward": self.episode_reward,
-            "current_step_index": self.current_step_index,
-            "num_steps": self.num_steps,
-        }
+        info = super()._get_info()
+        info["current_step_index"] = self.current_step_index
+        info["num_steps"] = self.num_steps
+        return info
     
     def _update_step_index(self):
         """Update welke trede de robot moet bereiken"""
         if self.sim is None:
             return
         
-        base_pos, _ = self.sim.get_base_pose()
+        base_pos = self.sim.get_state_frame().base_position[self.robot_index]
         
         # Check of robot volgende trede heeft bereikt
         if self.current_step_index < len(self.step_positions):
@@ -247,81 +353,20 @@ class Go2StairsEnv(gym.Env):
             if distance < 0.2 and base_pos[2] > next_step_pos[2] - 0.1:
                 self.current_step_index += 1
     
-    def _calculate_reward(self) -> float:
-        """Bereken reward voor traplopen"""
-        if self.sim is None:
-            return 0.0
-        
-        base_pos, base_ori = self.sim.get_base_pose()
-        base_lin_vel, base_ang_vel = self.sim.get_base_velocity()
-        joint_states = self.sim.get_joint_states()
-        
-        reward = 0.0
-        
-        # Reward voor voorwaartse beweging richting trap
-        forward_velocity = base_lin_vel[0]
-        reward += 5.0 * forward_velocity
-        
-        # Reward voor het bereiken van volgende trede
-        next_step_pos = self._get_next_step_position()
-        distance_to_step = np.linalg.norm(
-            np.array(base_pos[:2]) - np.array(next_step_pos[:2])
-        )
-        
-        # Beloning voor dichterbij komen
-        reward += 10.0 * (1.0 / (1.0 + distance_to_step))
-        
-        # Grote beloning voor het bereiken van een trede
-        if distance_to_step < 0.15 and base_pos[2] > next_step_pos[2] - 0.05:
-            reward += 50.0
-        
-        # Beloning voor het bereiken van de top
-        if self.current_step_index >= self.num_steps:
-            reward += 100.0
-        
-        # Penalty voor achteruit bewegen
-        if forward_velocity < -0.1:
-            reward -= 10.0
-        
-        # Penalty voor zijwaartse beweging (stabiliteit)
-        lateral_velocity = abs(base_lin_vel[1])
-        reward -= 5.0 * lateral_velocity
-        
-        # Penalty voor rotatie (stabiliteit)
-        angular_velocity_magnitude = np.linalg.norm(base_ang_vel)
-        reward -= 2.0 * angular_velocity_magnitude
-        
-        # Penalty voor te veel hoogte variatie (moet geleidelijk omhoog)
-        expected_height = self.current_step_index * self.step_height + 0.5
-        height_error = abs(base_pos[2] - expected_height)
-        reward -= 10.0 * height_error
-        
-        # Penalty voor vallen
-        if base_pos[2] < 0.2:
-            reward -= 100.0
-        
-        # Reward voor stabiliteit (lage joint velocities)
-        joint_velocities = [joint_states[name]['velocity'] for name in self.sim.joint_names]
-        avg_joint_velocity = np.mean(np.abs(joint_velocities))
-        reward += 1.0 * (1.0 - min(avg_joint_velocity, 1.0))
-        
-        # Survival bonus
-        reward += 0.1
-        
-        return reward
+    def _reward_state(self) -> Dict[str, np.ndarray]:
+        """State arrays voor de reward termen, met de trap voortgang"""
+        state = super()._reward_state()
+        state["next_step_position"] = np.array([self._get_next_step_position()])
+        state["step_index"] = np.array([self.current_step_index])
+        state["num_steps"] = np.array([self.num_steps])
+        # Moet geleidelijk omhoog: doelhoogte volgt de huidige trede
+        state["target_height"] = np.array([self.current_step_index * self.step_height + self.TARGET_HEIGHT])
+        return state
     
     def _is_done(self) -> bool:
         """Check of episode klaar is"""
-        if self.sim is None:
-            return True
-        
-        # Episode eindigt na max steps
-        if self.step_count >= self.max_episode_steps:
-            return True
-        
-        # Episode eindigt als robot valt
-        base_pos, _ = self.sim.get_base_pose()
-        if base_pos[2] < 0.2:
+        # Max steps en vallen
+        if super()._is_done():
             return True
         
         # Episode eindigt als robot de top heeft bereikt
@@ -329,6 +374,7 @@ class Go2StairsEnv(gym.Env):
             return True
         
         # Episode eindigt als robot te ver achteruit gaat
+        base_pos = self.sim.get_state_frame().base_position[self.robot_index]
         if base_pos[0] < -1.0:
             return True
         
@@ -339,92 +385,66 @@ class Go2StairsEnv(gym.Env):
         seed: Optional[int] = None,
         options: Optional[Dict] = None
     ) -> Tuple[np.ndarray, Dict[str, Any]]:
-        """Reset environment"""
-        super().reset(seed=seed)
-        
-        # Sluit oude simulator
-        if self.sim is not None:
-            self.sim.close()
-        
-        # Start nieuwe simulator
-        self.sim = Go2Simulator(gui=self.gui)
+        """
+        Reset environment
         
-        # Maak trap
+        Args:
+            seed: Random seed
+            options: Optioneel {"snapshot": SimSnapshot} en/of
+                {"stair_config": dict} voor een nieuwe trap (zie set_stair_config())
+        """
+        if options and options.get("stair_config") is not None:
+            self.set_stair_config(options["stair_config"])
+        return super().reset(seed=seed, options=options)
+    
+    def _build_world(self):
+        """Maak trap in een nieuwe simulator"""
+        self._stair_bodies = OrderedDict()
+        self.stair_id = None
         self._create_stairs()
-        
-        # Reset tracking
-        self.step_count = 0
-        self.episode_reward = 0.0
+        self._place_stairs()
+    
+    def _reset_task(self):
+        """Begin weer bij de eerste trede, met de nieuwe trap configuratie"""
         self.current_step_index = 0
-        
-        # Reset robot naar start positie (voor trap)
-        start_pos = [0.0, 0.0, 0.5]
-        start_ori = p.getQuaternionFromEuler([0, 0, 0])
-        self.sim.reset(position=start_pos, orientation=start_ori)
-        
-        # Wacht even voor stabilisatie
-        for _ in range(10):
-            self.sim.step()
-        
-        obs = self._get_obs()
-        info = self._get_info()
-        
-        return obs, info
+        if self._pending_stair_config is not None:
+            self._apply_stair_config(self._pending_stair_config)
+            self._pending_stair_config = None
+            self._create_stairs()
     
-    def step(self, action: np.ndarray) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
-        """Voer actie uit"""
-        if self.sim is None:
-            raise RuntimeError("Environment niet geïnitialiseerd. Roep reset() aan eerst.")
-        
-        # Scale actions van [-1, 1] naar joint limits
-        scaled_actions = np.zeros_like(action)
-        for i in range(len(action)):
-            low, high = self.joint_limits[i]
-            scaled_actions[i] = low + (action[i] + 1.0) / 2.0 * (high - low)
-        
-        # Stel joint targets in
-        targets = {}
-        for i, joint_name in enumerate(self.sim.joint_names):
-            targets[joint_name] = scaled_actions[i]
-        
-        self.sim.set_joint_targets(targets)
-        
-        # Simuleer stap
-        self.sim.step()
-        
-        # Update welke trede robot moet bereiken
-        self._update_step_index()
-        
-        # Update tracking
-        self.step_count += 1
-        reward = self._calculate_reward()
-        self.episode_reward += reward
-        
-        # Check done
-        done = self._is_done()
-        truncated = False
-        
-        obs = self._get_obs()
-        info = self._get_info()
-        
-        return obs, reward, done, truncated, info
+    def _sync_world(self):
+        """Trap op zijn plek na het herstellen van simulator state"""
+        self._place_stairs()
     
-    def render(self):
-        """Render environment"""
-        if self.render_mode == "human":
-            # PyBullet GUI wordt automatisch getoond als gui=True
-            pass
-        elif self.render_mode == "rgb_array":
-            raise NotImplementedError("RGB array rendering nog niet geïmplementeerd")
+    def _post_physics_step(self):
+        """Update welke trede robot moet bereiken"""
+        with self.profiler.phase("step_index"):
+            self._update_step_index()
+    
+    def _snapshot_extra(self) -> Dict[str, Any]:
+        """Huidige trede voor snapshot()"""
+        return {"current_step_index": self.current_step_index}
+    
+    def _restore_extra(self, extra: Dict[str, Any]):
+        """Herstel huidige trede uit een snapshot"""
+        self.current_step_index = extra.get("current_step_index", 0)
+    
+    def _training_state_extra(self) -> Dict[str, Any]:
+        """Trap configuratie (ook een nog niet toegepaste) voor get_training_state()"""
+        pending = self._pending_stair_config
+        return {"stair_config": dict(pending if pending is not None else self.stair_config)}
+    
+    def _restore_training_state_extra(self, extra: Dict[str, Any]):
+        """Zet de trap configuratie klaar voor de volgende reset()"""
+        if extra.get("stair_config") is not None:
+            self.set_stair_config(extra["stair_config"])
     
     def close(self):
         """Sluit environment"""
-        if self.sim is not None:
-            # Verwijder trap
-            for stair_id in self.stair_ids:
-                p.removeBody(stair_id)
-            self.stair_ids = []
-            
-            self.sim.close()
-            self.sim = None
-
+        if self.sim is not None and self._shared_sim:
+            # Gedeelde simulator blijft bestaan: verwijder eigen trap bodies
+            for geometry, stair_id in self._stair_bodies.items():
+                self._remove_stair_body(geometry, stair_id)
+        self._stair_bodies = OrderedDict()
+        self.stair_id = None
+        super().close()
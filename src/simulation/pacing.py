@@ -0,0 +1,171 @@
+"""
+Wall-clock pacing voor PyBullet simulaties
+
+Houdt de simulatie synchroon met de echte tijd (of een veelvoud daarvan)
+en bepaalt op welke physics stappen een frame gerenderd wordt.
+"""
+
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+PACING_MODES = ("fast", "realtime", "xfactor")
+
+
+class PacingScheduler:
+    """
+    Pacing scheduler voor een simulatie met vaste tijdstap
+    
+    Modi:
+        fast:     zo snel mogelijk, geen wachttijd
+        realtime: 1 gesimuleerde seconde per seconde wall-clock tijd
+        xfactor:  `speed` gesimuleerde seconden per seconde wall-clock tijd
+    
+    Frames worden deterministisch gepland op de stap teller: na elke
+    `frame_interval_steps` physics stappen ligt een frame grens, afgeleid van
+    render_fps en de snelheidsfactor. Gepacede modi wachten alleen op frame
+    grenzen op de wall-clock, zodat de GUI per frame één consistente toestand
+    ziet. Achterstand op de wall-clock verandert het schema niet; een frame
+    grens die meer dan één frame interval te laat is, telt alleen als "late".
+    De jitter wordt daarom per frame interval gemeten, niet per stap.
+    """
+    
+    def __init__(
+        self,
+        timestep: float,
+        mode: str = "fast",
+        speed: float = 1.0,
+        render_fps: int = 30,
+        max_lag: float = 0.25,
+        clock: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Initialiseer pacing scheduler
+        
+        Args:
+            timestep: Physics tijdstap in seconden
+            mode: Pacing modus ("fast", "realtime" of "xfactor")
+            speed: Snelheidsfactor voor "xfactor" (2.0 = twee keer real-time)
+            render_fps: Gewenste frames per wall-clock seconde bij "realtime"
+                en "xfactor" (per gesimuleerde seconde bij "fast")
+            max_lag: Maximale achterstand in seconden; daarboven wordt het
+                schema opnieuw gesynchroniseerd in plaats van in te halen
+            clock: Klok functie (seconden)
+            sleep: Slaap functie (seconden)
+        """
+        self.timestep = timestep
+        self.max_lag = max_lag
+        self._clock = clock
+        self._sleep = sleep
+        self.render_fps = render_fps
+        self.set_mode(mode, speed)
+    
+    def set_mode(self, mode: str, speed: float = 1.0):
+        """
+        Wissel van pacing modus (reset de statistieken)
+        
+        Args:
+            mode: Pacing modus ("fast", "realtime" of "xfactor")
+            speed: Snelheidsfactor voor "xfactor"
+        """
+        if mode not in PACING_MODES:
+            raise ValueError(f"Onbekende pacing modus: {mode} (kies uit {', '.join(PACING_MODES)})")
+        if mode == "xfactor" and speed <= 0:
+            raise ValueError(f"Snelheidsfactor moet > 0 zijn, niet {speed}")
+        
+        self.mode = mode
+        self.speed = speed if mode == "xfactor" else 1.0
+        self.paced = mode != "fast"
+        # Bij xfactor lopen er `speed` gesimuleerde seconden per wall-clock
+        # seconde, dus liggen de frames verder uit elkaar in simulatietijd
+        self.frame_interval_steps = max(1, int(round(self.speed / (self.render_fps * self.timestep))))
+        self.reset()
+    
+    def reset(self):
+        """Reset schema en statistieken (bijv. na een pauze)"""
+        self.sim_steps = 0
+        self.frames = 0
+        self.frames_late = 0
+        self.resyncs = 0
+        self._wall_origin: Optional[float] = None
+        self._wall_start: Optional[float] = None
+        self._last_wall: Optional[float] = None
+        self._last_frame_wall: Optional[float] = None
+        self._interval_sum = 0.0
+        self._jitter_sum = 0.0
+        self._jitter_max = 0.0
+        self._jitter_count = 0
+    
+    @property
+    def wall_step(self) -> float:
+        """Gewenste wall-clock tijd per physics stap (0 bij "fast")"""
+        return self.timestep / self.speed if self.paced else 0.0
+    
+    def _target_time(self, steps: int) -> float:
+        """Geplande wall-clock tijd waarop `steps` stappen klaar moeten zijn"""
+        return self._wall_start + steps * self.wall_step
+    
+    def before_step(self):
+        """Aanroepen vóór elke physics stap (start de klok bij de eerste stap)"""
+        if self._wall_start is None:
+            self._wall_origin = self._wall_start = self._last_wall = self._last_frame_wall = self._clock()
+    
+    def after_step(self):
+        """Aanroepen na elke physics stap; wacht op frame grenzen op de wall-clock"""
+        self.sim_steps += 1
+        now = self._last_wall = self._clock()
+        if self.sim_steps % self.frame_interval_steps != 0:
+            return
+        
+        self.frames += 1
+        if self.paced:
+            target = self._target_time(self.sim_steps)
+            lag = now - target
+            if lag < 0:
+                self._sleep(-lag)
+                now = self._last_wall = self._clock()
+            else:
+                # Achterstand alleen rapporteren, het frame schema blijft gelijk
+                if lag > self.frame_interval_steps * self.wall_step:
+                    self.frames_late += 1
+                if lag > self.max_lag:
+                    # Te ver achter (bijv. na pauze): schema opnieuw ankeren
+                    self._wall_start += lag
+                    self.resyncs += 1
+        
+        # Jitter: afwijking van de frame interval t.o.v. het doel
+        # (bij "fast" t.o.v. de gemiddelde frame interval tot nu toe)
+        interval = now - self._last_frame_wall
+        self._last_frame_wall = now
+        self._interval_sum += interval
+        self._jitter_count += 1
+        if self.paced:
+            expected = self.frame_interval_steps * self.wall_step
+        else:
+            expected = self._interval_sum / self._jitter_count
+        deviation = abs(interval - expected)
+        self._jitter_sum += deviation
+        self._jitter_max = max(self._jitter_max, deviation)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Haal pacing statistieken op
+        
+        Returns:
+            Dict met mode, sim_time, wall_time, real_time_factor, frames,
+            frames_late, resyncs, frame_jitter_mean_ms en frame_jitter_max_ms
+        """
+        sim_time = self.sim_steps * self.timestep
+        wall_time = (self._last_wall - self._wall_origin) if self._wall_origin is not None else 0.0
+        return {
+            "mode": self.mode,
+            "sim_time": sim_time,
+            "wall_time": wall_time,
+            "real_time_factor": sim_time / wall_time if wall_time > 0 else 0.0,
+            "frames": self.frames,
+            "frames_late": self.frames_late,
+            "resyncs": self.resyncs,
+            "frame_jitter_mean_ms": 1000.0 * self._jitter_sum / max(1, self._jitter_count),
+            "frame_jitter_max_ms": 1000.0 * self._jitter_max,
+        }
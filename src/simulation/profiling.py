@@ -0,0 +1,156 @@
+"""
+Profiling van simulator en RL environment stappen
+
+Meet per fase (physics, observatie, reward, ...) hoeveel tijd een stap kost
+en telt PyBullet API calls. Uitgeschakeld kost een fase alleen het ophalen
+van een gedeelde lege context manager.
+"""
+
+import time
+from contextlib import nullcontext
+from typing import Any, Dict
+
+_NULL_PHASE = nullcontext()
+
+
+class _PhaseTimer:
+    """Herbruikbare timer voor één fase"""
+    
+    __slots__ = ("profiler", "name", "start")
+    
+    def __init__(self, profiler: "StepProfiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        elapsed = time.perf_counter() - self.start
+        profiler = self.profiler
+        profiler.phase_totals[self.name] = profiler.phase_totals.get(self.name, 0.0) + elapsed
+        profiler._current_step[self.name] = profiler._current_step.get(self.name, 0.0) + elapsed
+        return False
+
+
+class StepProfiler:
+    """
+    Verzamelt fase timings en API call tellingen per stap
+    
+    Gebruik:
+        with profiler.phase("physics"):
+            p.stepSimulation(...)
+        profiler.count("stepSimulation")
+        profiler.end_step()
+    
+    Fases mogen genest zijn (bijv. "step" rond alle andere fases); het
+    rapport toont elke fase los.
+    """
+    
+    def __init__(self, enabled: bool = False):
+        """
+        Initialiseer profiler
+        
+        Args:
+            enabled: Start met meten (False = vrijwel geen overhead)
+        """
+        self.enabled = enabled
+        self._timers: Dict[str, _PhaseTimer] = {}
+        self.reset()
+    
+    def reset(self):
+        """Wis alle metingen"""
+        self.steps = 0
+        self.phase_totals: Dict[str, float] = {}
+        self.api_calls: Dict[str, int] = {}
+        self.last_step: Dict[str, float] = {}  # Fase timings van de laatste stap
+        self._current_step: Dict[str, float] = {}
+    
+    def phase(self, name: str):
+        """
+        Context manager die de tijd van een fase meet
+        
+        Args:
+            name: Naam van de fase
+        
+        Returns:
+            Context manager (gedeelde no-op als profiling uit staat)
+        """
+        if not self.enabled:
+            return _NULL_PHASE
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _PhaseTimer(self, name)
+        return timer
+    
+    def count(self, api: str, calls: int = 1):
+        """
+        Tel PyBullet API calls
+        
+        Args:
+            api: Naam van de PyBullet functie
+            calls: Aantal calls
+        """
+        if self.enabled:
+            self.api_calls[api] = self.api_calls.get(api, 0) + calls
+    
+    def end_step(self):
+        """Markeer het einde van een (environment) stap"""
+        if self.enabled:
+            self.steps += 1
+            self.last_step = self._current_step
+            self._current_step = {}
+    
+    def report(self) -> Dict[str, Any]:
+        """
+        Geaggregeerde metingen
+        
+        Returns:
+            Dict met steps, phases ({naam: {total_s, mean_us}}) en
+            api_calls_per_step ({naam: gemiddeld aantal calls per stap})
+        """
+        steps = max(1, self.steps)
+        return {
+            "steps": self.steps,
+            "phases": {
+                name: {"total_s": total, "mean_us": 1e6 * total / steps}
+                for name, total in sorted(self.phase_totals.items(), key=lambda item: -item[1])
+            },
+            "api_calls_per_step": {
+                name: calls / steps
+                for name, calls in sorted(self.api_calls.items(), key=lambda item: -item[1])
+            },
+        }
+    
+    def merge_report(self, report: Dict[str, Any]):
+        """
+        Tel een rapport van een andere profiler (bijv. ander proces) op
+        
+        Args:
+            report: Resultaat van report()
+        """
+        self.steps += report["steps"]
+        for name, phase in report["phases"].items():
+            self.phase_totals[name] = self.phase_totals.get(name, 0.0) + phase["total_s"]
+        for name, calls_per_step in report["api_calls_per_step"].items():
+            calls = calls_per_step * max(1, report["steps"])
+            self.api_calls[name] = self.api_calls.get(name, 0) + calls
+    
+    def format_report(self) -> str:
+        """
+        Rapport als leesbare tabel
+        
+        Returns:
+            Tekst met per fase de gemiddelde tijd per stap en de API calls
+        """
+        report = self.report()
+        lines = [f"Profiel over {report['steps']} stappen:"]
+        lines.append(f"  {'fase':<30} {'µs/stap':>10} {'totaal (s)':>12}")
+        for name, phase in report["phases"].items():
+            lines.append(f"  {name:<30} {phase['mean_us']:>10.1f} {phase['total_s']:>12.3f}")
+        lines.append(f"  {'PyBullet API':<30} {'calls/stap':>10}")
+        for name, calls in report["api_calls_per_step"].items():
+            lines.append(f"  {name:<30} {calls:>10.2f}")
+        return "\n".join(lines)
@@ -0,0 +1,230 @@
+"""
+Domain randomization voor de Go2 simulator
+
+Per episode worden dynamica en motor parameters van één robot opnieuw
+getrokken, zodat een policy niet overfit op één exacte simulator:
+- friction: schaal op de laterale frictie van alle robot links
+- mass_scale: schaal per link op massa en traagheid
+- payload: extra massa op de base in kg
+- motor_strength: schaal per joint op de maximale motor kracht
+- kp, kd: schaal op de position/velocity gains van de motoren
+- latency: vertraging van joint targets in seconden (afgerond op physics stappen)
+- gravity_tilt: maximale kanteling van de zwaartekracht in graden
+
+Alles wordt toegepast op de bestaande bodies (changeDynamics en de motor
+parameters van de simulator); de URDF wordt nooit opnieuw geladen. De
+nominale waarden worden één keer gelezen, daarna kost een nieuwe trekking
+één changeDynamics call per link.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pybullet as p
+
+from .go2_simulator import DEFAULT_POSITION_GAIN, DEFAULT_VELOCITY_GAIN
+
+RANDOMIZATION_TYPES = (
+    "friction", "mass_scale", "payload", "motor_strength", "kp", "kd", "latency", "gravity_tilt",
+)
+
+# Standaard bereik (laag, hoog) per parameter
+DEFAULT_RANDOMIZATION: Dict[str, Tuple[float, float]] = {
+    "friction": (0.5, 1.25),
+    "mass_scale": (0.9, 1.1),
+    "payload": (0.0, 1.0),
+    "motor_strength": (0.8, 1.2),
+    "kp": (0.8, 1.2),
+    "kd": (0.8, 1.2),
+    "latency": (0.0, 0.02),
+    "gravity_tilt": (0.0, 2.0),
+}
+
+
+def randomization_ranges(config: Dict[str, Optional[Tuple[float, float]]]) -> Dict[str, Tuple[float, float]]:
+    """
+    Controleer een randomization configuratie en vul de standaard bereiken in
+    
+    Args:
+        config: Parameter naam -> (laag, hoog) of None (standaard bereik)
+    
+    Returns:
+        Parameter naam -> (laag, hoog), in de volgorde van RANDOMIZATION_TYPES
+    """
+    unknown = [name for name in config if name not in RANDOMIZATION_TYPES]
+    if unknown:
+        raise ValueError(
+            f"Onbekende randomization parameter(s): {', '.join(unknown)} "
+            f"(kies uit {', '.join(RANDOMIZATION_TYPES)})"
+        )
+    merged = {}
+    for name in RANDOMIZATION_TYPES:
+        if name in config:
+            low, high = config[name] if config[name] is not None else DEFAULT_RANDOMIZATION[name]
+            if low > high:
+                raise ValueError(f"Ongeldig bereik voor {name}: ({low}, {high})")
+            merged[name] = (float(low), float(high))
+    return merged
+
+
+class DomainRandomizer:
+    """
+    Trekt en past per episode dynamica parameters toe op één robot
+    
+    sample() trekt alle parameters uit de configuratie met de gegeven
+    random generator en past ze direct toe; params bevat daarna één
+    waarde per parameter (per-link en per-joint waarden als gemiddelde)
+    voor logging. Parameters die niet in de configuratie staan blijven
+    nominaal.
+    """
+    
+    def __init__(
+        self,
+        sim,
+        robot_index: int = 0,
+        config: Optional[Dict[str, Optional[Tuple[float, float]]]] = None,
+        timestep: float = 1.0 / 240.0,
+        apply_gravity: bool = True
+    ):
+        """
+        Initialiseer randomizer en lees de nominale dynamica
+        
+        Args:
+            sim: Go2Simulator
+            robot_index: Te randomizen robot
+            config: Parameter naam -> (laag, hoog) of None voor het standaard
+                bereik (zie DEFAULT_RANDOMIZATION); None = alle parameters
+            timestep: Physics tijdstap (voor het omrekenen van latency)
+            apply_gravity: Pas gravity_tilt toe. De zwaartekracht geldt voor
+                de hele simulator, dus in een gedeelde simulator staat dit uit
+        """
+        self.sim = sim
+        self.robot_index = robot_index
+        self.robot_id = sim.robot_ids[robot_index]
+        self.timestep = timestep
+        self.apply_gravity = apply_gravity
+        if config is None:
+            config = {name: None for name in RANDOMIZATION_TYPES}
+        self.config = randomization_ranges(config)
+        
+        # Nominale dynamica, één keer gelezen
+        client = sim.client
+        self.links = list(range(-1, p.getNumJoints(self.robot_id, physicsClientId=client)))
+        dynamics = [p.getDynamicsInfo(self.robot_id, link, physicsClientId=client) for link in self.links]
+        self.nominal_masses = np.array([info[0] for info in dynamics])
+        self.nominal_friction = np.array([info[1] for info in dynamics])
+        self.nominal_inertia = np.array([info[2] for info in dynamics])
+        self.nominal_forces = sim.default_joint_forces.copy()
+        num_joints = len(self.nominal_forces)
+        
+        # Huidige trekking
+        self.params: Dict[str, float] = {}
+        self.latency_steps = 0
+        self._mass_scales = np.ones(len(self.links))
+        self._motor_scales = np.ones(num_joints)
+    
+    def sample(self, rng: np.random.Generator) -> Dict[str, float]:
+        """
+        Trek nieuwe parameters en pas ze toe
+        
+        Args:
+            rng: Random generator (bijv. env.np_random, voor reproduceerbaarheid)
+        
+        Returns:
+            self.params (parameter naam -> getrokken waarde)
+        """
+        config = self.config
+        params = {}
+        
+        friction = 1.0
+        if "friction" in config:
+            friction = rng.uniform(*config["friction"])
+            params["friction"] = friction
+        
+        self._mass_scales[:] = 1.0
+        if "mass_scale" in config:
+            self._mass_scales[:] = rng.uniform(*config["mass_scale"], size=len(self.links))
+            params["mass_scale"] = float(self._mass_scales.mean())
+        
+        payload = 0.0
+        if "payload" in config:
+            payload = rng.uniform(*config["payload"])
+            params["payload"] = payload
+        
+        self._motor_scales[:] = 1.0
+        if "motor_strength" in config:
+            self._motor_scales[:] = rng.uniform(*config["motor_strength"], size=len(self._motor_scales))
+            params["motor_strength"] = float(self._motor_scales.mean())
+        
+        kp = kd = 1.0
+        if "kp" in config:
+            kp = rng.uniform(*config["kp"])
+            params["kp"] = kp
+        if "kd" in config:
+            kd = rng.uniform(*config["kd"])
+            params["kd"] = kd
+        
+        self.latency_steps = 0
+        if "latency" in config:
+            self.latency_steps = int(round(rng.uniform(*config["latency"]) / self.timestep))
+            params["latency"] = self.latency_steps * self.timestep
+        
+        tilt = direction = 0.0
+        if "gravity_tilt" in config:
+            # Altijd trekken: dezelfde seed geeft dezelfde reeks, met of zonder gravity
+            tilt = rng.uniform(*config["gravity_tilt"])
+            direction = rng.uniform(0.0, 2.0 * np.pi)
+            if not self.apply_gravity:
+                tilt = 0.0
+            params["gravity_tilt"] = tilt
+        
+        self._apply(friction, payload, kp, kd, tilt, direction)
+        self.params = {name: float(value) for name, value in params.items()}
+        return self.params
+    
+    def _apply(self, friction: float, payload: float, kp: float, kd: float, tilt: float, direction: float):
+        """Pas een trekking toe op de bestaande bodies en motoren"""
+        client = self.sim.client
+        masses = self.nominal_masses * self._mass_scales
+        masses[0] += payload  # Link -1 = base
+        for i, link in enumerate(self.links):
+            if self.nominal_masses[i] > 0:
+                # Traagheid schaalt mee met de massa (zelfde vorm)
+                inertia = self.nominal_inertia[i] * (masses[i] / self.nominal_masses[i])
+                p.changeDynamics(
+                    self.robot_id, link,
+                    mass=masses[i],
+                    localInertiaDiagonal=inertia,
+                    lateralFriction=self.nominal_friction[i] * friction,
+                    physicsClientId=client
+                )
+            else:
+                p.changeDynamics(
+                    self.robot_id, link,
+                    lateralFriction=self.nominal_friction[i] * friction,
+                    physicsClientId=client
+                )
+        self.sim.profiler.count("changeDynamics", len(self.links))
+        
+        r = self.robot_index
+        self.sim.joint_forces[r] = self.nominal_forces * self._motor_scales
+        self.sim.position_gains[r] = DEFAULT_POSITION_GAIN * kp
+        self.sim.velocity_gains[r] = DEFAULT_VELOCITY_GAIN * kd
+        
+        if self.apply_gravity:
+            angle = np.radians(tilt)
+            g = self.sim.gravity
+            p.setGravity(
+                g * np.sin(angle) * np.cos(direction),
+                g * np.sin(angle) * np.sin(direction),
+                g * np.cos(angle),
+                physicsClientId=client
+            )
+    
+    def restore(self):
+        """Zet de robot terug naar zijn nominale dynamica"""
+        self._mass_scales[:] = 1.0
+        self._motor_scales[:] = 1.0
+        self._apply(1.0, 0.0, 1.0, 1.0, 0.0, 0.0)
+        self.params = {}
+        self.latency_steps = 0
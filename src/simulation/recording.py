@@ -0,0 +1,392 @@
+"""
+Rollout opname naar memory-mapped kolom bestanden
+
+RolloutRecorder is een gymnasium wrapper die elke transitie van een Go2
+environment wegschrijft, voor offline analyse, behavior cloning en het
+uitzoeken van vallen. Per stap worden alleen rijen in voorgealloceerde
+memmaps gezet; er blijft niets in het geheugen staan, dus een opname kan
+honderden miljoenen transities bevatten.
+
+Layout van een opname map:
+- index.json: kolommen (dtype en vorm per rij), chunks met hun aantal
+  rijen, observatie velden en reward termen
+- chunk_00000/<kolom>.npy: chunk_size rijen per kolom (sparse aangemaakt)
+- chunk_00000/episodes.npy: episodes die in deze chunk eindigen, met de
+  eerste rij, lengte, return, terminated en fallen
+
+Kolommen: obs (observatie vóór de actie), action, reward, terminated,
+truncated, episode en step; optioneel reward_terms (gewogen term per stap,
+volgorde in index.json) en contacts (vlag per voet na de stap). De
+observatie na de laatste stap van een episode wordt niet opgeslagen.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import gymnasium as gym
+
+from .sensors import NUM_FEET
+
+INDEX_FILE = "index.json"
+EPISODES_FILE = "episodes.npy"  # Per chunk
+
+EPISODE_DTYPE = np.dtype([
+    ("start", np.int64),
+    ("length", np.int64),
+    ("return", np.float64),
+    ("terminated", np.bool_),
+    ("fallen", np.bool_),
+])
+
+
+def _write_json(path: str, data: Dict):
+    """Schrijf JSON atomisch (eerst naast het doel, dan hernoemen)"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class RolloutRecorder(gym.Wrapper):
+    """
+    Schrijft elke transitie van een Go2RLEnv of Go2StairsEnv naar schijf
+    
+    Elke chunk heeft per kolom één .npy bestand van chunk_size rijen, als
+    memmap geopend; een stap kopieert alleen de nieuwe rij. index.json wordt
+    bij elke nieuwe chunk, flush() en close() bijgewerkt; rijen na de
+    laatste index update gaan bij een crash verloren.
+    """
+    
+    def __init__(
+        self,
+        env: gym.Env,
+        directory: str,
+        chunk_size: int = 1_000_000,
+        record_reward_terms: bool = False,
+        record_contacts: bool = False,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            env: Go2RLEnv of Go2StairsEnv (of een wrapper daaromheen)
+            directory: Opname map (wordt aangemaakt; een bestaande opname wordt aangevuld)
+            chunk_size: Rijen per chunk bestand
+            record_reward_terms: Sla de gewogen reward termen per stap op
+            record_contacts: Sla de voet contacten na elke stap op
+            metadata: Extra JSON informatie voor index.json (bijv. model pad)
+        """
+        super().__init__(env)
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size moet >= 1 zijn, niet {chunk_size}")
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.record_reward_terms = record_reward_terms
+        self.record_contacts = record_contacts
+        
+        base = self._base = env.unwrapped
+        self.reward_terms: List[str] = list(base.reward_fn.names) if record_reward_terms else []
+        self._term_sums = np.zeros(len(self.reward_terms))
+        
+        self.columns: Dict[str, Dict[str, Any]] = {
+            "obs": {"dtype": np.dtype(env.observation_space.dtype).str, "shape": list(env.observation_space.shape)},
+            "action": {"dtype": np.dtype(np.float32).str, "shape": list(env.action_space.shape)},
+            "reward": {"dtype": np.dtype(np.float32).str, "shape": []},
+            "terminated": {"dtype": np.dtype(np.bool_).str, "shape": []},
+            "truncated": {"dtype": np.dtype(np.bool_).str, "shape": []},
+            "episode": {"dtype": np.dtype(np.int64).str, "shape": []},
+            "step": {"dtype": np.dtype(np.int32).str, "shape": []},
+        }
+        if record_reward_terms:
+            self.columns["reward_terms"] = {"dtype": np.dtype(np.float32).str, "shape": [len(self.reward_terms)]}
+        if record_contacts:
+            self.columns["contacts"] = {"dtype": np.dtype(np.bool_).str, "shape": [NUM_FEET]}
+        
+        obs_slices = getattr(base, "obs_slices", {})
+        self.index: Dict[str, Any] = {
+            "env": type(base).__name__,
+            "chunk_size": chunk_size,
+            "columns": self.columns,
+            "obs_fields": {name: [s.start, s.stop] for name, s in obs_slices.items()},
+            "reward_terms": self.reward_terms,
+            "chunks": [],
+            "num_rows": 0,
+            "num_episodes": 0,
+            "metadata": metadata or {},
+        }
+        self._episodes: List[tuple] = []  # Afgelopen episodes die nog niet geschreven zijn
+        
+        os.makedirs(directory, exist_ok=True)
+        index_path = os.path.join(directory, INDEX_FILE)
+        if os.path.exists(index_path):
+            # Bestaande opname aanvullen: zelfde kolommen vereist
+            with open(index_path, "r") as f:
+                previous = json.load(f)
+            if previous["columns"] != json.loads(json.dumps(self.columns)):
+                raise ValueError(f"Opname in {directory} heeft andere kolommen, kies een nieuwe map")
+            self.index.update({key: previous[key] for key in ("chunks", "num_rows", "num_episodes")})
+            self.chunk_size = self.index["chunk_size"] = previous["chunk_size"]
+        
+        self._chunk: Optional[Dict[str, np.ndarray]] = None
+        self._memmaps: Dict[str, np.memmap] = {}
+        self._row = 0  # Volgende vrije rij in de huidige chunk
+        self._obs: Optional[np.ndarray] = None
+        self._episode = 0
+        self._episode_start = 0
+        self._episode_return = 0.0
+        self._episode_step = 0
+    
+    @property
+    def num_rows(self) -> int:
+        """Aantal opgeslagen transities (inclusief de huidige chunk)"""
+        return self.index["num_rows"] + self._row
+    
+    def _open_chunk(self):
+        """Maak de volgende chunk bestanden (sparse, op volle grootte)"""
+        path = os.path.join(self.directory, f"chunk_{len(self.index['chunks']):05d}")
+        os.makedirs(path, exist_ok=True)
+        self._memmaps = {
+            name: np.lib.format.open_memmap(
+                os.path.join(path, f"{name}.npy"),
+                mode="w+",
+                dtype=np.dtype(column["dtype"]),
+                shape=(self.chunk_size, *column["shape"])
+            )
+            for name, column in self.columns.items()
+        }
+        # Gewone ndarray views: rij toewijzingen zonder memmap subclass overhead
+        self._chunk = {name: np.asarray(array) for name, array in self._memmaps.items()}
+        self.index["chunks"].append({"path": os.path.basename(path), "rows": 0})
+        self._row = 0
+    
+    def _close_chunk(self):
+        """Schrijf de huidige chunk weg en neem zijn rijen op in de index"""
+        if self._chunk is None:
+            return
+        for array in self._memmaps.values():
+            array.flush()
+        self._write_episodes()
+        self.index["chunks"][-1]["rows"] = self._row
+        self.index["num_rows"] += self._row
+        self._chunk = None
+        self._memmaps = {}
+        self._row = 0
+    
+    def reset(self, **kwargs):
+        """Reset de environment en begin een nieuwe episode in de opname"""
+        if self._episode_step > 0:
+            # Afgebroken episode: zonder terminated afsluiten
+            self._end_episode(terminated=False)
+        obs, info = self.env.reset(**kwargs)
+        self._obs = obs
+        self._episode = self.index["num_episodes"]
+        self._episode_start = self.num_rows
+        self._episode_return = 0.0
+        self._episode_step = 0
+        self._term_sums[:] = 0.0
+        return obs, info
+    
+    def step(self, action):
+        """Voer de actie uit en schrijf de transitie weg"""
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        
+        if self._chunk is None:
+            self._open_chunk()
+        chunk, row = self._chunk, self._row
+        chunk["obs"][row] = self._obs
+        chunk["action"][row] = action
+        chunk["reward"][row] = reward
+        chunk["terminated"][row] = terminated
+        chunk["truncated"][row] = truncated
+        chunk["episode"][row] = self._episode
+        chunk["step"][row] = self._episode_step
+        if self.record_reward_terms:
+            # De environment houdt sommen over de episode bij; het verschil is deze stap
+            sums = self._base.reward_term_sums
+            np.subtract(sums, self._term_sums, out=chunk["reward_terms"][row], casting="same_kind")
+            self._term_sums[:] = sums
+        if self.record_contacts:
+            chunk["contacts"][row] = self._base.foot_contacts()
+        
+        self._row += 1
+        self._obs = obs
+        self._episode_return += float(reward)
+        self._episode_step += 1
+        if terminated or truncated:
+            self._end_episode(terminated=bool(terminated))
+        if self._row == self.chunk_size:
+            self._close_chunk()
+            self._write_index()
+        return obs, reward, terminated, truncated, info
+    
+    def _end_episode(self, terminated: bool):
+        """Voeg de afgelopen episode toe aan de episode tabel"""
+        base = self._base
+        fallen = bool(base.has_fallen()) if hasattr(base, "has_fallen") and base.sim is not None else False
+        self._episodes.append(
+            (self._episode_start, self._episode_step, self._episode_return, terminated, fallen)
+        )
+        self.index["num_episodes"] += 1
+        self._episode_step = 0
+    
+    def _write_episodes(self):
+        """Voeg afgelopen episodes toe aan de episode tabel van de laatste chunk"""
+        if not self._episodes or not self.index["chunks"]:
+            return
+        path = os.path.join(self.directory, self.index["chunks"][-1]["path"], EPISODES_FILE)
+        episodes = np.array(self._episodes, dtype=EPISODE_DTYPE)
+        if os.path.exists(path):
+            episodes = np.concatenate([np.load(path), episodes])
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, episodes)
+        os.replace(tmp_path, path)
+        self._episodes = []
+    
+    def _write_index(self):
+        """Schrijf de resterende episodes en daarna index.json"""
+        self._write_episodes()
+        _write_json(os.path.join(self.directory, INDEX_FILE), self.index)
+    
+    def flush(self):
+        """
+        Maak alle transities tot nu toe zichtbaar voor RolloutReader
+        
+        Sluit de huidige chunk af; de volgende stap begint een nieuwe.
+        """
+        self._close_chunk()
+        self._write_index()
+    
+    def close(self):
+        """Schrijf de opname weg en sluit de environment"""
+        if self._episode_step > 0:
+            self._end_episode(terminated=False)
+        self.flush()
+        super().close()
+
+
+class RolloutReader:
+    """
+    Leest een opname van RolloutRecorder zonder alles in het geheugen te laden
+    
+    Kolommen worden per chunk als read-only memmap geopend; column() en
+    episode() kopiëren alleen wat gevraagd wordt.
+    """
+    
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Opname map met index.json
+        """
+        path = os.path.join(directory, INDEX_FILE)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Geen opname gevonden in {directory} ({INDEX_FILE} ontbreekt)")
+        self.directory = directory
+        with open(path, "r") as f:
+            self.index = json.load(f)
+        self.columns: List[str] = list(self.index["columns"])
+        self.reward_terms: List[str] = self.index["reward_terms"]
+        self.obs_fields: Dict[str, slice] = {
+            name: slice(start, stop) for name, (start, stop) in self.index["obs_fields"].items()
+        }
+        # Eerste rij van elke chunk, voor het opzoeken van rij bereiken
+        rows = [chunk["rows"] for chunk in self.index["chunks"]]
+        self._chunk_starts = np.concatenate([[0], np.cumsum(rows)]).astype(np.int64)
+        self._chunks: Dict[int, Dict[str, np.ndarray]] = {}
+        self._episodes: Optional[np.ndarray] = None
+    
+    def __len__(self) -> int:
+        """Aantal transities"""
+        return self.index["num_rows"]
+    
+    @property
+    def episodes(self) -> np.ndarray:
+        """Episode tabel (structured array met start, length, return, terminated, fallen)"""
+        if self._episodes is None:
+            tables = [np.zeros(0, dtype=EPISODE_DTYPE)]
+            for chunk in self.index["chunks"]:
+                path = os.path.join(self.directory, chunk["path"], EPISODES_FILE)
+                if os.path.exists(path):
+                    tables.append(np.load(path))
+            # Alleen episodes uit de index (niet van na de laatste index update)
+            self._episodes = np.concatenate(tables)[:self.index["num_episodes"]]
+        return self._episodes
+    
+    def _chunk(self, i: int) -> Dict[str, np.ndarray]:
+        """Memmaps van chunk i, ingekort tot de geschreven rijen"""
+        if i not in self._chunks:
+            chunk = self.index["chunks"][i]
+            path = os.path.join(self.directory, chunk["path"])
+            self._chunks[i] = {
+                name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")[:chunk["rows"]]
+                for name in self.columns
+            }
+        return self._chunks[i]
+    
+    def iter_chunks(self, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Loop in volgorde over alle chunks (memmap views, niets gekopieerd)
+        
+        Args:
+            columns: Kolommen (None = alle)
+        
+        Yields:
+            Kolom naam -> array met de rijen van één chunk
+        """
+        for i in range(len(self.index["chunks"])):
+            chunk = self._chunk(i)
+            yield {name: chunk[name] for name in (columns or self.columns)}
+    
+    def rows(self, start: int, stop: int, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Rijen [start, stop) als arrays, ook over chunk grenzen heen
+        
+        Args:
+            start: Eerste rij
+            stop: Rij na de laatste
+            columns: Kolommen (None = alle)
+        
+        Returns:
+            Kolom naam -> kopie van de rijen
+        """
+        columns = list(columns or self.columns)
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in columns}
+        first = int(np.searchsorted(self._chunk_starts, start, side="right")) - 1
+        for i in range(max(first, 0), len(self.index["chunks"])):
+            chunk_start = self._chunk_starts[i]
+            if chunk_start >= stop:
+                break
+            local = slice(max(start - chunk_start, 0), min(stop - chunk_start, self.index["chunks"][i]["rows"]))
+            chunk = self._chunk(i)
+            for name in columns:
+                parts[name].append(chunk[name][local])
+        return {
+            name: np.concatenate(arrays) if arrays else np.zeros(
+                (0, *self.index["columns"][name]["shape"]), dtype=self.index["columns"][name]["dtype"]
+            )
+            for name, arrays in parts.items()
+        }
+    
+    def column(self, name: str) -> np.ndarray:
+        """Eén kolom over de hele opname (kopie in het geheugen)"""
+        return self.rows(0, len(self), [name])[name]
+    
+    def episode(self, i: int, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Alle transities van episode i
+        
+        Args:
+            i: Episode nummer (index in de episode tabel)
+            columns: Kolommen (None = alle)
+        
+        Returns:
+            Kolom naam -> array met één rij per stap
+        """
+        episode = self.episodes[i]
+        start = int(episode["start"])
+        return self.rows(start, start + int(episode["length"]), columns)
+    
+    def obs_field(self, obs: np.ndarray, name: str) -> np.ndarray:
+        """Benoemd observatie veld (zie Go2BaseEnv.obs_slices)"""
+        return obs[..., self.obs_fields[name]]
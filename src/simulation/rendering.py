@@ -0,0 +1,215 @@
+"""
+Offscreen rendering en video opname voor de Go2 simulatie
+
+Rendert camerabeelden zonder GUI via PyBullet's TinyRenderer, zodat
+evaluatie video's ook op headless machines gemaakt kunnen worden.
+"""
+
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+try:
+    import pybullet as p
+except ImportError:
+    raise ImportError(
+        "PyBullet niet geïnstalleerd. Installeer met: pip install pybullet"
+    )
+
+
+class OffscreenRenderer:
+    """
+    Offscreen camera voor één physics client
+    
+    View en projectie matrices worden gecachet en alleen herberekend als de
+    camera verandert. Het RGB beeld wordt in een vaste buffer geschreven die
+    bij elke render() hergebruikt wordt; kopieer het beeld als het bewaard
+    moet blijven.
+    """
+    
+    def __init__(
+        self,
+        client: int,
+        width: int = 320,
+        height: int = 240,
+        fov: float = 60.0,
+        distance: float = 1.5,
+        yaw: float = 45.0,
+        pitch: float = -20.0,
+        target: Sequence[float] = (0.0, 0.0, 0.3),
+        frame_skip: int = 1,
+        near: float = 0.05,
+        far: float = 20.0
+    ):
+        """
+        Initialiseer offscreen renderer
+        
+        Args:
+            client: PyBullet physics client ID
+            width: Beeldbreedte in pixels
+            height: Beeldhoogte in pixels
+            fov: Verticale field of view in graden
+            distance: Afstand van camera tot target (meter)
+            yaw: Camera yaw in graden
+            pitch: Camera pitch in graden
+            target: Punt waar de camera naar kijkt [x, y, z]
+            frame_skip: Render alleen elke N-de aanroep; tussenliggende
+                aanroepen geven het vorige beeld terug
+            near: Near clipping plane (meter)
+            far: Far clipping plane (meter)
+        """
+        if frame_skip < 1:
+            raise ValueError(f"frame_skip moet >= 1 zijn, niet {frame_skip}")
+        
+        self.client = client
+        self.width = width
+        self.height = height
+        self.frame_skip = frame_skip
+        self.distance = distance
+        self.yaw = yaw
+        self.pitch = pitch
+        self.target = tuple(target)
+        
+        self._projection_matrix = p.computeProjectionMatrixFOV(
+            fov=fov, aspect=width / height, nearVal=near, farVal=far, physicsClientId=client
+        )
+        self._view_matrix = self._compute_view_matrix()
+        
+        self._buffer = np.zeros((height, width, 3), dtype=np.uint8)
+        self._calls = 0
+        self.frames_rendered = 0
+        self.new_frame = False
+    
+    def _compute_view_matrix(self):
+        """Bereken view matrix voor de huidige camera instellingen"""
+        return p.computeViewMatrixFromYawPitchRoll(
+            cameraTargetPosition=self.target,
+            distance=self.distance,
+            yaw=self.yaw,
+            pitch=self.pitch,
+            roll=0,
+            upAxisIndex=2,
+            physicsClientId=self.client
+        )
+    
+    def set_camera(
+        self,
+        target: Optional[Sequence[float]] = None,
+        distance: Optional[float] = None,
+        yaw: Optional[float] = None,
+        pitch: Optional[float] = None
+    ):
+        """
+        Pas camera aan (view matrix wordt alleen bij wijziging herberekend)
+        
+        Args:
+            target: Nieuw camera target [x, y, z] (None = ongewijzigd)
+            distance: Nieuwe afstand (None = ongewijzigd)
+            yaw: Nieuwe yaw in graden (None = ongewijzigd)
+            pitch: Nieuwe pitch in graden (None = ongewijzigd)
+        """
+        camera = (
+            self.target if target is None else tuple(target),
+            self.distance if distance is None else distance,
+            self.yaw if yaw is None else yaw,
+            self.pitch if pitch is None else pitch,
+        )
+        if camera != (self.target, self.distance, self.yaw, self.pitch):
+            self.target, self.distance, self.yaw, self.pitch = camera
+            self._view_matrix = self._compute_view_matrix()
+    
+    def render(self, target: Optional[Sequence[float]] = None) -> np.ndarray:
+        """
+        Render een RGB beeld
+        
+        Args:
+            target: Camera target voor dit beeld, bijv. de robot positie
+                (None = huidig target)
+        
+        Returns:
+            (height, width, 3) uint8 array (hergebruikte buffer)
+        """
+        self._calls += 1
+        self.new_frame = (self._calls - 1) % self.frame_skip == 0
+        if not self.new_frame:
+            return self._buffer
+        
+        if target is not None:
+            self.set_camera(target=target)
+        
+        _, _, rgba, _, _ = p.getCameraImage(
+            self.width,
+            self.height,
+            viewMatrix=self._view_matrix,
+            projectionMatrix=self._projection_matrix,
+            renderer=p.ER_TINY_RENDERER,
+            flags=p.ER_NO_SEGMENTATION_MASK,
+            physicsClientId=self.client
+        )
+        self._buffer[:] = np.reshape(rgba, (self.height, self.width, 4))[:, :, :3]
+        self.frames_rendered += 1
+        return self._buffer
+
+
+class VideoWriter:
+    """
+    Streaming video writer
+    
+    Frames worden direct naar het bestand geschreven (via imageio/ffmpeg),
+    zodat een hele episode niet in het geheugen bewaard hoeft te worden.
+    """
+    
+    def __init__(self, path: str, fps: float = 30.0):
+        """
+        Open video bestand voor schrijven
+        
+        Args:
+            path: Pad naar video bestand (.mp4, .gif, ...)
+            fps: Frames per seconde van de video
+        """
+        try:
+            import imageio
+        except ImportError:
+            raise ImportError(
+                "imageio niet geïnstalleerd. Installeer met: pip install imageio imageio-ffmpeg"
+            )
+        
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fps = fps
+        self.frames_written = 0
+        
+        suffix = self.path.suffix.lower()
+        if suffix in (".mp4", ".mkv", ".avi", ".mov"):
+            # Geen resize naar veelvoud van 16 pixels
+            kwargs = {"fps": fps, "macro_block_size": 1}
+        elif suffix == ".gif":
+            kwargs = {"duration": 1000.0 / fps}  # Frame duur in ms
+        else:
+            kwargs = {"fps": fps}
+        self._writer = imageio.get_writer(str(self.path), **kwargs)
+    
+    def append(self, frame: np.ndarray):
+        """
+        Schrijf één frame
+        
+        Args:
+            frame: (height, width, 3) uint8 RGB beeld
+        """
+        self._writer.append_data(frame)
+        self.frames_written += 1
+    
+    def close(self):
+        """Sluit video bestand"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+    
+    def __enter__(self):
+        """Context manager entry"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        self.close()
@@ -0,0 +1,205 @@
+"""
+Reward termen voor de Go2 RL environments
+
+Elke term is een functie van een dict met gebatchte state arrays (eerste as
+= robots) naar één waarde per robot. Een RewardFunction combineert termen
+met gewichten; reward shaping experimenten zijn zo alleen een andere
+gewichten dict.
+
+De reward wordt één keer per policy stap berekend. Gewone termen zijn een
+rate per physics stap (1/240 s) en worden met time_scale (control_dt /
+sim_dt) vermenigvuldigd, zodat een andere decimation de reward niet
+herschaalt. Event termen (bijv. fallen) tellen één keer per policy stap.
+
+State sleutels:
+    base_position (N, 3), base_linear_velocity (N, 3),
+    base_angular_velocity (N, 3), joint_positions (N, 12),
+    joint_velocities (N, 12), joint_limits (12, 2), target_height (N,)
+    Optioneel: ground_height (N,) (terrain hoogte onder de robot, default 0)
+    Traplopen: next_step_position (N, 3), step_index (N,), num_steps (N,)
+"""
+
+from typing import Callable, Dict, List, Set, Tuple
+
+import numpy as np
+
+
+RewardTerm = Callable[[Dict[str, np.ndarray]], np.ndarray]
+
+REWARD_TERMS: Dict[str, RewardTerm] = {}
+
+# Termen die niet met de duur van een policy stap schalen
+EVENT_TERMS: Set[str] = set()
+
+
+def register_reward_term(name: str, event: bool = False) -> Callable[[RewardTerm], RewardTerm]:
+    """
+    Registreer een reward term onder een naam
+    
+    Gebruik:
+        @register_reward_term("my_term")
+        def my_term(state):
+            return state["base_position"][:, 2]
+    
+    Args:
+        name: Naam van de term (gebruikt in gewichten en info)
+        event: True voor een gebeurtenis (één keer per policy stap), False
+            voor een rate die met time_scale geschaald wordt
+    
+    Returns:
+        Decorator die de functie ongewijzigd teruggeeft
+    """
+    def decorator(term: RewardTerm) -> RewardTerm:
+        if name in REWARD_TERMS:
+            raise ValueError(f"Reward term {name} is al geregistreerd")
+        REWARD_TERMS[name] = term
+        if event:
+            EVENT_TERMS.add(name)
+        return term
+    return decorator
+
+
+@register_reward_term("forward_velocity")
+def forward_velocity(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """Snelheid in x-richting"""
+    return state["base_linear_velocity"][:, 0]
+
+
+@register_reward_term("backward_motion")
+def backward_motion(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """1 als de robot duidelijk achteruit beweegt (< -0.1 m/s)"""
+    return (state["base_linear_velocity"][:, 0] < -0.1).astype(np.float64)
+
+
+@register_reward_term("lateral_velocity")
+def lateral_velocity(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """Absolute zijwaartse snelheid"""
+    return np.abs(state["base_linear_velocity"][:, 1])
+
+
+@register_reward_term("linear_velocity")
+def linear_velocity(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """Grootte van de lineaire snelheid"""
+    return np.linalg.norm(state["base_linear_velocity"], axis=1)
+
+
+@register_reward_term("angular_velocity")
+def angular_velocity(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """Grootte van de hoeksnelheid"""
+    return np.linalg.norm(state["base_angular_velocity"], axis=1)
+
+
+@register_reward_term("height_error")
+def height_error(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """Absolute afwijking van de doelhoogte"""
+    return np.abs(state["base_position"][:, 2] - state["target_height"])
+
+
+@register_reward_term("height_tracking")
+def height_tracking(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """1 op doelhoogte, aflopend naar 0 bij 0.5 m afwijking"""
+    error = np.abs(state["base_position"][:, 2] - state["target_height"])
+    return 1.0 - np.minimum(2.0 * error, 1.0)
+
+
+@register_reward_term("joint_velocity_stability")
+def joint_velocity_stability(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """1 bij stilstaande joints, 0 bij gemiddeld >= 1 rad/s"""
+    return 1.0 - np.minimum(np.mean(np.abs(state["joint_velocities"]), axis=1), 1.0)
+
+
+@register_reward_term("joint_limit_violation")
+def joint_limit_violation(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """Aantal joints buiten hun limits"""
+    positions = state["joint_positions"]
+    limits = state["joint_limits"]
+    outside = (positions < limits[:, 0]) | (positions > limits[:, 1])
+    return np.count_nonzero(outside, axis=1).astype(np.float64)
+
+
+@register_reward_term("fallen", event=True)
+def fallen(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """1 als de robot gevallen is (base lager dan 0.2 m boven de grond)"""
+    height = state["base_position"][:, 2] - state.get("ground_height", 0.0)
+    return (height < 0.2).astype(np.float64)
+
+
+@register_reward_term("survival")
+def survival(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """Constante 1 per stap"""
+    return np.ones(len(state["base_position"]))
+
+
+def _distance_to_step(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """Horizontale afstand tot de volgende trede"""
+    return np.linalg.norm(state["base_position"][:, :2] - state["next_step_position"][:, :2], axis=1)
+
+
+@register_reward_term("step_proximity")
+def step_proximity(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """1 / (1 + afstand tot volgende trede)"""
+    return 1.0 / (1.0 + _distance_to_step(state))
+
+
+@register_reward_term("step_reached", event=True)
+def step_reached(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """1 als de robot op de volgende trede staat"""
+    on_step = state["base_position"][:, 2] > state["next_step_position"][:, 2] - 0.05
+    return ((_distance_to_step(state) < 0.15) & on_step).astype(np.float64)
+
+
+@register_reward_term("top_reached", event=True)
+def top_reached(state: Dict[str, np.ndarray]) -> np.ndarray:
+    """1 als de robot alle treden gehaald heeft"""
+    return (state["step_index"] >= state["num_steps"]).astype(np.float64)
+
+
+class RewardFunction:
+    """
+    Gewogen som van geregistreerde reward termen
+    
+    Termen met gewicht 0 worden niet berekend. compute() werkt op een batch
+    van N robots en geeft naast de totale reward ook de gewogen bijdrage per
+    term terug (voor logging). Rate termen worden met time_scale
+    vermenigvuldigd, event termen niet.
+    """
+    
+    def __init__(self, weights: Dict[str, float], time_scale: float = 1.0):
+        """
+        Initialiseer reward functie
+        
+        Args:
+            weights: Term naam -> gewicht
+            time_scale: Physics stappen per policy stap (control_dt / sim_dt)
+        """
+        unknown = [name for name in weights if name not in REWARD_TERMS]
+        if unknown:
+            raise ValueError(
+                f"Onbekende reward term(en): {', '.join(unknown)} "
+                f"(kies uit {', '.join(sorted(REWARD_TERMS))})"
+            )
+        self.names: List[str] = [name for name, weight in weights.items() if weight != 0]
+        self.weights = np.array([weights[name] for name in self.names], dtype=np.float64)
+        self.time_scale = time_scale
+        # Effectief gewicht per policy stap
+        self._scales = np.array(
+            [weight if name in EVENT_TERMS else weight * time_scale for name, weight in zip(self.names, self.weights)]
+        )
+        self._terms = [REWARD_TERMS[name] for name in self.names]
+    
+    def compute(self, state: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bereken de reward voor een batch robots
+        
+        Args:
+            state: Dict met gebatchte state arrays (zie module docstring)
+        
+        Returns:
+            (rewards (N,), gewogen termen (N, len(names)))
+        """
+        num_robots = len(state["base_position"])
+        values = np.empty((num_robots, len(self._terms)))
+        for j, term in enumerate(self._terms):
+            values[:, j] = term(state)
+        values *= self._scales
+        return values.sum(axis=1), values
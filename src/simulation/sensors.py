@@ -0,0 +1,324 @@
+"""
+Gesimuleerde exteroceptie voor de Go2 simulator
+
+Sensoren:
+- height_scan: raster van grondhoogtes rond de base (t.o.v. de base hoogte)
+- foot_scan: ring van grondhoogtes rond elke voet (t.o.v. de voet hoogte)
+- lidar: 2D ring van afstanden in het horizontale vlak van de base
+- foot_contacts: contact vlag per voet
+
+Alle ray sensoren samen kosten één rayTestBatch call per update en de
+contact vlaggen één getContactPoints call. Rasters en ringen draaien mee met
+de yaw van de base (niet met roll/pitch), zoals een gestabiliseerde sensor.
+Resultaten staan in voorgealloceerde float32 arrays.
+"""
+
+from typing import Dict, List, Optional, Tuple, Any
+
+import numpy as np
+import pybullet as p
+
+SENSOR_TYPES = ("height_scan", "foot_scan", "lidar", "foot_contacts")
+
+# Standaard instellingen per sensor; update_every = elke N-de update()
+DEFAULT_SENSOR_CONFIG: Dict[str, Dict[str, Any]] = {
+    "height_scan": {
+        "size": (1.6, 1.0),     # (lengte in x, breedte in y) in meters
+        "resolution": 0.1,      # Afstand tussen rasterpunten in meters
+        "max_depth": 2.0,       # Rays eindigen zo ver onder de base
+        "update_every": 1,
+    },
+    "foot_scan": {
+        "radius": 0.08,         # Straal van de ring rond elke voet
+        "num_points": 6,
+        "max_depth": 1.0,
+        "update_every": 1,
+    },
+    "lidar": {
+        "num_rays": 32,
+        "max_range": 3.0,       # Blijf onder de afstand tot andere robots
+        "height": 0.0,          # Hoogte t.o.v. de base
+        "update_every": 1,
+    },
+    "foot_contacts": {
+        "update_every": 1,
+    },
+}
+
+# Collision groep van robots met sensoren; rays negeren deze groep zodat
+# de robot zichzelf niet ziet
+ROBOT_COLLISION_GROUP = 4
+
+# Rays starten zo ver boven de base of voet
+RAY_START_HEIGHT = 0.5
+
+NUM_FEET = 4
+
+
+def _merged_config(config: Dict[str, Optional[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Vul sensor configuratie aan met de standaard instellingen"""
+    unknown = [name for name in config if name not in SENSOR_TYPES]
+    if unknown:
+        raise ValueError(
+            f"Onbekende sensor(en): {', '.join(unknown)} (kies uit {', '.join(SENSOR_TYPES)})"
+        )
+    merged = {}
+    for name in SENSOR_TYPES:
+        if name in config:
+            merged[name] = dict(DEFAULT_SENSOR_CONFIG[name])
+            merged[name].update(config[name] or {})
+    return merged
+
+
+def _height_scan_offsets(size: Tuple[float, float], resolution: float) -> np.ndarray:
+    """(N, 2) rasterpunten t.o.v. de base, rij voor rij (x snelst)"""
+    xs = np.arange(-size[0] / 2, size[0] / 2 + 1e-9, resolution)
+    ys = np.arange(-size[1] / 2, size[1] / 2 + 1e-9, resolution)
+    grid_x, grid_y = np.meshgrid(xs, ys)
+    return np.stack([grid_x.ravel(), grid_y.ravel()], axis=1)
+
+
+def _ring(num_points: int, radius: float) -> np.ndarray:
+    """(N, 2) punten op een cirkel, beginnend in +x"""
+    angles = np.linspace(0.0, 2 * np.pi, num_points, endpoint=False)
+    return radius * np.stack([np.cos(angles), np.sin(angles)], axis=1)
+
+
+def find_foot_links(client: int, robot_id: int) -> List[int]:
+    """
+    Link indices van de voeten (joint naam eindigt op "_foot"), in URDF volgorde
+    
+    Args:
+        client: PyBullet client
+        robot_id: Robot body
+    
+    Returns:
+        NUM_FEET link indices
+    """
+    foot_links = [
+        link for link in range(p.getNumJoints(robot_id, physicsClientId=client))
+        if p.getJointInfo(robot_id, link, physicsClientId=client)[12].decode().endswith("_foot")
+    ]
+    if len(foot_links) != NUM_FEET:
+        raise RuntimeError(f"Verwacht {NUM_FEET} voet links, gevonden: {len(foot_links)}")
+    return foot_links
+
+
+def read_foot_contacts(client: int, robot_id: int, foot_links: List[int], out: np.ndarray) -> np.ndarray:
+    """
+    Contact vlag per voet met één getContactPoints call
+    
+    Args:
+        client: PyBullet client
+        robot_id: Robot body
+        foot_links: Resultaat van find_foot_links()
+        out: (NUM_FEET,) array waarin 1.0 (contact) of 0.0 komt
+    
+    Returns:
+        out
+    """
+    out[:] = 0.0
+    touching = {contact[3] for contact in p.getContactPoints(bodyA=robot_id, physicsClientId=client)}
+    for i, link in enumerate(foot_links):
+        if link in touching:
+            out[i] = 1.0
+    return out
+
+
+def sensor_fields(config: Optional[Dict[str, Optional[Dict[str, Any]]]]) -> Tuple[Tuple[str, int], ...]:
+    """
+    Observatie velden (naam, grootte) voor een sensor configuratie
+    
+    Args:
+        config: Sensor naam -> instellingen (None of {} = standaard)
+    
+    Returns:
+        Velden in de volgorde van SENSOR_TYPES
+    """
+    if not config:
+        return ()
+    fields = []
+    for name, settings in _merged_config(config).items():
+        if name == "height_scan":
+            size = len(_height_scan_offsets(tuple(settings["size"]), settings["resolution"]))
+        elif name == "foot_scan":
+            size = NUM_FEET * settings["num_points"]
+        elif name == "lidar":
+            size = settings["num_rays"]
+        else:
+            size = NUM_FEET
+        fields.append((name, size))
+    return tuple(fields)
+
+
+class SensorSuite:
+    """
+    Ray-cast sensoren en voet contacten voor één robot
+    
+    update() schrijft de metingen in self.values (één float32 array per
+    sensor). Sensoren met update_every > 1 houden hun vorige meting tussen
+    updates.
+    """
+    
+    def __init__(
+        self,
+        sim,
+        robot_index: int = 0,
+        config: Optional[Dict[str, Optional[Dict[str, Any]]]] = None,
+        num_threads: int = 1
+    ):
+        """
+        Initialiseer sensoren
+        
+        Args:
+            sim: Go2Simulator
+            robot_index: Robot waarop de sensoren zitten
+            config: Sensor naam -> instellingen (zie DEFAULT_SENSOR_CONFIG);
+                None = alle sensoren met standaard instellingen
+            num_threads: Threads voor rayTestBatch (0 = alle cores)
+        """
+        self.sim = sim
+        self.robot_index = robot_index
+        self.robot_id = sim.robot_ids[robot_index]
+        self.num_threads = num_threads
+        if config is None:
+            config = {name: None for name in SENSOR_TYPES}
+        self.config = _merged_config(config)
+        self.fields = sensor_fields(config)
+        self.values: Dict[str, np.ndarray] = {
+            name: np.zeros(size, dtype=np.float32) for name, size in self.fields
+        }
+        self._updates = 0
+        
+        client = sim.client
+        num_links = p.getNumJoints(self.robot_id, physicsClientId=client)
+        self.foot_links = find_foot_links(client, self.robot_id)
+        
+        # Robot in eigen collision groep: rays zien de robot zelf niet,
+        # botsingen met de omgeving blijven gelijk
+        for link in range(-1, num_links):
+            p.setCollisionFilterGroupMask(
+                self.robot_id, link, ROBOT_COLLISION_GROUP, 0x7fffffff,
+                physicsClientId=client
+            )
+        self._ray_mask = ~ROBOT_COLLISION_GROUP & 0xffff
+        
+        # Ray layout: elke ray sensor heeft een vast blok in de ray arrays
+        self._offsets: Dict[str, np.ndarray] = {}
+        self._ray_slices: Dict[str, slice] = {}
+        start = 0
+        for name, settings in self.config.items():
+            if name == "height_scan":
+                offsets = _height_scan_offsets(tuple(settings["size"]), settings["resolution"])
+                count = len(offsets)
+            elif name == "foot_scan":
+                offsets = _ring(settings["num_points"], settings["radius"])
+                count = NUM_FEET * len(offsets)
+            elif name == "lidar":
+                offsets = _ring(settings["num_rays"], 1.0)
+                count = len(offsets)
+            else:
+                continue
+            self._offsets[name] = offsets
+            self._ray_slices[name] = slice(start, start + count)
+            start += count
+        self._ray_from = np.zeros((start, 3))
+        self._ray_to = np.zeros((start, 3))
+    
+    def _due(self, name: str) -> bool:
+        """Is de sensor aan de beurt bij deze update?"""
+        return self._updates % self.config[name]["update_every"] == 0
+    
+    def _base_pose(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Wereldpositie van de base en 2D yaw rotatiematrix"""
+        frame = self.sim.get_state_frame()
+        r = self.robot_index
+        position = self.sim.robot_origins[r] + frame.base_position[r]
+        x, y, z, w = frame.base_orientation[r]
+        yaw = np.arctan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+        c, s = np.cos(yaw), np.sin(yaw)
+        return position, np.array([[c, -s], [s, c]])
+    
+    def _fill_rays(self, name: str, position: np.ndarray, rotation: np.ndarray):
+        """Zet begin- en eindpunten van de rays van één sensor"""
+        settings = self.config[name]
+        rays = self._ray_slices[name]
+        ray_from = self._ray_from[rays]
+        ray_to = self._ray_to[rays]
+        offsets = self._offsets[name] @ rotation.T
+        
+        if name == "height_scan":
+            ray_from[:, :2] = position[:2] + offsets
+            ray_to[:, :2] = ray_from[:, :2]
+            ray_from[:, 2] = position[2] + RAY_START_HEIGHT
+            ray_to[:, 2] = position[2] - settings["max_depth"]
+        elif name == "foot_scan":
+            feet = p.getLinkStates(self.robot_id, self.foot_links, physicsClientId=self.sim.client)
+            self.sim.profiler.count("getLinkStates")
+            points = len(offsets)
+            for i, foot in enumerate(feet):
+                foot_position = foot[0]
+                block = slice(i * points, (i + 1) * points)
+                ray_from[block, :2] = np.asarray(foot_position[:2]) + offsets
+                ray_from[block, 2] = foot_position[2] + RAY_START_HEIGHT
+                ray_to[block, 2] = foot_position[2] - settings["max_depth"]
+            ray_to[:, :2] = ray_from[:, :2]
+        else:
+            ray_from[:] = position
+            ray_from[:, 2] += settings["height"]
+            ray_to[:, :2] = ray_from[:, :2] + settings["max_range"] * offsets
+            ray_to[:, 2] = ray_from[:, 2]
+    
+    def update(self) -> Dict[str, np.ndarray]:
+        """
+        Meet alle sensoren die aan de beurt zijn
+        
+        Returns:
+            self.values (sensor naam -> float32 array)
+        """
+        due = [name for name in self._ray_slices if self._due(name)]
+        if due:
+            position, rotation = self._base_pose()
+            for name in due:
+                self._fill_rays(name, position, rotation)
+            
+            if len(due) == len(self._ray_slices):
+                ray_from, ray_to = self._ray_from, self._ray_to
+            else:
+                ray_from = np.concatenate([self._ray_from[self._ray_slices[name]] for name in due])
+                ray_to = np.concatenate([self._ray_to[self._ray_slices[name]] for name in due])
+            
+            results = p.rayTestBatch(
+                ray_from,
+                ray_to,
+                numThreads=self.num_threads,
+                collisionFilterMask=self._ray_mask,
+                physicsClientId=self.sim.client
+            )
+            self.sim.profiler.count("rayTestBatch")
+            fractions = np.fromiter((hit[2] for hit in results), dtype=np.float64, count=len(results))
+            
+            start = 0
+            for name in due:
+                count = self._ray_slices[name].stop - self._ray_slices[name].start
+                fraction = fractions[start:start + count]
+                rays = slice(start, start + count)
+                start += count
+                if name == "lidar":
+                    self.values[name][:] = fraction * self.config[name]["max_range"]
+                else:
+                    # Hoogte van het raakpunt t.o.v. de base of voet
+                    top = ray_from[rays, 2]
+                    hit_z = top + fraction * (ray_to[rays, 2] - top)
+                    self.values[name][:] = hit_z - (top - RAY_START_HEIGHT)
+        
+        if "foot_contacts" in self.values and self._due("foot_contacts"):
+            read_foot_contacts(self.sim.client, self.robot_id, self.foot_links, self.values["foot_contacts"])
+            self.sim.profiler.count("getContactPoints")
+        
+        self._updates += 1
+        return self.values
+    
+    def reset(self):
+        """Begin opnieuw: volgende update() meet alle sensoren"""
+        self._updates = 0
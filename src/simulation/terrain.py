@@ -0,0 +1,388 @@
+"""
+Procedurele terrains voor de Go2 simulator
+
+Genereert heightfields (ruwe grond, hellingen, stapstenen en trapvelden)
+uit een seed. Elk terrain is een (rows, cols) array met hoogtes in meters,
+gecentreerd rond de robot; de kolommen lopen langs x, de rijen langs y.
+Rond het midden blijft een vlak startgebied op hoogte 0.
+
+Gegenereerde terrains worden gecachet in het geheugen en op schijf (npz),
+met een hash van alle parameters als sleutel. Een TerrainManager houdt één
+heightfield body per robot aan en vervangt bij een terrain wissel alleen de
+hoogtedata van de bestaande collision shape (replaceHeightfieldIndex), zodat
+een curriculum duizenden varianten kan gebruiken zonder per reset een shape
+of body te bouwen.
+
+Cache locatie: $GO2_SIM_CACHE_DIR/terrain of ~/.cache/go2_simulation/terrain
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple, Dict, Callable
+
+import numpy as np
+import pybullet as p
+
+from .urdf_cache import get_cache_dir
+
+# Verhoog bij wijzigingen in de generators of het cache formaat
+TERRAIN_CACHE_VERSION = "1"
+
+# Hoogtes worden begrensd tot [-MAX_HEIGHT, MAX_HEIGHT]; dit bereik ligt
+# vast in de collision shape en blijft gelijk bij het vervangen van data
+MAX_HEIGHT = 2.0
+
+# Maximaal aantal terrains in de in-process cache
+MAX_CACHED_TERRAINS = 512
+
+_GENERATORS: Dict[str, Callable[..., np.ndarray]] = {}
+_heightfields: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+
+def _register(name: str):
+    """Registreer een terrain generator onder een naam"""
+    def decorator(generator):
+        _GENERATORS[name] = generator
+        return generator
+    return decorator
+
+
+def _smooth_noise(rng: np.random.Generator, x: np.ndarray, y: np.ndarray, feature_size: float) -> np.ndarray:
+    """Ruis in [-1, 1] met kenmerken van ongeveer feature_size meter (bilineair)"""
+    start = min(x[0], y[0])
+    cells = max(1, int(np.ceil((max(x[-1], y[-1]) - start) / feature_size)))
+    coarse = rng.uniform(-1.0, 1.0, size=(cells + 1, cells + 1))
+    grid = start + np.arange(cells + 1) * feature_size
+    
+    # Eerst langs x per coarse rij, daarna langs y per kolom
+    along_x = np.array([np.interp(x, grid, row) for row in coarse])
+    return np.array([np.interp(y, grid, column) for column in along_x.T]).T
+
+
+@_register("flat")
+def _flat(rng: np.random.Generator, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Vlakke grond"""
+    return np.zeros((len(y), len(x)))
+
+
+@_register("rough")
+def _rough(
+    rng: np.random.Generator,
+    x: np.ndarray,
+    y: np.ndarray,
+    amplitude: float = 0.05,
+    feature_size: float = 0.4
+) -> np.ndarray:
+    """Ruwe grond: golvende ondergrond plus fijne ruis"""
+    heights = amplitude * _smooth_noise(rng, x, y, feature_size)
+    heights += 0.25 * amplitude * rng.uniform(-1.0, 1.0, size=heights.shape)
+    return heights
+
+
+@_register("slope")
+def _slope(
+    rng: np.random.Generator,
+    x: np.ndarray,
+    y: np.ndarray,
+    angle: float = 10.0,
+    roughness: float = 0.0
+) -> np.ndarray:
+    """Helling omhoog in x-richting (angle in graden), optioneel ruw"""
+    xx = np.broadcast_to(x, (len(y), len(x)))
+    heights = np.tan(np.radians(angle)) * np.maximum(xx, 0.0)
+    if roughness > 0:
+        heights = heights + roughness * rng.uniform(-1.0, 1.0, size=heights.shape)
+    return heights
+
+
+@_register("stepping_stones")
+def _stepping_stones(
+    rng: np.random.Generator,
+    x: np.ndarray,
+    y: np.ndarray,
+    stone_size: float = 0.3,
+    gap: float = 0.1,
+    height_variation: float = 0.05,
+    depth: float = 0.5
+) -> np.ndarray:
+    """Losse vierkante stenen met gaten van depth meter diep ertussen"""
+    pitch = stone_size + gap
+    cell_x = np.floor((x - x[0]) / pitch).astype(int)
+    cell_y = np.floor((y - y[0]) / pitch).astype(int)
+    on_stone_x = (x - x[0]) % pitch < stone_size
+    on_stone_y = (y - y[0]) % pitch < stone_size
+    
+    # Willekeurige hoogte per steen, gaten ertussen
+    stone_heights = rng.uniform(-height_variation, height_variation, size=(cell_y[-1] + 1, cell_x[-1] + 1))
+    heights = stone_heights[np.ix_(cell_y, cell_x)]
+    heights[~(on_stone_y[:, None] & on_stone_x[None, :])] = -depth
+    return heights
+
+
+@_register("stairs")
+def _stairs(
+    rng: np.random.Generator,
+    x: np.ndarray,
+    y: np.ndarray,
+    step_height: float = 0.1,
+    step_depth: float = 0.3,
+    height_variation: float = 0.0,
+    descending: bool = False
+) -> np.ndarray:
+    """Trapveld: vierkante ringen die rond het midden omhoog (of omlaag) lopen"""
+    ring = np.floor(np.maximum(np.abs(x)[None, :], np.abs(y)[:, None]) / step_depth).astype(int)
+    steps = step_height + rng.uniform(-height_variation, height_variation, size=ring.max() + 1)
+    steps[0] = 0.0
+    heights = np.cumsum(steps)[ring]
+    return -heights if descending else heights
+
+
+TERRAIN_TYPES = tuple(_GENERATORS)
+
+
+def terrain_key(
+    terrain_type: str,
+    seed: int = 0,
+    size: float = 4.0,
+    resolution: float = 0.05,
+    spawn_radius: float = 0.5,
+    **params
+) -> str:
+    """
+    Cache sleutel voor een terrain (hash van alle parameters)
+    
+    Args:
+        Zie generate_heightfield()
+    
+    Returns:
+        Hex sleutel van 16 tekens
+    """
+    description = {
+        "version": TERRAIN_CACHE_VERSION,
+        "type": terrain_type,
+        "seed": int(seed),
+        "size": float(size),
+        "resolution": float(resolution),
+        "spawn_radius": float(spawn_radius),
+        "params": params,
+    }
+    digest = hashlib.sha256(json.dumps(description, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def generate_heightfield(
+    terrain_type: str,
+    seed: int = 0,
+    size: float = 4.0,
+    resolution: float = 0.05,
+    spawn_radius: float = 0.5,
+    **params
+) -> np.ndarray:
+    """
+    Genereer een terrain (zonder cache)
+    
+    Args:
+        terrain_type: Een van TERRAIN_TYPES
+        seed: Random seed; zelfde seed en parameters = zelfde terrain
+        size: Zijde van het vierkante terrain in meters
+        resolution: Afstand tussen hoogtepunten in meters
+        spawn_radius: Straal van het vlakke startgebied in het midden
+        **params: Generator parameters, bijv. amplitude voor "rough",
+            angle voor "slope", stone_size voor "stepping_stones" en
+            step_height voor "stairs"
+    
+    Returns:
+        float32 hoogtes (rows, cols) in meters
+    """
+    if terrain_type not in _GENERATORS:
+        raise ValueError(f"Onbekend terrain type: {terrain_type} (kies uit {', '.join(TERRAIN_TYPES)})")
+    
+    samples = int(round(size / resolution)) + 1
+    coordinates = (np.arange(samples) - (samples - 1) / 2.0) * resolution
+    rng = np.random.default_rng(seed)
+    heights = _GENERATORS[terrain_type](rng, coordinates, coordinates, **params)
+    
+    # Vlak startgebied zodat de robot altijd op hoogte 0 begint
+    distance = np.hypot(coordinates[None, :], coordinates[:, None])
+    heights = np.where(distance <= spawn_radius, 0.0, heights)
+    return np.clip(heights, -MAX_HEIGHT, MAX_HEIGHT).astype(np.float32)
+
+
+def _write_npz(path: Path, heights: np.ndarray):
+    """Schrijf heightfield atomisch (veilig bij gelijktijdige processen)"""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, heights=heights)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def get_heightfield(
+    terrain_type: str,
+    seed: int = 0,
+    size: float = 4.0,
+    resolution: float = 0.05,
+    spawn_radius: float = 0.5,
+    cache_dir: Optional[Path] = None,
+    **params
+) -> Tuple[np.ndarray, str]:
+    """
+    Geef een terrain uit de cache (geheugen, dan schijf) of genereer het
+    
+    Args:
+        terrain_type, seed, size, resolution, spawn_radius, **params:
+            Zie generate_heightfield()
+        cache_dir: Cache directory (None = get_cache_dir() / "terrain")
+    
+    Returns:
+        (float32 hoogtes (rows, cols), cache sleutel); de array is alleen-lezen
+    """
+    key = terrain_key(terrain_type, seed, size, resolution, spawn_radius, **params)
+    if key in _heightfields:
+        _heightfields.move_to_end(key)
+        return _heightfields[key], key
+    
+    cache_dir = Path(cache_dir) if cache_dir is not None else get_cache_dir() / "terrain"
+    cached_file = cache_dir / f"{terrain_type}_{key}.npz"
+    try:
+        with np.load(cached_file) as data:
+            heights = data["heights"]
+    except (OSError, KeyError, ValueError):
+        heights = generate_heightfield(terrain_type, seed, size, resolution, spawn_radius, **params)
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            _write_npz(cached_file, heights)
+        except OSError:
+            pass  # Schijf cache is optioneel
+    
+    heights.setflags(write=False)
+    _heightfields[key] = heights
+    if len(_heightfields) > MAX_CACHED_TERRAINS:
+        _heightfields.popitem(last=False)
+    return heights, key
+
+
+class TerrainManager:
+    """
+    Eén heightfield body in een simulator waarvan het terrain gewisseld kan worden
+    
+    De collision shape en body worden één keer gemaakt; load() vervangt
+    daarna alleen de hoogtedata. Alle terrains van een manager moeten
+    daarom dezelfde afmetingen (size en resolution) hebben.
+    """
+    
+    def __init__(
+        self,
+        client: int,
+        origin: np.ndarray,
+        size: float = 4.0,
+        resolution: float = 0.05
+    ):
+        """
+        Initialiseer terrain manager
+        
+        Args:
+            client: PyBullet physics client
+            origin: Wereldpositie van het midden van het terrain
+            size: Zijde van het terrain in meters
+            resolution: Afstand tussen hoogtepunten in meters
+        """
+        self.client = client
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.size = size
+        self.resolution = resolution
+        self.samples = int(round(size / resolution)) + 1
+        self.body_id: Optional[int] = None
+        self.shape_id: Optional[int] = None
+        self.key: Optional[str] = None
+        self.heights: Optional[np.ndarray] = None
+    
+    def _create_shape(self, heights: np.ndarray, replace: Optional[int] = None) -> int:
+        """Maak of vervang de heightfield collision shape"""
+        kwargs = {}
+        if replace is not None:
+            kwargs["replaceHeightfieldIndex"] = replace
+        return p.createCollisionShape(
+            p.GEOM_HEIGHTFIELD,
+            meshScale=[self.resolution, self.resolution, 1.0],
+            heightfieldData=heights.ravel(),
+            numHeightfieldRows=self.samples,
+            numHeightfieldColumns=self.samples,
+            physicsClientId=self.client,
+            **kwargs
+        )
+    
+    def load(self, heights: np.ndarray, key: Optional[str] = None):
+        """
+        Zet een terrain in de simulator
+        
+        Args:
+            heights: Hoogtes (rows, cols) van get_heightfield()
+            key: Cache sleutel; hetzelfde terrain wordt niet opnieuw geladen
+        """
+        if heights.shape != (self.samples, self.samples):
+            raise ValueError(
+                f"Terrain heeft vorm {heights.shape}, verwacht {(self.samples, self.samples)} "
+                f"(size {self.size} m, resolution {self.resolution} m)"
+            )
+        if key is not None and key == self.key:
+            return
+        
+        if self.shape_id is None:
+            # PyBullet centreert het hoogtebereik van de eerste data en houdt
+            # dat vast bij vervangen: begin daarom met het volle bereik, zodat
+            # hoogte 0 altijd op origin ligt
+            placeholder = np.zeros_like(heights)
+            placeholder.flat[0] = -MAX_HEIGHT
+            placeholder.flat[-1] = MAX_HEIGHT
+            self.shape_id = self._create_shape(placeholder)
+            self.body_id = p.createMultiBody(
+                baseMass=0,  # Statisch
+                baseCollisionShapeIndex=self.shape_id,
+                basePosition=self.origin,
+                physicsClientId=self.client
+            )
+            p.changeVisualShape(self.body_id, -1, rgbaColor=[0.5, 0.5, 0.5, 1.0], physicsClientId=self.client)
+        
+        self._create_shape(heights, replace=self.shape_id)
+        self.heights = heights
+        self.key = key
+    
+    def height_at(self, x: float, y: float) -> float:
+        """
+        Terrain hoogte op een positie t.o.v. origin (dichtstbijzijnde punt)
+        
+        Args:
+            x: x t.o.v. het midden in meters
+            y: y t.o.v. het midden in meters
+        
+        Returns:
+            Hoogte in meters (0 buiten het terrain)
+        """
+        if self.heights is None:
+            return 0.0
+        half = (self.samples - 1) / 2.0
+        column = int(round(x / self.resolution + half))
+        row = int(round(y / self.resolution + half))
+        if 0 <= row < self.samples and 0 <= column < self.samples:
+            return float(self.heights[row, column])
+        return 0.0
+    
+    def remove(self):
+        """Verwijder de terrain body en zijn heightfield shape uit de simulator"""
+        if self.body_id is not None:
+            p.removeBody(self.body_id, physicsClientId=self.client)
+        if self.shape_id is not None:
+            p.removeCollisionShape(self.shape_id, physicsClientId=self.client)
+        self.body_id = None
+        self.shape_id = None
+        self.key = None
+        self.heights = None
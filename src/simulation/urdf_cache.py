@@ -0,0 +1,336 @@
+"""
+URDF cache voor de Go2 simulator
+
+Slaat de URDF met opgeloste mesh paden en de joint tabel op schijf op,
+met de inhoud van de URDF als sleutel. Volgende simulators (ook in andere
+processen) laden direct het gecachte bestand zonder regex werk, tijdelijke
+bestanden of getJointInfo loop.
+
+Profielen:
+- "full": originele URDF met visuele meshes
+- "train": licht model voor headless training: geen visuele meshes,
+  primitieve collision geometrie en vaste (fixed) links samengevoegd met
+  hun parent met vooraf berekende gecombineerde inertia. Voet links
+  blijven apart voor contact detectie.
+
+Cache locatie: $GO2_SIM_CACHE_DIR of ~/.cache/go2_simulation
+"""
+
+import os
+import re
+import json
+import hashlib
+import tempfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Optional, Tuple, Dict, Any, Iterable
+
+import numpy as np
+
+# Verhoog bij wijzigingen in het cache formaat
+CACHE_VERSION = "2"
+
+URDF_PROFILES = ("full", "train")
+
+# In-process cache: (pad, mtime, grootte, profiel) -> (opgeloste URDF, sleutel)
+_resolved_urdfs: Dict[Tuple[str, int, int, str], Tuple[Path, str]] = {}
+_joint_tables: Dict[str, Dict[str, Any]] = {}
+
+
+def get_cache_dir() -> Path:
+    """
+    Bepaal de cache directory
+    
+    Returns:
+        Pad naar cache directory ($GO2_SIM_CACHE_DIR of ~/.cache/go2_simulation)
+    """
+    cache_dir = os.environ.get("GO2_SIM_CACHE_DIR")
+    if cache_dir:
+        return Path(cache_dir)
+    return Path.home() / ".cache" / "go2_simulation"
+
+
+def _atomic_write(path: Path, content: str):
+    """Schrijf bestand atomisch (veilig bij gelijktijdige processen)"""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def _rewrite_package_paths(urdf_content: str, urdf_dir: Path) -> str:
+    """Vervang package://go2_description/ paden met absolute paden"""
+    # Vervang package://go2_description/dae/ met absolute pad naar dae/
+    urdf_content = re.sub(
+        r'package://go2_description/dae/([^"]+)',
+        lambda m: str((urdf_dir / "dae" / m.group(1)).absolute()),
+        urdf_content
+    )
+    
+    # Vervang package://go2_description/meshes/ met absolute pad naar meshes/
+    urdf_content = re.sub(
+        r'package://go2_description/meshes/([^"]+)',
+        lambda m: str((urdf_dir / "meshes" / m.group(1)).absolute()),
+        urdf_content
+    )
+    return urdf_content
+
+
+def _parse_vector(text: Optional[str]) -> np.ndarray:
+    """Parse URDF vector attribuut ("x y z")"""
+    if not text:
+        return np.zeros(3)
+    return np.array([float(v) for v in text.split()])
+
+
+def _rpy_to_matrix(rpy: np.ndarray) -> np.ndarray:
+    """URDF roll-pitch-yaw naar rotatiematrix (R = Rz * Ry * Rx)"""
+    cr, cp, cy = np.cos(rpy)
+    sr, sp, sy = np.sin(rpy)
+    return np.array([
+        [cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+        [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+        [-sp, cp * sr, cp * cr],
+    ])
+
+
+def _matrix_to_rpy(rotation: np.ndarray) -> np.ndarray:
+    """Rotatiematrix naar URDF roll-pitch-yaw"""
+    pitch = np.arctan2(-rotation[2, 0], np.hypot(rotation[0, 0], rotation[1, 0]))
+    if np.isclose(np.cos(pitch), 0.0):
+        # Gimbal lock: yaw = 0
+        return np.array([np.arctan2(-rotation[1, 2], rotation[1, 1]), pitch, 0.0])
+    roll = np.arctan2(rotation[2, 1], rotation[2, 2])
+    yaw = np.arctan2(rotation[1, 0], rotation[0, 0])
+    return np.array([roll, pitch, yaw])
+
+
+def _read_origin(element: ET.Element) -> Tuple[np.ndarray, np.ndarray]:
+    """Lees <origin> als (translatie, rotatiematrix)"""
+    origin = element.find("origin")
+    if origin is None:
+        return np.zeros(3), np.eye(3)
+    return _parse_vector(origin.get("xyz")), _rpy_to_matrix(_parse_vector(origin.get("rpy")))
+
+
+def _write_origin(element: ET.Element, xyz: np.ndarray, rotation: np.ndarray):
+    """Schrijf (translatie, rotatiematrix) naar <origin>"""
+    origin = element.find("origin")
+    if origin is None:
+        origin = ET.Element("origin")
+        element.insert(0, origin)
+    origin.set("xyz", " ".join(f"{v:.9g}" for v in xyz))
+    origin.set("rpy", " ".join(f"{v:.9g}" for v in _matrix_to_rpy(rotation)))
+
+
+def _read_inertial(link: ET.Element) -> Tuple[float, np.ndarray, np.ndarray]:
+    """
+    Lees inertial van een link als (massa, zwaartepunt, inertia tensor in link frame)
+    
+    Links zonder inertial krijgen wat PyBullet zelf zou gebruiken:
+    mass=1 en inertia diagonaal (1, 1, 1).
+    """
+    inertial = link.find("inertial")
+    if inertial is None:
+        return 1.0, np.zeros(3), np.eye(3)
+    
+    xyz, rotation = _read_origin(inertial)
+    mass_element = inertial.find("mass")
+    mass = float(mass_element.get("value", 0.0)) if mass_element is not None else 0.0
+    inertia = inertial.find("inertia")
+    tensor = np.zeros((3, 3))
+    if inertia is not None:
+        ixx, ixy, ixz, iyy, iyz, izz = (
+            float(inertia.get(name, 0.0)) for name in ("ixx", "ixy", "ixz", "iyy", "iyz", "izz")
+        )
+        tensor = np.array([[ixx, ixy, ixz], [ixy, iyy, iyz], [ixz, iyz, izz]])
+    return mass, xyz, rotation @ tensor @ rotation.T
+
+
+def _write_inertial(link: ET.Element, mass: float, com: np.ndarray, tensor: np.ndarray):
+    """Vervang inertial van een link (inertia tensor rond zwaartepunt, link frame)"""
+    for inertial in link.findall("inertial"):
+        link.remove(inertial)
+    inertial = ET.Element("inertial")
+    ET.SubElement(inertial, "origin", xyz=" ".join(f"{v:.9g}" for v in com), rpy="0 0 0")
+    ET.SubElement(inertial, "mass", value=f"{mass:.9g}")
+    ET.SubElement(
+        inertial, "inertia",
+        ixx=f"{tensor[0, 0]:.9g}", ixy=f"{tensor[0, 1]:.9g}", ixz=f"{tensor[0, 2]:.9g}",
+        iyy=f"{tensor[1, 1]:.9g}", iyz=f"{tensor[1, 2]:.9g}", izz=f"{tensor[2, 2]:.9g}"
+    )
+    link.insert(0, inertial)
+
+
+def _merge_fixed_link(root: ET.Element, joint: ET.Element, parent: ET.Element, child: ET.Element):
+    """Voeg child link van een fixed joint samen met de parent link"""
+    joint_xyz, joint_rotation = _read_origin(joint)
+    
+    # Gecombineerde massa, zwaartepunt en inertia (parallel-as theorema)
+    parent_mass, parent_com, parent_tensor = _read_inertial(parent)
+    child_mass, child_com, child_tensor = _read_inertial(child)
+    child_com = joint_xyz + joint_rotation @ child_com
+    child_tensor = joint_rotation @ child_tensor @ joint_rotation.T
+    
+    mass = parent_mass + child_mass
+    com = (parent_mass * parent_com + child_mass * child_com) / mass if mass > 0 else parent_com
+    tensor = np.zeros((3, 3))
+    for body_mass, body_com, body_tensor in (
+        (parent_mass, parent_com, parent_tensor),
+        (child_mass, child_com, child_tensor),
+    ):
+        offset = body_com - com
+        tensor += body_tensor + body_mass * (offset @ offset * np.eye(3) - np.outer(offset, offset))
+    _write_inertial(parent, mass, com, tensor)
+    
+    # Collision geometrie naar parent frame
+    for collision in child.findall("collision"):
+        xyz, rotation = _read_origin(collision)
+        _write_origin(collision, joint_xyz + joint_rotation @ xyz, joint_rotation @ rotation)
+        parent.append(collision)
+    
+    # Joints van de child hangen nu aan de parent
+    for other in root.findall("joint"):
+        other_parent = other.find("parent")
+        if other_parent is not None and other_parent.get("link") == child.get("name"):
+            xyz, rotation = _read_origin(other)
+            _write_origin(other, joint_xyz + joint_rotation @ xyz, joint_rotation @ rotation)
+            other_parent.set("link", parent.get("name"))
+    
+    root.remove(joint)
+    root.remove(child)
+
+
+def _make_train_variant(urdf_content: str, keep_links: Iterable[str] = ("_foot",)) -> str:
+    """
+    Maak trainingsvariant van de URDF
+    
+    Verwijdert alle visuele elementen (geen meshes laden) en voegt links die
+    met een fixed joint vastzitten samen met hun parent, met vooraf berekende
+    gecombineerde inertia. Minder links betekent minder werk voor de solver
+    per physics stap.
+    
+    Args:
+        urdf_content: URDF met opgeloste paden
+        keep_links: Suffixen van links die apart blijven (default: voeten)
+    """
+    root = ET.fromstring(urdf_content)
+    links = {link.get("name"): link for link in root.findall("link")}
+    for link in links.values():
+        for visual in link.findall("visual"):
+            link.remove(visual)
+    
+    keep_links = tuple(keep_links)
+    for joint in list(root.findall("joint")):
+        if joint.get("type") != "fixed":
+            continue
+        child_name = joint.find("child").get("link")
+        if child_name.endswith(keep_links):
+            continue
+        parent_name = joint.find("parent").get("link")
+        _merge_fixed_link(root, joint, links[parent_name], links.pop(child_name))
+    
+    return ET.tostring(root, encoding="unicode")
+
+
+def resolve_urdf(
+    urdf_path: Path,
+    cache_dir: Optional[Path] = None,
+    profile: str = "full"
+) -> Tuple[Path, str]:
+    """
+    Geef pad naar URDF met opgeloste mesh paden (uit cache indien mogelijk)
+    
+    Args:
+        urdf_path: Pad naar originele URDF
+        cache_dir: Cache directory (None = get_cache_dir())
+        profile: "full" (met visuele meshes) of "train" (zonder visuals)
+    
+    Returns:
+        (pad naar opgeloste URDF, cache sleutel)
+    """
+    if profile not in URDF_PROFILES:
+        raise ValueError(f"Onbekend URDF profiel: {profile} (kies uit {', '.join(URDF_PROFILES)})")
+    
+    urdf_path = Path(urdf_path).absolute()
+    stat = urdf_path.stat()
+    memo_key = (str(urdf_path), stat.st_mtime_ns, stat.st_size, profile)
+    if memo_key in _resolved_urdfs and _resolved_urdfs[memo_key][0].exists():
+        return _resolved_urdfs[memo_key]
+    
+    # Mesh paden zijn relatief t.o.v. de package root (urdf/urdf/.. = urdf/)
+    urdf_dir = urdf_path.parent.parent
+    content = urdf_path.read_bytes()
+    digest = hashlib.sha256()
+    digest.update(CACHE_VERSION.encode())
+    digest.update(str(urdf_dir).encode())
+    digest.update(profile.encode())
+    digest.update(content)
+    key = digest.hexdigest()[:16]
+    
+    cache_dir = Path(cache_dir) if cache_dir is not None else get_cache_dir()
+    cached_urdf = cache_dir / f"go2_{profile}_{key}.urdf"
+    
+    if not cached_urdf.exists():
+        resolved = _rewrite_package_paths(content.decode('utf-8'), urdf_dir)
+        if profile == "train":
+            resolved = _make_train_variant(resolved)
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            _atomic_write(cached_urdf, resolved)
+        except OSError:
+            # Cache niet schrijfbaar: val terug op temp directory
+            cache_dir = Path(tempfile.gettempdir()) / "go2_simulation"
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            cached_urdf = cache_dir / f"go2_{profile}_{key}.urdf"
+            if not cached_urdf.exists():
+                _atomic_write(cached_urdf, resolved)
+    
+    _resolved_urdfs[memo_key] = (cached_urdf, key)
+    return cached_urdf, key
+
+
+def load_joint_table(resolved_urdf: Path) -> Optional[Dict[str, Any]]:
+    """
+    Laad gecachte joint tabel voor een opgeloste URDF
+    
+    Args:
+        resolved_urdf: Pad van resolve_urdf()
+    
+    Returns:
+        Joint tabel (zie save_joint_table) of None als niet gecached
+    """
+    table_path = resolved_urdf.with_suffix(".joints.json")
+    key = str(table_path)
+    if key in _joint_tables:
+        return _joint_tables[key]
+    
+    try:
+        table = json.loads(table_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    
+    _joint_tables[key] = table
+    return table
+
+
+def save_joint_table(resolved_urdf: Path, table: Dict[str, Any]):
+    """
+    Sla joint tabel op naast de opgeloste URDF
+    
+    Args:
+        resolved_urdf: Pad van resolve_urdf()
+        table: Dictionary met num_joints, joint_indices, joint_names,
+            lower_limits, upper_limits en default_positions
+    """
+    table_path = resolved_urdf.with_suffix(".joints.json")
+    _joint_tables[str(table_path)] = table
+    try:
+        _atomic_write(table_path, json.dumps(table, indent=2))
+    except OSError:
+        pass  # Cache is optioneel
@@ -0,0 +1,612 @@
+"""
+Gebatchte Stable-Baselines3 VecEnv voor Go2 training
+
+Go2VecEnv stuurt veel Go2 robots in lockstep aan met NumPy arrays voor
+observaties, rewards en dones. Robots worden in groepen verdeeld; elke
+groep deelt één physics client (één stepSimulation voor alle robots) en
+draait in het hoofdproces of in een eigen worker proces.
+
+Worker processen communiceren standaard via gedeeld geheugen
+(multiprocessing.shared_memory): actions, observaties, rewards, dones en
+scalaire info velden staan in een vaste indeling per worker en een stap
+wordt alleen met semaphores gesignaleerd, zonder pickling. Overige
+commando's (reset, get_attr, env_method, ...) gaan via een pipe.
+"""
+
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+from numbers import Integral
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from stable_baselines3.common.vec_env.base_vec_env import (
+        CloudpickleWrapper,
+        VecEnv,
+        VecEnvIndices,
+        VecEnvStepReturn,
+    )
+except ImportError:
+    raise ImportError(
+        "Stable-Baselines3 niet geïnstalleerd. Installeer met: pip install stable-baselines3"
+    )
+
+from .go2_base_env import Go2BaseEnv
+from .go2_simulator import Go2Simulator
+
+
+TRANSPORTS = ("shm", "pipe")
+
+# Commando's in de header van het gedeelde geheugen
+_CMD_STEP = 1
+_CMD_PIPE = 2
+
+_INFO_TYPES = {"bool": bool, "int": int, "float": float}
+
+
+class Go2EnvGroup:
+    """
+    Groep Go2 environments in één gedeelde physics client
+    
+    Alle environments moeten van hetzelfde type zijn (zelfde decimation en
+    observatie layout). Eén step() zet de actions van alle robots, doet de
+    physics substeps één keer voor de hele wereld en reset afgelopen
+    episodes automatisch (met info["terminal_observation"]).
+    """
+    
+    def __init__(self, env_fns: Sequence[Callable[[], Go2BaseEnv]], spacing: float = 5.0):
+        """
+        Initialiseer groep
+        
+        Args:
+            env_fns: Functies die elk een (niet gewrapte) Go2BaseEnv maken
+            spacing: Afstand tussen de robots in meters (ruim genoeg voor
+                taak objecten zoals een trap)
+        """
+        self.envs: List[Go2BaseEnv] = [env_fn() for env_fn in env_fns]
+        for env in self.envs:
+            if not isinstance(env, Go2BaseEnv):
+                raise TypeError(f"Go2EnvGroup verwacht Go2BaseEnv environments, niet {type(env).__name__}")
+        
+        first = self.envs[0]
+        if any(env.decimation != first.decimation for env in self.envs):
+            raise ValueError("Alle environments in een groep moeten dezelfde decimation hebben")
+        if any(env.observation_space.shape != first.observation_space.shape for env in self.envs):
+            raise ValueError("Alle environments in een groep moeten dezelfde observatie layout hebben")
+        
+        self.num_envs = len(self.envs)
+        self.decimation = first.decimation
+        
+        # Eén wereld voor alle robots; de physics telt mee in het profiel van env 0
+        self.sim = Go2Simulator(
+            gui=first.gui,
+            timestep=first.sim_dt,
+            profile=first.sim_profile,
+            num_robots=self.num_envs,
+            spacing=spacing,
+            profiler=first.profiler
+        )
+        for r, env in enumerate(self.envs):
+            env.attach(self.sim, r)
+        
+        # Gestabiliseerde begin-state waar elke robot naar terug reset
+        self.sim.reset(position=list(first.START_POSITION))
+        for _ in range(10):
+            self.sim.step()
+        initial_snapshot = self.sim.snapshot()
+        for env in self.envs:
+            env.set_initial_snapshot(initial_snapshot)
+        
+        self._obs = np.zeros((self.num_envs,) + first.observation_space.shape, dtype=np.float32)
+        self._rewards = np.zeros(self.num_envs, dtype=np.float32)
+        self._dones = np.zeros(self.num_envs, dtype=bool)
+    
+    def reset(
+        self,
+        seeds: Optional[Sequence[Optional[int]]] = None,
+        options: Optional[Sequence[Optional[Dict]]] = None
+    ) -> np.ndarray:
+        """
+        Reset alle environments
+        
+        Args:
+            seeds: Seed per environment (None = geen seed)
+            options: Reset opties per environment
+        
+        Returns:
+            (num_envs, obs_dim) observaties
+        """
+        for i, env in enumerate(self.envs):
+            seed = seeds[i] if seeds is not None else None
+            env_options = options[i] if options is not None else None
+            self._obs[i], _ = env.reset(seed=seed, options=env_options or None)
+        return self._obs.copy()
+    
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+        """
+        Voer één policy stap uit voor alle robots
+        
+        Args:
+            actions: (num_envs, 12) genormaliseerde actions
+        
+        Returns:
+            (obs, rewards, dones, infos); afgelopen environments zijn al
+            gereset en hun laatste observatie staat in info["terminal_observation"]
+        """
+        envs = self.envs
+        for env, action in zip(envs, actions):
+            env._apply_action(action)
+        
+        # Substeps in lockstep; reward en done één keer per policy stap
+        for _ in range(self.decimation):
+            for env in envs:
+                env._pre_physics_step()
+            self.sim.step()
+        results = [env._finish_step() for env in envs]
+        
+        infos = []
+        for i, (obs, reward, terminated, truncated, info) in enumerate(results):
+            done = terminated or truncated
+            info["TimeLimit.truncated"] = truncated and not terminated
+            profiler = envs[i].profiler
+            profiler.end_step()
+            if profiler.enabled:
+                info["profile"] = profiler.last_step
+            if done:
+                info["terminal_observation"] = obs
+                obs, _ = envs[i].reset()
+            self._obs[i] = obs
+            self._rewards[i] = reward
+            self._dones[i] = done
+            infos.append(info)
+        
+        return self._obs.copy(), self._rewards.copy(), self._dones.copy(), infos
+    
+    def close(self):
+        """Sluit environments en de gedeelde simulator"""
+        for env in self.envs:
+            env.close()
+        self.sim.close()
+
+
+def _handle_command(group: Go2EnvGroup, cmd: str, data: Any) -> Any:
+    """
+    Voer een commando uit op een groep (in het hoofdproces of een worker)
+    
+    Args:
+        group: Go2EnvGroup
+        cmd: Commando naam
+        data: Argumenten van het commando
+    
+    Returns:
+        Resultaat van het commando
+    """
+    if cmd == "step":
+        return group.step(data)
+    elif cmd == "reset":
+        return group.reset(*data)
+    elif cmd == "get_attr":
+        name, indices = data
+        return [getattr(group.envs[i], name) for i in indices]
+    elif cmd == "set_attr":
+        name, value, indices = data
+        for i in indices:
+            setattr(group.envs[i], name, value)
+        return None
+    elif cmd == "env_method":
+        name, args, kwargs, indices = data
+        return [getattr(group.envs[i], name)(*args, **kwargs) for i in indices]
+    elif cmd == "close":
+        group.close()
+        return None
+    raise ValueError(f"Onbekend commando: {cmd}")
+
+
+def _group_worker(remote, parent_remote, env_fns_wrapper: CloudpickleWrapper, spacing: float):
+    """Worker proces: één Go2EnvGroup, aangestuurd via een pipe"""
+    parent_remote.close()
+    group = Go2EnvGroup(env_fns_wrapper.var, spacing=spacing)
+    try:
+        while True:
+            cmd, data = remote.recv()
+            remote.send(_handle_command(group, cmd, data))
+            if cmd == "close":
+                break
+    except (EOFError, KeyboardInterrupt):
+        group.close()
+    finally:
+        remote.close()
+
+
+def _info_type(value: Any) -> Optional[str]:
+    """Type naam van een scalaire info waarde (None = niet scalair)"""
+    if isinstance(value, (bool, np.bool_)):
+        return "bool"
+    if isinstance(value, Integral):
+        return "int"
+    if isinstance(value, (float, np.floating)):
+        return "float"
+    return None
+
+
+class _ShmLayout:
+    """Indeling van het gedeelde geheugen van één worker"""
+    
+    def __init__(self, num_envs: int, obs_dim: int, action_dim: int, num_info: int):
+        """
+        Args:
+            num_envs: Aantal robots in de worker
+            obs_dim: Observatie grootte
+            action_dim: Action grootte
+            num_info: Aantal scalaire info velden
+        """
+        fields = [
+            ("header", (2,), np.int32),  # [commando, extra info via pipe]
+            ("actions", (num_envs, action_dim), np.float32),
+            ("obs", (num_envs, obs_dim), np.float32),
+            ("terminal_obs", (num_envs, obs_dim), np.float32),
+            ("rewards", (num_envs,), np.float32),
+            ("dones", (num_envs,), np.bool_),
+            ("truncated", (num_envs,), np.bool_),
+            ("info", (num_envs, num_info), np.float64),
+            ("info_present", (num_envs, num_info), np.bool_),  # veld in de info van deze stap
+        ]
+        self.fields = []
+        offset = 0
+        for name, shape, dtype in fields:
+            self.fields.append((name, shape, dtype, offset))
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            offset += (nbytes + 7) // 8 * 8  # 8-byte uitgelijnd
+        self.nbytes = max(offset, 8)
+    
+    def views(self, buffer) -> Dict[str, np.ndarray]:
+        """
+        Maak NumPy views op het gedeelde geheugen
+        
+        Args:
+            buffer: SharedMemory.buf
+        
+        Returns:
+            Dict met per veld een array view
+        """
+        return {
+            name: np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+            for name, shape, dtype, offset in self.fields
+        }
+
+
+def _shm_group_worker(
+    remote,
+    parent_remote,
+    env_fns_wrapper: CloudpickleWrapper,
+    spacing: float,
+    request,
+    done
+):
+    """Worker proces: één Go2EnvGroup, stappen via gedeeld geheugen"""
+    parent_remote.close()
+    group = Go2EnvGroup(env_fns_wrapper.var, spacing=spacing)
+    
+    # Handshake: indeling doorgeven, daarna het gedeelde geheugen koppelen.
+    # Info velden zoals randomization/* en terrain_seed bestaan pas na een
+    # reset; het hoofdproces reset daarna opnieuw met zijn eigen seeds.
+    group.reset()
+    first = group.envs[0]
+    info_keys = [(key, _info_type(value)) for key, value in first._get_info().items()]
+    info_keys = [(key, info_type) for key, info_type in info_keys if info_type is not None]
+    remote.send((group.num_envs, first.observation_space.shape[0], first.action_space.shape[0], info_keys))
+    layout = _ShmLayout(
+        group.num_envs, first.observation_space.shape[0], first.action_space.shape[0], len(info_keys)
+    )
+    shm = SharedMemory(name=remote.recv())
+    views = layout.views(shm.buf)
+    remote.send(True)
+    
+    header = views["header"]
+    try:
+        while True:
+            request.acquire()
+            if header[0] == _CMD_STEP:
+                obs, rewards, dones, infos = group.step(views["actions"])
+                views["obs"][:] = obs
+                views["rewards"][:] = rewards
+                views["dones"][:] = dones
+                
+                # Scalaire info velden in gedeeld geheugen, de rest (bijv.
+                # profiling) via de pipe
+                extras = []
+                for i, info in enumerate(infos):
+                    views["truncated"][i] = info.pop("TimeLimit.truncated")
+                    terminal_obs = info.pop("terminal_observation", None)
+                    if terminal_obs is not None:
+                        views["terminal_obs"][i] = terminal_obs
+                    for j, (key, _) in enumerate(info_keys):
+                        # Velden kunnen wegvallen (bijv. na set_terrain(None))
+                        present = key in info
+                        views["info_present"][i, j] = present
+                        views["info"][i, j] = info.pop(key) if present else 0.0
+                    extras.append(info)
+                has_extras = any(extras)
+                header[1] = int(has_extras)
+                done.release()
+                if has_extras:
+                    remote.send(extras)
+            else:
+                cmd, data = remote.recv()
+                remote.send(_handle_command(group, cmd, data))
+                if cmd == "close":
+                    break
+    except (EOFError, KeyboardInterrupt):
+        group.close()
+    finally:
+        del header, views
+        shm.close()
+        remote.close()
+
+
+class _LocalGroup:
+    """Groep in het hoofdproces (zelfde interface als _ProcessGroup)"""
+    
+    def __init__(self, env_fns: Sequence[Callable[[], Go2BaseEnv]], spacing: float):
+        self.group = Go2EnvGroup(env_fns, spacing=spacing)
+        self._result = None
+    
+    def send(self, cmd: str, data: Any = None):
+        self._result = _handle_command(self.group, cmd, data)
+    
+    def recv(self) -> Any:
+        result, self._result = self._result, None
+        return result
+    
+    def close(self):
+        self.group.close()
+
+
+class _ProcessGroup:
+    """Groep in een worker proces"""
+    
+    def __init__(self, ctx, env_fns: Sequence[Callable[[], Go2BaseEnv]], spacing: float):
+        self.remote, work_remote = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_group_worker,
+            args=(work_remote, self.remote, CloudpickleWrapper(list(env_fns)), spacing),
+            daemon=True
+        )
+        self.process.start()
+        work_remote.close()
+    
+    def send(self, cmd: str, data: Any = None):
+        self.remote.send((cmd, data))
+    
+    def recv(self) -> Any:
+        return self.remote.recv()
+    
+    def close(self):
+        self.send("close")
+        self.recv()
+        self.process.join()
+
+
+class _ShmProcessGroup:
+    """Groep in een worker proces met stappen via gedeeld geheugen"""
+    
+    def __init__(self, ctx, env_fns: Sequence[Callable[[], Go2BaseEnv]], spacing: float):
+        self.remote, work_remote = ctx.Pipe()
+        self._request = ctx.Semaphore(0)
+        self._done = ctx.Semaphore(0)
+        self.process = ctx.Process(
+            target=_shm_group_worker,
+            args=(work_remote, self.remote, CloudpickleWrapper(list(env_fns)), spacing, self._request, self._done),
+            daemon=True
+        )
+        self.process.start()
+        work_remote.close()
+        
+        # Handshake: gedeeld geheugen aanmaken volgens de indeling van de worker
+        num_envs, obs_dim, action_dim, info_keys = self.remote.recv()
+        self.num_envs = num_envs
+        self._info_keys = [(key, _INFO_TYPES[info_type]) for key, info_type in info_keys]
+        layout = _ShmLayout(num_envs, obs_dim, action_dim, len(info_keys))
+        self._shm = SharedMemory(create=True, size=layout.nbytes)
+        self._views = layout.views(self._shm.buf)
+        self.remote.send(self._shm.name)
+        self.remote.recv()
+        self._pending: Optional[str] = None
+    
+    def send(self, cmd: str, data: Any = None):
+        views = self._views
+        if cmd == "step":
+            views["actions"][:] = data
+            views["header"][0] = _CMD_STEP
+            self._request.release()
+        else:
+            views["header"][0] = _CMD_PIPE
+            self._request.release()
+            self.remote.send((cmd, data))
+        self._pending = cmd
+    
+    def recv(self) -> Any:
+        if self._pending != "step":
+            return self.remote.recv()
+        
+        self._done.acquire()
+        views = self._views
+        extras = self.remote.recv() if views["header"][1] else None
+        
+        infos = []
+        info_values = views["info"]
+        info_present = views["info_present"]
+        for i in range(self.num_envs):
+            info = {
+                key: info_type(info_values[i, j])
+                for j, (key, info_type) in enumerate(self._info_keys)
+                if info_present[i, j]
+            }
+            info["TimeLimit.truncated"] = bool(views["truncated"][i])
+            if views["dones"][i]:
+                info["terminal_observation"] = views["terminal_obs"][i].copy()
+            if extras:
+                info.update(extras[i])
+            infos.append(info)
+        return views["obs"], views["rewards"], views["dones"], infos
+    
+    def close(self):
+        self.send("close")
+        self.recv()
+        self.process.join()
+        self._views = None
+        self._shm.close()
+        self._shm.unlink()
+
+
+class Go2VecEnv(VecEnv):
+    """
+    Stable-Baselines3 VecEnv voor veel Go2 robots
+    
+    De environments worden in groepen van envs_per_process robots verdeeld.
+    Zonder envs_per_process draaien alle robots in één physics client in het
+    hoofdproces; anders krijgt elke groep een eigen worker proces. Alle
+    groepen stappen in lockstep en episodes worden automatisch gereset.
+    
+    Transport naar worker processen:
+        shm:  gedeeld geheugen + semaphores, geen pickling per stap
+        pipe: pipe met pickling (zoals SubprocVecEnv)
+    
+    Gebruik:
+        env = Go2VecEnv([lambda: Go2RLEnv(gui=False) for _ in range(64)], envs_per_process=8)
+    """
+    
+    def __init__(
+        self,
+        env_fns: Sequence[Callable[[], Go2BaseEnv]],
+        envs_per_process: Optional[int] = None,
+        spacing: float = 5.0,
+        start_method: Optional[str] = None,
+        transport: str = "shm"
+    ):
+        """
+        Initialiseer vectorized environment
+        
+        Args:
+            env_fns: Functies die elk een (niet gewrapte) Go2BaseEnv maken
+            envs_per_process: Robots per worker proces (None = alles in het
+                hoofdproces, in één physics client)
+            spacing: Afstand tussen de robots in een groep in meters
+            start_method: Multiprocessing start methode (None = "forkserver"
+                indien beschikbaar, anders "spawn")
+            transport: Transport naar worker processen ("shm" of "pipe")
+        """
+        env_fns = list(env_fns)
+        num_envs = len(env_fns)
+        if num_envs == 0:
+            raise ValueError("Go2VecEnv heeft minstens één environment nodig")
+        if envs_per_process is not None and envs_per_process < 1:
+            raise ValueError(f"envs_per_process moet >= 1 zijn, niet {envs_per_process}")
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Onbekend transport: {transport} (kies uit {', '.join(TRANSPORTS)})")
+        self.transport = transport
+        
+        if envs_per_process is None or envs_per_process >= num_envs:
+            chunks = [env_fns]
+            self._groups = [_LocalGroup(env_fns, spacing)]
+        else:
+            chunks = [env_fns[i:i + envs_per_process] for i in range(0, num_envs, envs_per_process)]
+            if start_method is None:
+                start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+            ctx = mp.get_context(start_method)
+            group_class = _ShmProcessGroup if transport == "shm" else _ProcessGroup
+            self._groups = [group_class(ctx, chunk, spacing) for chunk in chunks]
+        
+        # (groep, lokale index) per environment en slices per groep
+        self._env_locations: List[Tuple[int, int]] = []
+        self._group_slices: List[slice] = []
+        start = 0
+        for g, chunk in enumerate(chunks):
+            self._env_locations.extend((g, i) for i in range(len(chunk)))
+            self._group_slices.append(slice(start, start + len(chunk)))
+            start += len(chunk)
+        self.num_groups = len(self._groups)
+        
+        self._groups[0].send("get_attr", ("observation_space", [0]))
+        observation_space = self._groups[0].recv()[0]
+        self._groups[0].send("get_attr", ("action_space", [0]))
+        action_space = self._groups[0].recv()[0]
+        super().__init__(num_envs, observation_space, action_space)
+        
+        self._obs = np.zeros((num_envs,) + observation_space.shape, dtype=observation_space.dtype)
+        self._rewards = np.zeros(num_envs, dtype=np.float32)
+        self._dones = np.zeros(num_envs, dtype=bool)
+        self._actions: Optional[np.ndarray] = None
+        self.closed = False
+    
+    def reset(self):
+        """Reset alle environments (seeds en opties van seed()/set_options())"""
+        for group, group_slice in zip(self._groups, self._group_slices):
+            group.send("reset", (self._seeds[group_slice], self._options[group_slice]))
+        for group, group_slice in zip(self._groups, self._group_slices):
+            self._obs[group_slice] = group.recv()
+        self._reset_seeds()
+        self._reset_options()
+        return self._obs.copy()
+    
+    def step_async(self, actions: np.ndarray):
+        """Verstuur actions naar alle groepen"""
+        actions = np.asarray(actions)
+        for group, group_slice in zip(self._groups, self._group_slices):
+            group.send("step", actions[group_slice])
+    
+    def step_wait(self) -> VecEnvStepReturn:
+        """Wacht op alle groepen en combineer de resultaten"""
+        infos: List[Dict[str, Any]] = []
+        for group, group_slice in zip(self._groups, self._group_slices):
+            obs, rewards, dones, group_infos = group.recv()
+            self._obs[group_slice] = obs
+            self._rewards[group_slice] = rewards
+            self._dones[group_slice] = dones
+            infos.extend(group_infos)
+        return self._obs.copy(), self._rewards.copy(), self._dones.copy(), infos
+    
+    def _per_group(self, indices: VecEnvIndices) -> Dict[int, List[int]]:
+        """Verdeel globale indices over groepen als lokale indices"""
+        per_group: Dict[int, List[int]] = {}
+        for index in self._get_indices(indices):
+            g, local = self._env_locations[index]
+            per_group.setdefault(g, []).append(local)
+        return per_group
+    
+    def _gather(self, cmd: str, make_data: Callable[[List[int]], Any], indices: VecEnvIndices) -> List[Any]:
+        """Stuur een commando naar de betrokken groepen en verzamel de resultaten"""
+        per_group = self._per_group(indices)
+        for g, local_indices in per_group.items():
+            self._groups[g].send(cmd, make_data(local_indices))
+        results = []
+        for g in per_group:
+            result = self._groups[g].recv()
+            if result is not None:
+                results.extend(result)
+        return results
+    
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> List[Any]:
+        """Haal een attribuut op van (een deel van) de environments"""
+        return self._gather("get_attr", lambda local: (attr_name, local), indices)
+    
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None):
+        """Zet een attribuut op (een deel van) de environments"""
+        self._gather("set_attr", lambda local: (attr_name, value, local), indices)
+    
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> List[Any]:
+        """Roep een methode aan op (een deel van) de environments"""
+        return self._gather("env_method", lambda local: (method_name, method_args, method_kwargs, local), indices)
+    
+    def env_is_wrapped(self, wrapper_class, indices: VecEnvIndices = None) -> List[bool]:
+        """Environments in een Go2VecEnv zijn nooit gewrapt"""
+        return [False] * len(self._get_indices(indices))
+    
+    def close(self):
+        """Sluit alle groepen en worker processen"""
+        if self.closed:
+            return
+        for group in self._groups:
+            group.close()
+        self.closed = True
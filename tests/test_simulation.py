@@ -0,0 +1,1695 @@
+"""
+Simulatie tests voor Unitree Go2 EDU
+
+Test de PyBullet simulator en RL environments (headless).
+Let op: Deze tests vereisen PyBullet en de Go2 URDF met meshes.
+"""
+
+import json
+import pytest
+import numpy as np
+from pathlib import Path
+
+p = pytest.importorskip("pybullet")
+pytest.importorskip("gymnasium")
+
+from src.simulation.go2_rl_env import Go2RLEnv
+from src.simulation.go2_stairs_env import Go2StairsEnv
+
+
+def _make_env(env_class, **kwargs):
+    """Maak headless environment of skip als simulator niet kan starten"""
+    env = env_class(gui=False, **kwargs)
+    try:
+        env.reset()
+    except p.error as e:
+        env.close()
+        pytest.skip(f"Kon simulator niet starten: {e}")
+    return env
+
+
+class TestFastReset:
+    """Test hergebruik van simulator tussen episodes"""
+    
+    @pytest.mark.parametrize("env_class", [Go2RLEnv, Go2StairsEnv])
+    def test_reset_reuses_simulator(self, env_class):
+        """Snelle reset houdt dezelfde physics client en robot"""
+        env = _make_env(env_class)
+        try:
+            sim = env.sim
+            robot_id = sim.robot_id
+            
+            env.step(env.action_space.sample())
+            env.reset()
+            
+            assert env.sim is sim
+            assert env.sim.robot_id == robot_id
+        finally:
+            env.close()
+    
+    @pytest.mark.parametrize("env_class", [Go2RLEnv, Go2StairsEnv])
+    def test_reset_restores_initial_observation(self, env_class):
+        """Na een episode levert reset dezelfde begin-observatie op"""
+        env = _make_env(env_class)
+        try:
+            first_obs, _ = env.reset()
+            for _ in range(20):
+                env.step(env.action_space.sample())
+            obs, info = env.reset()
+            
+            np.testing.assert_allclose(obs, first_obs, atol=1e-6)
+            assert info["step_count"] == 0
+        finally:
+            env.close()
+    
+    def test_fast_reset_matches_rebuild(self):
+        """Snelle reset en herbouwde simulator starten in dezelfde state"""
+        fast_env = _make_env(Go2RLEnv, fast_reset=True)
+        try:
+            fast_env.step(fast_env.action_space.sample())
+            fast_obs, _ = fast_env.reset()
+        finally:
+            fast_env.close()
+        
+        slow_env = _make_env(Go2RLEnv, fast_reset=False)
+        try:
+            slow_env.step(slow_env.action_space.sample())
+            slow_obs, _ = slow_env.reset()
+        finally:
+            slow_env.close()
+        
+        np.testing.assert_allclose(fast_obs, slow_obs, atol=1e-5)
+
+
+class TestClientIsolation:
+    """Test meerdere simulators in één proces"""
+    
+    def test_simulators_are_independent(self):
+        """Stappen in de ene simulator beïnvloedt de andere niet"""
+        first = _make_env(Go2RLEnv)
+        second = _make_env(Go2RLEnv)
+        try:
+            assert first.sim.client != second.sim.client
+            before = second.sim.get_base_pose()[0]
+            
+            action = np.ones(first.action_space.shape, dtype=np.float32)
+            for _ in range(50):
+                first.step(action)
+            
+            assert second.sim.get_base_pose()[0] == before
+            assert first.sim.get_base_pose()[0] != before
+        finally:
+            first.close()
+            second.close()
+    
+    def test_close_keeps_other_simulator_alive(self):
+        """Sluiten van de ene simulator laat de andere draaien"""
+        first = _make_env(Go2StairsEnv)
+        second = _make_env(Go2StairsEnv)
+        try:
+            first.close()
+            obs, _, _, _, _ = second.step(second.action_space.sample())
+            assert np.all(np.isfinite(obs))
+        finally:
+            first.close()
+            second.close()
+
+
+class TestJointArrays:
+    """Test array-gebaseerde joint I/O"""
+    
+    def test_arrays_match_dict_api(self):
+        """get_joint_state_arrays en get_joint_states geven dezelfde waarden"""
+        env = _make_env(Go2RLEnv)
+        try:
+            env.step(env.action_space.sample())
+            states = env.sim.get_joint_states()
+            positions, velocities, efforts = env.sim.get_joint_state_arrays()
+            
+            assert positions.shape == (len(env.sim.joint_names),)
+            for i, name in enumerate(env.sim.joint_names):
+                assert states[name]['position'] == positions[i]
+                assert states[name]['velocity'] == velocities[i]
+                assert states[name]['effort'] == efforts[i]
+        finally:
+            env.close()
+    
+    def test_array_targets_match_dict_targets(self):
+        """set_joint_targets_array en set_joint_targets sturen hetzelfde aan"""
+        targets = np.linspace(-0.5, 0.5, 12)
+        results = []
+        for use_array in (True, False):
+            env = _make_env(Go2RLEnv)
+            try:
+                if use_array:
+                    env.sim.set_joint_targets_array(targets)
+                else:
+                    env.sim.set_joint_targets(dict(zip(env.sim.joint_names, targets)))
+                env.sim.step(20)
+                results.append(env.sim.get_joint_state_arrays()[0].copy())
+            finally:
+                env.close()
+        
+        np.testing.assert_allclose(results[0], results[1])
+
+
+class TestUrdfCache:
+    """Test de on-disk URDF cache"""
+    
+    def test_resolved_urdf_is_cached(self, tmp_path):
+        """Opgeloste URDF wordt één keer geschreven en daarna hergebruikt"""
+        from src.simulation.urdf_cache import resolve_urdf, _resolved_urdfs
+        from src.simulation.go2_simulator import Go2Simulator
+        
+        urdf_path = Path(__file__).parent.parent / "urdf" / "urdf" / "go2_description.urdf"
+        _resolved_urdfs.clear()
+        resolved, key = resolve_urdf(urdf_path, cache_dir=tmp_path)
+        
+        assert resolved.parent == tmp_path
+        assert key in resolved.name
+        assert "package://" not in resolved.read_text(encoding='utf-8')
+        
+        mtime = resolved.stat().st_mtime_ns
+        _resolved_urdfs.clear()
+        assert resolve_urdf(urdf_path, cache_dir=tmp_path) == (resolved, key)
+        assert resolved.stat().st_mtime_ns == mtime
+        _resolved_urdfs.clear()
+    
+    def test_joint_table_is_cached(self):
+        """Tweede simulator gebruikt de gecachte joint tabel"""
+        from src.simulation.urdf_cache import load_joint_table, resolve_urdf
+        
+        env = _make_env(Go2RLEnv)
+        try:
+            resolved, _ = resolve_urdf(env.sim.urdf_path, profile=env.sim.profile)
+            table = load_joint_table(resolved)
+            
+            assert table is not None
+            assert table["joint_names"] == env.sim.joint_names
+            assert table["joint_indices"] == env.sim.joint_indices
+            assert table["default_positions"] == env.sim.default_joint_positions
+        finally:
+            env.close()
+
+
+class TestTrainProfile:
+    """Test het lichte trainingsmodel"""
+    
+    @staticmethod
+    def _make_sim(profile):
+        from src.simulation.go2_simulator import Go2Simulator
+        try:
+            return Go2Simulator(gui=False, profile=profile)
+        except p.error as e:
+            pytest.skip(f"Kon simulator niet starten: {e}")
+    
+    @staticmethod
+    def _total_mass(sim):
+        num_joints = p.getNumJoints(sim.robot_id, physicsClientId=sim.client)
+        return sum(
+            p.getDynamicsInfo(sim.robot_id, i, physicsClientId=sim.client)[0]
+            for i in range(-1, num_joints)
+        )
+    
+    def test_train_profile_matches_full_model(self):
+        """Zelfde joints en massa, maar minder links en geen visuals"""
+        train = self._make_sim("train")
+        try:
+            full = self._make_sim("full")
+        except BaseException:
+            train.close()
+            raise
+        try:
+            assert train.joint_names == full.joint_names
+            assert train.default_joint_positions == full.default_joint_positions
+            assert self._total_mass(train) == pytest.approx(self._total_mass(full))
+            assert (p.getNumJoints(train.robot_id, physicsClientId=train.client)
+                    < p.getNumJoints(full.robot_id, physicsClientId=full.client))
+            visual_shapes = p.getVisualShapeData(train.robot_id, physicsClientId=train.client)
+            assert not any(shape[4].endswith(b".dae") for shape in visual_shapes)
+        finally:
+            train.close()
+            full.close()
+    
+    def test_unknown_profile_raises(self):
+        """Onbekend profiel geeft een duidelijke fout"""
+        from src.simulation.go2_simulator import Go2Simulator
+        with pytest.raises(ValueError):
+            Go2Simulator(gui=False, profile="unknown")
+    
+    def test_headless_env_uses_train_profile(self):
+        """Headless environments gebruiken standaard het trainingsmodel"""
+        env = _make_env(Go2RLEnv)
+        try:
+            assert env.sim_profile == "train"
+            assert env.sim.profile == "train"
+        finally:
+            env.close()
+
+
+class TestDecimation:
+    """Test control decimation (meerdere physics substeps per policy stap)"""
+    
+    @pytest.mark.parametrize("env_class", [Go2RLEnv, Go2StairsEnv])
+    def test_decimation_matches_single_steps(self, env_class):
+        """4 env stappen met decimation 4 simuleren hetzelfde als 16 losse stappen"""
+        action = np.full(12, 0.3, dtype=np.float32)
+        results = []
+        for decimation, num_steps in ((4, 4), (1, 16)):
+            env = _make_env(env_class, decimation=decimation)
+            try:
+                for _ in range(num_steps):
+                    obs, _, _, _, info = env.step(action)
+                assert info["step_count"] == num_steps
+                results.append((obs, info["reward/survival"]))
+            finally:
+                env.close()
+        
+        np.testing.assert_allclose(results[0][0], results[1][0], atol=1e-5)
+        # Rate termen schalen met control_dt: zelfde reward per gesimuleerde seconde
+        assert results[0][1] == pytest.approx(results[1][1])
+    
+    @pytest.mark.parametrize("env_class", [Go2RLEnv, Go2StairsEnv])
+    def test_decimation_reduces_step_overhead(self, env_class):
+        """State, reward en done één keer per policy stap: minder overhead per gesimuleerde seconde"""
+        overhead = {}
+        for decimation in (1, 8):
+            env = _make_env(env_class, profiling=True, decimation=decimation, max_episode_steps=10_000)
+            try:
+                env.profiler.reset()
+                for _ in range(480 // decimation):
+                    env.step(np.zeros(12, dtype=np.float32))
+                report = env.profile_report()
+                phases = report["phases"]
+                overhead[decimation] = phases["step"]["total_s"] - phases["physics"]["total_s"]
+                assert report["api_calls_per_step"]["stepSimulation"] == decimation
+                assert report["api_calls_per_step"]["getJointStates"] == 1
+            finally:
+                env.close()
+        
+        # Zelfde gesimuleerde tijd (2 s); zonder overhead per substep ruim 2x minder
+        assert overhead[8] < 0.5 * overhead[1]
+    
+    def test_control_dt_sets_decimation(self):
+        """control_dt wordt omgezet naar een aantal physics substeps"""
+        env = Go2RLEnv(gui=False, control_dt=0.05)
+        assert env.decimation == 12
+        assert env.control_dt == pytest.approx(0.05)
+        with pytest.raises(ValueError):
+            Go2RLEnv(gui=False, decimation=0)
+
+
+class FakeClock:
+    """Deterministische klok; sleep zet de tijd vooruit"""
+    
+    def __init__(self, step_cost: float = 0.0):
+        self.now = 0.0
+        self.step_cost = step_cost
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+class TestPacing:
+    """Test wall-clock pacing scheduler"""
+    
+    @staticmethod
+    def _run(scheduler, clock, steps):
+        frames = []
+        for i in range(steps):
+            scheduler.before_step()
+            clock.now += clock.step_cost
+            scheduler.after_step()
+            if scheduler.frames > len(frames):
+                frames.append(i)
+        return frames
+    
+    def test_fast_mode_frames_on_fixed_schedule(self):
+        """Frames vallen op vaste simulatiestappen, zonder wachten"""
+        from src.simulation.pacing import PacingScheduler
+        clock = FakeClock(step_cost=0.001)
+        scheduler = PacingScheduler(1.0 / 240.0, mode="fast", render_fps=30, clock=clock, sleep=clock.sleep)
+        
+        frames = self._run(scheduler, clock, 240)
+        stats = scheduler.stats()
+        
+        assert frames == list(range(7, 240, 8))
+        assert stats["frames"] == 30
+        assert stats["frames_late"] == 0
+        assert stats["real_time_factor"] == pytest.approx((1.0 / 240.0) / 0.001)
+    
+    @pytest.mark.parametrize("mode,speed", [("realtime", 1.0), ("xfactor", 4.0)])
+    def test_paced_mode_matches_wall_clock(self, mode, speed):
+        """Gepacede modus wacht tot de wall-clock de simulatie inhaalt"""
+        from src.simulation.pacing import PacingScheduler
+        clock = FakeClock(step_cost=0.0005)
+        scheduler = PacingScheduler(1.0 / 240.0, mode=mode, speed=speed, clock=clock, sleep=clock.sleep)
+        
+        self._run(scheduler, clock, 480)
+        stats = scheduler.stats()
+        
+        assert stats["real_time_factor"] == pytest.approx(speed)
+        assert stats["frames"] == 480 // scheduler.frame_interval_steps
+        assert stats["frames_late"] == 0
+        assert stats["frame_jitter_max_ms"] == pytest.approx(0.0, abs=1e-9)
+    
+    def test_slow_steps_report_late_frames(self):
+        """Te trage physics houdt het frame schema aan en meldt te late frames"""
+        from src.simulation.pacing import PacingScheduler
+        clock = FakeClock(step_cost=0.01)  # 2.4x trager dan real-time
+        scheduler = PacingScheduler(1.0 / 240.0, mode="realtime", clock=clock, sleep=clock.sleep)
+        
+        frames = self._run(scheduler, clock, 240)
+        stats = scheduler.stats()
+        
+        assert frames == list(range(7, 240, 8))
+        assert stats["frames_late"] > 0
+        assert stats["frames"] == 30
+        assert stats["real_time_factor"] == pytest.approx(1.0 / 2.4)
+        assert stats["resyncs"] > 0
+    
+    def test_frame_schedule_follows_speed(self):
+        """Het frame schema volgt render_fps in wall-clock tijd, ook bij xfactor"""
+        from src.simulation.pacing import PacingScheduler
+        clock = FakeClock(step_cost=0.0)
+        scheduler = PacingScheduler(1.0 / 240.0, mode="xfactor", speed=2.0, render_fps=30, clock=clock, sleep=clock.sleep)
+        assert scheduler.frame_interval_steps == 16
+        
+        frames = self._run(scheduler, clock, 480)
+        assert frames == list(range(15, 480, 16))
+        assert scheduler.stats()["wall_time"] == pytest.approx(1.0)
+        
+        scheduler.set_mode("realtime")
+        assert scheduler.frame_interval_steps == 8
+    
+    def test_unknown_mode_raises(self):
+        """Onbekende pacing modus geeft een duidelijke fout"""
+        from src.simulation.pacing import PacingScheduler
+        with pytest.raises(ValueError):
+            PacingScheduler(1.0 / 240.0, mode="slow")
+    
+    def test_optimized_simulator_paces_steps(self):
+        """Go2SimulatorOptimized rapporteert pacing statistieken"""
+        from src.simulation.go2_simulator_optimized import Go2SimulatorOptimized
+        try:
+            sim = Go2SimulatorOptimized(gui=False, pacing="xfactor", speed=10.0)
+        except p.error as e:
+            pytest.skip(f"Kon simulator niet starten: {e}")
+        try:
+            sim.step(160)
+            stats = sim.pacing_stats()
+            assert stats["sim_time"] == pytest.approx(160 / 240)
+            assert stats["wall_time"] >= 160 / 240 / 10.0 - 1e-3
+            assert stats["frames"] == 2
+        finally:
+            sim.close()
+
+
+class TestMultiRobot:
+    """Test meerdere robots in één physics wereld"""
+    
+    @staticmethod
+    def _make_sim(num_robots):
+        from src.simulation.go2_simulator import Go2Simulator
+        try:
+            return Go2Simulator(gui=False, profile="train", num_robots=num_robots, spacing=2.0)
+        except p.error as e:
+            pytest.skip(f"Kon simulator niet starten: {e}")
+    
+    def test_robots_share_one_world(self):
+        """Alle robots staan gespreid in dezelfde client"""
+        sim = self._make_sim(4)
+        try:
+            assert len(set(sim.robot_ids)) == 4
+            assert sim.robot_id == sim.robot_ids[0]
+            assert sim.robot_origins.shape == (4, 3)
+            
+            positions, _, _, _ = sim.get_base_state_batch()
+            np.testing.assert_allclose(positions[:, :2], sim.robot_origins[:, :2], atol=1e-6)
+        finally:
+            sim.close()
+    
+    def test_batch_io_controls_each_robot(self):
+        """Batched targets sturen elke robot apart aan"""
+        sim = self._make_sim(3)
+        try:
+            targets = np.tile(np.array(sim.default_joint_positions), (3, 1))
+            hips = [i for i, name in enumerate(sim.joint_names) if "hip" in name]
+            targets[1, hips] += 0.3
+            targets[2, hips] -= 0.3
+            sim.set_joint_targets_batch(targets)
+            sim.step(60)
+            
+            positions, velocities, _ = sim.get_joint_state_batch()
+            assert positions.shape == (3, len(sim.joint_names))
+            assert velocities.shape == positions.shape
+            np.testing.assert_allclose(positions[0], sim.get_joint_state_arrays()[0])
+            assert np.all(positions[1, hips] > positions[0, hips] + 0.1)
+            assert np.all(positions[2, hips] < positions[0, hips] - 0.1)
+        finally:
+            sim.close()
+    
+    def test_reset_single_robot(self):
+        """reset() met robot_indices laat andere robots ongemoeid"""
+        sim = self._make_sim(2)
+        try:
+            sim.step(120)
+            moved = sim.get_base_state_batch()[0].copy()
+            sim.reset(robot_indices=[1])
+            positions = sim.get_base_state_batch()[0]
+            
+            np.testing.assert_allclose(positions[0], moved[0])
+            np.testing.assert_allclose(positions[1], sim.robot_origins[1] + [0, 0, 0.5])
+        finally:
+            sim.close()
+
+
+class TestRendering:
+    """Test offscreen rendering en video opname"""
+    
+    @pytest.mark.parametrize("env_class", [Go2RLEnv, Go2StairsEnv])
+    def test_rgb_array_render(self, env_class):
+        """rgb_array geeft een RGB beeld zonder GUI"""
+        env = _make_env(env_class, render_mode="rgb_array", render_width=64, render_height=48)
+        try:
+            frame = env.render()
+            assert frame.shape == (48, 64, 3)
+            assert frame.dtype == np.uint8
+            assert frame.std() > 0
+        finally:
+            env.close()
+    
+    def test_renderer_reuses_buffer_and_skips_frames(self):
+        """Zelfde buffer bij elke aanroep; alleen elke N-de aanroep rendert"""
+        from src.simulation.rendering import OffscreenRenderer
+        env = _make_env(Go2RLEnv)
+        try:
+            renderer = OffscreenRenderer(env.sim.client, width=32, height=24, frame_skip=3)
+            frames = [renderer.render() for _ in range(7)]
+            
+            assert all(frame is frames[0] for frame in frames)
+            assert renderer.frames_rendered == 3
+        finally:
+            env.close()
+    
+    def test_video_writer_streams_frames(self, tmp_path):
+        """VideoWriter schrijft frames direct naar bestand"""
+        pytest.importorskip("imageio")
+        from src.simulation.rendering import VideoWriter
+        
+        path = tmp_path / "video.gif"
+        frame = np.zeros((24, 32, 3), dtype=np.uint8)
+        with VideoWriter(str(path), fps=10) as video:
+            for i in range(5):
+                frame[:] = i * 40
+                video.append(frame)
+        
+        assert video.frames_written == 5
+        assert path.stat().st_size > 0
+
+
+class TestSnapshots:
+    """Test snapshot/restore van simulatie state"""
+    
+    @pytest.mark.parametrize("env_class", [Go2RLEnv, Go2StairsEnv])
+    def test_branches_from_snapshot_are_identical(self, env_class):
+        """Rollouts vanuit dezelfde snapshot geven hetzelfde resultaat"""
+        env = _make_env(env_class)
+        try:
+            for _ in range(30):
+                env.step(env.action_space.sample())
+            snapshot = env.snapshot()
+            actions = [env.action_space.sample() for _ in range(20)]
+            
+            branches = []
+            for _ in range(2):
+                env.restore(snapshot)
+                for action in actions:
+                    obs, _, _, _, info = env.step(action)
+                branches.append((obs, info["step_count"]))
+            
+            np.testing.assert_array_equal(branches[0][0], branches[1][0])
+            assert branches[0][1] == branches[1][1] == 50
+            env.sim.release(snapshot)
+            assert snapshot.state_id is None
+        finally:
+            env.close()
+    
+    def test_serialized_snapshot_restores_in_other_simulator(self):
+        """Snapshot via bytes herstellen in een andere simulator"""
+        from src.simulation.go2_simulator import SimSnapshot
+        env = _make_env(Go2StairsEnv)
+        try:
+            for _ in range(30):
+                env.step(env.action_space.sample())
+            expected_obs = env._get_obs()
+            data = env.snapshot().to_bytes()
+        finally:
+            env.close()
+        
+        snapshot = SimSnapshot.from_bytes(data)
+        assert snapshot.state_id is None
+        assert snapshot.extra["step_count"] == 30
+        
+        other = _make_env(Go2StairsEnv)
+        try:
+            obs = other.restore(snapshot)
+            np.testing.assert_allclose(obs, expected_obs, atol=1e-5)
+            assert other.step_count == 30
+            
+            obs, info = other.reset(options={"snapshot": snapshot})
+            np.testing.assert_allclose(obs, expected_obs, atol=1e-5)
+            assert info["step_count"] == 0
+        finally:
+            other.close()
+
+
+class TestProfiling:
+    """Test fase timings en API call tellingen"""
+    
+    def test_disabled_profiler_records_nothing(self):
+        """Standaard wordt er niets gemeten"""
+        env = _make_env(Go2RLEnv)
+        try:
+            _, _, _, _, info = env.step(env.action_space.sample())
+            report = env.profile_report()
+            
+            assert "profile" not in info
+            assert report["steps"] == 0
+            assert report["phases"] == {}
+        finally:
+            env.close()
+    
+    @pytest.mark.parametrize("env_class", [Go2RLEnv, Go2StairsEnv])
+    def test_step_phases_and_api_calls(self, env_class):
+        """Fases en API calls per stap worden gemeten"""
+        env = _make_env(env_class, profiling=True, decimation=2)
+        try:
+            env.profiler.reset()
+            for _ in range(5):
+                _, _, _, _, info = env.step(env.action_space.sample())
+            report = env.profile_report()
+            
+            assert {"step", "physics", "action", "reward", "done", "obs"} <= set(info["profile"])
+            assert report["steps"] == 5
+            assert report["api_calls_per_step"]["stepSimulation"] == 2
+            assert report["api_calls_per_step"]["setJointMotorControlArray"] == 1
+            phases = report["phases"]
+            assert phases["step"]["total_s"] >= phases["physics"]["total_s"] > 0
+        finally:
+            env.close()
+
+
+class TestStateFrame:
+    """Test de per-stap state cache"""
+    
+    @pytest.mark.parametrize("env_class", [Go2RLEnv, Go2StairsEnv])
+    def test_state_read_once_per_policy_step(self, env_class):
+        """Observatie, reward en done delen één state query per policy stap"""
+        env = _make_env(env_class, profiling=True, decimation=2)
+        try:
+            env.profiler.reset()
+            for _ in range(5):
+                env.step(env.action_space.sample())
+            calls = env.profile_report()["api_calls_per_step"]
+            
+            assert calls["getBasePositionAndOrientation"] == 1
+            assert calls["getBaseVelocity"] == 1
+            assert calls["getJointStates"] == 1
+        finally:
+            env.close()
+    
+    def test_frame_matches_direct_queries(self):
+        """Frame waarden komen overeen met de losse getters"""
+        env = _make_env(Go2RLEnv)
+        try:
+            env.step(env.action_space.sample())
+            sim = env.sim
+            frame = sim.get_state_frame()
+            positions, velocities, efforts = sim.get_joint_state_arrays()
+            base_pos, base_ori = sim.get_base_pose()
+            
+            np.testing.assert_allclose(frame.joint_positions[0], positions, rtol=1e-6, atol=1e-6)
+            np.testing.assert_allclose(frame.joint_velocities[0], velocities, rtol=1e-6, atol=1e-5)
+            np.testing.assert_allclose(frame.base_position[0], base_pos, atol=1e-6)
+            np.testing.assert_allclose(frame.base_orientation[0], base_ori, atol=1e-6)
+        finally:
+            env.close()
+    
+    def test_frame_invalidated_by_state_changes(self):
+        """step(), restore() en invalidate_state() maken het frame ongeldig"""
+        env = _make_env(Go2RLEnv)
+        try:
+            sim = env.sim
+            snap = sim.snapshot()
+            start = sim.get_state_frame().base_position[0].copy()
+            version = sim.state_frame.version
+            assert sim.get_state_frame().version == version
+            
+            sim.step(60)
+            assert not np.allclose(sim.get_state_frame().base_position[0], start)
+            
+            sim.restore(snap)
+            np.testing.assert_allclose(sim.get_state_frame().base_position[0], start, atol=1e-6)
+            
+            version = sim.state_frame.version
+            sim.invalidate_state()
+            assert sim.get_state_frame().version > version
+            sim.release(snap)
+        finally:
+            env.close()
+    
+    def test_multi_robot_positions_relative_to_origin(self):
+        """Base posities in het frame zijn relatief t.o.v. de robot oorsprong"""
+        sim = TestMultiRobot._make_sim(4)
+        try:
+            frame = sim.get_state_frame()
+            world_positions = sim.get_base_state_batch()[0]
+            
+            assert frame.base_position.shape == (4, 3)
+            np.testing.assert_allclose(frame.base_position, world_positions - sim.robot_origins, atol=1e-6)
+            np.testing.assert_allclose(frame.base_position[:, :2], 0.0, atol=1e-6)
+        finally:
+            sim.close()
+
+
+class TestBaseEnv:
+    """Test de gedeelde observatie layout en action scaling"""
+    
+    def test_obs_layout_matches_spaces(self):
+        """Benoemde slices dekken de hele observatie"""
+        for env_class, dim in [(Go2RLEnv, 37), (Go2StairsEnv, 41)]:
+            env = env_class(gui=False)
+            slices = list(env.obs_slices.values())
+            assert env.observation_space.shape == (dim,)
+            assert slices[0].start == 0 and slices[-1].stop == dim
+            assert all(a.stop == b.start for a, b in zip(slices, slices[1:]))
+            env.close()
+    
+    def test_obs_fields_match_state_frame(self):
+        """Observatie velden bevatten de robot state en de taak velden"""
+        env = _make_env(Go2StairsEnv)
+        try:
+            obs, _, _, _, _ = env.step(env.action_space.sample())
+            frame = env.sim.get_state_frame()
+            
+            assert obs.dtype == np.float32
+            np.testing.assert_array_equal(env.obs_field(obs, "joint_positions"), frame.joint_positions[0])
+            np.testing.assert_array_equal(env.obs_field(obs, "base_orientation"), frame.base_orientation[0])
+            np.testing.assert_allclose(env.obs_field(obs, "next_step_position"), env._get_next_step_position())
+            
+            # Teruggegeven observatie is geen view op de interne buffer
+            next_obs, _, _, _, _ = env.step(env.action_space.sample())
+            assert not np.shares_memory(obs, next_obs)
+        finally:
+            env.close()
+    
+    def test_scale_action_matches_joint_limits(self):
+        """Affine scaling beeldt [-1, 1] af op [low, high]"""
+        env = Go2RLEnv(gui=False)
+        low, high = env.joint_limits[:, 0], env.joint_limits[:, 1]
+        np.testing.assert_allclose(env.scale_action(-np.ones(12, dtype=np.float32)), low)
+        np.testing.assert_allclose(env.scale_action(np.ones(12, dtype=np.float32)), high)
+        
+        action = np.linspace(-1, 1, 12, dtype=np.float32)
+        np.testing.assert_allclose(env.scale_action(action), low + (action + 1.0) / 2.0 * (high - low), rtol=1e-6)
+        env.close()
+    
+    def test_subclass_declares_extra_fields(self):
+        """Een nieuwe taak hoeft alleen extra velden te declareren"""
+        from src.simulation.go2_base_env import Go2BaseEnv
+        
+        class GoalEnv(Go2BaseEnv):
+            EXTRA_OBS_FIELDS = (("goal_offset", 2),)
+            
+            def _fill_obs(self, obs):
+                base_pos = self.sim.get_state_frame().base_position[0]
+                obs[self.obs_slices["goal_offset"]] = np.array([2.0, 0.0]) - base_pos[:2]
+            
+            def _calculate_reward(self):
+                return 0.0
+        
+        env = _make_env(GoalEnv)
+        try:
+            obs, reward, _, _, _ = env.step(env.action_space.sample())
+            assert obs.shape == (39,)
+            base_pos = env.obs_field(obs, "base_position")
+            np.testing.assert_allclose(env.obs_field(obs, "goal_offset"), [2.0 - base_pos[0], -base_pos[1]], atol=1e-6)
+        finally:
+            env.close()
+
+
+class TestVecEnv:
+    """Test de gebatchte Go2VecEnv"""
+    
+    @staticmethod
+    def _make_vec_env(env_class, num_envs, envs_per_process=None, transport="shm", **kwargs):
+        pytest.importorskip("stable_baselines3")
+        from src.simulation.vec_env import Go2VecEnv
+        try:
+            return Go2VecEnv(
+                [lambda: env_class(gui=False, **kwargs) for _ in range(num_envs)],
+                envs_per_process=envs_per_process,
+                transport=transport
+            )
+        except p.error as e:
+            pytest.skip(f"Kon simulator niet starten: {e}")
+    
+    @pytest.mark.parametrize("env_class", [Go2RLEnv, Go2StairsEnv])
+    def test_batched_step_shapes(self, env_class):
+        """Observaties, rewards en dones komen als arrays voor alle robots"""
+        vec_env = self._make_vec_env(env_class, 3, decimation=2)
+        try:
+            obs = vec_env.reset()
+            assert obs.shape == (3,) + vec_env.observation_space.shape
+            assert obs.dtype == np.float32
+            
+            actions = np.zeros((3, 12), dtype=np.float32)
+            obs, rewards, dones, infos = vec_env.step(actions)
+            assert obs.shape[0] == rewards.shape[0] == dones.shape[0] == len(infos) == 3
+            assert vec_env.get_attr("step_count") == [1, 1, 1]
+        finally:
+            vec_env.close()
+    
+    def test_reset_matches_single_env(self):
+        """Elke robot start in dezelfde (relatieve) state als een losse env"""
+        env = _make_env(Go2RLEnv)
+        vec_env = self._make_vec_env(Go2RLEnv, 2)
+        try:
+            single_obs, _ = env.reset()
+            obs = vec_env.reset()
+            np.testing.assert_allclose(obs[0], single_obs, atol=1e-4)
+            np.testing.assert_allclose(obs[1], single_obs, atol=1e-4)
+        finally:
+            env.close()
+            vec_env.close()
+    
+    def test_auto_reset_only_finished_robot(self):
+        """Een afgelopen episode wordt gereset zonder de andere robots te storen"""
+        vec_env = self._make_vec_env(Go2RLEnv, 2, max_episode_steps=3)
+        try:
+            vec_env.reset()
+            vec_env.set_attr("max_episode_steps", 100, indices=[1])
+            actions = np.zeros((2, 12), dtype=np.float32)
+            for _ in range(3):
+                obs, _, dones, infos = vec_env.step(actions)
+            
+            assert dones.tolist() == [True, False]
+            assert infos[0]["terminal_observation"].shape == obs[0].shape
+            assert "terminal_observation" not in infos[1]
+            assert vec_env.get_attr("step_count") == [0, 3]
+        finally:
+            vec_env.close()
+    
+    @pytest.mark.parametrize("transport", ["shm", "pipe"])
+    def test_worker_processes_match_in_process(self, transport):
+        """Worker processen geven dezelfde resultaten als één client"""
+        local = self._make_vec_env(Go2RLEnv, 2, decimation=2)
+        workers = self._make_vec_env(Go2RLEnv, 2, envs_per_process=1, transport=transport, decimation=2)
+        try:
+            assert workers.num_groups == 2
+            np.testing.assert_allclose(local.reset(), workers.reset(), atol=1e-4)
+            
+            actions = np.random.default_rng(0).uniform(-1, 1, (2, 12)).astype(np.float32)
+            local_obs, local_rewards, _, _ = local.step(actions)
+            worker_obs, worker_rewards, _, _ = workers.step(actions)
+            np.testing.assert_allclose(local_obs, worker_obs, atol=1e-3)
+            np.testing.assert_allclose(local_rewards, worker_rewards, atol=1e-2)
+            assert workers.env_method("profile_report", indices=[1])[0]["steps"] == 0
+        finally:
+            local.close()
+            workers.close()
+    
+    def test_shm_transport_infos_and_terminal_obs(self):
+        """Gedeeld geheugen levert dezelfde infos als de pipe, inclusief terminal_observation"""
+        kwargs = dict(envs_per_process=1, max_episode_steps=2, stair_config={"num_steps": 3})
+        shm = self._make_vec_env(Go2StairsEnv, 2, transport="shm", **kwargs)
+        pipe = self._make_vec_env(Go2StairsEnv, 2, transport="pipe", **kwargs)
+        try:
+            shm.reset()
+            pipe.reset()
+            actions = np.zeros((2, 12), dtype=np.float32)
+            for _ in range(2):
+                _, _, shm_dones, shm_infos = shm.step(actions)
+                _, _, pipe_dones, pipe_infos = pipe.step(actions)
+            
+            assert shm_dones.tolist() == pipe_dones.tolist() == [True, True]
+            for shm_info, pipe_info in zip(shm_infos, pipe_infos):
+                assert set(shm_info) == set(pipe_info)
+                assert shm_info["num_steps"] == 3 and isinstance(shm_info["step_count"], int)
+                assert shm_info["episode_reward"] == pytest.approx(pipe_info["episode_reward"], abs=1e-3)
+                np.testing.assert_allclose(shm_info["terminal_observation"], pipe_info["terminal_observation"], atol=1e-5)
+        finally:
+            shm.close()
+            pipe.close()
+    
+    def test_shm_transport_randomization_infos_in_shared_memory(self):
+        """Randomization infos gaan via het gedeelde geheugen, niet elke stap over de pipe"""
+        vec_env = self._make_vec_env(
+            Go2RLEnv, 2, envs_per_process=1, max_episode_steps=3, randomization={"friction": None}
+        )
+        try:
+            vec_env.reset()
+            actions = np.zeros((2, 12), dtype=np.float32)
+            for _ in range(3):
+                _, _, _, infos = vec_env.step(actions)
+                for group in vec_env._groups:
+                    assert group._views["header"][1] == 0
+                for info in infos:
+                    assert isinstance(info["randomization/friction"], float)
+        finally:
+            vec_env.close()
+    
+    def test_shm_transport_info_keys_can_disappear(self):
+        """Terrain en randomization via env_method uitzetten laat hun infos weg"""
+        vec_env = self._make_vec_env(
+            Go2RLEnv, 2, envs_per_process=1, max_episode_steps=3,
+            terrain={"type": "stairs"}, randomization={"friction": None}
+        )
+        try:
+            vec_env.reset()
+            actions = np.zeros((2, 12), dtype=np.float32)
+            _, _, _, infos = vec_env.step(actions)
+            assert all("terrain_seed" in info and "randomization/friction" in info for info in infos)
+            
+            vec_env.env_method("set_terrain", None)
+            vec_env.env_method("set_randomization", None)
+            vec_env.reset()
+            for _ in range(3):
+                _, _, _, infos = vec_env.step(actions)
+                for info in infos:
+                    assert "terrain_seed" not in info and "randomization/friction" not in info
+                    assert isinstance(info["step_count"], int)
+        finally:
+            vec_env.close()
+    
+    def test_unknown_transport_raises(self):
+        """Onbekend transport geeft een duidelijke fout"""
+        pytest.importorskip("stable_baselines3")
+        from src.simulation.vec_env import Go2VecEnv
+        with pytest.raises(ValueError, match="transport"):
+            Go2VecEnv([lambda: Go2RLEnv(gui=False)] * 2, envs_per_process=1, transport="tcp")
+
+
+class TestRewards:
+    """Test de reward termen en per-term logging"""
+    
+    def test_batched_compute_matches_single_robot(self):
+        """Eén compute() over alle robots geeft dezelfde reward als per robot"""
+        from src.simulation.rewards import RewardFunction
+        
+        sim = TestMultiRobot._make_sim(4)
+        try:
+            for i in range(4):
+                sim.set_joint_targets_array(np.random.uniform(-0.5, 0.5, 12), robot_index=i)
+            sim.step(20)
+            frame = sim.get_state_frame()
+            env = Go2RLEnv(gui=False)
+            state = {
+                "base_position": frame.base_position,
+                "base_linear_velocity": frame.base_linear_velocity,
+                "base_angular_velocity": frame.base_angular_velocity,
+                "joint_positions": frame.joint_positions,
+                "joint_velocities": frame.joint_velocities,
+                "joint_limits": env.joint_limits,
+                "target_height": np.full(4, 0.5),
+            }
+            reward_fn = RewardFunction(Go2RLEnv.REWARD_PRESETS["walking"])
+            rewards, terms = reward_fn.compute(state)
+            
+            assert rewards.shape == (4,) and terms.shape == (4, len(reward_fn.names))
+            np.testing.assert_allclose(terms.sum(axis=1), rewards)
+            for i in range(4):
+                single = {k: v if k == "joint_limits" else v[i:i + 1] for k, v in state.items()}
+                np.testing.assert_allclose(reward_fn.compute(single)[0], rewards[i:i + 1])
+            env.close()
+        finally:
+            sim.close()
+    
+    @pytest.mark.parametrize("env_class", [Go2RLEnv, Go2StairsEnv])
+    def test_term_sums_add_up_to_episode_reward(self, env_class):
+        """De reward/<term> sommen in info tellen op tot episode_reward"""
+        env = _make_env(env_class)
+        try:
+            for _ in range(10):
+                _, _, _, _, info = env.step(env.action_space.sample())
+            sums = [value for key, value in info.items() if key.startswith("reward/")]
+            assert len(sums) == len(env.reward_fn.names)
+            assert sum(sums) == pytest.approx(info["episode_reward"], rel=1e-5, abs=1e-5)
+            
+            _, info = env.reset()
+            assert all(info[f"reward/{name}"] == 0.0 for name in env.reward_fn.names)
+        finally:
+            env.close()
+    
+    def test_weight_override(self):
+        """reward_weights past gewichten aan; gewicht 0 zet een term uit"""
+        env = _make_env(Go2RLEnv, reward_type="standing", reward_weights={"survival": 0.0, "fallen": -100.0})
+        try:
+            assert "survival" not in env.reward_fn.names
+            assert "fallen" in env.reward_fn.names
+            assert "height_tracking" in env.reward_fn.names
+            _, _, _, _, info = env.step(env.action_space.sample())
+            assert "reward/survival" not in info
+        finally:
+            env.close()
+    
+    def test_unknown_term_raises(self):
+        """Onbekende term of reward type geeft een duidelijke fout"""
+        with pytest.raises(ValueError, match="reward term"):
+            Go2RLEnv(gui=False, reward_weights={"does_not_exist": 1.0})
+        with pytest.raises(ValueError, match="reward type"):
+            Go2RLEnv(gui=False, reward_type="running")
+
+
+class TestTerrain:
+    """Test de procedurele terrains"""
+    
+    @pytest.mark.parametrize("terrain_type", ["flat", "rough", "slope", "stepping_stones", "stairs"])
+    def test_generation_is_seeded(self, terrain_type):
+        """Zelfde seed geeft hetzelfde terrain, met een vlak startgebied"""
+        from src.simulation.terrain import generate_heightfield
+        
+        heights = generate_heightfield(terrain_type, seed=3, size=4.0, resolution=0.1)
+        assert heights.shape == (41, 41) and heights.dtype == np.float32
+        np.testing.assert_array_equal(heights, generate_heightfield(terrain_type, seed=3, size=4.0, resolution=0.1))
+        np.testing.assert_array_equal(heights[18:23, 18:23], 0.0)
+        if terrain_type in ("rough", "stepping_stones"):
+            assert not np.array_equal(heights, generate_heightfield(terrain_type, seed=4, size=4.0, resolution=0.1))
+    
+    def test_heightfield_cache(self, tmp_path):
+        """Terrains worden op parameter hash gecachet in geheugen en op schijf"""
+        from src.simulation.terrain import get_heightfield, terrain_key, _heightfields
+        
+        _heightfields.clear()
+        heights, key = get_heightfield("rough", seed=1, amplitude=0.1, cache_dir=tmp_path)
+        cached_file = tmp_path / f"rough_{key}.npz"
+        assert cached_file.exists()
+        assert key != terrain_key("rough", seed=1, amplitude=0.2)
+        assert get_heightfield("rough", seed=1, amplitude=0.1, cache_dir=tmp_path)[0] is heights
+        
+        # Nieuw proces: van schijf, zonder opnieuw te schrijven
+        mtime = cached_file.stat().st_mtime_ns
+        _heightfields.clear()
+        reloaded, reloaded_key = get_heightfield("rough", seed=1, amplitude=0.1, cache_dir=tmp_path)
+        assert reloaded_key == key
+        np.testing.assert_array_equal(reloaded, heights)
+        assert cached_file.stat().st_mtime_ns == mtime
+        _heightfields.clear()
+    
+    def test_swap_reuses_collision_shape(self):
+        """Terrain wissel bij reset vervangt alleen de hoogtedata"""
+        env = _make_env(Go2RLEnv, terrain={"type": "stairs", "num_variations": 20, "height_variation": 0.05})
+        try:
+            client = env.sim.client
+            body_id, shape_id = env.terrain.body_id, env.terrain.shape_id
+            num_bodies = p.getNumBodies(physicsClientId=client)
+            seeds = set()
+            for _ in range(8):
+                _, info = env.reset()
+                seeds.add(info["terrain_seed"])
+                assert (env.terrain.body_id, env.terrain.shape_id) == (body_id, shape_id)
+                assert p.getNumBodies(physicsClientId=client) == num_bodies
+                
+                # Collision geometrie volgt de nieuwe hoogtes
+                x, y = 1.525, 0.025
+                hit = p.rayTest([x, y, 3.0], [x, y, -3.0], physicsClientId=client)[0]
+                assert hit[0] == body_id
+                assert hit[3][2] == pytest.approx(env.terrain.height_at(x, y), abs=1e-3)
+            assert len(seeds) > 1
+        finally:
+            env.close()
+    
+    def test_remove_frees_collision_shape(self, monkeypatch):
+        """Terrain uitzetten of van afmeting wisselen verwijdert ook de heightfield shape"""
+        from src.simulation import terrain as terrain_module
+        
+        removed = []
+        remove_shape = terrain_module.p.removeCollisionShape
+        
+        def spy(shape_id, physicsClientId):
+            removed.append(shape_id)
+            remove_shape(shape_id, physicsClientId=physicsClientId)
+        
+        monkeypatch.setattr(terrain_module.p, "removeCollisionShape", spy)
+        env = _make_env(Go2RLEnv, terrain={"type": "rough"})
+        try:
+            first = env.terrain.shape_id
+            env.set_terrain({"type": "rough", "size": 3.0})
+            assert removed == [first]
+            
+            env.reset()
+            second = env.terrain.shape_id
+            env.set_terrain(None)
+            assert removed == [first, second]
+            assert env.terrain is None
+        finally:
+            env.close()
+    
+    def test_robot_stands_on_terrain(self):
+        """Robot botst met het terrain en niet meer met de vloer eronder"""
+        env = _make_env(Go2RLEnv, terrain={"type": "stepping_stones", "spawn_radius": 0.6})
+        try:
+            touched = set()
+            for _ in range(60):
+                _, _, done, _, _ = env.step(np.zeros(12, dtype=np.float32))
+                contacts = p.getContactPoints(bodyA=env.sim.robot_id, physicsClientId=env.sim.client)
+                touched.update(c[2] for c in contacts)
+            assert not done
+            assert touched == {env.terrain.body_id}
+        finally:
+            env.close()
+    
+    def test_unknown_terrain_raises(self):
+        """Onbekend terrain type geeft een duidelijke fout"""
+        with pytest.raises(ValueError, match="terrain type"):
+            Go2RLEnv(gui=False, terrain={"type": "lava"})
+
+
+class TestStairs:
+    """Test de herbruikbare trap geometrie"""
+    
+    @staticmethod
+    def _surface(env, x):
+        """(body, hoogte) van het bovenste oppervlak op x (t.o.v. robot oorsprong)"""
+        hit = p.rayTest([x, 0.0, 3.0], [x, 0.0, -1.0], physicsClientId=env.sim.client)[0]
+        return hit[0], hit[3][2]
+    
+    def test_stairs_are_one_body(self):
+        """Alle treden en het platform zitten in één statische body"""
+        env = _make_env(Go2StairsEnv, stair_config={"num_steps": 4, "step_height": 0.1})
+        try:
+            assert p.getNumBodies(physicsClientId=env.sim.client) == 3  # vloer, robot, trap
+            # Voorkant van de eerste trede en het platform bovenaan
+            x, _, z = env.step_positions[0]
+            assert self._surface(env, x - 0.2) == (env.stair_id, pytest.approx(z + 0.05, abs=1e-3))
+            platform_x = env.start_distance + env.num_steps * env.step_depth
+            assert self._surface(env, platform_x) == (env.stair_id, pytest.approx(4 * 0.1 + 0.2, abs=1e-3))
+        finally:
+            env.close()
+    
+    def test_reconfigure_reuses_bodies(self):
+        """Nieuwe trap configuratie bij reset verplaatst bestaande bodies"""
+        env = _make_env(Go2StairsEnv)
+        try:
+            client = env.sim.client
+            low = {"step_height": 0.08, "start_distance": 0.8}
+            high = {"step_height": 0.12, "start_distance": 1.2}
+            env.reset(options={"stair_config": low})
+            env.reset(options={"stair_config": high})
+            num_bodies = p.getNumBodies(physicsClientId=client)
+            ids = {}
+            for config in [low, high, low, dict(high, start_distance=1.5)]:
+                _, info = env.reset(options={"stair_config": config})
+                ids.setdefault(config["step_height"], env.stair_id)
+                assert env.stair_id == ids[config["step_height"]]
+                assert p.getNumBodies(physicsClientId=client) == num_bodies
+                
+                # Trap staat na restoreState op de nieuwe plek
+                body, height = self._surface(env, config["start_distance"] + 0.01)
+                assert body == env.stair_id
+                assert height == pytest.approx(2.5 * config["step_height"], abs=1e-3)
+                assert env.step_positions[0][0] == config["start_distance"]
+            steps = [key for key in env.sim.shape_cache if key[0] == "stair_step"]
+            assert len(steps) == 3  # default, laag en hoog
+        finally:
+            env.close()
+    
+    def test_num_steps_moves_links(self):
+        """Ander aantal treden: zelfde body en begin-state, ongebruikte treden onder de vloer"""
+        env = _make_env(Go2StairsEnv, profiling=True)
+        try:
+            stair_id, state_id = env.stair_id, env._initial_state_id
+            for num_steps in (3, 7, 5):
+                env.profiler.reset()
+                env.reset(options={"stair_config": {"num_steps": num_steps}})
+                assert (env.stair_id, env._initial_state_id) == (stair_id, state_id)
+                assert "stepSimulation" not in env.profiler.api_calls
+                assert "saveState" not in env.profiler.api_calls
+                
+                # Ongebruikte treden onder de vloer, platform achter de bovenste trede
+                heights = [
+                    p.getLinkState(env.stair_id, link, physicsClientId=env.sim.client)[0][2]
+                    for link in range(env.MAX_STAIR_STEPS)
+                ]
+                assert sum(height < 0 for height in heights) == env.MAX_STAIR_STEPS - num_steps
+                platform_x = env.start_distance + num_steps * env.step_depth + 0.1
+                assert self._surface(env, platform_x) == (env.stair_id, pytest.approx(num_steps * 0.15 + 0.2, abs=1e-3))
+        finally:
+            env.close()
+    
+    def test_new_geometry_keeps_initial_state(self):
+        """Nieuwe trede afmetingen: geen stabilisatie, oude bodies en shapes worden opgeruimd"""
+        env = _make_env(Go2StairsEnv, profiling=True)
+        try:
+            env.MAX_STAIR_BODIES = 2
+            first_obs, _ = env.reset()
+            for height in (0.08, 0.1, 0.12):
+                env.profiler.reset()
+                obs, _ = env.reset(options={"stair_config": {"step_height": height}})
+                assert "stepSimulation" not in env.profiler.api_calls
+                assert env.profiler.api_calls["saveState"] == 1
+                robot = env.obs_slices["joint_positions"].start, env.obs_slices["base_angular_velocity"].stop
+                np.testing.assert_allclose(obs[slice(*robot)], first_obs[slice(*robot)], atol=1e-6)
+            
+            assert len(env._stair_bodies) == 2
+            assert p.getNumBodies(physicsClientId=env.sim.client) == 4  # vloer, robot, twee trappen
+            steps = sorted(key[1] for key in env.sim.shape_cache if key[0] == "stair_step")
+            assert steps == [0.1, 0.12]
+        finally:
+            env.close()
+    
+    def test_set_stair_config_applies_on_reset(self):
+        """set_stair_config() verandert de lopende episode niet"""
+        env = _make_env(Go2StairsEnv)
+        try:
+            env.set_stair_config({"num_steps": 3})
+            _, _, _, _, info = env.step(env.action_space.sample())
+            assert info["num_steps"] == 5
+            _, info = env.reset()
+            assert info["num_steps"] == 3
+            assert len(env.step_positions) == 3
+        finally:
+            env.close()
+
+
+class TestRaySensors:
+    """Test de ray-cast sensoren en voet contacten"""
+    
+    ALL_SENSORS = {"height_scan": None, "foot_scan": None, "lidar": None, "foot_contacts": None}
+    
+    def test_obs_layout_includes_sensors(self):
+        """Sensor velden komen achter de taak velden"""
+        from src.simulation.sensors import sensor_fields
+        
+        env = Go2StairsEnv(gui=False, sensors=self.ALL_SENSORS)
+        fields = dict(sensor_fields(self.ALL_SENSORS))
+        assert env.obs_slices["height_scan"].start == 41
+        assert env.observation_space.shape == (41 + sum(fields.values()),)
+        assert fields["foot_contacts"] == 4 and fields["lidar"] == 32
+        env.close()
+    
+    def test_flat_ground_ignores_robot(self):
+        """Op vlakke vloer meten de rays de vloer, niet de robot zelf"""
+        env = _make_env(Go2RLEnv, sensors=self.ALL_SENSORS, profiling=True)
+        try:
+            env.profiler.reset()
+            obs, _, _, _, _ = env.step(np.zeros(12, dtype=np.float32))
+            base_z = env.obs_field(obs, "base_position")[2]
+            
+            np.testing.assert_allclose(env.obs_field(obs, "height_scan"), -base_z, atol=1e-3)
+            np.testing.assert_allclose(env.obs_field(obs, "lidar"), 3.0)
+            calls = env.profile_report()["api_calls_per_step"]
+            assert calls["rayTestBatch"] == 1
+            assert calls["getContactPoints"] == 1
+        finally:
+            env.close()
+    
+    def test_scans_see_stairs(self):
+        """Height scan en lidar zien de trap voor de robot"""
+        env = _make_env(Go2StairsEnv, stair_config={"start_distance": 0.5}, sensors=self.ALL_SENSORS)
+        try:
+            obs, _ = env.reset()
+            base_z = env.obs_field(obs, "base_position")[2]
+            
+            # Middelste rij van het raster (x loopt van -0.8 tot 0.8 m)
+            heights = env.obs_field(obs, "height_scan").reshape(11, 17)[5]
+            assert heights[0] == pytest.approx(-base_z, abs=1e-3)
+            assert heights[-1] > heights[0] + 0.3
+            
+            # Lidar ray 0 kijkt vooruit naar de eerste trede
+            lidar = env.obs_field(obs, "lidar")
+            assert lidar[0] < 1.0 and lidar[len(lidar) // 2] == pytest.approx(3.0)
+        finally:
+            env.close()
+    
+    def test_update_rate_and_contacts(self):
+        """Sensoren met update_every > 1 houden hun meting; voeten raken de vloer"""
+        from src.simulation.sensors import SensorSuite
+        
+        env = _make_env(Go2RLEnv)
+        try:
+            sensors = SensorSuite(env.sim, config={"lidar": {"update_every": 3}, "foot_contacts": None})
+            sensors.update()
+            sensors.values["lidar"][:] = -1.0
+            sensors.update()
+            sensors.update()
+            assert np.all(sensors.values["lidar"] == -1.0)
+            sensors.update()
+            assert np.all(sensors.values["lidar"] == 3.0)
+            
+            touched = np.zeros(4)
+            for _ in range(60):
+                env.sim.step()
+                touched += sensors.update()["foot_contacts"]
+            assert np.any(touched > 0)
+        finally:
+            env.close()
+    
+    def test_unknown_sensor_raises(self):
+        """Onbekende sensor geeft een duidelijke fout"""
+        with pytest.raises(ValueError, match="sensor"):
+            Go2RLEnv(gui=False, sensors={"camera": None})
+
+
+class TestRandomization:
+    """Test domain randomization per episode"""
+    
+    ALL_PARAMS = {
+        "friction": None, "mass_scale": None, "payload": None, "motor_strength": None,
+        "kp": None, "kd": None, "latency": None, "gravity_tilt": None,
+    }
+    
+    def test_seeded_and_logged(self):
+        """Dezelfde seed geeft dezelfde trekking; waarden staan in info"""
+        env = _make_env(Go2RLEnv, randomization=self.ALL_PARAMS)
+        other = _make_env(Go2RLEnv, randomization=self.ALL_PARAMS)
+        try:
+            _, info = env.reset(seed=7)
+            _, other_info = other.reset(seed=7)
+            values = {k: v for k, v in info.items() if k.startswith("randomization/")}
+            assert len(values) == len(self.ALL_PARAMS)
+            assert values == {k: v for k, v in other_info.items() if k.startswith("randomization/")}
+            
+            _, info = env.reset()
+            assert info["randomization/friction"] != values["randomization/friction"]
+        finally:
+            env.close()
+            other.close()
+    
+    def test_applied_to_existing_body(self):
+        """Dynamica en motoren worden aangepast zonder nieuwe bodies"""
+        env = _make_env(
+            Go2RLEnv,
+            randomization={"friction": (0.5, 0.5), "payload": (1.0, 1.0), "motor_strength": (0.5, 0.5)}
+        )
+        try:
+            client = env.sim.client
+            robot_id = env.sim.robot_id
+            num_bodies = p.getNumBodies(physicsClientId=client)
+            env.reset()
+            
+            nominal = env.randomizer.nominal_masses[0]
+            mass, friction = p.getDynamicsInfo(robot_id, -1, physicsClientId=client)[:2]
+            assert mass == pytest.approx(nominal + 1.0)
+            assert friction == pytest.approx(env.randomizer.nominal_friction[0] * 0.5)
+            np.testing.assert_allclose(env.sim.joint_forces[0], 50.0)
+            assert p.getNumBodies(physicsClientId=client) == num_bodies
+            
+            # Zonder randomization terug naar nominaal
+            env.set_randomization(None)
+            _, info = env.reset()
+            assert p.getDynamicsInfo(robot_id, -1, physicsClientId=client)[0] == pytest.approx(nominal)
+            np.testing.assert_allclose(env.sim.joint_forces[0], env.sim.default_joint_forces)
+            assert not any(k.startswith("randomization/") for k in info)
+        finally:
+            env.close()
+    
+    def test_latency_delays_targets(self):
+        """Met latency bereiken nieuwe targets de motoren pas na N physics stappen"""
+        env = _make_env(Go2RLEnv, randomization={"latency": (4 / 240, 4 / 240)})
+        reference = _make_env(Go2RLEnv, randomization={"latency": (0.0, 0.0)})
+        try:
+            assert env.randomizer.latency_steps == 4
+            assert reference.randomizer.latency_steps == 0
+            action = np.ones(12, dtype=np.float32)
+            moved = []
+            for e in (env, reference):
+                start = e.sim.get_state_frame().joint_positions[0].copy()
+                for _ in range(4):
+                    e.step(action)
+                moved.append(np.abs(e.sim.get_state_frame().joint_positions[0] - start).max())
+            assert moved[0] < 0.5 * moved[1]
+        finally:
+            env.close()
+            reference.close()
+    
+    def test_reset_cost(self):
+        """Een nieuwe trekking kost ruim minder dan een milliseconde"""
+        import time
+        
+        env = _make_env(Go2RLEnv, randomization=self.ALL_PARAMS)
+        try:
+            start = time.perf_counter()
+            for _ in range(50):
+                env.randomizer.sample(env.np_random)
+            assert (time.perf_counter() - start) / 50 < 1e-3
+        finally:
+            env.close()
+    
+    def test_unknown_parameter_raises(self):
+        """Onbekende parameter geeft een duidelijke fout"""
+        with pytest.raises(ValueError, match="randomization"):
+            Go2RLEnv(gui=False, randomization={"wind": None})
+
+
+class TestEvaluation:
+    """Test de parallelle evaluatie harness"""
+    
+    def test_confidence_intervals(self):
+        """Intervallen omvatten het gemiddelde en blijven binnen [0, 1] voor fracties"""
+        from src.simulation.evaluation import mean_confidence_interval, proportion_confidence_interval
+        
+        mean, low, high = mean_confidence_interval([1.0, 2.0, 3.0, 4.0])
+        assert mean == pytest.approx(2.5) and low < mean < high
+        assert mean_confidence_interval([5.0]) == (5.0, 5.0, 5.0)
+        
+        rate, low, high = proportion_confidence_interval(0, 10)
+        assert rate == 0.0 and low == pytest.approx(0.0, abs=1e-12) and 0.0 < high < 0.5
+    
+    def test_summarize_groups(self):
+        """Samenvatting per model en configuratie"""
+        from src.simulation.evaluation import summarize
+        
+        results = [
+            {"model": "a", "config": c, "return": float(i), "length": 10, "success": i % 2 == 0, "fallen": False}
+            for c in (0, 1) for i in range(4)
+        ]
+        summary = summarize(results)
+        assert [(row["model"], row["config"]) for row in summary] == [("a", 0), ("a", 1)]
+        assert summary[0]["episodes"] == 4
+        assert summary[0]["success_rate"][0] == pytest.approx(0.5)
+        assert summary[0]["return"][0] == pytest.approx(1.5)
+    
+    def test_streams_reproducible_results(self, tmp_path):
+        """Resultaten komen per episode in het bestand en hangen alleen af van de seeds"""
+        pytest.importorskip("stable_baselines3")
+        from stable_baselines3 import PPO
+        from src.simulation.evaluation import make_tasks, evaluate_parallel, read_results
+        
+        env = _make_env(Go2StairsEnv)
+        model_path = str(tmp_path / "ppo_model")
+        PPO("MlpPolicy", env, n_steps=64, batch_size=32, device="cpu").save(model_path)
+        env.close()
+        
+        tasks = make_tasks(
+            [model_path + ".zip"],
+            seeds=[0, 1],
+            num_episodes=2,
+            stair_configs=[{"num_steps": 3}, None],
+            env_kwargs={"max_episode_steps": 5, "randomization": {"friction": None}}
+        )
+        assert len(tasks) == 8
+        
+        results_path = tmp_path / "results.jsonl"
+        results = evaluate_parallel(tasks, results_path=str(results_path), num_workers=0)
+        assert read_results(str(results_path)) == results
+        assert all(result["length"] == 5 and "steps_reached" in result for result in results)
+        
+        again = evaluate_parallel(list(reversed(tasks)), num_workers=0)
+        assert list(reversed(again)) == results
+    
+    def test_async_eval_callback(self, tmp_path):
+        """Evaluatie in een worker proces levert resultaten en een best model op"""
+        pytest.importorskip("stable_baselines3")
+        from stable_baselines3 import PPO
+        from src.simulation.callbacks import AsyncEvalCallback
+        
+        env = Go2RLEnv(gui=False, max_episode_steps=5)
+        model = PPO("MlpPolicy", env, n_steps=64, batch_size=32, n_epochs=1, device="cpu")
+        callback = AsyncEvalCallback(
+            env="rl",
+            env_kwargs={"max_episode_steps": 5},
+            eval_freq=32,
+            n_eval_episodes=1,
+            best_model_save_path=str(tmp_path / "best_model"),
+            log_path=str(tmp_path / "logs"),
+            verbose=0
+        )
+        try:
+            model.learn(128, callback=callback)
+        finally:
+            callback.close()
+            env.close()
+        
+        # De eerste evaluatie wordt altijd afgerond, latere kunnen overgeslagen zijn
+        assert callback.evaluations_timesteps[0] == 32
+        assert len(callback.evaluations_timesteps) + callback.skipped == 4
+        assert (tmp_path / "best_model" / "best_model.zip").exists()
+        assert (tmp_path / "logs" / "evaluations.npz").exists()
+    
+    def test_async_eval_callback_logs_at_learner_steps(self):
+        """Evaluatie resultaten worden door de learner gedumpt, nooit bij een oudere timestep"""
+        pytest.importorskip("stable_baselines3")
+        from stable_baselines3 import PPO
+        from stable_baselines3.common.logger import KVWriter, Logger
+        from src.simulation.callbacks import AsyncEvalCallback
+        
+        class Capture(KVWriter):
+            def __init__(self):
+                self.dumps = []
+            
+            def write(self, key_values, key_excluded, step=0):
+                self.dumps.append((step, dict(key_values)))
+        
+        capture = Capture()
+        env = Go2RLEnv(gui=False, max_episode_steps=5)
+        model = PPO("MlpPolicy", env, n_steps=64, batch_size=32, n_epochs=1, device="cpu")
+        model.set_logger(Logger(None, [capture]))
+        callback = AsyncEvalCallback(env="rl", env_kwargs={"max_episode_steps": 5}, eval_freq=32, n_eval_episodes=1, verbose=0)
+        try:
+            model.learn(128, callback=callback)
+        finally:
+            callback.close()
+            env.close()
+        
+        steps = [step for step, _ in capture.dumps]
+        assert steps == sorted(steps) and set(steps) <= {64, 128}
+        eval_dumps = [values for _, values in capture.dumps if "eval/mean_reward" in values]
+        assert eval_dumps and eval_dumps[0]["eval/snapshot_timesteps"] == 32
+
+
+class TestCheckpointing:
+    """Test checkpoints op de achtergrond"""
+    
+    def test_checkpoints_loadable_and_pruned(self, tmp_path):
+        """Achtergrond checkpoints zijn te laden en oude worden opgeruimd"""
+        pytest.importorskip("stable_baselines3")
+        import torch
+        from stable_baselines3 import PPO
+        from src.simulation.callbacks import BackgroundCheckpointCallback
+        from src.simulation.checkpointing import checkpoint_steps
+        
+        env = Go2RLEnv(gui=False, max_episode_steps=5)
+        model = PPO("MlpPolicy", env, n_steps=32, batch_size=32, n_epochs=1, device="cpu")
+        callback = BackgroundCheckpointCallback(32, str(tmp_path), "go2", keep_last=2, keep_every=64)
+        try:
+            model.learn(160, callback=callback)
+            callback.save(str(tmp_path / "final_model"))
+        finally:
+            callback.close()
+            env.close()
+        
+        assert [steps for steps, _ in checkpoint_steps(str(tmp_path), "go2")] == [64, 128, 160]
+        loaded = PPO.load(str(tmp_path / "final_model.zip"), device="cpu")
+        assert loaded.num_timesteps == 160
+        for name, value in model.policy.state_dict().items():
+            assert torch.equal(value, loaded.policy.state_dict()[name])
+    
+    def test_replay_buffer_incremental(self, tmp_path):
+        """Alleen nieuwe rijen worden geschreven, ook over de rand van de ring buffer"""
+        pytest.importorskip("stable_baselines3")
+        from gymnasium import spaces
+        from stable_baselines3.common.buffers import ReplayBuffer
+        from src.simulation.checkpointing import ReplayBufferStore
+        
+        observation_space = spaces.Box(-1.0, 1.0, (3,), dtype=np.float32)
+        action_space = spaces.Box(-1.0, 1.0, (2,), dtype=np.float32)
+        buffer = ReplayBuffer(10, observation_space, action_space, device="cpu")
+        store = ReplayBufferStore(str(tmp_path / "replay_buffer"))
+        
+        def add(count, start):
+            for i in range(start, start + count):
+                obs = np.full((1, 3), i, dtype=np.float32)
+                buffer.add(obs, obs + 1, np.full((1, 2), i), np.array([i]), np.array([False]), [{}])
+        
+        add(6, 0)
+        store.write(store.snapshot(buffer, 6))
+        add(7, 6)
+        payload = store.snapshot(buffer, 13)
+        assert [rows for rows, _ in payload["rows"]] == [slice(6, 10), slice(0, 3)]
+        store.write(payload)
+        
+        restored = ReplayBuffer(10, observation_space, action_space, device="cpu")
+        meta = ReplayBufferStore(str(tmp_path / "replay_buffer")).load(restored)
+        assert meta["num_timesteps"] == 13 and restored.pos == 3 and restored.full
+        for name in ("observations", "next_observations", "actions", "rewards"):
+            assert np.array_equal(getattr(restored, name), getattr(buffer, name))
+        
+        # Verder na hervatten: de vrije set wordt eerst van de actieve set gekopieerd
+        store = ReplayBufferStore(str(tmp_path / "replay_buffer"))
+        assert store.sync(buffer, 13)
+        add(4, 13)
+        payload = store.snapshot(buffer, 17)
+        assert [rows for rows, _ in payload["rows"]] == [slice(3, 7)]
+        store.write(payload)
+        restored = ReplayBuffer(10, observation_space, action_space, device="cpu")
+        assert ReplayBufferStore(str(tmp_path / "replay_buffer")).load(restored)["num_timesteps"] == 17
+        for name in ("observations", "next_observations", "actions", "rewards"):
+            assert np.array_equal(getattr(restored, name), getattr(buffer, name))
+    
+    def test_replay_buffer_interrupted_write(self, tmp_path):
+        """Een afgebroken checkpoint laat de vorige buffer en zijn training state leesbaar"""
+        pytest.importorskip("stable_baselines3")
+        from gymnasium import spaces
+        from stable_baselines3.common.buffers import ReplayBuffer
+        from src.simulation.checkpointing import ReplayBufferStore
+        
+        observation_space = spaces.Box(-1.0, 1.0, (3,), dtype=np.float32)
+        action_space = spaces.Box(-1.0, 1.0, (2,), dtype=np.float32)
+        buffer = ReplayBuffer(8, observation_space, action_space, device="cpu")
+        store = ReplayBufferStore(str(tmp_path / "replay_buffer"))
+        
+        def add(count, start):
+            for i in range(start, start + count):
+                obs = np.full((1, 3), i, dtype=np.float32)
+                buffer.add(obs, obs + 1, np.full((1, 2), i), np.array([i]), np.array([False]), [{}])
+        
+        def load(position=None):
+            restored = ReplayBuffer(8, observation_space, action_space, device="cpu")
+            ReplayBufferStore(str(tmp_path / "replay_buffer")).load(restored, position=position)
+            return restored
+        
+        add(6, 0)
+        store.write(store.snapshot(buffer, 6))
+        add(6, 6)
+        store.write(store.snapshot(buffer, 12))
+        expected = {name: getattr(buffer, name).copy() for name in ("observations", "actions", "rewards")}
+        position = {"pos": buffer.pos, "full": buffer.full, "num_timesteps": 12}
+        
+        # Crash halverwege: een deel van de velden is al in de vrije set geschreven
+        add(5, 12)
+        payload = store.snapshot(buffer, 17)
+        for _, values in payload["rows"]:
+            del values["rewards"]
+        with pytest.raises(KeyError):
+            store.write(payload)
+        for restored in (load(), load(position)):
+            assert restored.pos == 4 and restored.full
+            for name, values in expected.items():
+                assert np.array_equal(getattr(restored, name), values)
+        
+        # Buffer wel omgezet, training_state.json nog niet: de vorige set blijft leesbaar
+        store = ReplayBufferStore(str(tmp_path / "replay_buffer"))
+        assert store.sync(buffer, 12) is False
+        store.write(store.snapshot(buffer, 17))
+        restored = load(position)
+        for name, values in expected.items():
+            assert np.array_equal(getattr(restored, name), values)
+        assert np.array_equal(load().observations, buffer.observations)
+    
+    def test_env_training_state_roundtrip(self):
+        """Random generator en curriculum gaan mee in de training state"""
+        env = Go2StairsEnv(gui=False, max_episode_steps=5, randomization={"friction": None})
+        env.reset(seed=3)
+        env.set_stair_config({"num_steps": 3})
+        state = env.get_training_state()
+        expected = env.np_random.random()
+        env.close()
+        
+        other = Go2StairsEnv(gui=False, max_episode_steps=5)
+        other.set_training_state(json.loads(json.dumps(state)))
+        assert other.np_random.random() == expected
+        assert other.randomization_config == {"friction": None}
+        other.reset()
+        assert other.num_steps == 3
+        other.close()
+    
+    def test_resume_training(self, tmp_path):
+        """Hervatten herstelt tellers, optimizer, replay buffer en environment state"""
+        pytest.importorskip("stable_baselines3")
+        import torch
+        from stable_baselines3 import SAC
+        from stable_baselines3.common.vec_env import DummyVecEnv
+        from src.simulation.callbacks import BackgroundCheckpointCallback
+        from src.simulation.checkpointing import resume_training
+        
+        def make_env():
+            return DummyVecEnv([lambda: Go2RLEnv(gui=False, max_episode_steps=20)])
+        
+        env = make_env()
+        model = SAC("MlpPolicy", env, buffer_size=50, learning_starts=10, batch_size=16, device="cpu")
+        callback = BackgroundCheckpointCallback(40, str(tmp_path), "go2", save_replay_buffer=True)
+        try:
+            model.learn(80, callback=callback)
+            callback.checkpoint()
+        finally:
+            callback.close()
+        env_state = env.env_method("get_training_state")[0]
+        env.close()
+        
+        env = make_env()
+        resumed, state = resume_training(str(tmp_path), env, device="cpu")
+        assert state["num_timesteps"] == resumed.num_timesteps == 80
+        assert resumed._episode_num == model._episode_num == 4
+        assert env.env_method("get_training_state")[0]["np_random"] == env_state["np_random"]
+        for name in ("observations", "actions", "rewards"):
+            assert np.array_equal(getattr(resumed.replay_buffer, name), getattr(model.replay_buffer, name))
+        assert resumed.replay_buffer.pos == model.replay_buffer.pos
+        saved = model.actor.optimizer.state_dict()["state"][0]["exp_avg"]
+        assert torch.equal(resumed.actor.optimizer.state_dict()["state"][0]["exp_avg"], saved)
+        
+        resumed.learn(20, reset_num_timesteps=False)
+        assert resumed.num_timesteps == 100
+        env.close()
+
+
+class TestRecording:
+    """Test de memory-mapped rollout opname"""
+    
+    def test_records_transitions_across_chunks(self, tmp_path):
+        """Transities, episodes en reward termen komen terug uit de opname, ook over chunk grenzen"""
+        from src.simulation.recording import RolloutRecorder, RolloutReader
+        
+        env = RolloutRecorder(
+            Go2StairsEnv(gui=False, max_episode_steps=7),
+            str(tmp_path),
+            chunk_size=5,
+            record_reward_terms=True,
+            record_contacts=True
+        )
+        observations, rewards = [], []
+        for seed in range(3):
+            obs, _ = env.reset(seed=seed)
+            done = False
+            while not done:
+                observations.append(obs)
+                obs, reward, done, truncated, _ = env.step(env.action_space.sample())
+                rewards.append(reward)
+        env.close()
+        
+        reader = RolloutReader(str(tmp_path))
+        assert len(reader) == 21 and len(reader.index["chunks"]) == 5
+        assert np.array_equal(reader.column("obs"), np.array(observations))
+        assert np.allclose(reader.column("reward"), rewards, atol=1e-4)
+        assert np.allclose(reader.column("reward_terms").sum(axis=1), rewards, atol=1e-3)
+        assert reader.column("contacts").shape == (21, 4)
+        
+        episodes = reader.episodes
+        assert list(episodes["start"]) == [0, 7, 14] and list(episodes["length"]) == [7, 7, 7]
+        episode = reader.episode(1)
+        assert list(episode["step"]) == list(range(7)) and set(episode["episode"]) == {1}
+        assert episode["terminated"][-1] and episodes["return"][1] == pytest.approx(sum(rewards[7:14]), abs=1e-3)
+    
+    def test_appends_to_existing_recording(self, tmp_path):
+        """Een nieuwe opname in dezelfde map gaat verder met de episode nummers"""
+        from src.simulation.recording import RolloutRecorder, RolloutReader
+        
+        for _ in range(2):
+            env = RolloutRecorder(Go2RLEnv(gui=False, max_episode_steps=4), str(tmp_path), chunk_size=100)
+            env.reset(seed=0)
+            for _ in range(6):
+                _, _, done, _, _ = env.step(np.zeros(12, dtype=np.float32))
+                if done:
+                    env.reset()
+            env.close()
+        
+        reader = RolloutReader(str(tmp_path))
+        assert len(reader) == 12
+        # Per sessie: één volledige episode en één afgebroken (2 stappen, niet terminated)
+        assert list(reader.episodes["length"]) == [4, 2, 4, 2]
+        assert list(reader.episodes["terminated"]) == [True, False, True, False]
+        assert list(reader.column("episode")) == [0] * 4 + [1] * 2 + [2] * 4 + [3] * 2